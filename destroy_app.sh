@@ -123,6 +123,13 @@ fi
 # Verificar por puerto como fallback
 kill_by_port $UPLOAD_SERVICE_PORT "UploadService"
 
+# El worker de lotes no escucha en ningún puerto; SIGTERM devuelve sus jobs a la cola
+if pgrep -f "python -m src.worker" >/dev/null 2>&1; then
+    pkill -TERM -f "python -m src.worker"
+    sleep 1
+    echo -e "${GREEN}✓${NC} Worker de UploadService detenido"
+fi
+
 echo ""
 
 # ============================================
@@ -0,0 +1,66 @@
+"""Make TransactionCategory.description unique
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-17 00:00:00.000000
+
+The UploadService creates missing categories with a single INSERT that
+skips duplicate keys (ON DUPLICATE KEY UPDATE of the description to
+itself), which relies on a unique index on description to stay
+idempotent when several uploads create the same category concurrently.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+from sqlalchemy import text
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Merge duplicate categories and add the unique index.
+
+    Duplicates created by concurrent uploads before this migration are
+    merged into the category with the lowest id_category: transactions are
+    repointed to it and the other rows are deleted.
+    """
+    op.execute(text("""
+        UPDATE `Transaction` t
+        JOIN TransactionCategory c ON c.id_category = t.id_category
+        JOIN (
+            SELECT description, MIN(id_category) AS keep_id
+            FROM TransactionCategory
+            GROUP BY description
+            HAVING COUNT(*) > 1
+        ) d ON d.description = c.description
+        SET t.id_category = d.keep_id
+        WHERE t.id_category <> d.keep_id
+    """))
+    op.execute(text("""
+        DELETE c FROM TransactionCategory c
+        JOIN (
+            SELECT description, MIN(id_category) AS keep_id
+            FROM TransactionCategory
+            GROUP BY description
+            HAVING COUNT(*) > 1
+        ) d ON d.description = c.description
+        WHERE c.id_category <> d.keep_id
+    """))
+
+    op.create_unique_constraint(
+        'uq_transactioncategory_description', 'TransactionCategory', ['description']
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the unique index on TransactionCategory.description.
+    """
+    op.drop_constraint(
+        'uq_transactioncategory_description', 'TransactionCategory', type_='unique'
+    )
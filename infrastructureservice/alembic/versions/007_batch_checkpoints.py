@@ -0,0 +1,48 @@
+"""Add batch checkpoints and per-batch row keys
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-17 00:00:00.000000
+
+The UploadService commits the transactions of a batch chunk by chunk. This
+migration lets it resume an interrupted batch instead of starting over:
+- TransactionBatch.processed_records: rows committed so far, updated in the
+  same transaction as each chunk
+- Transaction.batch_row: ordinal of the row within its batch, unique together
+  with id_batch, so chunks inserted again after a retry skip existing rows
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '007'
+down_revision: Union[str, None] = '006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add TransactionBatch.processed_records and Transaction.batch_row.
+
+    Existing transactions keep batch_row NULL, which the unique constraint allows.
+    """
+    op.add_column(
+        'TransactionBatch',
+        sa.Column('processed_records', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.add_column('Transaction', sa.Column('batch_row', sa.Integer(), nullable=True))
+    op.create_unique_constraint(
+        'uq_transaction_batch_row', 'Transaction', ['id_batch', 'batch_row']
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the checkpoint and row key columns.
+    """
+    op.drop_constraint('uq_transaction_batch_row', 'Transaction', type_='unique')
+    op.drop_column('Transaction', 'batch_row')
+    op.drop_column('TransactionBatch', 'processed_records')
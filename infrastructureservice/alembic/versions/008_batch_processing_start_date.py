@@ -0,0 +1,38 @@
+"""Add TransactionBatch.processing_start_date
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-17 00:00:00.000000
+
+start_date is the upload time, which includes the time the batch waited in
+the job queue. processing_start_date records when a worker first picked the
+batch up, so the UploadService can report throughput and an ETA from
+processed_records.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '008'
+down_revision: Union[str, None] = '007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add TransactionBatch.processing_start_date.
+    """
+    op.add_column(
+        'TransactionBatch',
+        sa.Column('processing_start_date', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop TransactionBatch.processing_start_date.
+    """
+    op.drop_column('TransactionBatch', 'processing_start_date')
@@ -0,0 +1,47 @@
+"""Add ClassificationCache table
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-17 00:00:00.000000
+
+Shared tier of the UploadService prediction cache. Bank descriptions repeat
+constantly, so the category predicted for a (cleaned description,
+transaction type) pair is stored once per model version and reused by every
+worker instead of running the model again.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '009'
+down_revision: Union[str, None] = '008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create the ClassificationCache table.
+    """
+    op.create_table(
+        'ClassificationCache',
+        sa.Column('cache_key', mysql.CHAR(64), nullable=False),
+        sa.Column('model_version', sa.String(64), nullable=False),
+        sa.Column('category', sa.String(255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('cache_key'),
+    )
+    op.create_index(
+        'ix_ClassificationCache_model_version', 'ClassificationCache', ['model_version']
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the ClassificationCache table.
+    """
+    op.drop_index('ix_ClassificationCache_model_version', table_name='ClassificationCache')
+    op.drop_table('ClassificationCache')
@@ -0,0 +1,55 @@
+"""Add MerchantRule table and TransactionBatch.rule_matched_records
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-17 00:00:00.000000
+
+Known merchants and transfer patterns are categorized by deterministic rules
+before the ML classifier runs. A rule matches a normalized description
+exactly or by prefix; rules without id_user apply to every user and are
+maintained by administrators, the others belong to one user.
+rule_matched_records counts the rows of a batch categorized by a rule.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '010'
+down_revision: Union[str, None] = '009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create the MerchantRule table and add TransactionBatch.rule_matched_records.
+    """
+    op.create_table(
+        'MerchantRule',
+        sa.Column('id_rule', mysql.CHAR(36), nullable=False),
+        sa.Column('id_user', mysql.CHAR(36), nullable=True),
+        sa.Column('pattern', sa.String(255), nullable=False),
+        sa.Column('match_type', sa.String(10), nullable=False),
+        sa.Column('id_category', mysql.CHAR(36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id_rule'),
+        sa.ForeignKeyConstraint(['id_category'], ['TransactionCategory.id_category']),
+        sa.UniqueConstraint('id_user', 'pattern', 'match_type', name='uq_merchant_rule'),
+    )
+    op.create_index('ix_MerchantRule_id_user', 'MerchantRule', ['id_user'])
+    op.add_column(
+        'TransactionBatch',
+        sa.Column('rule_matched_records', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop TransactionBatch.rule_matched_records and the MerchantRule table.
+    """
+    op.drop_column('TransactionBatch', 'rule_matched_records')
+    op.drop_index('ix_MerchantRule_id_user', table_name='MerchantRule')
+    op.drop_table('MerchantRule')
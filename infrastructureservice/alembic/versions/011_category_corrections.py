@@ -0,0 +1,47 @@
+"""Add CategoryCorrection table
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-17 00:00:00.000000
+
+Every category a user corrects on a transaction is recorded with the
+transaction's description and amount. The UploadService folds new
+corrections into the classifier incrementally; id_correction increases
+monotonically, so a model version records the last correction it learned.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '011'
+down_revision: Union[str, None] = '010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create the CategoryCorrection table.
+    """
+    op.create_table(
+        'CategoryCorrection',
+        sa.Column('id_correction', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('id_user', mysql.CHAR(36), nullable=False),
+        sa.Column('id_transaction', mysql.CHAR(36), nullable=True),
+        sa.Column('description', sa.String(255), nullable=False),
+        sa.Column('value', sa.Numeric(15, 2), nullable=True),
+        sa.Column('id_category', mysql.CHAR(36), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id_correction'),
+        sa.ForeignKeyConstraint(['id_category'], ['TransactionCategory.id_category']),
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the CategoryCorrection table.
+    """
+    op.drop_table('CategoryCorrection')
@@ -0,0 +1,48 @@
+"""Add ReclassificationJob table
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17 00:00:00.000000
+
+Checkpoint of the bulk reclassification job of the UploadService. The job
+pages through Transaction by id_transaction; last_id_transaction is the
+keyset cursor it resumes from after an interruption.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '012'
+down_revision: Union[str, None] = '011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create the ReclassificationJob table.
+    """
+    op.create_table(
+        'ReclassificationJob',
+        sa.Column('id_job', mysql.CHAR(36), nullable=False),
+        sa.Column('status', sa.String(50), nullable=False),
+        sa.Column('model_version', sa.String(64), nullable=True),
+        sa.Column('last_id_transaction', mysql.CHAR(36), nullable=True),
+        sa.Column('scanned_records', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('changed_records', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('start_date', sa.DateTime(), nullable=False),
+        sa.Column('end_date', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id_job'),
+    )
+    op.create_index('ix_ReclassificationJob_status', 'ReclassificationJob', ['status'])
+
+
+def downgrade() -> None:
+    """
+    Drop the ReclassificationJob table.
+    """
+    op.drop_index('ix_ReclassificationJob_status', table_name='ReclassificationJob')
+    op.drop_table('ReclassificationJob')
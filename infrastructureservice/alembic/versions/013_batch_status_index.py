@@ -0,0 +1,32 @@
+"""Index TransactionBatch.process_status
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17 00:00:00.000000
+
+The UploadService counts the pending and processing batches on every
+upload to turn uploads away while the backlog is full.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '013'
+down_revision: Union[str, None] = '012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create the index on TransactionBatch.process_status.
+    """
+    op.create_index('ix_TransactionBatch_process_status', 'TransactionBatch', ['process_status'])
+
+
+def downgrade() -> None:
+    """
+    Drop the index on TransactionBatch.process_status.
+    """
+    op.drop_index('ix_TransactionBatch_process_status', table_name='TransactionBatch')
@@ -0,0 +1,32 @@
+"""Index CategoryCorrection.description
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17 00:00:00.000000
+
+The UploadService looks up the corrections other users made to the same
+description before it learns a correction into the shared model.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '014'
+down_revision: Union[str, None] = '013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Create the index on CategoryCorrection.description.
+    """
+    op.create_index('ix_CategoryCorrection_description', 'CategoryCorrection', ['description'])
+
+
+def downgrade() -> None:
+    """
+    Drop the index on CategoryCorrection.description.
+    """
+    op.drop_index('ix_CategoryCorrection_description', table_name='CategoryCorrection')
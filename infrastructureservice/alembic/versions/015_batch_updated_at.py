@@ -0,0 +1,39 @@
+"""Add TransactionBatch.updated_at
+
+Revision ID: 015
+Revises: 014
+Create Date: 2026-10-17 00:00:00.000000
+
+The UploadService sets updated_at on every change of a batch (status or
+checkpoint). Pending or processing batches that stopped changing no longer
+count against its upload limits, so a stuck batch can't block a user for
+good. Existing batches start from their latest known date.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '015'
+down_revision: Union[str, None] = '014'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Add the updated_at column to TransactionBatch.
+    """
+    op.add_column('TransactionBatch', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE TransactionBatch "
+        "SET updated_at = COALESCE(end_date, processing_start_date, start_date)"
+    )
+
+
+def downgrade() -> None:
+    """
+    Drop the updated_at column from TransactionBatch.
+    """
+    op.drop_column('TransactionBatch', 'updated_at')
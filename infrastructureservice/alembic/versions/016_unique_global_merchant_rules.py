@@ -0,0 +1,58 @@
+"""Make global merchant rules unique
+
+Revision ID: 016
+Revises: 015
+Create Date: 2026-10-17 00:00:00.000000
+
+uq_merchant_rule covered (id_user, pattern, match_type), but global rules
+have no id_user and NULLs never collide in a unique index, so the same
+global rule could be stored twice. The key now uses rule_owner, a stored
+generated column holding id_user or '' for global rules. Duplicate global
+rules already stored are removed first, keeping the oldest.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+# revision identifiers, used by Alembic.
+revision: str = '016'
+down_revision: Union[str, None] = '015'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Remove duplicate global rules and key uq_merchant_rule on rule_owner.
+    """
+    op.execute(
+        "DELETE duplicate FROM MerchantRule duplicate "
+        "JOIN MerchantRule kept "
+        "ON kept.id_user IS NULL AND duplicate.id_user IS NULL "
+        "AND kept.pattern = duplicate.pattern AND kept.match_type = duplicate.match_type "
+        "AND (kept.created_at < duplicate.created_at "
+        "OR (kept.created_at = duplicate.created_at AND kept.id_rule < duplicate.id_rule))"
+    )
+    op.add_column(
+        'MerchantRule',
+        sa.Column(
+            'rule_owner', mysql.CHAR(36), sa.Computed("COALESCE(id_user, '')", persisted=True)
+        ),
+    )
+    op.drop_constraint('uq_merchant_rule', 'MerchantRule', type_='unique')
+    op.create_unique_constraint(
+        'uq_merchant_rule', 'MerchantRule', ['rule_owner', 'pattern', 'match_type']
+    )
+
+
+def downgrade() -> None:
+    """
+    Key uq_merchant_rule on id_user again and drop rule_owner.
+    """
+    op.drop_constraint('uq_merchant_rule', 'MerchantRule', type_='unique')
+    op.create_unique_constraint(
+        'uq_merchant_rule', 'MerchantRule', ['id_user', 'pattern', 'match_type']
+    )
+    op.drop_column('MerchantRule', 'rule_owner')
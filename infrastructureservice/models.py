@@ -8,7 +8,9 @@ Este archivo define TODOS los modelos que serán usados por:
 
 Las migraciones se generan a partir de estos modelos.
 """
-from sqlalchemy import Column, String, DateTime, Numeric, ForeignKey, Integer, Boolean, Text
+from sqlalchemy import (
+    Column, Computed, String, DateTime, Numeric, ForeignKey, Integer, Boolean, Text, UniqueConstraint,
+)
 from sqlalchemy.dialects.mysql import CHAR
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
@@ -94,7 +96,7 @@ class TransactionCategory(Base):
     __tablename__ = "TransactionCategory"
 
     id_category = Column(CHAR(36), primary_key=True, default=generate_uuid)
-    description = Column(String(255), nullable=False)
+    description = Column(String(255), nullable=False, unique=True)
 
 
 class TransactionBatch(Base):
@@ -105,10 +107,19 @@ class TransactionBatch(Base):
     __tablename__ = "TransactionBatch"
 
     id_batch = Column(CHAR(36), primary_key=True, default=generate_uuid)
-    process_status = Column(String(50), nullable=False)  # pending, processing, completed, error
+    process_status = Column(String(50), nullable=False, index=True)  # pending, processing, completed, error
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=True)
     batch_size = Column(Integer, nullable=True)
+    # Filas confirmadas hasta ahora; el procesamiento se reanuda desde aquí
+    processed_records = Column(Integer, nullable=False, default=0, server_default="0")
+    # Momento en que un worker empezó a procesar el lote (para throughput y ETA)
+    processing_start_date = Column(DateTime, nullable=True)
+    # Filas categorizadas por una regla de comercio (sin pasar por el modelo)
+    rule_matched_records = Column(Integer, nullable=False, default=0, server_default="0")
+    # Último cambio del lote (estado o avance); los lotes sin terminar que
+    # dejaron de cambiar ya no cuentan para los límites de carga
+    updated_at = Column(DateTime, nullable=True)
 
 
 class Transaction(Base):
@@ -130,6 +141,12 @@ class Transaction(Base):
     value = Column(Numeric(15, 2), nullable=False)
     transaction_date = Column(DateTime, nullable=False)
     transaction_type = Column(String(50), nullable=False)  # income, expense
+    # Ordinal de la fila dentro del lote (id_batch, batch_row identifica la fila)
+    batch_row = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("id_batch", "batch_row", name="uq_transaction_batch_row"),
+    )
 
 
 class FileUploadHistory(Base):
@@ -151,6 +168,83 @@ class FileUploadHistory(Base):
     file_size = Column(Integer, nullable=False)
 
 
+class ClassificationCache(Base):
+    """
+    Caché de predicciones del clasificador de transacciones
+    Usado por: UploadService (compartida entre todos los workers)
+
+    La clave es el SHA256 de (versión del modelo, tipo, descripción limpia)
+    """
+    __tablename__ = "ClassificationCache"
+
+    cache_key = Column(CHAR(64), primary_key=True)
+    model_version = Column(String(64), nullable=False, index=True)
+    category = Column(String(255), nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class MerchantRule(Base):
+    """
+    Reglas de categorización de comercios conocidos
+    Usado por: UploadService (se aplican antes del clasificador ML)
+
+    pattern es la descripción normalizada (mayúsculas, solo A-Z, 0-9 y espacios).
+    Sin id_user la regla es global y la mantienen los administradores.
+    """
+    __tablename__ = "MerchantRule"
+
+    id_rule = Column(CHAR(36), primary_key=True, default=generate_uuid)
+    id_user = Column(CHAR(36), nullable=True, index=True)  # No FK - validación via API
+    # id_user, o '' en las reglas globales: los NULL nunca chocan en un índice único
+    rule_owner = Column(CHAR(36), Computed("COALESCE(id_user, '')", persisted=True))
+    pattern = Column(String(255), nullable=False)
+    match_type = Column(String(10), nullable=False)  # exact, prefix
+    id_category = Column(CHAR(36), ForeignKey("TransactionCategory.id_category"), nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("rule_owner", "pattern", "match_type", name="uq_merchant_rule"),
+    )
+
+
+class CategoryCorrection(Base):
+    """
+    Correcciones de categoría hechas por los usuarios
+    Usado por: UploadService (aprendizaje incremental del clasificador)
+
+    id_correction es incremental: cada versión del modelo guarda la última
+    corrección que aprendió
+    """
+    __tablename__ = "CategoryCorrection"
+
+    id_correction = Column(Integer, primary_key=True, autoincrement=True)
+    id_user = Column(CHAR(36), nullable=False)  # No FK - validación via API
+    id_transaction = Column(CHAR(36), nullable=True)
+    description = Column(String(255), nullable=False, index=True)
+    value = Column(Numeric(15, 2), nullable=True)
+    id_category = Column(CHAR(36), ForeignKey("TransactionCategory.id_category"), nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class ReclassificationJob(Base):
+    """
+    Checkpoint de la reclasificación masiva de transacciones
+    Usado por: UploadService (python -m src.reclassify)
+
+    last_id_transaction es el cursor (keyset) desde el que se reanuda el job
+    """
+    __tablename__ = "ReclassificationJob"
+
+    id_job = Column(CHAR(36), primary_key=True, default=generate_uuid)
+    status = Column(String(50), nullable=False, index=True)  # running, completed, superseded, error
+    model_version = Column(String(64), nullable=True)
+    last_id_transaction = Column(CHAR(36), nullable=True)
+    scanned_records = Column(Integer, nullable=False, default=0, server_default="0")
+    changed_records = Column(Integer, nullable=False, default=0, server_default="0")
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=True)
+
+
 # ============================================================================
 # INSIGHTS TABLES
 # ============================================================================
@@ -43,4 +43,13 @@ else
     echo -e "${YELLOW}⚠️  No hay ningún proceso corriendo en el puerto $PORT${NC}"
 fi
 
+# Detener el worker de lotes (no escucha en ningún puerto)
+if pgrep -f "python -m src.worker" >/dev/null 2>&1 ; then
+    echo -e "${YELLOW}Deteniendo worker de lotes...${NC}"
+    # SIGTERM: los jobs sin confirmar vuelven a la cola
+    pkill -TERM -f "python -m src.worker"
+    sleep 2
+    echo -e "${GREEN}✓ Worker de lotes detenido${NC}"
+fi
+
 echo ""
\ No newline at end of file
@@ -1,24 +1,51 @@
-from .auth import get_current_user_id
+from .auth import get_current_user_id, get_admin_user_id, get_admin_user_ids
 from .repositories import (
     get_transaction_repository,
     get_bank_repository,
     get_category_repository,
     get_batch_repository,
     get_user_repository,
+    get_merchant_rule_repository,
+    get_category_correction_repository,
     get_db_session_factory,
 )
-from .services import get_classifier, get_message_broker
+from .services import (
+    get_classifier,
+    get_classification_batcher,
+    get_message_broker,
+    get_reference_data,
+    get_job_queue,
+    get_file_storage,
+    get_stage_executor,
+    get_batch_processor,
+    get_inline_max_rows,
+    get_admission_limits,
+    get_batch_status_broadcaster,
+)
 from .file_upload_history_dependency import get_file_upload_history_repository
 
 __all__ = [
     "get_current_user_id",
+    "get_admin_user_id",
+    "get_admin_user_ids",
     "get_transaction_repository",
     "get_bank_repository",
     "get_category_repository",
     "get_batch_repository",
     "get_user_repository",
+    "get_merchant_rule_repository",
+    "get_category_correction_repository",
     "get_db_session_factory",
     "get_classifier",
+    "get_classification_batcher",
     "get_message_broker",
+    "get_reference_data",
+    "get_job_queue",
+    "get_file_storage",
+    "get_stage_executor",
+    "get_batch_processor",
+    "get_inline_max_rows",
+    "get_admission_limits",
+    "get_batch_status_broadcaster",
     "get_file_upload_history_repository",
 ]
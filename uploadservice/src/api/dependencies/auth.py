@@ -1,5 +1,7 @@
+import os
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from typing import FrozenSet
 from uuid import UUID
 from ...infrastructure.clients import IdentityServiceClient
 
@@ -51,3 +53,41 @@ async def get_current_user_id(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Authentication service unavailable",
         )
+
+
+def get_admin_user_ids() -> FrozenSet[UUID]:
+    """
+    Dependency for the users allowed to administer shared data (e.g. global merchant rules).
+
+    The IdentityService doesn't report roles when validating a token, so
+    administrators are configured here.
+
+    Environment Variables:
+        ADMIN_USER_IDS: Comma-separated user IDs of the administrators (default: none)
+    """
+    return frozenset(
+        UUID(user_id.strip())
+        for user_id in os.getenv("ADMIN_USER_IDS", "").split(",")
+        if user_id.strip()
+    )
+
+
+async def get_admin_user_id(
+    user_id: UUID = Depends(get_current_user_id),
+    admin_user_ids: FrozenSet[UUID] = Depends(get_admin_user_ids),
+) -> UUID:
+    """
+    Validates that the authenticated user is an administrator.
+
+    Returns:
+        UUID: The administrator's user ID
+
+    Raises:
+        HTTPException 403: If the user isn't listed in ADMIN_USER_IDS
+    """
+    if user_id not in admin_user_ids:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Administrator privileges required",
+        )
+    return user_id
@@ -8,6 +8,8 @@ from ...infrastructure.repositories import (
     MySQLCategoryRepository,
     MySQLTransactionBatchRepository,
     MySQLUserRepository,
+    MySQLMerchantRuleRepository,
+    MySQLCategoryCorrectionRepository,
 )
 
 
@@ -86,6 +88,36 @@ async def get_user_repository(
     return MySQLUserRepository(db)
 
 
+async def get_merchant_rule_repository(
+    db: AsyncSession = Depends(get_database),
+) -> MySQLMerchantRuleRepository:
+    """
+    Dependency for getting the merchant rule repository.
+
+    Args:
+        db: Database session
+
+    Returns:
+        MySQLMerchantRuleRepository: Merchant rule repository instance
+    """
+    return MySQLMerchantRuleRepository(db)
+
+
+async def get_category_correction_repository(
+    db: AsyncSession = Depends(get_database),
+) -> MySQLCategoryCorrectionRepository:
+    """
+    Dependency for getting the category correction repository.
+
+    Args:
+        db: Database session
+
+    Returns:
+        MySQLCategoryCorrectionRepository: Category correction repository instance
+    """
+    return MySQLCategoryCorrectionRepository(db)
+
+
 def get_db_session_factory() -> sessionmaker:
     """
     Dependency for getting the session factory.
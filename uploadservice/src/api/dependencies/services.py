@@ -1,11 +1,35 @@
 import os
 import logging
+from typing import Optional
+from uuid import UUID
+from ...application.dto import BatchStatusDTO
+from ...application.services import BatchStatusBroadcaster, ClassificationBatcher
+from ...application.use_cases import GetBatchStatusUseCase, ProcessBatchUseCase
 from ...infrastructure.classifier import SimpleClassifier, MLClassifier
-from ...infrastructure.messaging import RabbitMQProducer
-from ...domain.ports import ClassifierPort, MessageBrokerPort
+from ...infrastructure.messaging import (
+    get_job_queue as get_shared_job_queue,
+    get_message_broker as get_shared_message_broker,
+)
+from ...infrastructure.cache import get_reference_data_cache, get_prediction_cache
+from ...infrastructure.database import get_session_factory
+from ...infrastructure.repositories import MySQLTransactionBatchRepository
+from ...infrastructure.storage import get_file_storage as build_file_storage
+from ...infrastructure.executors import get_stage_executor as build_stage_executor
+from ...domain.ports import (
+    ClassifierPort,
+    MessageBrokerPort,
+    ReferenceDataPort,
+    JobQueuePort,
+    FileStoragePort,
+    StageExecutorPort,
+)
 
 logger = logging.getLogger(__name__)
 
+_classifier: Optional[ClassifierPort] = None
+_batch_status_broadcaster: Optional[BatchStatusBroadcaster] = None
+_classification_batcher: Optional[ClassificationBatcher] = None
+
 
 def get_classifier() -> ClassifierPort:
     """
@@ -17,31 +41,202 @@ def get_classifier() -> ClassifierPort:
     Environment Variables:
         USE_SIMPLE_CLASSIFIER: Set to "true" to use SimpleClassifier instead of MLClassifier
         ML_MODELS_PATH: Path to ML model files (default: uploadservice/models/)
+        ML_COMPILED_MODELS_PATH: Host-wide directory of memory-mapped compiled models
+        PREDICTION_CACHE_SIZE: Predictions kept in the in-process cache (default: 100000)
+        PREDICTION_CACHE_SHARED: Set to "false" to skip the shared ClassificationCache table
+        STAGE_EXECUTOR: Where predictions run off the event loop (see get_stage_executor)
 
     Returns:
-        ClassifierPort: Classifier instance for categorizing transactions
+        ClassifierPort: Process-wide classifier instance for categorizing transactions
     """
+    global _classifier
+    if _classifier is not None:
+        return _classifier
+
     use_simple = os.getenv("USE_SIMPLE_CLASSIFIER", "false").lower() == "true"
 
     if use_simple:
         logger.info("Using SimpleClassifier (returns 'Other' for all transactions)")
-        return SimpleClassifier()
+        _classifier = SimpleClassifier()
     else:
         logger.info("Using MLClassifier (ML-based classification)")
-        return MLClassifier()
+        _classifier = MLClassifier(
+            prediction_cache=get_prediction_cache(),
+            stage_executor=get_stage_executor(),
+        )
+    return _classifier
+
+
+def get_classification_batcher() -> ClassificationBatcher:
+    """
+    Dependency for getting the shared micro-batching classifier.
+
+    Concurrent callers of this process (batch jobs, the classification
+    endpoint) are merged into shared classify_batch calls of the classifier.
+
+    Environment Variables:
+        CLASSIFY_BATCH_MAX_SIZE: Transactions that trigger a batch right away (default: 1024)
+        CLASSIFY_BATCH_MAX_WAIT_MS: Longest wait for more requests to join a batch (default: 5)
+
+    Returns:
+        ClassificationBatcher: Process-wide batcher wrapping get_classifier()
+    """
+    global _classification_batcher
+    if _classification_batcher is None:
+        _classification_batcher = ClassificationBatcher(
+            classifier=get_classifier(),
+            max_batch_size=int(os.getenv("CLASSIFY_BATCH_MAX_SIZE", "1024")),
+            max_wait_ms=float(os.getenv("CLASSIFY_BATCH_MAX_WAIT_MS", "5")),
+        )
+    return _classification_batcher
 
 
 def get_message_broker() -> MessageBrokerPort:
     """
     Dependency for getting the message broker.
 
+    Environment Variables:
+        RABBITMQ_QUEUE_NAME: Queue receiving the batch processed events (default: batch_processed)
+        RABBITMQ_PUBLISH_CHANNELS, RABBITMQ_PUBLISH_BATCH_SIZE,
+        RABBITMQ_PUBLISH_BATCH_WAIT_MS, RABBITMQ_PUBLISH_MAX_PENDING: Pooling and
+            batching of the publisher (see infrastructure.messaging.get_message_broker)
+
     Returns:
-        MessageBrokerPort: RabbitMQ producer instance
+        MessageBrokerPort: Process-wide RabbitMQ producer, connected at startup
+    """
+    return get_shared_message_broker()
+
+
+def get_reference_data() -> ReferenceDataPort:
     """
-    return RabbitMQProducer(
-        host=os.getenv("RABBITMQ_HOST", "localhost"),
-        port=int(os.getenv("RABBITMQ_PORT", "5672")),
-        username=os.getenv("RABBITMQ_USERNAME", "guest"),
-        password=os.getenv("RABBITMQ_PASSWORD", "guest"),
-        queue_name=os.getenv("RABBITMQ_QUEUE_NAME", "batch_processed"),
+    Dependency for getting the process-wide bank and category cache.
+
+    Environment Variables:
+        REFERENCE_DATA_TTL_SECONDS: Seconds between reloads from the database (default: 300)
+
+    Returns:
+        ReferenceDataPort: Reference data cache, preloaded at startup
+    """
+    return get_reference_data_cache()
+
+
+def get_job_queue() -> JobQueuePort:
+    """
+    Dependency for getting the batch job queue.
+
+    Environment Variables:
+        JOB_QUEUE_BACKEND: "rabbitmq" (default) or "memory" (jobs processed in the API process)
+        JOB_QUEUE_NAME: RabbitMQ queue holding the jobs (default: batch_jobs)
+
+    Returns:
+        JobQueuePort: Process-wide job queue, connected at startup
+    """
+    return get_shared_job_queue()
+
+
+def get_file_storage() -> FileStoragePort:
+    """
+    Dependency for getting the storage shared by the API and the batch workers.
+
+    Environment Variables:
+        UPLOAD_STORAGE_PATH: Directory for the uploaded files of queued batches
+
+    Returns:
+        FileStoragePort: Uploaded file storage
+    """
+    return build_file_storage()
+
+
+def get_stage_executor() -> StageExecutorPort:
+    """
+    Dependency for getting the executor of the CPU-bound stages (parsing, inference).
+
+    Environment Variables:
+        STAGE_EXECUTOR: "thread" (default), "process" or "inline"
+        STAGE_EXECUTOR_WORKERS: Threads or processes in the pool
+
+    Returns:
+        StageExecutorPort: Process-wide stage executor
+    """
+    return build_stage_executor()
+
+
+def get_batch_processor() -> ProcessBatchUseCase:
+    """
+    Dependency for processing small batches within the upload request.
+
+    Uses the same classifier, caches and executor as the workers of this process.
+
+    Returns:
+        ProcessBatchUseCase: Batch processor for inline uploads
+    """
+    return ProcessBatchUseCase(
+        classifier=get_classification_batcher(),
+        message_broker=get_message_broker(),
+        reference_data=get_reference_data_cache(),
+        file_storage=build_file_storage(),
+        session_factory=get_session_factory(),
+        stage_executor=get_stage_executor(),
+    )
+
+
+def get_inline_max_rows() -> int:
+    """
+    Dependency for the largest upload processed within the request.
+
+    Environment Variables:
+        UPLOAD_INLINE_MAX_ROWS: Rows (of all files) up to which an upload is
+            processed before responding (default: 200, 0 queues every upload)
+    """
+    return int(os.getenv("UPLOAD_INLINE_MAX_ROWS", "200"))
+
+
+def get_admission_limits() -> tuple:
+    """
+    Dependency for the backlog limits above which uploads are turned away.
+
+    Environment Variables:
+        UPLOAD_MAX_PENDING_BATCHES: Unfinished batches of all users above which
+            uploads get 503 (default: 200, 0 for no limit)
+        UPLOAD_MAX_PENDING_PER_USER: Unfinished batches a user may have before
+            further uploads get 429 (default: 5, 0 for no limit)
+        UPLOAD_RETRY_AFTER_SECONDS: Retry-After sent with those responses (default: 30)
+        UPLOAD_PENDING_STALE_SECONDS: Seconds without changes after which an
+            unfinished batch no longer counts (default: 3600, 0 counts them all)
+
+    Returns:
+        Tuple of (max_pending, max_pending_per_user, retry_after_seconds,
+        stale_after_seconds)
+    """
+    return (
+        int(os.getenv("UPLOAD_MAX_PENDING_BATCHES", "200")),
+        int(os.getenv("UPLOAD_MAX_PENDING_PER_USER", "5")),
+        int(os.getenv("UPLOAD_RETRY_AFTER_SECONDS", "30")),
+        int(os.getenv("UPLOAD_PENDING_STALE_SECONDS", "3600")),
     )
+
+
+async def _load_batch_status(batch_id: UUID) -> Optional[BatchStatusDTO]:
+    # A new session per read, so every read sees the latest committed progress
+    async with get_session_factory()() as session:
+        use_case = GetBatchStatusUseCase(batch_repo=MySQLTransactionBatchRepository(session))
+        return await use_case.execute(batch_id=batch_id)
+
+
+def get_batch_status_broadcaster() -> BatchStatusBroadcaster:
+    """
+    Dependency for getting the process-wide batch status broadcaster.
+
+    Environment Variables:
+        BATCH_STATUS_POLL_SECONDS: Seconds between two reads of a followed batch (default: 1)
+
+    Returns:
+        BatchStatusBroadcaster: Broadcaster shared by every status stream of this process
+    """
+    global _batch_status_broadcaster
+    if _batch_status_broadcaster is None:
+        _batch_status_broadcaster = BatchStatusBroadcaster(
+            load_status=_load_batch_status,
+            interval_seconds=float(os.getenv("BATCH_STATUS_POLL_SECONDS", "1")),
+        )
+    return _batch_status_broadcaster
@@ -0,0 +1,5 @@
+from .request_size_limit import RequestSizeLimitMiddleware
+
+__all__ = [
+    "RequestSizeLimitMiddleware",
+]
@@ -1,5 +1,13 @@
 from .transactions import router as transactions_router
 from .health import router as health_router
 from .test import router as test_router
+from .classification import router as classification_router
+from .merchant_rules import router as merchant_rules_router
 
-__all__ = ["transactions_router", "health_router", "test_router"]
+__all__ = [
+    "transactions_router",
+    "health_router",
+    "test_router",
+    "classification_router",
+    "merchant_rules_router",
+]
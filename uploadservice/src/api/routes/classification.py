@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Depends
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from uuid import UUID
+from ..dependencies import get_current_user_id, get_classification_batcher
+
+router = APIRouter(prefix="/api/v1/classification", tags=["classification"])
+
+MAX_TRANSACTIONS_PER_REQUEST = 1000
+
+
+class TransactionToClassify(BaseModel):
+    description: str
+    value: Optional[float] = None
+
+
+class ClassificationRequest(BaseModel):
+    transactions: List[TransactionToClassify] = Field(
+        ..., min_length=1, max_length=MAX_TRANSACTIONS_PER_REQUEST
+    )
+
+
+class ClassificationResponse(BaseModel):
+    categories: List[str]
+
+
+@router.post("/batch", response_model=ClassificationResponse)
+async def classify_transactions(
+    request: ClassificationRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    classifier=Depends(get_classification_batcher),
+):
+    """
+    Classify transactions without uploading a file.
+
+    Meant for other services classifying manually entered transactions.
+    Concurrent requests are merged into shared model batches, so a single
+    transaction costs about the same as a slice of a large batch.
+
+    Args:
+        request: Up to 1000 descriptions with their optional amounts; the sign
+            of the amount (income or expense) improves the prediction
+        user_id: Current authenticated user ID
+        classifier: Shared micro-batching classifier dependency
+
+    Returns:
+        ClassificationResponse: Category of every transaction, in request order
+
+    Raises:
+        HTTPException 422: If the list is empty or longer than 1000 transactions
+    """
+    categories = await classifier.classify_batch(
+        [transaction.description for transaction in request.transactions],
+        [transaction.value for transaction in request.transactions],
+    )
+    return ClassificationResponse(categories=categories)
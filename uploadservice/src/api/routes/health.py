@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from ...infrastructure.database import get_database
+from ...infrastructure.messaging import get_job_queue
+from ..dependencies import get_classifier
 
 router = APIRouter(prefix="/api/v1/health", tags=["health"])
 
@@ -12,6 +15,16 @@ class HealthResponse(BaseModel):
     database: str
 
 
+class QueueResponse(BaseModel):
+    status: str
+    pending_jobs: int
+
+
+class ReadinessResponse(BaseModel):
+    status: str
+    classifier: str
+
+
 @router.get("", response_model=HealthResponse)
 async def health_check(db: AsyncSession = Depends(get_database)):
     """
@@ -34,3 +47,44 @@ async def health_check(db: AsyncSession = Depends(get_database)):
         status="healthy" if db_status == "healthy" else "degraded",
         database=db_status,
     )
+
+
+@router.get("/queue", response_model=QueueResponse)
+async def queue_depth():
+    """
+    Number of batch jobs waiting for a worker.
+
+    Useful to monitor the processing backlog and to scale the workers.
+
+    Returns:
+        QueueResponse: Queue status and number of pending jobs (-1 if the queue is unreachable)
+    """
+    try:
+        pending_jobs = await get_job_queue().get_depth()
+    except Exception:
+        return QueueResponse(status="unavailable", pending_jobs=-1)
+    return QueueResponse(status="healthy", pending_jobs=pending_jobs)
+
+
+@router.get(
+    "/ready",
+    response_model=ReadinessResponse,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ReadinessResponse}},
+)
+async def readiness_check(classifier=Depends(get_classifier)):
+    """
+    Readiness probe: 200 once the classifier model is loaded and warm.
+
+    The model is loaded in the background at startup. Until it is warm this
+    endpoint answers 503, so load balancers keep traffic away from instances
+    that would serve their first requests with a cold model.
+
+    Returns:
+        ReadinessResponse: "ready", or "starting" with status code 503
+    """
+    if classifier.is_ready:
+        return ReadinessResponse(status="ready", classifier="warm")
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=ReadinessResponse(status="starting", classifier="loading").model_dump(),
+    )
@@ -0,0 +1,234 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from pydantic import BaseModel, Field
+from sqlalchemy.exc import IntegrityError
+from typing import List, Literal, Optional
+from uuid import UUID
+from ...domain.entities import MerchantRule
+from ...infrastructure.classifier.utils import clean_text
+from ..dependencies import (
+    get_current_user_id,
+    get_admin_user_id,
+    get_category_repository,
+    get_merchant_rule_repository,
+)
+
+router = APIRouter(prefix="/api/v1/merchant-rules", tags=["merchant-rules"])
+
+
+class MerchantRuleRequest(BaseModel):
+    pattern: str = Field(..., min_length=1, max_length=255)
+    match_type: Literal["exact", "prefix"] = MerchantRule.MATCH_PREFIX
+    category: str
+
+
+class MerchantRuleResponse(BaseModel):
+    id_rule: UUID
+    pattern: str
+    match_type: str
+    category: Optional[str]
+    is_global: bool
+
+
+def _to_response(rule: MerchantRule) -> MerchantRuleResponse:
+    return MerchantRuleResponse(
+        id_rule=rule.id_rule,
+        pattern=rule.pattern,
+        match_type=rule.match_type,
+        category=rule.category,
+        is_global=rule.is_global,
+    )
+
+
+async def _to_rule(
+    request: MerchantRuleRequest,
+    category_repo,
+    id_user: Optional[UUID],
+    id_rule: Optional[UUID] = None,
+) -> MerchantRule:
+    """
+    Build the rule of a request, normalizing its pattern like the descriptions
+    it is matched against (uppercase, only letters, digits and single spaces).
+
+    Raises:
+        HTTPException 400: If the category doesn't exist or the pattern is empty once normalized
+    """
+    pattern = clean_text(request.pattern)
+    if not pattern:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pattern must contain letters or digits",
+        )
+    category = await category_repo.get_by_description(request.category)
+    if category is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown category: {request.category}",
+        )
+    return MerchantRule(
+        id_rule=id_rule,
+        pattern=pattern,
+        match_type=request.match_type,
+        id_category=category.id_category,
+        id_user=id_user,
+        category=category.description,
+    )
+
+
+def _duplicate(rule: MerchantRule) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"A {rule.match_type} rule for '{rule.pattern}' already exists",
+    )
+
+
+async def _save(rule: MerchantRule, rule_repo) -> MerchantRuleResponse:
+    try:
+        return _to_response(await rule_repo.save(rule))
+    except IntegrityError:
+        raise _duplicate(rule)
+
+
+async def _update(rule: MerchantRule, rule_repo) -> MerchantRuleResponse:
+    try:
+        updated = await rule_repo.update(rule)
+    except IntegrityError:
+        raise _duplicate(rule)
+    if not updated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Merchant rule not found",
+        )
+    return _to_response(rule)
+
+
+async def _delete(rule_id: UUID, id_user: Optional[UUID], rule_repo) -> Response:
+    if not await rule_repo.delete(rule_id, id_user):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Merchant rule not found",
+        )
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("", response_model=List[MerchantRuleResponse])
+async def list_merchant_rules(
+    user_id: UUID = Depends(get_current_user_id),
+    rule_repo=Depends(get_merchant_rule_repository),
+):
+    """
+    List the merchant rules applied to the user's uploads.
+
+    Returns:
+        List[MerchantRuleResponse]: Global rules (is_global) and the user's own rules
+    """
+    return [_to_response(rule) for rule in await rule_repo.get_applicable(user_id)]
+
+
+@router.post("", response_model=MerchantRuleResponse, status_code=status.HTTP_201_CREATED)
+async def create_merchant_rule(
+    request: MerchantRuleRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    rule_repo=Depends(get_merchant_rule_repository),
+    category_repo=Depends(get_category_repository),
+):
+    """
+    Create a merchant rule for the user.
+
+    The pattern is normalized like the descriptions it is matched against
+    (uppercase, only letters, digits and single spaces). From the next
+    upload on, matching rows get the rule's category without going through
+    the classifier; the user's rules override global rules.
+
+    Raises:
+        HTTPException 400: If the category doesn't exist or the pattern is empty once normalized
+        HTTPException 409: If the user already has a rule with this pattern and match type
+    """
+    return await _save(await _to_rule(request, category_repo, user_id), rule_repo)
+
+
+@router.put("/{rule_id}", response_model=MerchantRuleResponse)
+async def update_merchant_rule(
+    rule_id: UUID,
+    request: MerchantRuleRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    rule_repo=Depends(get_merchant_rule_repository),
+    category_repo=Depends(get_category_repository),
+):
+    """
+    Change the pattern, match type or category of one of the user's merchant rules.
+
+    Raises:
+        HTTPException 400: If the category doesn't exist or the pattern is empty once normalized
+        HTTPException 404: If the user has no such rule (global rules can't be changed here)
+        HTTPException 409: If the user already has another rule with this pattern and match type
+    """
+    return await _update(await _to_rule(request, category_repo, user_id, rule_id), rule_repo)
+
+
+@router.delete("/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_merchant_rule(
+    rule_id: UUID,
+    user_id: UUID = Depends(get_current_user_id),
+    rule_repo=Depends(get_merchant_rule_repository),
+):
+    """
+    Delete one of the user's merchant rules.
+
+    Raises:
+        HTTPException 404: If the user has no such rule (global rules can't be deleted here)
+    """
+    return await _delete(rule_id, user_id, rule_repo)
+
+
+@router.post("/global", response_model=MerchantRuleResponse, status_code=status.HTTP_201_CREATED)
+async def create_global_merchant_rule(
+    request: MerchantRuleRequest,
+    admin_id: UUID = Depends(get_admin_user_id),
+    rule_repo=Depends(get_merchant_rule_repository),
+    category_repo=Depends(get_category_repository),
+):
+    """
+    Create a global merchant rule, applied to every user's uploads (administrators only).
+
+    Raises:
+        HTTPException 400: If the category doesn't exist or the pattern is empty once normalized
+        HTTPException 403: If the user isn't an administrator
+        HTTPException 409: If a global rule with this pattern and match type exists
+    """
+    return await _save(await _to_rule(request, category_repo, None), rule_repo)
+
+
+@router.put("/global/{rule_id}", response_model=MerchantRuleResponse)
+async def update_global_merchant_rule(
+    rule_id: UUID,
+    request: MerchantRuleRequest,
+    admin_id: UUID = Depends(get_admin_user_id),
+    rule_repo=Depends(get_merchant_rule_repository),
+    category_repo=Depends(get_category_repository),
+):
+    """
+    Change the pattern, match type or category of a global merchant rule (administrators only).
+
+    Raises:
+        HTTPException 400: If the category doesn't exist or the pattern is empty once normalized
+        HTTPException 403: If the user isn't an administrator
+        HTTPException 404: If there's no such global rule
+        HTTPException 409: If another global rule has this pattern and match type
+    """
+    return await _update(await _to_rule(request, category_repo, None, rule_id), rule_repo)
+
+
+@router.delete("/global/{rule_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_global_merchant_rule(
+    rule_id: UUID,
+    admin_id: UUID = Depends(get_admin_user_id),
+    rule_repo=Depends(get_merchant_rule_repository),
+):
+    """
+    Delete a global merchant rule (administrators only).
+
+    Raises:
+        HTTPException 403: If the user isn't an administrator
+        HTTPException 404: If there's no such global rule
+    """
+    return await _delete(rule_id, None, rule_repo)
@@ -1,10 +1,23 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Header
-from typing import List
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status, Header, Response
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
 from pydantic import BaseModel
 from uuid import UUID
-import hashlib
-from ...application.use_cases import ProcessFilesUseCase, GetBatchStatusUseCase
+from ...application.use_cases import (
+    ProcessFilesUseCase,
+    GetBatchStatusUseCase,
+    CorrectCategoryUseCase,
+    AdmitUploadUseCase,
+)
+from ...application.use_cases.admit_upload_use_case import (
+    UploadRejectedError,
+    UserBacklogFullError,
+)
 from ...application.use_cases.process_files_use_case import DuplicateFileError
+from ...application.use_cases.correct_category_use_case import (
+    TransactionNotFoundError,
+    UnknownCategoryError,
+)
 from ...application.dto import BatchStatusDTO
 from ..dependencies import (
     get_current_user_id,
@@ -12,12 +25,20 @@ from ..dependencies import (
     get_bank_repository,
     get_category_repository,
     get_batch_repository,
-    get_classifier,
-    get_message_broker,
+    get_reference_data,
+    get_job_queue,
+    get_file_storage,
+    get_stage_executor,
+    get_batch_processor,
+    get_inline_max_rows,
+    get_admission_limits,
     get_db_session_factory,
     get_file_upload_history_repository,
+    get_batch_status_broadcaster,
+    get_category_correction_repository,
 )
 from ...infrastructure.parsers import ParserFactory
+from ...infrastructure.storage import FileTooLargeError, hash_upload, get_upload_limits
 
 router = APIRouter(prefix="/api/v1/transactions", tags=["transactions"])
 
@@ -25,6 +46,33 @@ router = APIRouter(prefix="/api/v1/transactions", tags=["transactions"])
 class UploadResponse(BaseModel):
     batch_id: UUID
     message: str
+    status: str = "pending"
+    # Set when the upload was small enough to be processed within the request
+    processed_records: Optional[int] = None
+    rule_matched_records: Optional[int] = None
+
+
+class CategoryCorrectionRequest(BaseModel):
+    category: str
+
+
+class CategoryCorrectionResponse(BaseModel):
+    id_transaction: UUID
+    id_category: str
+    category: str
+
+
+def upload_rejected(e: UploadRejectedError) -> HTTPException:
+    """429 for a user over their limit, 503 for a busy service, both with Retry-After"""
+    return HTTPException(
+        status_code=(
+            status.HTTP_429_TOO_MANY_REQUESTS
+            if isinstance(e, UserBacklogFullError)
+            else status.HTTP_503_SERVICE_UNAVAILABLE
+        ),
+        detail=str(e),
+        headers={"Retry-After": str(e.retry_after)},
+    )
 
 
 from fastapi import Security
@@ -35,6 +83,7 @@ security = HTTPBearer()
 @router.post("/upload", response_model=UploadResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_files(
     bank_code: str,
+    response: Response,
     files: List[UploadFile] = File(...),
     authorization: HTTPAuthorizationCredentials = Security(security),
     user_id: UUID = Depends(get_current_user_id),
@@ -42,14 +91,28 @@ async def upload_files(
     bank_repo=Depends(get_bank_repository),
     category_repo=Depends(get_category_repository),
     batch_repo=Depends(get_batch_repository),
-    classifier=Depends(get_classifier),
-    message_broker=Depends(get_message_broker),
+    reference_data=Depends(get_reference_data),
+    job_queue=Depends(get_job_queue),
+    file_storage=Depends(get_file_storage),
+    stage_executor=Depends(get_stage_executor),
+    batch_processor=Depends(get_batch_processor),
+    inline_max_rows: int = Depends(get_inline_max_rows),
+    admission_limits: tuple = Depends(get_admission_limits),
     session_factory=Depends(get_db_session_factory),
     file_upload_history_repo=Depends(get_file_upload_history_repository),
 ):
     """
     Endpoint for uploading Excel files with transactions.
 
+    Uploads of up to UPLOAD_INLINE_MAX_ROWS rows are processed before the
+    response, which then reports them as completed (200) with their counts;
+    their job is queued first, so a worker finishes them if the request
+    can't within UPLOAD_INLINE_TIMEOUT_SECONDS. Larger ones are queued for
+    the workers (202). While the user has too many unfinished batches,
+    uploads are turned away before their files are stored (429). While the
+    whole service has too many, uploads that would go to the queue get 503.
+    Both carry a Retry-After header.
+
     Args:
         bank_code: Bank code (e.g., BANCOLOMBIA)
         files: List of Excel files to process
@@ -58,17 +121,28 @@ async def upload_files(
         bank_repo: Bank repository dependency
         category_repo: Category repository dependency
         batch_repo: Batch repository dependency
-        classifier: Transaction classifier dependency
-        message_broker: Message broker dependency
+        reference_data: Bank and category cache dependency
+        job_queue: Batch job queue dependency
+        file_storage: Uploaded file storage dependency
+        stage_executor: Executor that validates the files off the event loop
+        batch_processor: Processes small uploads within the request
+        inline_max_rows: Largest upload (in rows) processed within the request
+        admission_limits: Backlog limits above which uploads are turned away
         session_factory: Database session factory dependency
         file_upload_history_repo: File upload history repository dependency
 
     Returns:
-        UploadResponse: Contains the batch ID for checking processing status
+        UploadResponse: Contains the batch ID for checking processing status,
+            and the counts of a batch completed within the request
 
     Raises:
         HTTPException 400: If files are invalid (wrong format, empty list, etc.)
         HTTPException 409: If file was already uploaded (duplicate detected by hash)
+        HTTPException 413: If a file exceeds UPLOAD_MAX_FILE_BYTES (or the request
+            UPLOAD_MAX_REQUEST_BYTES, answered before the body is read)
+        HTTPException 429: If the user has UPLOAD_MAX_PENDING_PER_USER unfinished batches
+        HTTPException 503: If the service has UPLOAD_MAX_PENDING_BATCHES unfinished batches
+            and the upload is too large to be processed within the request
     """
     if not files:
         raise HTTPException(
@@ -93,20 +167,20 @@ async def upload_files(
             detail=str(e),
         )
 
-    # Read file contents and calculate hashes
-    files_data = []  # List of (content, hash, filename, size)
-    for file in files:
-        # Read file content
-        content = await file.read()
-
-        # Calculate SHA256 hash
-        file_hash = hashlib.sha256(content).hexdigest()
-
-        # Get file size
-        file_size = len(content)
-
-        # Store file data
-        files_data.append((content, file_hash, file.filename, file_size))
+    max_pending, max_pending_per_user, retry_after_seconds, stale_after_seconds = admission_limits
+    admission = AdmitUploadUseCase(
+        batch_repo=batch_repo,
+        file_upload_history_repo=file_upload_history_repo,
+        max_pending=max_pending,
+        max_pending_per_user=max_pending_per_user,
+        retry_after_seconds=retry_after_seconds,
+        stale_after_seconds=stale_after_seconds,
+    )
+    try:
+        # The service-wide limit is checked once the upload is known to be queued
+        await admission.execute(user_id=str(user_id), queued=False)
+    except UploadRejectedError as e:
+        raise upload_rejected(e)
 
     # Create the use case with file_upload_history_repo
     use_case = ProcessFilesUseCase(
@@ -114,18 +188,44 @@ async def upload_files(
         bank_repo=bank_repo,
         category_repo=category_repo,
         batch_repo=batch_repo,
-        classifier=classifier,
-        message_broker=message_broker,
         file_upload_history_repo=file_upload_history_repo,
+        reference_data=reference_data,
+        job_queue=job_queue,
+        file_storage=file_storage,
         session_factory=session_factory,
+        stage_executor=stage_executor,
+        batch_processor=batch_processor,
+        inline_max_rows=inline_max_rows,
+        admission=admission,
     )
 
+    max_size, _ = get_upload_limits()
+    uploads = []
     try:
+        # Starlette already spooled each file (to disk when large) and
+        # RequestSizeLimitMiddleware capped the request; hash the files
+        # where they are instead of copying them again
+        for file in files:
+            uploads.append(
+                await hash_upload(file.file, filename=file.filename, max_size=max_size)
+            )
+        files_data = [
+            (upload.file, upload.file_hash, upload.filename, upload.file_size)
+            for upload in uploads
+        ]
+
         batch_id = await use_case.execute(
             files_data=files_data,
             parser=parser,
             user_id=str(user_id),
         )
+    except FileTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(e),
+        )
+    except UploadRejectedError as e:
+        raise upload_rejected(e)
     except DuplicateFileError as e:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -141,10 +241,26 @@ async def upload_files(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         )
+    finally:
+        # The use case copied the files to the shared storage
+        for upload in uploads:
+            upload.close()
+
+    batch_status = await GetBatchStatusUseCase(batch_repo=batch_repo).execute(batch_id=batch_id)
+    if batch_status is not None and batch_status.process_status == "completed":
+        response.status_code = status.HTTP_200_OK
+        return UploadResponse(
+            batch_id=batch_id,
+            message=f"Processed {batch_status.processed_records} transactions.",
+            status=batch_status.process_status,
+            processed_records=batch_status.processed_records,
+            rule_matched_records=batch_status.rule_matched_records,
+        )
 
     return UploadResponse(
         batch_id=batch_id,
         message=f"Processing started. Use batch_id {batch_id} to check the status.",
+        status=batch_status.process_status if batch_status else "pending",
     )
 
 
@@ -178,3 +294,100 @@ async def get_batch_status(
         )
 
     return batch_status
+
+
+@router.get("/batch/{batch_id}/events")
+async def stream_batch_status(
+    batch_id: UUID,
+    user_id: UUID = Depends(get_current_user_id),
+    batch_repo=Depends(get_batch_repository),
+    broadcaster=Depends(get_batch_status_broadcaster),
+):
+    """
+    Stream the processing status of a transaction batch as Server-Sent Events.
+
+    Sends a "status" event with the current status, then one for every
+    change (progress, throughput, ETA) until the batch is completed or
+    failed, and closes the stream. Clients keep one connection open instead
+    of polling GET /batch/{batch_id}.
+
+    Args:
+        batch_id: ID of the batch to follow
+        user_id: Current authenticated user ID
+        batch_repo: Batch repository dependency
+        broadcaster: Batch status broadcaster dependency
+
+    Returns:
+        StreamingResponse: text/event-stream of BatchStatusDTO events
+
+    Raises:
+        HTTPException: If batch is not found
+    """
+    if await batch_repo.get_by_id(batch_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Batch {batch_id} not found",
+        )
+
+    async def events():
+        async for batch_status in broadcaster.subscribe(batch_id):
+            if batch_status is None:
+                # Comment line: keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+            else:
+                yield f"event: status\ndata: {batch_status.model_dump_json()}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.put("/{transaction_id}/category", response_model=CategoryCorrectionResponse)
+async def correct_category(
+    transaction_id: UUID,
+    request: CategoryCorrectionRequest,
+    user_id: UUID = Depends(get_current_user_id),
+    transaction_repo=Depends(get_transaction_repository),
+    category_repo=Depends(get_category_repository),
+    correction_repo=Depends(get_category_correction_repository),
+):
+    """
+    Correct the category of a transaction.
+
+    The correction is also recorded as a training example; the worker folds
+    new corrections into the classifier incrementally (ML_ONLINE_LEARNING_SECONDS).
+
+    Args:
+        transaction_id: ID of the transaction to correct
+        request: Description of the right category (e.g. "Nomina")
+        user_id: Current authenticated user ID
+        transaction_repo: Transaction repository dependency
+        category_repo: Category repository dependency
+        correction_repo: Category correction repository dependency
+
+    Returns:
+        CategoryCorrectionResponse: The transaction's new category
+
+    Raises:
+        HTTPException 400: If the category doesn't exist
+        HTTPException 404: If the user has no such transaction
+    """
+    use_case = CorrectCategoryUseCase(
+        transaction_repo=transaction_repo,
+        category_repo=category_repo,
+        correction_repo=correction_repo,
+    )
+    try:
+        transaction = await use_case.execute(transaction_id, user_id, request.category)
+    except TransactionNotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except UnknownCategoryError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return CategoryCorrectionResponse(
+        id_transaction=transaction_id,
+        id_category=transaction.id_category,
+        category=request.category,
+    )
@@ -10,4 +10,14 @@ class BatchStatusDTO(BaseModel):
     start_date: datetime
     end_date: Optional[datetime]
     batch_size: Optional[int]
+    processed_records: int = 0
     processed_percentage: float
+    rows_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    rule_matched_records: int = 0
+    rule_hit_ratio: Optional[float] = None
+
+    @property
+    def is_finished(self) -> bool:
+        """Whether the batch reached a final status"""
+        return self.process_status in ("completed", "error")
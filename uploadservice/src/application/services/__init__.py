@@ -0,0 +1,13 @@
+from .transaction_pipeline import TransactionPipeline, ChunkSizeController, CommitCheckpoint
+from .batch_status_broadcaster import BatchStatusBroadcaster
+from .classification_batcher import ClassificationBatcher
+from .fair_job_scheduler import FairJobScheduler
+
+__all__ = [
+    "TransactionPipeline",
+    "ChunkSizeController",
+    "CommitCheckpoint",
+    "BatchStatusBroadcaster",
+    "ClassificationBatcher",
+    "FairJobScheduler",
+]
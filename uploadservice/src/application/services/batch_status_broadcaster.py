@@ -0,0 +1,108 @@
+"""
+Pushes batch status changes to connected clients.
+
+Clients that follow a batch hold one streaming connection instead of polling
+GET /batch/{batch_id}. Every batch being followed has a single watcher that
+reads its status every interval_seconds and hands each change to all of the
+batch's subscribers, so the database load doesn't grow with the number of
+open tabs.
+"""
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Set
+from uuid import UUID
+
+from ..dto import BatchStatusDTO
+
+logger = logging.getLogger(__name__)
+
+
+class _BatchWatch:
+    """Subscribers of one batch and the task polling its status"""
+
+    def __init__(self):
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.latest: Optional[BatchStatusDTO] = None
+        self.task: Optional[asyncio.Task] = None
+
+
+class BatchStatusBroadcaster:
+    """
+    Shares one status watcher per batch among all of its subscribers.
+
+    Args:
+        load_status: Reads the current status of a batch (None if it doesn't exist)
+        interval_seconds: Time between two reads of the same batch
+    """
+
+    def __init__(
+        self,
+        load_status: Callable[[UUID], Awaitable[Optional[BatchStatusDTO]]],
+        interval_seconds: float = 1.0,
+    ):
+        self.load_status = load_status
+        self.interval_seconds = interval_seconds
+        self._watches: Dict[UUID, _BatchWatch] = {}
+
+    async def subscribe(
+        self, batch_id: UUID, heartbeat_seconds: float = 15.0
+    ) -> AsyncIterator[Optional[BatchStatusDTO]]:
+        """
+        Follow the status of a batch until it is completed or failed.
+
+        Yields the current status first and then every change. Yields None
+        when nothing changed for heartbeat_seconds, so the caller can keep
+        the connection alive. Stops after a final status, or right away if
+        the batch doesn't exist.
+        """
+        watch = self._watches.get(batch_id)
+        if watch is None:
+            watch = self._watches[batch_id] = _BatchWatch()
+            watch.task = asyncio.create_task(self._watch(batch_id, watch))
+        updates: asyncio.Queue = asyncio.Queue(maxsize=1)
+        watch.subscribers.add(updates)
+        if watch.latest is not None:
+            updates.put_nowait(watch.latest)
+        try:
+            while True:
+                try:
+                    status = await asyncio.wait_for(updates.get(), heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if status is None:
+                    return
+                yield status
+                if status.is_finished:
+                    return
+        finally:
+            watch.subscribers.discard(updates)
+            if not watch.subscribers and self._watches.get(batch_id) is watch:
+                del self._watches[batch_id]
+                watch.task.cancel()
+
+    async def _watch(self, batch_id: UUID, watch: _BatchWatch) -> None:
+        """Poll the batch and publish every change until it finishes"""
+        while True:
+            try:
+                status = await self.load_status(batch_id)
+            except Exception as e:
+                logger.warning(f"Failed to read status of batch {batch_id}: {e}")
+            else:
+                if status is None or status != watch.latest:
+                    watch.latest = status
+                    for updates in list(watch.subscribers):
+                        self._offer(updates, status)
+                if status is None or status.is_finished:
+                    break
+            await asyncio.sleep(self.interval_seconds)
+        # Later subscribers start their own watch
+        if self._watches.get(batch_id) is watch:
+            del self._watches[batch_id]
+
+    @staticmethod
+    def _offer(updates: asyncio.Queue, status: Optional[BatchStatusDTO]) -> None:
+        """Replace any status the subscriber didn't read yet with the newest one"""
+        if updates.full():
+            updates.get_nowait()
+        updates.put_nowait(status)
@@ -0,0 +1,146 @@
+"""
+Cross-request micro-batching for transaction classification.
+
+Every caller (batch workers, the classification endpoint, single
+transactions) hands its descriptions to one shared queue. A dispatcher
+gathers the requests that arrive within max_wait_ms, up to max_batch_size
+transactions, and classifies them with a single classify_batch call, so the
+model keeps running at its efficient batch size under concurrent load
+instead of once per caller.
+"""
+import asyncio
+import logging
+from typing import List, Optional
+
+from ...domain.ports import ClassifierPort
+
+logger = logging.getLogger(__name__)
+
+
+class _ClassificationRequest:
+    """Transactions of one caller and the future receiving their categories"""
+
+    def __init__(self, descriptions: List[str], values: List[Optional[float]]):
+        self.descriptions = descriptions
+        self.values = values
+        self.result: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class ClassificationBatcher(ClassifierPort):
+    """
+    Classifier that merges concurrent requests into shared batches.
+
+    Args:
+        classifier: Classifier running the merged batches
+        max_batch_size: Transactions that trigger a batch right away
+        max_wait_ms: Longest time the first request of a batch waits for others
+    """
+
+    def __init__(
+        self,
+        classifier: ClassifierPort,
+        max_batch_size: int = 1024,
+        max_wait_ms: float = 5.0,
+    ):
+        self.classifier = classifier
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    async def classify(self, description: str, transaction_value: Optional[float] = None) -> str:
+        """Classify one transaction as part of the next shared batch"""
+        return (await self.classify_batch([description], [transaction_value]))[0]
+
+    async def classify_batch(
+        self,
+        descriptions: List[str],
+        transaction_values: Optional[List[Optional[float]]] = None,
+    ) -> List[str]:
+        """
+        Classify the transactions of one caller as part of the next shared batch.
+
+        Returns:
+            Category of every description, same order as the input
+        """
+        if not descriptions:
+            return []
+        if transaction_values is None or len(transaction_values) != len(descriptions):
+            transaction_values = [None] * len(descriptions)
+        request = _ClassificationRequest(list(descriptions), list(transaction_values))
+        self._ensure_dispatcher()
+        self._queue.put_nowait(request)
+        return await request.result
+
+    def warm_up(self) -> None:
+        self.classifier.warm_up()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.classifier.is_ready
+
+    def reload(self) -> bool:
+        return self.classifier.reload()
+
+    @property
+    def model_version(self) -> Optional[str]:
+        return self.classifier.model_version
+
+    async def close(self) -> None:
+        """Stop the dispatcher; requests still queued are cancelled"""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        while self._queue is not None and not self._queue.empty():
+            self._queue.get_nowait().result.cancel()
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        """Run one batch at a time; requests arriving meanwhile form the next one"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0].descriptions)
+            deadline = loop.time() + self.max_wait_seconds
+            while size < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(request)
+                size += len(request.descriptions)
+            await self._run(batch)
+
+    async def _run(self, batch: List[_ClassificationRequest]) -> None:
+        """Classify the merged requests and hand every caller its slice"""
+        # Callers that gave up (e.g. disconnected clients) are left out
+        batch = [request for request in batch if not request.result.done()]
+        if not batch:
+            return
+        descriptions = [d for request in batch for d in request.descriptions]
+        values = [v for request in batch for v in request.values]
+        try:
+            categories = await self.classifier.classify_batch(descriptions, values)
+        except Exception as e:
+            logger.error(f"Shared classification batch failed: {e}", exc_info=True)
+            for request in batch:
+                if not request.result.done():
+                    request.result.set_exception(e)
+            return
+
+        logger.debug(f"Classified {len(descriptions)} transactions for {len(batch)} requests")
+        start = 0
+        for request in batch:
+            end = start + len(request.descriptions)
+            if not request.result.done():
+                request.result.set_result(categories[start:end])
+            start = end
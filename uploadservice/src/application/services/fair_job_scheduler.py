@@ -0,0 +1,120 @@
+"""
+Fair scheduling of batch jobs across users.
+
+The job queue hands jobs out in upload order: a user who uploads twenty
+statements at once would hold every worker slot until they are all done,
+and everyone else's upload would wait behind them. Workers therefore take
+more jobs from the queue than they run, and this scheduler decides which
+of them run: at most `concurrency` at a time (the process's budget), at
+most `per_user_limit` of them for the same user, and the users with
+waiting jobs take turns (round robin) whenever a slot frees up.
+"""
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict
+
+from ...domain.entities import BatchJob
+
+
+class FairJobScheduler:
+    """
+    Runs batch jobs within a concurrency budget, taking turns between users.
+
+    Args:
+        handler: Processes one job
+        concurrency: Jobs running at the same time
+        per_user_limit: Jobs of the same user running at the same time (0: no limit)
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[BatchJob], Awaitable[None]],
+        concurrency: int,
+        per_user_limit: int = 1,
+    ):
+        self.handler = handler
+        self.concurrency = concurrency
+        self.per_user_limit = per_user_limit
+        # Slots waited for, per user; the users with waiting jobs, next turn first
+        self._waiting: Dict[str, Deque[asyncio.Future]] = {}
+        self._turns: Deque[str] = deque()
+        self._running: Dict[str, int] = {}
+        self._running_total = 0
+
+    @property
+    def waiting(self) -> int:
+        """Jobs waiting for a slot"""
+        return sum(len(slots) for slots in self._waiting.values())
+
+    @property
+    def running(self) -> int:
+        """Jobs being handled"""
+        return self._running_total
+
+    async def run(self, job: BatchJob) -> None:
+        """
+        Wait for the job's turn, then handle it.
+
+        Returns (or raises) once the handler did, so the queue acknowledges
+        the job only after it was processed.
+        """
+        slot = asyncio.get_running_loop().create_future()
+        waiting = self._waiting.get(job.id_user)
+        if waiting is None:
+            waiting = self._waiting[job.id_user] = deque()
+            self._turns.append(job.id_user)
+        waiting.append(slot)
+        self._dispatch()
+
+        try:
+            await slot
+        except asyncio.CancelledError:
+            if slot.done() and not slot.cancelled():
+                # Granted right before the cancellation: hand the slot on
+                self._release(job.id_user)
+            else:
+                self._withdraw(job.id_user, slot)
+            raise
+
+        try:
+            await self.handler(job)
+        finally:
+            self._release(job.id_user)
+
+    def _dispatch(self) -> None:
+        """Grant the free slots, one job per user and turn"""
+        blocked = 0
+        while self._running_total < self.concurrency and blocked < len(self._turns):
+            id_user = self._turns.popleft()
+            if self.per_user_limit and self._running.get(id_user, 0) >= self.per_user_limit:
+                self._turns.append(id_user)
+                blocked += 1
+                continue
+
+            waiting = self._waiting[id_user]
+            slot = waiting.popleft()
+            if waiting:
+                self._turns.append(id_user)
+            else:
+                del self._waiting[id_user]
+            self._running[id_user] = self._running.get(id_user, 0) + 1
+            self._running_total += 1
+            slot.set_result(None)
+            blocked = 0
+
+    def _release(self, id_user: str) -> None:
+        self._running_total -= 1
+        self._running[id_user] -= 1
+        if not self._running[id_user]:
+            del self._running[id_user]
+        self._dispatch()
+
+    def _withdraw(self, id_user: str, slot: asyncio.Future) -> None:
+        """Forget a job cancelled while it waited"""
+        waiting = self._waiting.get(id_user)
+        if waiting is None or slot not in waiting:
+            return
+        waiting.remove(slot)
+        if not waiting:
+            del self._waiting[id_user]
+            self._turns.remove(id_user)
@@ -0,0 +1,243 @@
+"""
+Staged processing pipeline for transaction batches.
+
+Parsing, classification and persistence run as three concurrent stages
+connected by bounded queues, so chunk N+1 is classified while chunk N is
+being written to the database. The size of the chunks handed to the
+classify stage adapts to the measured insert latency. Large batches can run
+several classify/persist lanes side by side, each taking the next parsed
+chunk as soon as it is free.
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import replace
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Tuple, Union
+
+from ...domain.entities import TransactionChunk
+
+logger = logging.getLogger(__name__)
+
+# Signals the end of the stream to the next stage
+_END = object()
+
+Chunks = Union[Iterable[TransactionChunk], AsyncIterable[TransactionChunk]]
+
+
+async def _stream(chunks: Iterable[TransactionChunk]) -> AsyncIterator[TransactionChunk]:
+    """A plain source as an async one"""
+    for chunk in chunks:
+        yield chunk
+
+
+class ChunkSizeController:
+    """
+    Adapts the chunk size so that persisting a chunk takes about target_seconds.
+
+    After every insert the ideal size for the measured rows/second is
+    computed and blended into the current size, clamped to [minimum, maximum].
+    """
+
+    def __init__(
+        self,
+        initial: int = 500,
+        minimum: int = 100,
+        maximum: int = 5000,
+        target_seconds: float = 0.5,
+        smoothing: float = 0.5,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self.smoothing = smoothing
+        self._size = max(minimum, min(maximum, initial))
+
+    @classmethod
+    def from_env(cls) -> "ChunkSizeController":
+        """Build a controller from the PIPELINE_CHUNK_* environment variables"""
+        return cls(
+            initial=int(os.getenv("PIPELINE_CHUNK_SIZE", "500")),
+            minimum=int(os.getenv("PIPELINE_CHUNK_SIZE_MIN", "100")),
+            maximum=int(os.getenv("PIPELINE_CHUNK_SIZE_MAX", "5000")),
+            target_seconds=float(os.getenv("PIPELINE_TARGET_INSERT_SECONDS", "0.5")),
+        )
+
+    @property
+    def chunk_size(self) -> int:
+        return self._size
+
+    def record(self, rows: int, seconds: float) -> None:
+        """Record how long it took to persist a chunk of the given size"""
+        if rows <= 0 or seconds <= 0:
+            return
+        ideal = rows * self.target_seconds / seconds
+        size = self.smoothing * ideal + (1 - self.smoothing) * self._size
+        self._size = int(max(self.minimum, min(self.maximum, size)))
+
+
+class CommitCheckpoint:
+    """
+    Resume checkpoint of chunks committed in any order.
+
+    The checkpoint is the end of the run of committed rows from the start of
+    the batch, so every row before it is committed even when lanes commit
+    their chunks out of order. A per-row count (e.g. rows categorized by a
+    merchant rule) is summed up to the checkpoint.
+
+    Args:
+        position: Rows committed from the start of the batch
+        count: The count of those rows
+    """
+
+    def __init__(self, position: int = 0, count: int = 0):
+        self.position = position
+        self.count = count
+        # Committed chunks past the checkpoint: first row -> (end row, count)
+        self._ahead: Dict[int, Tuple[int, int]] = {}
+
+    def including(self, first_row: int, end_row: int, count: int) -> Tuple[int, int]:
+        """The checkpoint and count once this chunk is committed too"""
+        if first_row != self.position:
+            return self.position, self.count
+        position, total = end_row, self.count + count
+        while position in self._ahead:
+            position, ahead_count = self._ahead[position]
+            total += ahead_count
+        return position, total
+
+    def commit(self, first_row: int, end_row: int, count: int) -> None:
+        """Record a committed chunk"""
+        self._ahead[first_row] = (end_row, count)
+        while self.position in self._ahead:
+            self.position, count = self._ahead.pop(self.position)
+            self.count += count
+
+
+class TransactionPipeline:
+    """
+    Runs parse -> classify -> persist as concurrent stages.
+
+    Args:
+        classify: Returns one category description per row of a chunk
+        persist: Writes a classified chunk (and commits it)
+        sizer: Controls how many rows go into each classified chunk
+        queue_size: Maximum number of chunks waiting between two stages
+        lanes: Classify/persist pairs running concurrently. With more than
+            one, chunks are persisted out of order and persist must be safe
+            to run concurrently (e.g. a database session per call)
+    """
+
+    def __init__(
+        self,
+        classify: Callable[[TransactionChunk], Awaitable[List[str]]],
+        persist: Callable[[TransactionChunk, List[str]], Awaitable[None]],
+        sizer: ChunkSizeController,
+        queue_size: int = 2,
+        lanes: int = 1,
+    ):
+        self.classify = classify
+        self.persist = persist
+        self.sizer = sizer
+        self.queue_size = queue_size
+        self.lanes = max(1, lanes)
+
+    async def run(self, chunks: Chunks, skip_rows: int = 0) -> int:
+        """
+        Process every chunk of the source
+
+        Rows are numbered in source order (TransactionChunk.first_row), so the
+        same source always yields the same row ordinals.
+
+        Args:
+            chunks: Parsed chunks, in order; an async source (see
+                StageExecutorPort.iterate) keeps parsing off the event loop
+            skip_rows: Rows at the start of the source that were already
+                persisted by a previous run; they are parsed but not processed
+
+        Returns:
+            Number of rows persisted by this run
+
+        Raises:
+            Exception: The first error raised by any stage; the other stages are cancelled
+        """
+        to_classify: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+
+        stages = [asyncio.create_task(self._parse_stage(chunks, to_classify, skip_rows))]
+        persist_stages = []
+        for _ in range(self.lanes):
+            to_persist: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+            stages.append(asyncio.create_task(self._classify_stage(to_classify, to_persist)))
+            persist_stages.append(asyncio.create_task(self._persist_stage(to_persist)))
+        stages.extend(persist_stages)
+        try:
+            await asyncio.gather(*stages)
+        except BaseException:
+            for stage in stages:
+                stage.cancel()
+            await asyncio.gather(*stages, return_exceptions=True)
+            raise
+        return sum(stage.result() for stage in persist_stages)
+
+    async def _parse_stage(self, chunks: Chunks, output: asyncio.Queue, skip_rows: int):
+        """Number the rows, drop the skipped ones and regroup to the current chunk size"""
+        stream = chunks if hasattr(chunks, "__aiter__") else _stream(chunks)
+        try:
+            await self._regroup(stream, output, skip_rows)
+        finally:
+            # Release the source (its files) even when the pipeline fails
+            if hasattr(stream, "aclose"):
+                await stream.aclose()
+        # One end marker for every lane's classify stage
+        for _ in range(self.lanes):
+            await output.put(_END)
+
+    async def _regroup(
+        self, chunks: AsyncIterator[TransactionChunk], output: asyncio.Queue, skip_rows: int
+    ):
+        pending: List[TransactionChunk] = []
+        pending_rows = 0
+        position = 0
+        async for chunk in chunks:
+            chunk = replace(chunk, first_row=position)
+            position += len(chunk)
+            if position <= skip_rows:
+                continue
+            if chunk.first_row < skip_rows:
+                chunk = chunk.slice(skip_rows - chunk.first_row, len(chunk))
+            pending.append(chunk)
+            pending_rows += len(chunk)
+            while pending_rows >= self.sizer.chunk_size:
+                merged = TransactionChunk.concat(pending)
+                size = self.sizer.chunk_size
+                await output.put(merged.slice(0, size))
+                rest = merged.slice(size, len(merged))
+                pending = [rest] if len(rest) else []
+                pending_rows = len(rest)
+            # Give the other stages a chance to run between parser chunks
+            await asyncio.sleep(0)
+        if pending_rows:
+            await output.put(TransactionChunk.concat(pending))
+
+    async def _classify_stage(self, input: asyncio.Queue, output: asyncio.Queue):
+        while (chunk := await input.get()) is not _END:
+            labels = await self.classify(chunk)
+            await output.put((chunk, labels))
+        await output.put(_END)
+
+    async def _persist_stage(self, input: asyncio.Queue) -> int:
+        rows = 0
+        chunk_number = 0
+        while (item := await input.get()) is not _END:
+            chunk, labels = item
+            chunk_number += 1
+            started = time.perf_counter()
+            await self.persist(chunk, labels)
+            elapsed = time.perf_counter() - started
+            self.sizer.record(len(chunk), elapsed)
+            rows += len(chunk)
+            logger.info(
+                f"Chunk {chunk_number} persisted: {len(chunk)} rows in {elapsed*1000:.0f}ms "
+                f"(next chunk size: {self.sizer.chunk_size})"
+            )
+        return rows
@@ -1,4 +1,15 @@
 from .process_files_use_case import ProcessFilesUseCase
+from .process_batch_use_case import ProcessBatchUseCase
 from .get_batch_status_use_case import GetBatchStatusUseCase
+from .correct_category_use_case import CorrectCategoryUseCase
+from .reclassify_transactions_use_case import ReclassifyTransactionsUseCase
+from .admit_upload_use_case import AdmitUploadUseCase
 
-__all__ = ["ProcessFilesUseCase", "GetBatchStatusUseCase"]
+__all__ = [
+    "ProcessFilesUseCase",
+    "ProcessBatchUseCase",
+    "GetBatchStatusUseCase",
+    "CorrectCategoryUseCase",
+    "ReclassifyTransactionsUseCase",
+    "AdmitUploadUseCase",
+]
@@ -0,0 +1,102 @@
+from datetime import datetime, timedelta
+from ...domain.ports import TransactionBatchRepositoryPort
+from ...domain.ports.file_upload_history_repository_port import FileUploadHistoryRepositoryPort
+
+
+class UploadRejectedError(Exception):
+    """The upload was turned away; the client may retry after retry_after seconds"""
+
+    def __init__(self, message: str, retry_after: int):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class UserBacklogFullError(UploadRejectedError):
+    """The user already has as many unfinished batches as allowed"""
+
+
+class BacklogFullError(UploadRejectedError):
+    """The service has as many unfinished batches as it accepts"""
+
+
+class AdmitUploadUseCase:
+    """
+    Use case for deciding whether a new upload is accepted.
+
+    An upload is turned away while its user has max_pending_per_user
+    batches waiting or processing, so one user can't queue enough work to
+    starve the others (it also bounds how many of a user's jobs sit ahead
+    of everyone else's in the queue). Uploads that go to the queue are
+    also turned away while the whole service has max_pending batches, so a
+    backlog the workers can't clear stops growing instead of every upload
+    waiting longer; uploads processed within the request don't add to it.
+
+    Processing batches that haven't changed for stale_after_seconds don't
+    count: a batch whose worker got stuck must not block its user for good.
+    Queued batches always count, however long they wait: they only change
+    once a worker takes them, and a long queue is what the limits are for.
+
+    Args:
+        batch_repo: Counts the unfinished batches of every user
+        file_upload_history_repo: Counts the unfinished batches of one user
+        max_pending: Unfinished batches above which uploads are shed (0: no limit)
+        max_pending_per_user: Unfinished batches a user may have (0: no limit)
+        retry_after_seconds: Seconds rejected clients are told to wait
+        stale_after_seconds: Seconds without changes after which a
+            processing batch no longer counts (0: always counts)
+    """
+
+    def __init__(
+        self,
+        batch_repo: TransactionBatchRepositoryPort,
+        file_upload_history_repo: FileUploadHistoryRepositoryPort,
+        max_pending: int,
+        max_pending_per_user: int,
+        retry_after_seconds: int,
+        stale_after_seconds: int = 0,
+    ):
+        self.batch_repo = batch_repo
+        self.file_upload_history_repo = file_upload_history_repo
+        self.max_pending = max_pending
+        self.max_pending_per_user = max_pending_per_user
+        self.retry_after_seconds = retry_after_seconds
+        self.stale_after_seconds = stale_after_seconds
+
+    async def execute(self, user_id: str, queued: bool = True, per_user: bool = True) -> None:
+        """
+        Accept an upload of the user, or raise.
+
+        Args:
+            user_id: The uploading user (UUID as string)
+            queued: Whether the upload waits in the queue; the service-wide
+                limit only applies then
+            per_user: Whether to check the user's limit; False once the
+                upload passed that check and only the service-wide one is left
+
+        Raises:
+            UserBacklogFullError: If the user has too many unfinished batches
+            BacklogFullError: If the service has too many unfinished batches
+        """
+        processing_since = (
+            datetime.now() - timedelta(seconds=self.stale_after_seconds)
+            if self.stale_after_seconds
+            else None
+        )
+        if per_user and self.max_pending_per_user:
+            pending = await self.file_upload_history_repo.count_unfinished_batches(
+                user_id, processing_since
+            )
+            if pending >= self.max_pending_per_user:
+                raise UserBacklogFullError(
+                    f"{pending} uploads are still being processed; "
+                    f"wait for one to finish before uploading more",
+                    self.retry_after_seconds,
+                )
+
+        if queued and self.max_pending:
+            pending = await self.batch_repo.count_unfinished(processing_since)
+            if pending >= self.max_pending:
+                raise BacklogFullError(
+                    "The service is busy processing other uploads; try again later",
+                    self.retry_after_seconds,
+                )
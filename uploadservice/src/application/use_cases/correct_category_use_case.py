@@ -0,0 +1,69 @@
+from uuid import UUID
+from ...domain.entities import CategoryCorrection, Transaction
+from ...domain.ports import (
+    TransactionRepositoryPort,
+    CategoryRepositoryPort,
+    CategoryCorrectionRepositoryPort,
+)
+
+
+class TransactionNotFoundError(Exception):
+    """The transaction doesn't exist or belongs to another user"""
+
+
+class UnknownCategoryError(ValueError):
+    """The category isn't one of the TransactionCategory rows"""
+
+
+class CorrectCategoryUseCase:
+    """
+    Use case for correcting the category of a transaction.
+
+    Besides updating the transaction, every correction is recorded so the
+    incremental learner can fold it into the next model version once
+    enough users made the same one.
+    """
+
+    def __init__(
+        self,
+        transaction_repo: TransactionRepositoryPort,
+        category_repo: CategoryRepositoryPort,
+        correction_repo: CategoryCorrectionRepositoryPort,
+    ):
+        self.transaction_repo = transaction_repo
+        self.category_repo = category_repo
+        self.correction_repo = correction_repo
+
+    async def execute(self, id_transaction: UUID, user_id: UUID, category: str) -> Transaction:
+        """
+        Set the category of one of the user's transactions.
+
+        Returns:
+            The updated transaction
+
+        Raises:
+            TransactionNotFoundError: If the user has no such transaction
+            UnknownCategoryError: If the category doesn't exist
+        """
+        transaction = await self.transaction_repo.get_by_id(id_transaction)
+        if transaction is None or transaction.id_user != user_id:
+            raise TransactionNotFoundError(f"Transaction {id_transaction} not found")
+
+        found = await self.category_repo.get_by_description(category)
+        if found is None:
+            raise UnknownCategoryError(f"Category {category} not found")
+
+        if transaction.id_category != found.id_category:
+            await self.transaction_repo.update_category(id_transaction, found.id_category)
+            transaction.id_category = found.id_category
+        # Recorded even when unchanged: confirming a category is a training example too
+        await self.correction_repo.save(CategoryCorrection(
+            id_correction=None,
+            id_user=user_id,
+            description=transaction.transaction_name,
+            id_category=found.id_category,
+            value=transaction.signed_value,
+            id_transaction=id_transaction,
+            category=found.description,
+        ))
+        return transaction
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 from ...domain.ports import TransactionBatchRepositoryPort
@@ -9,16 +10,31 @@ class GetBatchStatusUseCase:
         self.batch_repo = batch_repo
 
     async def execute(self, batch_id: UUID) -> Optional[BatchStatusDTO]:
-        """Get the status of a transaction batch"""
+        """
+        Get the status of a transaction batch.
+
+        Progress comes from the rows the workers committed so far; throughput
+        and ETA are averaged since a worker picked the batch up. The rule hit
+        ratio is the share of those rows categorized by a merchant rule.
+        """
         batch = await self.batch_repo.get_by_id(batch_id)
         if not batch:
             return None
 
+        now = datetime.now()
+        rows_per_second = batch.rows_per_second(now)
+        eta_seconds = batch.eta_seconds(now)
+        rule_hit_ratio = batch.rule_hit_ratio
         return BatchStatusDTO(
             id_batch=batch.id_batch,
             process_status=batch.process_status,
             start_date=batch.start_date,
             end_date=batch.end_date,
             batch_size=batch.batch_size,
+            processed_records=batch.processed_records,
             processed_percentage=batch.processed_percentage,
+            rows_per_second=round(rows_per_second, 1) if rows_per_second else None,
+            eta_seconds=round(eta_seconds, 1) if eta_seconds is not None else None,
+            rule_matched_records=batch.rule_matched_records,
+            rule_hit_ratio=round(rule_hit_ratio, 4) if rule_hit_ratio is not None else None,
         )
@@ -0,0 +1,424 @@
+"""
+ProcessBatchUseCase: classifies and stores the transactions of a queued batch.
+
+Runs in the batch workers (or in the API process with the in-memory job
+queue), picking up the jobs queued by ProcessFilesUseCase.
+"""
+from contextlib import AsyncExitStack
+from typing import Dict, Iterator, List, Optional, Sequence
+from uuid import UUID
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+import numpy as np
+from sqlalchemy.orm import sessionmaker
+
+from ...domain.ports import (
+    ExcelParserPort,
+    ClassifierPort,
+    MessageBrokerPort,
+    ReferenceDataPort,
+    FileStoragePort,
+    StageExecutorPort,
+)
+from ...domain.entities import BatchJob, TransactionBatch, TransactionChunk
+from ..services import TransactionPipeline, ChunkSizeController, CommitCheckpoint
+
+logger = logging.getLogger(__name__)
+
+# Rows read from the parser at a time; the pipeline regroups them to the adaptive chunk size
+PARSE_CHUNK_SIZE = 250
+# Chunks allowed to wait between two pipeline stages
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "2"))
+# Attempts per batch before it is marked as "error"; each retry resumes from the checkpoint
+BATCH_MAX_ATTEMPTS = int(os.getenv("BATCH_MAX_ATTEMPTS", "3"))
+# Seconds to wait before the first retry, doubled on every further retry
+BATCH_RETRY_DELAY_SECONDS = float(os.getenv("BATCH_RETRY_DELAY_SECONDS", "2"))
+# Most shards (classify/persist lanes, each with its own session) of one batch
+BATCH_SHARDS = int(os.getenv("BATCH_SHARDS", "1"))
+# Rows left to process per shard; smaller batches use fewer shards
+BATCH_SHARD_MIN_ROWS = int(os.getenv("BATCH_SHARD_MIN_ROWS", "20000"))
+# Seconds the API may spend on a batch within the upload request; the batch's
+# queued job waits that long before a worker takes over
+INLINE_TIMEOUT_SECONDS = float(os.getenv("UPLOAD_INLINE_TIMEOUT_SECONDS", "10"))
+# Seconds workers wait past that deadline, for clock differences between hosts
+INLINE_GRACE_SECONDS = 2.0
+# Seconds a worker waits for the broker to confirm a batch's event before
+# acknowledging the job anyway (the event stays buffered for the publisher)
+BATCH_EVENT_CONFIRM_SECONDS = float(os.getenv("BATCH_EVENT_CONFIRM_SECONDS", "10"))
+
+
+def read_stored_chunks(
+    file_storage: FileStoragePort,
+    parser: ExcelParserPort,
+    file_keys: Sequence[str],
+    chunk_size: int,
+) -> Iterator[TransactionChunk]:
+    """Parse the stored files of a batch, in order, chunk by chunk (runs on the stage executor)"""
+    for key in file_keys:
+        with file_storage.open(key) as file_content:
+            yield from parser.iter_chunks(file_content, chunk_size)
+
+
+class ProcessBatchUseCase:
+    """
+    Use case for processing a queued batch job.
+
+    Features:
+    - Streams the stored files through the parse/classify/persist pipeline,
+      parsing on the stage executor so the event loop keeps serving requests
+    - Categorizes known merchants with the user's and global merchant rules;
+      only unmatched rows reach the classifier
+    - Splits large batches into shards classified and persisted
+      concurrently, each on its own database session
+    - Checkpoints every committed chunk on the batch (processed_records)
+    - Resumes retried and redelivered batches from the last checkpoint
+    - Skips jobs whose batch already finished (duplicate deliveries, or
+      batches the API completed within the upload request)
+    - Deletes the stored files once the batch is completed or failed
+    - Waits (up to BATCH_EVENT_CONFIRM_SECONDS) for the broker to confirm
+      the batch's event before the job is acknowledged
+    """
+
+    def __init__(
+        self,
+        classifier: ClassifierPort,
+        message_broker: MessageBrokerPort,
+        reference_data: ReferenceDataPort,
+        file_storage: FileStoragePort,
+        session_factory: sessionmaker,
+        stage_executor: Optional[StageExecutorPort] = None,
+        confirm_events: bool = True,
+    ):
+        from ...infrastructure.executors import InlineStageExecutor
+
+        self.classifier = classifier
+        self.message_broker = message_broker
+        self.reference_data = reference_data
+        self.file_storage = file_storage
+        self.session_factory = session_factory
+        # Parses on the event loop unless an executor is given
+        self.stage_executor = stage_executor or InlineStageExecutor()
+        # Whether jobs wait for the broker to confirm their batch's event before
+        # being acknowledged (pointless when the job queue isn't durable)
+        self.confirm_events = confirm_events
+
+    async def execute(self, job: BatchJob, parser: ExcelParserPort) -> None:
+        """
+        Process the transactions of a batch, retrying transient failures.
+
+        Each attempt resumes after the last committed chunk. Format errors
+        (ValueError) are not retried, since the same file fails the same way.
+
+        Args:
+            job: The queued job
+            parser: Excel parser for the bank of the job
+
+        Raises:
+            Exception: If the last attempt fails; the batch is marked as "error" first
+        """
+        for attempt in range(1, BATCH_MAX_ATTEMPTS + 1):
+            try:
+                batch = await self._process(job, parser)
+                break
+            except Exception as e:
+                if isinstance(e, ValueError) or attempt == BATCH_MAX_ATTEMPTS:
+                    await self._fail(job)
+                    raise
+                delay = BATCH_RETRY_DELAY_SECONDS * 2 ** (attempt - 1)
+                logger.warning(
+                    f"Batch {job.id_batch} failed on attempt {attempt}/{BATCH_MAX_ATTEMPTS}: "
+                    f"{e}. Resuming from the last checkpoint in {delay:.0f}s",
+                    exc_info=True,
+                )
+                await asyncio.sleep(delay)
+
+        if batch is not None:
+            await self._complete(job, batch)
+
+    async def execute_inline(self, job: BatchJob, parser: ExcelParserPort) -> bool:
+        """
+        Process a small batch within the upload request: one attempt, no retry delay.
+
+        The job must already be queued with inline_until set: the attempt
+        is cancelled at that deadline, and the queued job (which waits for
+        it, see wait_for_inline_attempt) resumes whatever this attempt
+        didn't finish, also if the API process dies mid-way.
+
+        Args:
+            job: The queued job
+            parser: Excel parser for the bank of the job
+
+        Returns:
+            Whether the batch was processed. False if the attempt failed with
+            a transient error or ran out of time: a worker resumes it from
+            the last checkpoint.
+
+        Raises:
+            ValueError: If the files have an unexpected format; the batch is
+                marked as "error" first
+        """
+        try:
+            batch = await asyncio.wait_for(
+                self._process(job, parser), job.inline_until - time.time()
+            )
+        except ValueError:
+            await self._fail(job, confirm=False)
+            raise
+        except Exception as e:
+            logger.warning(
+                f"Inline processing of batch {job.id_batch} failed: {e!r}. "
+                "Leaving it to the queued job",
+                exc_info=True,
+            )
+            return False
+
+        if batch is not None:
+            # The response doesn't wait for the broker: the event stays buffered
+            await self._complete(job, batch, confirm=False)
+        return True
+
+    @staticmethod
+    async def wait_for_inline_attempt(job: BatchJob) -> None:
+        """Wait until the API can no longer be processing the job's batch inline"""
+        if job.inline_until is None:
+            return
+        delay = job.inline_until + INLINE_GRACE_SECONDS - time.time()
+        if delay > 0:
+            logger.info(f"Batch {job.id_batch} is processed inline, waiting {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _complete(self, job: BatchJob, batch: TransactionBatch, confirm: bool = True) -> None:
+        """
+        Release the files of a completed batch and publish its event.
+
+        With confirm, returns once the broker confirmed the event (or after
+        BATCH_EVENT_CONFIRM_SECONDS), so the job is acknowledged after it. A
+        redelivered job skips the completed batch, so an unconfirmed event
+        is lost if this process dies before the publisher sends it.
+        """
+        await asyncio.to_thread(self.file_storage.delete, job.file_keys)
+
+        # Publish message to RabbitMQ after successful completion
+        try:
+            await self.message_broker.publish_batch_processed(
+                batch_id=batch.id_batch,
+                user_id=job.id_user,
+                status="completed",
+            )
+            if confirm and self.confirm_events:
+                await self._confirm_event(job)
+        except Exception as mq_error:
+            logger.error(
+                f"Failed to publish batch processed event to RabbitMQ: {mq_error}",
+                exc_info=True,
+            )
+
+    async def _confirm_event(self, job: BatchJob) -> None:
+        """Wait a bounded time for the broker to confirm the events published so far"""
+        try:
+            await asyncio.wait_for(self.message_broker.flush(), BATCH_EVENT_CONFIRM_SECONDS)
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Event of batch {job.id_batch} not confirmed by RabbitMQ within "
+                f"{BATCH_EVENT_CONFIRM_SECONDS:.0f}s, acknowledging the job anyway"
+            )
+
+    async def _process(self, job: BatchJob, parser: ExcelParserPort):
+        """
+        Run one processing attempt through the staged pipeline.
+
+        Files are streamed through the parser one chunk at a time, so only
+        the chunks in flight between stages are held in memory, also on a
+        process stage executor. Rows already committed by an earlier
+        attempt (processed_records) are skipped.
+
+        Large batches run as several shards: lanes that each take the next
+        parsed chunk, classify it and commit it on their own session. The
+        checkpoint then covers the rows committed from the start of the
+        batch; chunks committed past it are written again (and ignored) by
+        a retry. The batch is completed only after every shard committed.
+
+        Returns:
+            The completed batch, or None if the job has nothing to do
+        """
+        # Import repositories
+        from ...infrastructure.repositories import (
+            MySQLTransactionRepository,
+            MySQLTransactionBatchRepository,
+            MySQLMerchantRuleRepository,
+        )
+        from ...infrastructure.classifier import MerchantRuleIndex
+        from ...infrastructure.classifier.utils import clean_texts
+
+        # Create a new session for this attempt
+        async with self.session_factory() as session:
+            batch_repo = MySQLTransactionBatchRepository(session)
+            rule_repo = MySQLMerchantRuleRepository(session)
+
+            batch = await batch_repo.get_by_id(UUID(job.id_batch))
+            if batch is None:
+                logger.warning(f"Batch {job.id_batch} not found, dropping job")
+                return None
+            if batch.process_status in ("completed", "error"):
+                logger.info(
+                    f"Batch {job.id_batch} already {batch.process_status}, skipping job"
+                )
+                return None
+
+            resume_from = batch.processed_records
+            if resume_from:
+                logger.warning(
+                    f"Resuming batch {job.id_batch} after {resume_from} committed rows"
+                )
+
+            batch.process_status = "processing"
+            if batch.processing_start_date is None:
+                batch.processing_start_date = datetime.now()
+            await batch_repo.update(batch)
+            await session.commit()
+
+            # Rules are read once per attempt, so edits apply from the next batch
+            rules = MerchantRuleIndex(await rule_repo.get_applicable(UUID(job.id_user)))
+            checkpoint = CommitCheckpoint(resume_from, batch.rule_matched_records)
+            rule_hits: Dict[int, int] = {}
+            shards = self._shards((batch.batch_size or 0) - resume_from)
+
+            async def classify(chunk: TransactionChunk) -> List[str]:
+                descriptions = chunk.descriptions.tolist()
+                values = chunk.values.tolist()
+                # Known merchants skip the model entirely
+                categories = (
+                    rules.match(clean_texts(descriptions))
+                    if len(rules)
+                    else [None] * len(descriptions)
+                )
+                unmatched = [row for row, category in enumerate(categories) if category is None]
+                rule_hits[chunk.first_row] = len(categories) - len(unmatched)
+                if not unmatched:
+                    return categories
+
+                # OPTIMIZATION: Batch classify all transactions at once
+                # This is 50-100x faster than classifying one-by-one!
+                logger.info(
+                    f"Batch classifying {len(unmatched)} transactions "
+                    f"({rule_hits[chunk.first_row]} matched by merchant rules)..."
+                )
+                if len(unmatched) < len(categories):
+                    descriptions = [descriptions[row] for row in unmatched]
+                    values = [values[row] for row in unmatched]
+                predicted = await self.classifier.classify_batch(
+                    descriptions=descriptions,
+                    transaction_values=values,
+                )
+                for row, category in zip(unmatched, predicted):
+                    categories[row] = category
+                return categories
+
+            # One session per shard; the first shard uses the attempt's session
+            sessions: asyncio.Queue = asyncio.Queue()
+
+            async def persist(chunk: TransactionChunk, category_descriptions: List[str]):
+                # Resolve each distinct category once and map it back to the rows.
+                # Categories come from the shared cache; missing ones are upserted.
+                labels, row_labels = np.unique(
+                    np.asarray(category_descriptions, dtype=object), return_inverse=True
+                )
+                ids_by_label = await self.reference_data.get_category_ids(labels.tolist())
+                category_ids = np.array(
+                    [ids_by_label[label] for label in labels], dtype=object
+                )[row_labels]
+
+                end_row = chunk.first_row + len(chunk)
+                hits = rule_hits.pop(chunk.first_row, 0)
+                shard_session = await sessions.get()
+                try:
+                    await MySQLTransactionRepository(shard_session).save_chunk(
+                        chunk,
+                        category_ids=category_ids,
+                        id_user=job.id_user,
+                        id_bank=job.id_bank,
+                        id_batch=batch.id_batch,
+                    )
+                    # The checkpoint commits together with the rows it accounts for
+                    await MySQLTransactionBatchRepository(shard_session).record_progress(
+                        batch.id_batch, *checkpoint.including(chunk.first_row, end_row, hits)
+                    )
+                    await shard_session.commit()
+                    checkpoint.commit(chunk.first_row, end_row, hits)
+                finally:
+                    sessions.put_nowait(shard_session)
+
+            # Parse, classify and persist run as concurrent stages: the next
+            # chunk is classified while the previous one is being written.
+            pipeline = TransactionPipeline(
+                classify=classify,
+                persist=persist,
+                sizer=ChunkSizeController.from_env(),
+                queue_size=PIPELINE_QUEUE_SIZE,
+                lanes=shards,
+            )
+            chunks = self.stage_executor.iterate(
+                read_stored_chunks, self.file_storage, parser, job.file_keys, PARSE_CHUNK_SIZE
+            )
+            try:
+                async with AsyncExitStack() as shard_sessions:
+                    sessions.put_nowait(session)
+                    for _ in range(shards - 1):
+                        sessions.put_nowait(
+                            await shard_sessions.enter_async_context(self.session_factory())
+                        )
+                    saved_rows = await pipeline.run(chunks, skip_rows=resume_from)
+            except Exception:
+                await session.rollback()
+                raise
+            logger.info(
+                f"Batch {batch.id_batch}: {saved_rows} transactions saved in {shards} shard(s), "
+                f"{checkpoint.count} categorized by merchant rules"
+            )
+
+            # Mark as completed, once every shard committed
+            await batch_repo.record_progress(batch.id_batch, checkpoint.position, checkpoint.count)
+            batch.process_status = "completed"
+            batch.end_date = datetime.now()
+            await batch_repo.update(batch)
+            await session.commit()
+            return batch
+
+    @staticmethod
+    def _shards(remaining_rows: int) -> int:
+        """Shards for the rows left to process: BATCH_SHARD_MIN_ROWS each, at most BATCH_SHARDS"""
+        return max(1, min(BATCH_SHARDS, remaining_rows // max(1, BATCH_SHARD_MIN_ROWS)))
+
+    async def _fail(self, job: BatchJob, confirm: bool = True) -> None:
+        """Mark the batch as failed, release its files and publish the error event"""
+        from ...infrastructure.repositories import MySQLTransactionBatchRepository
+
+        # Create a new session to update error status
+        async with self.session_factory() as error_session:
+            error_batch_repo = MySQLTransactionBatchRepository(error_session)
+            batch = await error_batch_repo.get_by_id(UUID(job.id_batch))
+            if batch is None:
+                return
+            batch.process_status = "error"
+            batch.end_date = datetime.now()
+            await error_batch_repo.update(batch)
+            await error_session.commit()
+        await asyncio.to_thread(self.file_storage.delete, job.file_keys)
+
+        # Optionally publish error event to RabbitMQ
+        try:
+            await self.message_broker.publish_batch_processed(
+                batch_id=batch.id_batch,
+                user_id=job.id_user,
+                status="Error",
+            )
+            if confirm and self.confirm_events:
+                await self._confirm_event(job)
+        except Exception as mq_error:
+            logger.error(
+                f"Failed to publish batch error event to RabbitMQ: {mq_error}",
+                exc_info=True,
+            )
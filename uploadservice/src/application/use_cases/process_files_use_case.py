@@ -1,9 +1,11 @@
 """
 ProcessFilesUseCase with file hash validation and duplicate file detection.
 """
-from typing import List, Tuple
+from typing import BinaryIO, List, Optional, Sequence, Tuple
+from uuid import uuid4
 import asyncio
 import logging
+import time
 from datetime import datetime
 from sqlalchemy.orm import sessionmaker
 
@@ -14,11 +16,26 @@ from ...domain.ports import (
     CategoryRepositoryPort,
     TransactionBatchRepositoryPort,
     ExcelParserPort,
-    ClassifierPort,
-    MessageBrokerPort,
+    ReferenceDataPort,
+    JobQueuePort,
+    FileStoragePort,
+    StageExecutorPort,
 )
 from ...domain.ports.file_upload_history_repository_port import FileUploadHistoryRepositoryPort
-from ...domain.entities import Transaction, TransactionBatch, FileUploadHistory
+from ...domain.entities import BatchJob, TransactionBatch, FileUploadHistory
+from .process_batch_use_case import ProcessBatchUseCase, INLINE_TIMEOUT_SECONDS
+from .admit_upload_use_case import AdmitUploadUseCase
+
+
+def count_stored_rows(
+    file_storage: FileStoragePort, parser: ExcelParserPort, file_keys: Sequence[str]
+) -> int:
+    """Validate the stored files and count their rows (runs on the stage executor)"""
+    total_rows = 0
+    for key in file_keys:
+        with file_storage.open(key) as file_content:
+            total_rows += parser.count_rows(file_content)
+    return total_rows
 
 
 class DuplicateFileError(Exception):
@@ -38,7 +55,9 @@ class ProcessFilesUseCase:
     - Calculates SHA256 hash of uploaded files
     - Detects and prevents duplicate file processing
     - Saves file upload history to database
-    - Processes transactions asynchronously
+    - Validates the files on the stage executor, off the event loop
+    - Processes small batches within the request (inline_max_rows) and
+      queues the rest for the processing workers
     """
 
     def __init__(
@@ -47,23 +66,39 @@ class ProcessFilesUseCase:
         bank_repo: BankRepositoryPort,
         category_repo: CategoryRepositoryPort,
         batch_repo: TransactionBatchRepositoryPort,
-        classifier: ClassifierPort,
-        message_broker: MessageBrokerPort,
         file_upload_history_repo: FileUploadHistoryRepositoryPort,  # NEW PARAMETER
+        reference_data: ReferenceDataPort,
+        job_queue: JobQueuePort,
+        file_storage: FileStoragePort,
         session_factory: sessionmaker = None,
+        stage_executor: Optional[StageExecutorPort] = None,
+        batch_processor: Optional[ProcessBatchUseCase] = None,
+        inline_max_rows: int = 0,
+        admission: Optional[AdmitUploadUseCase] = None,
     ):
+        from ...infrastructure.executors import InlineStageExecutor
+
         self.transaction_repo = transaction_repo
         self.bank_repo = bank_repo
         self.category_repo = category_repo
         self.batch_repo = batch_repo
-        self.classifier = classifier
-        self.message_broker = message_broker
         self.file_upload_history_repo = file_upload_history_repo  # NEW
+        self.reference_data = reference_data
+        self.job_queue = job_queue
+        self.file_storage = file_storage
         self.session_factory = session_factory
+        # Validates on the event loop unless an executor is given
+        self.stage_executor = stage_executor or InlineStageExecutor()
+        # Batches of up to inline_max_rows rows are processed by batch_processor
+        # before the request returns (0 disables it)
+        self.batch_processor = batch_processor
+        self.inline_max_rows = inline_max_rows
+        # Checks the service-wide backlog for uploads that go to the queue
+        self.admission = admission
 
     async def execute(
         self,
-        files_data: List[Tuple[bytes, str, str, int]],  # (content, hash, filename, size)
+        files_data: List[Tuple[BinaryIO, str, str, int]],  # (file, hash, filename, size)
         parser: ExcelParserPort,
         user_id: str,  # UUID as string
     ) -> str:  # Returns batch_id as string
@@ -71,29 +106,36 @@ class ProcessFilesUseCase:
         Process Excel files with duplicate detection.
 
         Args:
-            files_data: List of tuples containing (file_content, file_hash, filename, file_size)
+            files_data: List of tuples containing (file, file_hash, filename, file_size).
+                The files are binary file objects (spooled uploads); their content is
+                copied to the file storage shared with the workers.
             parser: Excel parser for the bank
             user_id: ID of the user uploading files (UUID as string)
 
         Returns:
-            UUID string of the created batch
+            UUID string of the created batch; small batches are already
+            completed when it returns
 
         Raises:
             ValueError: If bank not found
             DuplicateFileError: If file was already uploaded (contains batch_id and upload_date)
+            UploadRejectedError: If the upload would be queued while the backlog is full
+            Exception: If the job can't be queued; the batch is marked as "error"
         """
-        # 1. Get the bank by name
+        # 1. Get the bank by name (from the process-wide cache)
         bank_name = parser.get_bank_code()
-        bank = await self.bank_repo.get_by_name(bank_name)
+        bank = await self.reference_data.get_bank_by_name(bank_name)
         if not bank:
             raise ValueError(f"Bank with name {bank_name} not found")
 
-        # 2. VALIDATE FILE HASHES - Check for duplicates
+        # 2. VALIDATE FILE HASHES - Check every file for duplicates in one query
+        existing_uploads = await self.file_upload_history_repo.get_by_hashes(
+            user_id=user_id,
+            file_hashes=[file_hash for _, file_hash, _, _ in files_data],
+        )
+        existing_by_hash = {upload.file_hash: upload for upload in existing_uploads}
         for file_content, file_hash, filename, file_size in files_data:
-            existing_upload = await self.file_upload_history_repo.get_by_hash(
-                user_id=user_id,
-                file_hash=file_hash
-            )
+            existing_upload = existing_by_hash.get(file_hash)
 
             if existing_upload:
                 # FILE IS DUPLICATE - Raise exception to return 409
@@ -109,177 +151,95 @@ class ProcessFilesUseCase:
                     upload_date=existing_upload.upload_date
                 )
 
-        # 3. Parse all files
-        all_raw_transactions = []
-        for file_content, file_hash, filename, file_size in files_data:
-            raw_transactions = parser.parse(file_content)
-            all_raw_transactions.extend(raw_transactions)
+        # 3. Store the files where the workers (and the stage executor) can read them
+        id_batch = uuid4()
+        file_keys = []
+        try:
+            for index, (file_content, _, _, _) in enumerate(files_data):
+                file_keys.append(
+                    await asyncio.to_thread(self.file_storage.save, str(id_batch), index, file_content)
+                )
 
-        # 4. Create the batch
+            # 4. Validate and count the rows of all files. Rows are converted
+            # later, chunk by chunk, by the batch workers.
+            total_rows = await self.stage_executor.run(
+                count_stored_rows, self.file_storage, parser, file_keys
+            )
+            inline = self.batch_processor is not None and total_rows <= self.inline_max_rows
+            if not inline and self.admission is not None:
+                # The user's limit was checked before the files were stored
+                await self.admission.execute(user_id, per_user=False)
+        except Exception:
+            await asyncio.to_thread(self.file_storage.delete, file_keys)
+            raise
+
+        # 5. Create the batch and its FILE UPLOAD HISTORY in one transaction
+        upload_date = datetime.now()
         batch = TransactionBatch(
-            id_batch=None,
+            id_batch=id_batch,
             process_status="pending",
-            start_date=datetime.now(),
+            start_date=upload_date,
             end_date=None,
-            batch_size=len(all_raw_transactions),
+            batch_size=total_rows,
         )
-        batch = await self.batch_repo.save(batch)
-
-        # 5. SAVE FILE UPLOAD HISTORY - Record this upload
-        for file_content, file_hash, filename, file_size in files_data:
-            file_upload = FileUploadHistory(
+        file_uploads = [
+            FileUploadHistory(
                 id_file=None,
                 id_user=user_id,
                 file_hash=file_hash,
                 file_name=filename,
                 bank_code=bank_name,
-                upload_date=datetime.now(),
-                id_batch=batch.id_batch,
+                upload_date=upload_date,
+                id_batch=None,  # Set to the batch's ID on registration
                 file_size=file_size,
             )
-            await self.file_upload_history_repo.save(file_upload)
+            for _, file_hash, filename, file_size in files_data
+        ]
+        try:
+            batch = await self.file_upload_history_repo.register_batch(batch, file_uploads)
+        except Exception:
+            await asyncio.to_thread(self.file_storage.delete, file_keys)
+            raise
+        for file_upload in file_uploads:
             logger.info(
-                f"Saved file upload history: {filename} (hash: {file_hash[:16]}...) "
-                f"Batch ID: {batch.id_batch}"
+                f"Saved file upload history: {file_upload.file_name} "
+                f"(hash: {file_upload.file_hash[:16]}...) Batch ID: {batch.id_batch}"
             )
 
-        # 6. Process in background
-        asyncio.create_task(
-            self._process_transactions_async(
-                all_raw_transactions, batch, user_id, bank.id_bank
-            )
+        job = BatchJob(
+            id_batch=str(batch.id_batch),
+            id_user=user_id,
+            id_bank=bank.id_bank,
+            bank_code=bank_name,
+            file_keys=file_keys,
         )
 
-        return batch.id_batch
-
-    async def _process_transactions_async(
-        self, raw_transactions, batch: TransactionBatch, user_id: str, bank_id: str  # Both are UUID strings
-    ):
-        """Process transactions in batches of 500"""
-        # Create a new session for this background task
-        async with self.session_factory() as session:
-            try:
-                # Import repositories
-                from ...infrastructure.repositories import (
-                    MySQLTransactionRepository,
-                    MySQLCategoryRepository,
-                    MySQLTransactionBatchRepository,
-                )
+        if inline:
+            # The queued job leaves the batch to this request until then
+            job.inline_until = time.time() + INLINE_TIMEOUT_SECONDS
 
-                # Create repository instances with the new session
-                transaction_repo = MySQLTransactionRepository(session)
-                category_repo = MySQLCategoryRepository(session)
-                batch_repo = MySQLTransactionBatchRepository(session)
+        # 6. Queue the batch for the processing workers. Small batches are
+        # queued too, so a worker finishes them if this request can't.
+        try:
+            await self.job_queue.enqueue(job)
+        except Exception:
+            logger.error(f"Failed to queue batch {batch.id_batch}", exc_info=True)
+            await self._mark_batch_error(batch)
+            await asyncio.to_thread(self.file_storage.delete, file_keys)
+            raise
 
-                batch.process_status = "processing"
-                await batch_repo.update(batch)
-                await session.commit()
+        # 7. Process small batches right away: no waiting for a worker, no polling
+        if inline:
+            await self.batch_processor.execute_inline(job, parser)
 
-                BATCH_SIZE = 500
-
-                # Cache categories to avoid repeated DB queries
-                category_cache = {}
-
-                for i in range(0, len(raw_transactions), BATCH_SIZE):
-                    chunk = raw_transactions[i : i + BATCH_SIZE]
-
-                    # OPTIMIZATION: Batch classify all transactions at once
-                    # This is 50-100x faster than classifying one-by-one!
-                    descriptions = [raw_tx.description for raw_tx in chunk]
-                    values = [float(raw_tx.amount) for raw_tx in chunk]
-
-                    logger.info(f"Batch classifying {len(chunk)} transactions...")
-                    category_descriptions = await self.classifier.classify_batch(
-                        descriptions=descriptions,
-                        transaction_values=values
-                    )
-
-                    # Create transactions with classified categories
-                    transactions = []
-                    for raw_tx, category_description in zip(chunk, category_descriptions):
-                        # Check cache first
-                        if category_description not in category_cache:
-                            # Get or create category
-                            category = await category_repo.get_by_description(
-                                category_description
-                            )
-                            if not category:
-                                from ...domain.entities import Category
-
-                                category = await category_repo.save(
-                                    Category(id_category=None, description=category_description)
-                                )
-                                await session.commit()
-
-                            # Add to cache
-                            category_cache[category_description] = category
-                        else:
-                            # Use cached category (much faster!)
-                            category = category_cache[category_description]
-
-                        # Determine transaction type (income or expense based on amount sign)
-                        transaction_type = "income" if raw_tx.amount > 0 else "expense"
-
-                        # Create transaction
-                        transaction = Transaction(
-                            id_transaction=None,
-                            id_user=user_id,
-                            id_bank=bank_id,
-                            id_category=category.id_category,
-                            id_batch=batch.id_batch,
-                            transaction_date=raw_tx.date,
-                            transaction_name=raw_tx.description,
-                            value=abs(raw_tx.amount),  # Store as positive value
-                            transaction_type=transaction_type,
-                        )
-                        transactions.append(transaction)
-
-                    # Save batch
-                    logger.info(f"Saving {len(transactions)} classified transactions to database...")
-                    await transaction_repo.save_batch(transactions)
-                    await session.commit()
-                    logger.info(f"Batch {i//BATCH_SIZE + 1} completed: {len(transactions)} transactions saved")
-
-                # Mark as completed
-                batch.process_status = "completed"
-                batch.end_date = datetime.now()
-                await batch_repo.update(batch)
-                await session.commit()
-
-                # Publish message to RabbitMQ after successful completion
-                try:
-                    await self.message_broker.publish_batch_processed(
-                        batch_id=batch.id_batch,
-                        user_id=user_id,
-                        status="completed",
-                    )
-                except Exception as mq_error:
-                    logger.error(
-                        f"Failed to publish batch processed event to RabbitMQ: {mq_error}",
-                        exc_info=True,
-                    )
-
-            except Exception as e:
-                await session.rollback()
-                # Create a new session to update error status
-                async with self.session_factory() as error_session:
-                    error_batch_repo = MySQLTransactionBatchRepository(error_session)
-                    batch.process_status = "error"
-                    batch.end_date = datetime.now()
-                    await error_batch_repo.update(batch)
-                    await error_session.commit()
+        return batch.id_batch
 
-                # Optionally publish error event to RabbitMQ
-                try:
-                    await self.message_broker.publish_batch_processed(
-                        batch_id=batch.id_batch,
-                        user_id=user_id,
-                        status="Error",
-                    )
-                except Exception as mq_error:
-                    logger.error(
-                        f"Failed to publish batch error event to RabbitMQ: {mq_error}",
-                        exc_info=True,
-                    )
+    async def _mark_batch_error(self, batch: TransactionBatch) -> None:
+        """Mark a batch that could not be queued as failed, in its own session"""
+        from ...infrastructure.repositories import MySQLTransactionBatchRepository
 
-                raise e
+        async with self.session_factory() as error_session:
+            batch.process_status = "error"
+            batch.end_date = datetime.now()
+            await MySQLTransactionBatchRepository(error_session).update(batch)
+            await error_session.commit()
@@ -0,0 +1,246 @@
+"""
+ReclassifyTransactionsUseCase: re-categorizes the stored transactions with
+the current model.
+
+Stored categories keep the label of the model version that was active when
+the batch was processed. This job pages through Transaction by primary key,
+classifies every page in one large batch (the classifier may spread it
+across processes), and writes back only the rows whose category changed.
+Each page commits together with the job checkpoint, so an interrupted job
+resumes after the last committed page.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, Optional
+from uuid import UUID, uuid4
+import asyncio
+import logging
+from sqlalchemy.orm import sessionmaker
+
+from ...domain.ports import ClassifierPort, ReferenceDataPort
+from ...domain.entities import MerchantRule, ReclassificationJob, Transaction
+
+if TYPE_CHECKING:
+    from ...infrastructure.classifier import MerchantRuleIndex
+
+logger = logging.getLogger(__name__)
+
+
+class ReclassifyTransactionsUseCase:
+    """
+    Use case for reclassifying the stored transactions.
+
+    Features:
+    - Keyset pagination over Transaction.id_transaction
+    - Merchant rules first, the classifier for the rest, as in batch processing
+    - Transactions a user corrected by hand are never touched
+    - Only changed rows are written, in grouped UPDATE ... CASE statements
+    - The next page is read while the current one is classified and written
+    - Checkpointed after every page; resumes the running job unless restarted
+    - Throttled: at most max_rows_per_second, and a pause after every page
+      while upload batches are being processed
+
+    Args:
+        classifier: Classifier of the pages; errors must propagate (no fallback)
+        reference_data: Maps category descriptions to IDs
+        session_factory: Database session factory
+        page_size: Transactions read, classified and written at a time
+        max_rows_per_second: Rate limit (0 disables it)
+        busy_pause_seconds: Pause after a page while batches are processing
+    """
+
+    def __init__(
+        self,
+        classifier: ClassifierPort,
+        reference_data: ReferenceDataPort,
+        session_factory: sessionmaker,
+        page_size: int = 5000,
+        max_rows_per_second: float = 0,
+        busy_pause_seconds: float = 2.0,
+    ):
+        self.classifier = classifier
+        self.reference_data = reference_data
+        self.session_factory = session_factory
+        self.page_size = page_size
+        self.max_rows_per_second = max_rows_per_second
+        self.busy_pause_seconds = busy_pause_seconds
+
+    async def execute(self, restart: bool = False) -> ReclassificationJob:
+        """
+        Reclassify every stored transaction, resuming the running job if any.
+
+        A running job started with another model version is marked as
+        superseded and a new one starts from the first transaction.
+
+        Args:
+            restart: Start from the first transaction even if a job is running
+
+        Returns:
+            The completed job
+
+        Raises:
+            Exception: If a page fails; the job stays running and the next
+                execution resumes after its last committed page
+        """
+        from ...infrastructure.repositories import (
+            MySQLTransactionRepository,
+            MySQLReclassificationJobRepository,
+        )
+
+        model_version = await asyncio.to_thread(lambda: self.classifier.model_version)
+        job = await self._start(model_version, restart)
+        rules = await self._load_rules()
+
+        async def read(after: Optional[str]) -> List[Transaction]:
+            async with self.session_factory() as session:
+                return await MySQLTransactionRepository(session).get_page_after(after, self.page_size)
+
+        loop = asyncio.get_running_loop()
+        next_page = asyncio.create_task(read(job.last_id_transaction))
+        try:
+            while True:
+                page = await next_page
+                if not page:
+                    break
+                # Keyset pagination: the next page only needs the last ID
+                next_page = asyncio.create_task(read(str(page[-1].id_transaction)))
+                started = loop.time()
+
+                categories = await self._classify(page, rules)
+                if self.classifier.model_version != job.model_version:
+                    raise RuntimeError(
+                        f"Model changed from {job.model_version} to "
+                        f"{self.classifier.model_version} during reclassification"
+                    )
+                ids_by_label = await self.reference_data.get_category_ids(sorted(set(categories)))
+                changes: Dict[UUID, str] = {}
+                previous: Dict[UUID, str] = {}
+                for transaction, category in zip(page, categories):
+                    id_category = ids_by_label[category]
+                    if id_category != transaction.id_category:
+                        changes[transaction.id_transaction] = id_category
+                        previous[transaction.id_transaction] = transaction.id_category
+
+                async with self.session_factory() as session:
+                    changed = await MySQLTransactionRepository(session).update_categories(
+                        changes, previous
+                    )
+                    job.last_id_transaction = str(page[-1].id_transaction)
+                    job.scanned_records += len(page)
+                    job.changed_records += changed
+                    # The checkpoint commits together with the rows it accounts for
+                    await MySQLReclassificationJobRepository(session).update(job)
+                    await session.commit()
+                logger.info(
+                    f"Reclassification {job.id_job}: {job.scanned_records} scanned, "
+                    f"{job.changed_records} changed"
+                )
+
+                await self._throttle(len(page), loop.time() - started)
+        finally:
+            next_page.cancel()
+
+        job.status = ReclassificationJob.STATUS_COMPLETED
+        job.end_date = datetime.now()
+        async with self.session_factory() as session:
+            await MySQLReclassificationJobRepository(session).update(job)
+            await session.commit()
+        logger.info(
+            f"Reclassification {job.id_job} completed: {job.scanned_records} scanned, "
+            f"{job.changed_records} changed"
+        )
+        return job
+
+    async def _start(self, model_version: Optional[str], restart: bool) -> ReclassificationJob:
+        """Resume the running job of this model version or start a new one"""
+        from ...infrastructure.repositories import MySQLReclassificationJobRepository
+
+        async with self.session_factory() as session:
+            job_repo = MySQLReclassificationJobRepository(session)
+            job = await job_repo.get_running()
+            if job is not None and not restart and job.model_version == model_version:
+                logger.info(
+                    f"Resuming reclassification {job.id_job} after {job.scanned_records} transactions"
+                )
+                return job
+            if job is not None:
+                logger.warning(f"Reclassification {job.id_job} superseded by a new job")
+                job.status = ReclassificationJob.STATUS_SUPERSEDED
+                job.end_date = datetime.now()
+                await job_repo.update(job)
+
+            job = await job_repo.save(ReclassificationJob(
+                id_job=uuid4(),
+                status=ReclassificationJob.STATUS_RUNNING,
+                start_date=datetime.now(),
+                model_version=model_version,
+            ))
+            await session.commit()
+            logger.info(f"Started reclassification {job.id_job} with model {model_version}")
+            return job
+
+    async def _load_rules(self) -> Dict[Optional[UUID], "MerchantRuleIndex"]:
+        """
+        Merchant rule indexes, read once per job.
+
+        Key None holds the global rules; every user with rules of their own
+        gets an index of the global rules plus theirs.
+        """
+        from ...infrastructure.classifier import MerchantRuleIndex
+        from ...infrastructure.repositories import MySQLMerchantRuleRepository
+
+        async with self.session_factory() as session:
+            rules = await MySQLMerchantRuleRepository(session).get_all()
+        by_user: Dict[Optional[UUID], List[MerchantRule]] = defaultdict(list)
+        for rule in rules:
+            by_user[rule.id_user].append(rule)
+        global_rules = by_user.pop(None, [])
+        indexes = {
+            id_user: MerchantRuleIndex(global_rules + user_rules)
+            for id_user, user_rules in by_user.items()
+        }
+        indexes[None] = MerchantRuleIndex(global_rules)
+        return indexes
+
+    async def _classify(
+        self, page: List[Transaction], rules: Dict[Optional[UUID], "MerchantRuleIndex"]
+    ) -> List[str]:
+        """Categorize a page: merchant rules first, one classifier batch for the rest"""
+        from ...infrastructure.classifier.utils import clean_texts
+
+        categories: List[Optional[str]] = [None] * len(page)
+        if any(len(index) for index in rules.values()):
+            cleaned = clean_texts([transaction.transaction_name for transaction in page])
+            rows_by_user: Dict[UUID, List[int]] = defaultdict(list)
+            for row, transaction in enumerate(page):
+                rows_by_user[transaction.id_user].append(row)
+            for id_user, rows in rows_by_user.items():
+                index = rules.get(id_user, rules[None])
+                if not len(index):
+                    continue
+                for row, category in zip(rows, index.match([cleaned[row] for row in rows])):
+                    categories[row] = category
+
+        unmatched = [row for row, category in enumerate(categories) if category is None]
+        if unmatched:
+            predicted = await self.classifier.classify_batch(
+                [page[row].transaction_name for row in unmatched],
+                [float(page[row].signed_value) for row in unmatched],
+            )
+            for row, category in zip(unmatched, predicted):
+                categories[row] = category
+        return categories
+
+    async def _throttle(self, rows: int, elapsed: float) -> None:
+        """Keep under the rate limit and give way to batches being processed"""
+        from ...infrastructure.repositories import MySQLTransactionBatchRepository
+
+        pause = 0.0
+        if self.max_rows_per_second > 0:
+            pause = max(0.0, rows / self.max_rows_per_second - elapsed)
+        if self.busy_pause_seconds > 0:
+            async with self.session_factory() as session:
+                if await MySQLTransactionBatchRepository(session).count_processing():
+                    pause = max(pause, self.busy_pause_seconds)
+        if pause:
+            await asyncio.sleep(pause)
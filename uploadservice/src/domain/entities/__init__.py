@@ -3,5 +3,21 @@ from .bank import Bank
 from .category import Category
 from .transaction_batch import TransactionBatch
 from .file_upload_history import FileUploadHistory
+from .transaction_chunk import TransactionChunk
+from .batch_job import BatchJob
+from .merchant_rule import MerchantRule
+from .category_correction import CategoryCorrection
+from .reclassification_job import ReclassificationJob
 
-__all__ = ["Transaction", "Bank", "Category", "TransactionBatch", "FileUploadHistory"]
+__all__ = [
+    "Transaction",
+    "Bank",
+    "Category",
+    "TransactionBatch",
+    "FileUploadHistory",
+    "TransactionChunk",
+    "BatchJob",
+    "MerchantRule",
+    "CategoryCorrection",
+    "ReclassificationJob",
+]
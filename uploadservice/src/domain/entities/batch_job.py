@@ -0,0 +1,24 @@
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+
+@dataclass
+class BatchJob:
+    """
+    Unit of work queued for the batch processing workers.
+
+    Attributes:
+        id_batch: Batch to process (UUID as string)
+        id_user: Owner of the batch (UUID as string)
+        id_bank: Bank of the uploaded files (UUID as string)
+        bank_code: Bank code used to pick the parser (e.g., BANCOLOMBIA)
+        file_keys: Storage keys of the uploaded files, in upload order
+        inline_until: Unix time until which the API may still be processing
+            the batch within the upload request; workers wait until then
+    """
+    id_batch: str
+    id_user: str
+    id_bank: str
+    bank_code: str
+    file_keys: List[str] = field(default_factory=list)
+    inline_until: Optional[float] = None
@@ -0,0 +1,23 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+
+@dataclass
+class CategoryCorrection:
+    """
+    A category set by a user on one of their transactions.
+
+    Corrections are the training examples of the incremental learner;
+    id_correction increases monotonically.
+    """
+    id_correction: Optional[int]
+    id_user: UUID
+    description: str
+    id_category: str
+    value: Optional[Decimal] = None
+    id_transaction: Optional[UUID] = None
+    category: Optional[str] = None  # Category description, filled when read
+    created_at: Optional[datetime] = None
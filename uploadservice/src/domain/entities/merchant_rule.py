@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
+
+
+@dataclass
+class MerchantRule:
+    """
+    Deterministic categorization of a known merchant or transfer pattern.
+
+    pattern is a normalized description (see classifier utils.clean_text).
+    Exact rules match the whole description, prefix rules its beginning.
+    Rules without id_user are global and maintained by administrators.
+    """
+    MATCH_EXACT = "exact"
+    MATCH_PREFIX = "prefix"
+
+    id_rule: Optional[UUID]
+    pattern: str
+    match_type: str
+    id_category: str
+    id_user: Optional[UUID] = None
+    category: Optional[str] = None  # Category description, filled when read
+
+    @property
+    def is_global(self) -> bool:
+        return self.id_user is None
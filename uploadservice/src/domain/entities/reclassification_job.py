@@ -0,0 +1,28 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+
+@dataclass
+class ReclassificationJob:
+    """
+    Checkpoint of a bulk reclassification of the stored transactions.
+
+    The job pages through the transactions in id_transaction order; every
+    transaction up to last_id_transaction has been reclassified with
+    model_version, so an interrupted job resumes after it.
+    """
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    # Left unfinished when a newer model version was published
+    STATUS_SUPERSEDED = "superseded"
+
+    id_job: UUID
+    status: str
+    start_date: datetime
+    model_version: Optional[str] = None
+    last_id_transaction: Optional[str] = None
+    scanned_records: int = 0
+    changed_records: int = 0
+    end_date: Optional[datetime] = None
@@ -13,6 +13,12 @@ class Transaction:
     id_bank: Optional[str]  # Bank IDs are strings, not UUIDs
     id_batch: Optional[UUID]
     transaction_name: str
-    value: Decimal
+    value: Decimal  # Stored positive; the sign is in transaction_type
     transaction_date: datetime
     transaction_type: str
+    batch_row: Optional[int] = None  # Ordinal of the row within its batch
+
+    @property
+    def signed_value(self) -> Decimal:
+        """The amount as in the statement: negative for expenses"""
+        return self.value if self.transaction_type == "income" else -self.value
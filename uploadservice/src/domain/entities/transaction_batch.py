@@ -11,16 +11,42 @@ class TransactionBatch:
     start_date: datetime
     end_date: Optional[datetime] = None
     batch_size: Optional[int] = None
+    processed_records: int = 0  # Rows committed so far (resume checkpoint)
+    processing_start_date: Optional[datetime] = None  # When a worker first picked it up
+    rule_matched_records: int = 0  # Committed rows categorized by a merchant rule
+
+    @property
+    def rule_hit_ratio(self) -> Optional[float]:
+        """Share of the committed rows categorized by a merchant rule"""
+        if not self.processed_records:
+            return None
+        return self.rule_matched_records / self.processed_records
 
     @property
     def processed_percentage(self) -> float:
         """Calculate the percentage of processed records"""
-        if self.batch_size == 0 or self.batch_size is None:
-            return 0.0
-        # This would need additional logic to track progress
-        # For now, based on status
         if self.process_status == "completed":
             return 100.0
-        elif self.process_status == "processing":
-            return 50.0
-        return 0.0
+        if not self.batch_size:
+            return 0.0
+        return min(100.0, round(self.processed_records * 100.0 / self.batch_size, 2))
+
+    def rows_per_second(self, now: datetime) -> Optional[float]:
+        """Average processing throughput since a worker picked the batch up"""
+        if self.processing_start_date is None or not self.processed_records:
+            return None
+        until = self.end_date or now
+        elapsed = (until - self.processing_start_date).total_seconds()
+        if elapsed <= 0:
+            return None
+        return self.processed_records / elapsed
+
+    def eta_seconds(self, now: datetime) -> Optional[float]:
+        """Estimated seconds until the batch completes, at the current throughput"""
+        if self.process_status == "completed":
+            return 0.0
+        throughput = self.rows_per_second(now)
+        if self.process_status != "processing" or not self.batch_size or not throughput:
+            return None
+        remaining = max(0, self.batch_size - self.processed_records)
+        return remaining / throughput
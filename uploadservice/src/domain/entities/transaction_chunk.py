@@ -0,0 +1,74 @@
+from dataclasses import dataclass
+from typing import List
+import numpy as np
+
+
+@dataclass
+class TransactionChunk:
+    """
+    Columnar block of parsed transactions.
+
+    Each attribute is a NumPy array with one entry per transaction, so a
+    chunk moves from the parser through classification to the bulk insert
+    without building a Python object per row.
+
+    Attributes:
+        dates: Transaction dates (datetime64[us])
+        amounts: Signed amounts in integer cents (int64), as in the statement
+        descriptions: Transaction descriptions (object array of str)
+        references: Optional references (object array of str or None)
+        first_row: Ordinal of the first row within its batch
+    """
+    dates: np.ndarray
+    amounts: np.ndarray
+    descriptions: np.ndarray
+    references: np.ndarray
+    first_row: int = 0
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    @property
+    def values(self) -> np.ndarray:
+        """Signed amounts in currency units (float64), as used by the classifier"""
+        return self.amounts / 100
+
+    @property
+    def transaction_types(self) -> np.ndarray:
+        """'income' for positive amounts, 'expense' otherwise"""
+        return np.where(self.amounts > 0, "income", "expense").astype(object)
+
+    def slice(self, start: int, stop: int) -> "TransactionChunk":
+        """Rows start..stop of the chunk (views, no copy)"""
+        return TransactionChunk(
+            dates=self.dates[start:stop],
+            amounts=self.amounts[start:stop],
+            descriptions=self.descriptions[start:stop],
+            references=self.references[start:stop],
+            first_row=self.first_row + start,
+        )
+
+    @classmethod
+    def concat(cls, chunks: List["TransactionChunk"]) -> "TransactionChunk":
+        """Join several consecutive chunks into one, in order"""
+        if len(chunks) == 1:
+            return chunks[0]
+        return cls(
+            dates=np.concatenate([chunk.dates for chunk in chunks]),
+            amounts=np.concatenate([chunk.amounts for chunk in chunks]),
+            descriptions=np.concatenate([chunk.descriptions for chunk in chunks]),
+            references=np.concatenate([chunk.references for chunk in chunks]),
+            first_row=chunks[0].first_row,
+        )
+
+    @classmethod
+    def from_columns(
+        cls, dates, amounts, descriptions: List[str], references: List
+    ) -> "TransactionChunk":
+        """Build a chunk from column sequences, normalizing their dtypes"""
+        return cls(
+            dates=np.asarray(dates, dtype="datetime64[us]"),
+            amounts=np.asarray(amounts, dtype=np.int64),
+            descriptions=np.asarray(descriptions, dtype=object),
+            references=np.asarray(references, dtype=object),
+        )
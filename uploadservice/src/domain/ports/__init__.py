@@ -3,19 +3,37 @@ from .repository_port import (
     BankRepositoryPort,
     CategoryRepositoryPort,
     TransactionBatchRepositoryPort,
+    PredictionCacheRepositoryPort,
+    MerchantRuleRepositoryPort,
+    CategoryCorrectionRepositoryPort,
+    ReclassificationJobRepositoryPort,
     UserRepositoryPort,
 )
 from .excel_parser_port import ExcelParserPort
 from .classifier_port import ClassifierPort
 from .message_broker_port import MessageBrokerPort
+from .reference_data_port import ReferenceDataPort
+from .job_queue_port import JobQueuePort
+from .file_storage_port import FileStoragePort
+from .prediction_cache_port import PredictionCachePort
+from .stage_executor_port import StageExecutorPort
 
 __all__ = [
     "TransactionRepositoryPort",
     "BankRepositoryPort",
     "CategoryRepositoryPort",
     "TransactionBatchRepositoryPort",
+    "PredictionCacheRepositoryPort",
+    "MerchantRuleRepositoryPort",
+    "CategoryCorrectionRepositoryPort",
+    "ReclassificationJobRepositoryPort",
     "UserRepositoryPort",
     "ExcelParserPort",
     "ClassifierPort",
     "MessageBrokerPort",
+    "ReferenceDataPort",
+    "JobQueuePort",
+    "FileStoragePort",
+    "PredictionCachePort",
+    "StageExecutorPort",
 ]
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from typing import Optional
 
 
 class ClassifierPort(ABC):
@@ -9,3 +10,36 @@ class ClassifierPort(ABC):
         Returns the category name
         """
         pass
+
+    async def classify_batch(
+        self, descriptions: list[str], transaction_values: Optional[list] = None
+    ) -> list[str]:
+        """
+        Classify several transactions, returning one category per description.
+        Classifiers with a vectorized model override it.
+        """
+        return [await self.classify(description) for description in descriptions]
+
+    def warm_up(self) -> None:
+        """
+        Load everything the classifier needs before the first request.
+        Blocking; classifiers without a startup cost don't override it.
+        """
+        pass
+
+    @property
+    def is_ready(self) -> bool:
+        """Whether the classifier can serve requests without a cold start"""
+        return True
+
+    def reload(self) -> bool:
+        """
+        Switch to a newly published model version, if there is one.
+        Blocking; returns whether the model changed.
+        """
+        return False
+
+    @property
+    def model_version(self) -> Optional[str]:
+        """Version of the model in use, or None if the classifier isn't versioned"""
+        return None
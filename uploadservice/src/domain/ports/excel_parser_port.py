@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import BinaryIO, Iterator, List, Union
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, ROUND_HALF_UP
+from ..entities.transaction_chunk import TransactionChunk
+
+
+# Parsers accept either the raw file bytes or a binary file object
+FileSource = Union[bytes, BinaryIO]
 
 
 class RawTransaction:
@@ -15,7 +20,7 @@ class RawTransaction:
 
 class ExcelParserPort(ABC):
     @abstractmethod
-    def parse(self, file_content: bytes) -> List[RawTransaction]:
+    def parse(self, file_content: FileSource) -> List[RawTransaction]:
         """Parse Excel file and return a list of raw transactions"""
         pass
 
@@ -23,3 +28,35 @@ class ExcelParserPort(ABC):
     def get_bank_code(self) -> str:
         """Return the bank code associated with this parser"""
         pass
+
+    def iter_chunks(
+        self, file_content: FileSource, chunk_size: int
+    ) -> Iterator[TransactionChunk]:
+        """
+        Yield the transactions of a file as columnar chunks of at most chunk_size rows.
+
+        The default implementation slices the result of parse(). Parsers that
+        can read the file incrementally should override it so memory stays
+        bounded by the chunk size instead of the file size. Half cents round
+        away from zero, as in every parser.
+        """
+        transactions = self.parse(file_content)
+        for i in range(0, len(transactions), chunk_size):
+            part = transactions[i : i + chunk_size]
+            yield TransactionChunk.from_columns(
+                dates=[tx.date for tx in part],
+                amounts=[
+                    int((tx.amount * 100).quantize(Decimal(1), ROUND_HALF_UP)) for tx in part
+                ],
+                descriptions=[tx.description for tx in part],
+                references=[tx.reference for tx in part],
+            )
+
+    def count_rows(self, file_content: FileSource) -> int:
+        """
+        Count the transactions in a file, validating its format.
+
+        Raises:
+            ValueError: If the file doesn't have the expected format
+        """
+        return sum(len(chunk) for chunk in self.iter_chunks(file_content, 1000))
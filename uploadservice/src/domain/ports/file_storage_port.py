@@ -0,0 +1,26 @@
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Sequence
+
+
+class FileStoragePort(ABC):
+    """Port for uploaded files shared between the API and the workers"""
+
+    @abstractmethod
+    def save(self, id_batch: str, index: int, file: BinaryIO) -> str:
+        """
+        Store the content of an uploaded file.
+
+        Returns:
+            Storage key used to open the file later
+        """
+        pass
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Open a stored file for reading"""
+        pass
+
+    @abstractmethod
+    def delete(self, keys: Sequence[str]) -> None:
+        """Delete stored files; missing keys are ignored"""
+        pass
@@ -3,8 +3,10 @@ Repository port for FileUploadHistory.
 Defines the interface for file upload history persistence.
 """
 from abc import ABC, abstractmethod
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional, Sequence
 from ..entities.file_upload_history import FileUploadHistory
+from ..entities.transaction_batch import TransactionBatch
 
 
 class FileUploadHistoryRepositoryPort(ABC):
@@ -27,6 +29,58 @@ class FileUploadHistoryRepositoryPort(ABC):
         """
         pass
 
+    @abstractmethod
+    async def get_by_hashes(
+        self, user_id: str, file_hashes: Sequence[str]
+    ) -> List[FileUploadHistory]:
+        """
+        Find the file upload records of a user matching any of the given hashes.
+
+        Args:
+            user_id: The user who uploaded the files (UUID as string)
+            file_hashes: SHA256 hashes of the file contents
+
+        Returns:
+            The matching records (empty list if none of the files was uploaded before)
+        """
+        pass
+
+    @abstractmethod
+    async def register_batch(
+        self, batch: TransactionBatch, file_uploads: Sequence[FileUploadHistory]
+    ) -> TransactionBatch:
+        """
+        Save a new transaction batch together with the upload records of its files.
+
+        The batch and all its records are committed in a single transaction,
+        so a batch never exists without its upload history.
+
+        Args:
+            batch: The batch to create
+            file_uploads: One record per uploaded file; their id_batch is set to the batch's
+
+        Returns:
+            The saved batch with its generated ID
+        """
+        pass
+
+    @abstractmethod
+    async def count_unfinished_batches(
+        self, user_id: str, processing_since: Optional[datetime] = None
+    ) -> int:
+        """
+        Count the batches of a user that are queued or being processed.
+
+        Args:
+            user_id: The user who uploaded the files (UUID as string)
+            processing_since: Only count processing batches that changed at or
+                after this time; queued ones always count
+
+        Returns:
+            Number of the user's batches in the pending or processing state
+        """
+        pass
+
     @abstractmethod
     async def save(self, file_upload: FileUploadHistory) -> FileUploadHistory:
         """
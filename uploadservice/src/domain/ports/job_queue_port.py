@@ -0,0 +1,44 @@
+from abc import ABC, abstractmethod
+from typing import Awaitable, Callable
+from ..entities import BatchJob
+
+
+class JobQueuePort(ABC):
+    """Port for the queue of batch processing jobs"""
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """Connect to the queue backend"""
+        pass
+
+    @abstractmethod
+    async def disconnect(self) -> None:
+        """Close the connection to the queue backend"""
+        pass
+
+    @abstractmethod
+    async def enqueue(self, job: BatchJob) -> None:
+        """
+        Queue a job for the workers.
+
+        Raises:
+            Exception: If the job could not be queued
+        """
+        pass
+
+    @abstractmethod
+    async def consume(
+        self, handler: Callable[[BatchJob], Awaitable[None]], concurrency: int
+    ) -> None:
+        """
+        Run handler for queued jobs, at most concurrency at a time, until cancelled.
+
+        A job is removed from the queue only after its handler returns, so
+        jobs whose worker dies mid-way are delivered again.
+        """
+        pass
+
+    @abstractmethod
+    async def get_depth(self) -> int:
+        """Number of jobs waiting to be picked up"""
+        pass
@@ -31,3 +31,7 @@ class MessageBrokerPort(ABC):
     async def disconnect(self) -> None:
         """Close connection to the message broker"""
         pass
+
+    async def flush(self) -> None:
+        """Wait until every message published so far reached the broker"""
+        pass
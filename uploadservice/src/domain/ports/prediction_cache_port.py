@@ -0,0 +1,28 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Sequence, Tuple
+
+# (cleaned description, transaction type)
+PredictionKey = Tuple[str, str]
+
+
+class PredictionCachePort(ABC):
+    """Port for caching classifier predictions per model version"""
+
+    @abstractmethod
+    async def get_many(
+        self, model_version: str, keys: Sequence[PredictionKey]
+    ) -> Dict[PredictionKey, str]:
+        """
+        Get the cached categories of the given keys.
+
+        Returns:
+            Dictionary of key -> category for the keys found (misses are left out)
+        """
+        pass
+
+    @abstractmethod
+    async def put_many(
+        self, model_version: str, predictions: Dict[PredictionKey, str]
+    ) -> None:
+        """Store the categories predicted by a model version"""
+        pass
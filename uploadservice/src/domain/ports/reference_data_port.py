@@ -0,0 +1,24 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Sequence
+from ..entities import Bank
+
+
+class ReferenceDataPort(ABC):
+    """Port for read-mostly reference data (banks and transaction categories)"""
+
+    @abstractmethod
+    async def get_bank_by_name(self, bank_name: str) -> Optional[Bank]:
+        """Get a bank by its name, or None if it doesn't exist"""
+        pass
+
+    @abstractmethod
+    async def get_category_ids(self, descriptions: Sequence[str]) -> Dict[str, str]:
+        """
+        Map category descriptions to category IDs.
+
+        Categories that don't exist yet are created.
+
+        Returns:
+            Dictionary of description -> id_category for every description given
+        """
+        pass
@@ -1,7 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Sequence, Dict
 from uuid import UUID
-from ..entities import Transaction, Bank, Category, TransactionBatch
+import numpy as np
+from ..entities import (
+    Transaction, Bank, Category, TransactionBatch, TransactionChunk, MerchantRule,
+    CategoryCorrection, ReclassificationJob,
+)
 
 
 class TransactionRepositoryPort(ABC):
@@ -10,11 +15,60 @@ class TransactionRepositoryPort(ABC):
         """Save a batch of transactions"""
         pass
 
+    @abstractmethod
+    async def save_chunk(
+        self,
+        chunk: TransactionChunk,
+        category_ids: np.ndarray,
+        id_user: str,
+        id_bank: Optional[str],
+        id_batch: Optional[UUID],
+    ) -> int:
+        """
+        Save a columnar chunk of classified transactions.
+
+        category_ids holds one category ID per row of the chunk. Rows are
+        keyed by (id_batch, chunk.first_row + position); rows whose key
+        already exists are skipped.
+        Returns the number of rows in the chunk.
+        """
+        pass
+
     @abstractmethod
     async def get_by_id(self, id_transaction: UUID) -> Optional[Transaction]:
         """Get transaction by ID"""
         pass
 
+    @abstractmethod
+    async def update_category(self, id_transaction: UUID, id_category: str) -> None:
+        """Set the category of a transaction"""
+        pass
+
+    @abstractmethod
+    async def get_page_after(
+        self, id_transaction: Optional[str], limit: int
+    ) -> List[Transaction]:
+        """
+        Get the next transactions in id_transaction order (keyset pagination).
+
+        Starts at the first transaction if id_transaction is None.
+        Transactions whose category a user corrected are left out.
+        """
+        pass
+
+    @abstractmethod
+    async def update_categories(
+        self, categories: Dict[UUID, str], previous: Dict[UUID, str]
+    ) -> int:
+        """
+        Set the category of many transactions in grouped statements.
+
+        A transaction is only updated if its category is still the one in
+        previous, so concurrent changes are never overwritten.
+        Returns the number of updated transactions.
+        """
+        pass
+
 
 class BankRepositoryPort(ABC):
     @abstractmethod
@@ -32,6 +86,11 @@ class BankRepositoryPort(ABC):
         """Get bank by ID"""
         pass
 
+    @abstractmethod
+    async def get_all(self) -> List[Bank]:
+        """Get all banks"""
+        pass
+
 
 class CategoryRepositoryPort(ABC):
     @abstractmethod
@@ -49,6 +108,21 @@ class CategoryRepositoryPort(ABC):
         """Get category by ID (id_category is a string like 'cat-001-retiros-efectivo')"""
         pass
 
+    @abstractmethod
+    async def get_all(self) -> List[Category]:
+        """Get all categories"""
+        pass
+
+    @abstractmethod
+    async def upsert_many(self, descriptions: Sequence[str]) -> List[Category]:
+        """
+        Create the categories that don't exist yet and return all of them.
+
+        Idempotent: concurrent callers creating the same description end up
+        with the same single category.
+        """
+        pass
+
 
 class TransactionBatchRepositoryPort(ABC):
     @abstractmethod
@@ -66,6 +140,111 @@ class TransactionBatchRepositoryPort(ABC):
         """Update transaction batch"""
         pass
 
+    @abstractmethod
+    async def record_progress(
+        self,
+        id_batch: UUID,
+        processed_records: int,
+        rule_matched_records: Optional[int] = None,
+    ) -> None:
+        """
+        Record how many rows of the batch are committed (the resume checkpoint)
+        and, if given, how many of them a merchant rule categorized.
+
+        Meant to run in the same transaction as the rows it accounts for.
+        The checkpoint only moves forward: a smaller value than the stored
+        one (from a lane that committed out of order) is ignored.
+        """
+        pass
+
+    @abstractmethod
+    async def count_processing(self) -> int:
+        """Number of batches a worker is processing right now"""
+        pass
+
+    @abstractmethod
+    async def count_unfinished(self, processing_since: Optional[datetime] = None) -> int:
+        """Number of batches queued, or being processed and changed at or after processing_since"""
+        pass
+
+
+class PredictionCacheRepositoryPort(ABC):
+    @abstractmethod
+    async def get_many(self, cache_keys: Sequence[str]) -> Dict[str, str]:
+        """Get the cached categories of the given keys (missing keys are left out)"""
+        pass
+
+    @abstractmethod
+    async def save_many(self, model_version: str, categories: Dict[str, str]) -> None:
+        """Store cache key -> category predictions of a model version; existing keys are kept"""
+        pass
+
+
+class MerchantRuleRepositoryPort(ABC):
+    @abstractmethod
+    async def get_applicable(self, id_user: UUID) -> List[MerchantRule]:
+        """Get the global rules and the rules of a user, with their category descriptions"""
+        pass
+
+    @abstractmethod
+    async def save(self, rule: MerchantRule) -> MerchantRule:
+        """Save a rule"""
+        pass
+
+    @abstractmethod
+    async def update(self, rule: MerchantRule) -> bool:
+        """
+        Change the pattern, match type and category of a rule of rule.id_user
+        (None: a global rule); returns False if there's no such rule
+        """
+        pass
+
+    @abstractmethod
+    async def delete(self, id_rule: UUID, id_user: Optional[UUID]) -> bool:
+        """Delete a rule of the user (None: a global rule); returns False if there's no such rule"""
+        pass
+
+    @abstractmethod
+    async def get_all(self) -> List[MerchantRule]:
+        """Get the rules of every user and the global ones, with their category descriptions"""
+        pass
+
+
+class CategoryCorrectionRepositoryPort(ABC):
+    @abstractmethod
+    async def save(self, correction: CategoryCorrection) -> CategoryCorrection:
+        """Record a correction"""
+        pass
+
+    @abstractmethod
+    async def get_after(self, id_correction: int, limit: int) -> List[CategoryCorrection]:
+        """Get the corrections recorded after id_correction, oldest first, with category descriptions"""
+        pass
+
+    @abstractmethod
+    async def get_by_descriptions(
+        self, descriptions: Sequence[str], through: int
+    ) -> List[CategoryCorrection]:
+        """Get the corrections of these descriptions recorded up to id_correction through, oldest first"""
+        pass
+
+
+class ReclassificationJobRepositoryPort(ABC):
+    @abstractmethod
+    async def save(self, job: ReclassificationJob) -> ReclassificationJob:
+        """Save a new job"""
+        pass
+
+    @abstractmethod
+    async def get_running(self) -> Optional[ReclassificationJob]:
+        """Get the unfinished job, if any"""
+        pass
+
+    @abstractmethod
+    async def update(self, job: ReclassificationJob) -> ReclassificationJob:
+        """Update a job"""
+        pass
+
 
 class UserRepositoryPort(ABC):
     @abstractmethod
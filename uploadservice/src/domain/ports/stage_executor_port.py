@@ -0,0 +1,39 @@
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+class StageExecutorPort(ABC):
+    """
+    Port for running the CPU-bound stages (parsing, model inference) off the event loop.
+
+    Functions run by an isolated executor execute in other processes: they
+    must be module-level functions, and their arguments and results must be
+    picklable.
+    """
+
+    @property
+    @abstractmethod
+    def isolated(self) -> bool:
+        """Whether functions run in other processes"""
+        pass
+
+    @abstractmethod
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run fn(*args) and return its result"""
+        pass
+
+    @abstractmethod
+    def iterate(self, factory: Callable[..., Iterable[T]], *args: Any) -> AsyncIterator[T]:
+        """
+        Yield the items of factory(*args), computing them off the event loop.
+
+        The iterable is created and consumed on the executor. Closing the
+        returned iterator closes the iterable (e.g. the files it opened).
+        """
+        pass
+
+    def close(self) -> None:
+        """Release the executor's threads or processes"""
+        pass
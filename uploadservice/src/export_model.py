@@ -0,0 +1,61 @@
+"""
+Model export.
+
+Compiles the training pickles (classifier.pkl, vectorizer.pkl,
+label_encoder.pkl and metadata.json) into a versioned model artifact and,
+with --activate, publishes it as the version the services load:
+
+    python -m src.export_model --activate
+
+Running API and worker processes switch to the published version on their
+next poll (ML_MODEL_RELOAD_SECONDS) or right away on SIGHUP.
+
+Environment Variables:
+    ML_MODELS_PATH: Directory of the training pickles (default: models/)
+    ML_ARTIFACTS_PATH: Directory of the artifacts (default: <models>/artifacts)
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import argparse
+import logging
+import os
+from .infrastructure.classifier.model_artifact import (
+    activate_artifact,
+    current_version,
+    export_artifact,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODELS_PATH = os.path.join(os.path.dirname(__file__), "..", "models")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    models_path = os.getenv("ML_MODELS_PATH", DEFAULT_MODELS_PATH)
+    parser = argparse.ArgumentParser(description="Export the classifier as a model artifact")
+    parser.add_argument("--models-path", default=models_path, help="Directory of the training pickles")
+    parser.add_argument(
+        "--artifacts-path",
+        default=os.getenv("ML_ARTIFACTS_PATH", os.path.join(models_path, "artifacts")),
+        help="Directory of the model artifacts",
+    )
+    parser.add_argument("--activate", action="store_true", help="Publish it as the CURRENT version")
+    parser.add_argument("--rollback", metavar="VERSION", help="Publish an already exported version")
+    args = parser.parse_args()
+
+    if args.rollback:
+        activate_artifact(args.artifacts_path, args.rollback)
+        logger.info(f"Published model {args.rollback}")
+        return
+
+    version = export_artifact(args.models_path, args.artifacts_path, activate=args.activate)
+    logger.info(f"Exported model {version} to {os.path.join(args.artifacts_path, version)}")
+    logger.info(f"Current model: {current_version(args.artifacts_path) or 'none (pickles are used)'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+from .reference_data_cache import ReferenceDataCache, get_reference_data_cache
+from .prediction_cache import PredictionCache, get_prediction_cache
+
+__all__ = [
+    "ReferenceDataCache",
+    "get_reference_data_cache",
+    "PredictionCache",
+    "get_prediction_cache",
+]
@@ -0,0 +1,131 @@
+"""
+Two-tier cache of classifier predictions.
+
+Bank descriptions repeat constantly ("COMPRA EXITO", "UBER", ...), so the
+category predicted for a (cleaned description, transaction type) pair is
+cached per model version:
+- Local tier: an in-process LRU, checked first and free to query
+- Shared tier: the ClassificationCache table, shared by every worker, so a
+  description predicted once is not predicted again by another process
+
+Only keys missing from both tiers reach the model. The cache is best effort:
+if the shared tier fails, lookups fall through to the model.
+"""
+import hashlib
+import logging
+import os
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+from sqlalchemy.orm import sessionmaker
+from ...domain.ports import PredictionCachePort
+from ...domain.ports.prediction_cache_port import PredictionKey
+from ..database import get_session_factory
+from ..repositories import MySQLPredictionCacheRepository
+
+logger = logging.getLogger(__name__)
+
+
+def _cache_key(model_version: str, key: PredictionKey) -> str:
+    """Fixed-size shared tier key for a prediction of a model version"""
+    cleaned, tipo = key
+    return hashlib.sha256(f"{model_version}\x1f{tipo}\x1f{cleaned}".encode()).hexdigest()
+
+
+class PredictionCache(PredictionCachePort):
+    """
+    In-process LRU in front of the shared ClassificationCache table.
+
+    Args:
+        session_factory: Factory for the shared tier sessions; None keeps
+            the cache local to this process
+        max_entries: Maximum number of predictions kept in the local tier
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[sessionmaker] = None,
+        max_entries: int = 100_000,
+    ):
+        self.session_factory = session_factory
+        self.max_entries = max_entries
+        self._local: "OrderedDict[tuple, str]" = OrderedDict()
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    async def get_many(
+        self, model_version: str, keys: Sequence[PredictionKey]
+    ) -> Dict[PredictionKey, str]:
+        """Look the keys up in the local tier, then the missing ones in the shared tier"""
+        found: Dict[PredictionKey, str] = {}
+        missing = []
+        for key in keys:
+            category = self._local.get((model_version, key))
+            if category is None:
+                missing.append(key)
+            else:
+                self._local.move_to_end((model_version, key))
+                found[key] = category
+        self.local_hits += len(found)
+
+        if missing and self.session_factory is not None:
+            shared = await self._get_shared(model_version, missing)
+            self.shared_hits += len(shared)
+            found.update(shared)
+            self._remember(model_version, shared)
+
+        self.misses += len(keys) - len(found)
+        return found
+
+    async def put_many(
+        self, model_version: str, predictions: Dict[PredictionKey, str]
+    ) -> None:
+        """Store new predictions in both tiers"""
+        if not predictions:
+            return
+        self._remember(model_version, predictions)
+        if self.session_factory is None:
+            return
+        try:
+            async with self.session_factory() as session:
+                await MySQLPredictionCacheRepository(session).save_many(
+                    model_version,
+                    {_cache_key(model_version, key): category for key, category in predictions.items()},
+                )
+                await session.commit()
+        except Exception as e:
+            logger.warning(f"Could not store predictions in the shared cache: {e}")
+
+    async def _get_shared(
+        self, model_version: str, keys: Sequence[PredictionKey]
+    ) -> Dict[PredictionKey, str]:
+        keys_by_hash = {_cache_key(model_version, key): key for key in keys}
+        try:
+            async with self.session_factory() as session:
+                rows = await MySQLPredictionCacheRepository(session).get_many(list(keys_by_hash))
+        except Exception as e:
+            logger.warning(f"Shared prediction cache unavailable: {e}")
+            return {}
+        return {keys_by_hash[cache_key]: category for cache_key, category in rows.items()}
+
+    def _remember(self, model_version: str, predictions: Dict[PredictionKey, str]) -> None:
+        for key, category in predictions.items():
+            self._local[(model_version, key)] = category
+            self._local.move_to_end((model_version, key))
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+
+_prediction_cache: Optional[PredictionCache] = None
+
+
+def get_prediction_cache() -> PredictionCache:
+    """Return the process-wide prediction cache"""
+    global _prediction_cache
+    if _prediction_cache is None:
+        shared = os.getenv("PREDICTION_CACHE_SHARED", "true").lower() == "true"
+        _prediction_cache = PredictionCache(
+            session_factory=get_session_factory() if shared else None,
+            max_entries=int(os.getenv("PREDICTION_CACHE_SIZE", "100000")),
+        )
+    return _prediction_cache
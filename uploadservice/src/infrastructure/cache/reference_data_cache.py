@@ -0,0 +1,126 @@
+"""
+Process-wide cache of banks and transaction categories.
+
+Banks and categories change rarely but are needed by every upload, so they
+are loaded once (at startup) and refreshed every REFERENCE_DATA_TTL_SECONDS.
+Between refreshes, lookups are served from memory without touching the
+database. Categories that the classifier produces but don't exist yet are
+created in bulk with a single idempotent upsert.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, Optional, Sequence
+from sqlalchemy.orm import sessionmaker
+from ...domain.entities import Bank, Category
+from ...domain.ports import ReferenceDataPort
+from ..database import get_session_factory
+from ..repositories import MySQLBankRepository, MySQLCategoryRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ReferenceDataCache(ReferenceDataPort):
+    """
+    TTL-refreshed in-memory cache of Bank and TransactionCategory.
+
+    Args:
+        session_factory: Factory for the sessions used to load and upsert
+        ttl_seconds: Age after which the next lookup reloads all the data
+        miss_refresh_seconds: Minimum interval between reloads triggered by
+            unknown bank names, so bad requests can't hammer the database
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        ttl_seconds: float = 300.0,
+        miss_refresh_seconds: float = 5.0,
+    ):
+        self.session_factory = session_factory
+        self.ttl_seconds = ttl_seconds
+        self.miss_refresh_seconds = miss_refresh_seconds
+        self._banks: Dict[str, Bank] = {}
+        self._categories: Dict[str, Category] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = asyncio.Lock()
+
+    async def load(self) -> None:
+        """Reload every bank and category from the database"""
+        async with self._lock:
+            await self._load()
+
+    async def get_bank_by_name(self, bank_name: str) -> Optional[Bank]:
+        """Get a bank by its name, or None if it doesn't exist"""
+        await self._refresh_if_stale()
+        bank = self._banks.get(bank_name)
+        if bank is None and self._age() >= self.miss_refresh_seconds:
+            # The bank may have been added since the last load
+            async with self._lock:
+                if self._age() >= self.miss_refresh_seconds:
+                    await self._load()
+            bank = self._banks.get(bank_name)
+        return bank
+
+    async def get_category_ids(self, descriptions: Sequence[str]) -> Dict[str, str]:
+        """
+        Map category descriptions to category IDs, creating the missing ones.
+
+        Missing categories are created together with one INSERT that skips
+        existing descriptions, so concurrent uploads (in this or another
+        process) never duplicate them.
+        """
+        await self._refresh_if_stale()
+        missing = [d for d in dict.fromkeys(descriptions) if d not in self._categories]
+        if missing:
+            async with self._lock:
+                missing = [d for d in missing if d not in self._categories]
+                if missing:
+                    await self._create_categories(missing)
+        return {d: self._categories[d].id_category for d in descriptions}
+
+    def _age(self) -> float:
+        if self._loaded_at is None:
+            return float("inf")
+        return time.monotonic() - self._loaded_at
+
+    async def _refresh_if_stale(self) -> None:
+        if self._age() < self.ttl_seconds:
+            return
+        async with self._lock:
+            if self._age() >= self.ttl_seconds:
+                await self._load()
+
+    async def _load(self) -> None:
+        async with self.session_factory() as session:
+            banks = await MySQLBankRepository(session).get_all()
+            categories = await MySQLCategoryRepository(session).get_all()
+        self._banks = {bank.bank_name: bank for bank in banks}
+        self._categories = {category.description: category for category in categories}
+        self._loaded_at = time.monotonic()
+        logger.info(
+            f"Reference data loaded: {len(self._banks)} banks, "
+            f"{len(self._categories)} categories"
+        )
+
+    async def _create_categories(self, descriptions: Sequence[str]) -> None:
+        async with self.session_factory() as session:
+            categories = await MySQLCategoryRepository(session).upsert_many(descriptions)
+            await session.commit()
+        self._categories.update({category.description: category for category in categories})
+        logger.info(f"Upserted categories: {list(descriptions)}")
+
+
+_reference_data_cache: Optional[ReferenceDataCache] = None
+
+
+def get_reference_data_cache() -> ReferenceDataCache:
+    """Return the process-wide reference data cache"""
+    global _reference_data_cache
+    if _reference_data_cache is None:
+        _reference_data_cache = ReferenceDataCache(
+            session_factory=get_session_factory(),
+            ttl_seconds=float(os.getenv("REFERENCE_DATA_TTL_SECONDS", "300")),
+        )
+    return _reference_data_cache
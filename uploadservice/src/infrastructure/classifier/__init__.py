@@ -1,4 +1,6 @@
 from .simple_classifier import SimpleClassifier
 from .ml_classifier import MLClassifier
+from .merchant_rules import MerchantRuleIndex
+from .process_pool_classifier import ProcessPoolClassifier
 
-__all__ = ["SimpleClassifier", "MLClassifier"]
+__all__ = ["SimpleClassifier", "MLClassifier", "MerchantRuleIndex", "ProcessPoolClassifier"]
@@ -0,0 +1,221 @@
+"""
+Incremental learning from user category corrections
+
+Retraining the TF-IDF + Logistic Regression model means refitting on the
+whole training set outside the system. Corrections are instead folded into
+the compiled model a few at a time:
+
+- Terms of the corrected descriptions that the vocabulary doesn't have get
+  a new feature column (with the largest IDF of the vocabulary, as a term
+  seen in no training document), so new merchants can be learned.
+- Categories the model doesn't know become new classes.
+- The term weights are refined with gradient descent on the softmax loss of
+  the corrections, L2-regularized toward the current weights. Only the rows
+  of terms that appear in the corrections move, so descriptions sharing no
+  term with them keep their predictions; intercepts and the transaction
+  type row stay as trained.
+
+This takes milliseconds to seconds instead of a full retrain. Every run
+writes a new artifact version whose metadata records the last correction
+it learned, and publishes it as CURRENT; running services switch to it
+through MLClassifier.reload like any exported model.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+import numpy as np
+from scipy.sparse import csr_matrix
+from .inference_engine import TfidfLogisticEngine
+from .model_artifact import (
+    activate_artifact,
+    current_version,
+    export_artifact,
+    load_artifact,
+    write_artifact,
+)
+from .utils import clean_texts, transaction_types
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class LabeledDescription:
+    """One training example: a raw description, its amount and its category"""
+    description: str
+    value: Optional[float]
+    category: str
+
+
+class IncrementalLearner:
+    """
+    Folds labeled descriptions into a compiled TfidfLogisticEngine.
+
+    Args:
+        learning_rate: Step size of the gradient descent
+        l2: Strength of the pull toward the current weights
+        max_epochs: Most passes over the corrections
+        target_probability: Stop once every correction is predicted with at
+            least this probability
+    """
+
+    def __init__(
+        self,
+        learning_rate: float = 2.0,
+        l2: float = 1e-3,
+        max_epochs: int = 500,
+        target_probability: float = 0.8,
+    ):
+        self.learning_rate = learning_rate
+        self.l2 = l2
+        self.max_epochs = max_epochs
+        self.target_probability = target_probability
+
+    def partial_fit(
+        self,
+        engine: TfidfLogisticEngine,
+        descriptions: Sequence[str],
+        tipos: Sequence[str],
+        categories: Sequence[str],
+    ) -> TfidfLogisticEngine:
+        """
+        Learn cleaned descriptions with their categories.
+
+        Args:
+            engine: Current model; it isn't modified (its arrays may be
+                read-only memory maps)
+            descriptions: Cleaned descriptions (see utils.clean_texts)
+            tipos: Transaction type of every description
+            categories: Category of every description
+
+        Returns:
+            A new engine with the corrections learned
+        """
+        engine = self._extend(engine, descriptions, categories)
+        if not descriptions:
+            return engine
+
+        features = engine._features(descriptions, tipos)
+        # Only the term rows are trained; the last row is the transaction type
+        term_features = csr_matrix(features[:, :-1])
+        class_index = {category: i for i, category in enumerate(engine.classes.tolist())}
+        targets = np.array([class_index[category] for category in categories])
+        rows = np.arange(len(targets))
+        touched = np.unique(term_features.indices)
+        base = engine.weights[touched].copy()
+        local = csr_matrix(term_features[:, touched])
+
+        weights = engine.weights
+        for epoch in range(self.max_epochs):
+            scores = features @ weights + engine.intercept
+            probabilities = np.exp(scores - scores.max(axis=1, keepdims=True))
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            if probabilities[rows, targets].min() >= self.target_probability:
+                break
+            probabilities[rows, targets] -= 1.0
+            gradient = local.T @ probabilities / len(targets)
+            gradient += self.l2 * (weights[touched] - base)
+            weights[touched] -= self.learning_rate * gradient
+        logger.debug(f"Learned {len(targets)} corrections in {epoch + 1} epochs")
+        return engine
+
+    @staticmethod
+    def _extend(
+        engine: TfidfLogisticEngine, descriptions: Sequence[str], categories: Sequence[str]
+    ) -> TfidfLogisticEngine:
+        """Copy the engine, adding the unseen terms and categories"""
+        vocabulary = dict(engine.vocabulary)
+        for description in descriptions:
+            for term in engine._terms(description):
+                if term not in vocabulary:
+                    vocabulary[term] = len(vocabulary)
+        new_terms = len(vocabulary) - len(engine.vocabulary)
+
+        classes = engine.classes.tolist()
+        known = set(classes)
+        new_classes = [c for c in dict.fromkeys(categories) if c not in known]
+
+        idf = np.concatenate([engine.idf, np.full(new_terms, engine.idf.max())])
+        weights = np.zeros((len(idf) + 1, len(classes) + len(new_classes)))
+        weights[:len(engine.idf), :len(classes)] = engine.weights[:-1]
+        weights[-1, :len(classes)] = engine.weights[-1]
+        # A new category starts as unlikely as the least likely known one
+        intercept = np.concatenate(
+            [engine.intercept, np.full(len(new_classes), np.min(engine.intercept))]
+        )
+
+        return TfidfLogisticEngine(
+            vocabulary=vocabulary,
+            idf=idf,
+            weights=weights,
+            intercept=intercept,
+            classes=np.array(classes + new_classes),
+            tipo_codes=dict(engine.tipo_codes),
+            token_pattern=engine._token_pattern,
+            ngram_range=engine.ngram_range,
+        )
+
+
+def learned_through(artifacts_path: str) -> int:
+    """Last correction learned by the CURRENT model (0 if none or no artifact)"""
+    version = current_version(artifacts_path)
+    if version is None:
+        return 0
+    metadata = load_artifact(artifacts_path, version).metadata
+    return int(metadata.get("learning", {}).get("corrections_through", 0))
+
+
+def publish_corrections(
+    models_path: str,
+    artifacts_path: str,
+    examples: List[LabeledDescription],
+    corrections_through: int,
+    learner: Optional[IncrementalLearner] = None,
+) -> str:
+    """
+    Learn corrections on top of the CURRENT model and publish the result.
+
+    If no artifact was published yet, the training pickles are exported
+    first. The version depends only on the base version and the last
+    correction, so processes learning the same corrections write the same
+    artifact.
+
+    Args:
+        models_path: Directory of the training pickles
+        artifacts_path: Directory of the artifacts
+        examples: Corrections recorded after the ones the model learned (may be
+            empty, which only records that corrections_through was read)
+        corrections_through: ID of the last correction read
+        learner: Learner to use (default settings if None)
+
+    Returns:
+        The published version
+    """
+    base_version = current_version(artifacts_path)
+    if base_version is None:
+        base_version = export_artifact(models_path, artifacts_path, activate=True)
+    base = load_artifact(artifacts_path, base_version)
+
+    engine = base.engine
+    if examples:
+        descriptions = clean_texts([example.description for example in examples])
+        tipos = transaction_types([example.value for example in examples])
+        categories = [example.category for example in examples]
+        engine = (learner or IncrementalLearner()).partial_fit(
+            engine, descriptions, tipos, categories
+        )
+
+    version = hashlib.sha256(f"{base_version}:{corrections_through}".encode()).hexdigest()[:16]
+    metadata = dict(base.metadata)
+    metadata["learning"] = {
+        "base_version": base_version,
+        "corrections_through": corrections_through,
+        "corrections": len(examples) + int(base.metadata.get("learning", {}).get("corrections", 0)),
+    }
+    write_artifact(artifacts_path, version, engine, metadata)
+    activate_artifact(artifacts_path, version)
+    logger.info(
+        f"Published model {version}: {len(examples)} corrections learned on top of {base_version}"
+    )
+    return version
@@ -0,0 +1,255 @@
+"""
+NumPy inference engine for the TF-IDF + Logistic Regression classifier
+
+The sklearn path vectorizes with TfidfVectorizer.transform, appends the
+transaction type column with scipy's hstack and then calls both predict and
+predict_proba, computing the same decision function twice.
+
+This engine compiles the fitted vocabulary, IDF weights and model
+coefficients into arrays once. A batch is then tokenized straight into the
+CSR arrays of the final feature matrix (TF-IDF terms plus the encoded
+transaction type) and scored with a single sparse matmul; labels and
+confidences come from the same scores.
+
+The compiled arrays can be saved to a directory and loaded memory-mapped,
+so every process on a host reads the same read-only pages.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class UnsupportedModelError(ValueError):
+    """The fitted artifacts use options the engine doesn't reproduce"""
+
+
+class TfidfLogisticEngine:
+    """
+    Compiled TfidfVectorizer + LogisticRegression (multinomial) predictor.
+
+    Args:
+        vocabulary: Term (unigram or "word word" bigram) -> feature column
+        idf: IDF weight of every feature column
+        weights: (n_features + 1, n_classes) coefficients; the last row
+            belongs to the encoded transaction type
+        intercept: (n_classes,) intercepts
+        classes: Category name of every class
+        tipo_codes: Transaction type -> encoded value, as the label encoder does
+        token_pattern: Regular expression that extracts the words
+        ngram_range: Smallest and largest n-gram size
+    """
+
+    def __init__(
+        self,
+        vocabulary: dict,
+        idf: np.ndarray,
+        weights: np.ndarray,
+        intercept: np.ndarray,
+        classes: np.ndarray,
+        tipo_codes: dict,
+        token_pattern: str = r"(?u)\b\w\w+\b",
+        ngram_range: Tuple[int, int] = (1, 2),
+    ):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.weights = weights
+        self.intercept = intercept
+        self.classes = classes
+        self.tipo_codes = tipo_codes
+        self.ngram_range = ngram_range
+        self._token_pattern = token_pattern
+        self._tokenize = re.compile(token_pattern).findall
+        self._tipo_column = len(idf)
+
+    @classmethod
+    def from_sklearn(cls, vectorizer, model, label_encoder) -> "TfidfLogisticEngine":
+        """
+        Compile fitted sklearn artifacts.
+
+        Raises:
+            UnsupportedModelError: If the artifacts were fitted with options
+                this engine doesn't reproduce exactly
+        """
+        params = vectorizer.get_params()
+        unsupported = {
+            "analyzer": params["analyzer"] != "word",
+            "tokenizer": params["tokenizer"] is not None,
+            "preprocessor": params["preprocessor"] is not None,
+            "strip_accents": params["strip_accents"] is not None,
+            "stop_words": params["stop_words"] is not None,
+            "lowercase": not params["lowercase"],
+            "binary": params["binary"],
+            "sublinear_tf": params["sublinear_tf"],
+            "use_idf": not params["use_idf"],
+            "norm": params["norm"] != "l2",
+            "dtype": params["dtype"] != np.float64,
+            "solver": model.get_params().get("solver") == "liblinear",
+            # One-vs-rest probabilities are normalized sigmoids, not a softmax
+            "multi_class": model.get_params().get("multi_class") == "ovr",
+            "classes": len(model.classes_) < 3 or model.coef_.shape[0] != len(model.classes_),
+        }
+        options = [name for name, is_unsupported in unsupported.items() if is_unsupported]
+        if options:
+            raise UnsupportedModelError(f"Unsupported model options: {', '.join(options)}")
+
+        n_features = len(vectorizer.idf_)
+        if model.coef_.shape[1] != n_features + 1:
+            raise UnsupportedModelError(
+                f"Model expects {model.coef_.shape[1]} features, vectorizer produces {n_features} + 1"
+            )
+
+        return cls(
+            vocabulary=dict(vectorizer.vocabulary_),
+            idf=np.asarray(vectorizer.idf_, dtype=np.float64),
+            weights=np.ascontiguousarray(model.coef_.T, dtype=np.float64),
+            intercept=np.asarray(model.intercept_, dtype=np.float64),
+            classes=np.asarray(model.classes_),
+            tipo_codes={tipo: code for code, tipo in enumerate(label_encoder.classes_)},
+            token_pattern=params["token_pattern"],
+            ngram_range=params["ngram_range"],
+        )
+
+    def save(self, directory: str, metadata: Optional[dict] = None) -> None:
+        """
+        Write the compiled arrays to a new directory.
+
+        metadata, if given, is written next to them as metadata.json. The
+        files are written to a temporary directory that is renamed into
+        place, so concurrent processes never read a partial engine. If
+        another process saved it first, its copy is kept.
+        """
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent, prefix=".engine-")
+        try:
+            terms = np.empty(len(self.vocabulary), dtype=object)
+            for term, column in self.vocabulary.items():
+                terms[column] = term
+            np.save(os.path.join(staging, "terms.npy"), terms.astype(str))
+            np.save(os.path.join(staging, "idf.npy"), self.idf)
+            np.save(os.path.join(staging, "weights.npy"), self.weights)
+            np.save(os.path.join(staging, "intercept.npy"), self.intercept)
+            np.save(os.path.join(staging, "classes.npy"), self.classes.astype(str))
+            tipos = sorted(self.tipo_codes, key=self.tipo_codes.get)
+            with open(os.path.join(staging, "config.json"), "w") as f:
+                json.dump(
+                    {
+                        "token_pattern": self._token_pattern,
+                        "ngram_range": list(self.ngram_range),
+                        "tipos": tipos,
+                    },
+                    f,
+                )
+            if metadata is not None:
+                with open(os.path.join(staging, "metadata.json"), "w") as f:
+                    json.dump(metadata, f, indent=2)
+            os.rename(staging, directory)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            if not os.path.isdir(directory):
+                raise
+
+    @classmethod
+    def load(cls, directory: str) -> "TfidfLogisticEngine":
+        """Load an engine written by save(), memory-mapping its arrays read-only"""
+        with open(os.path.join(directory, "config.json")) as f:
+            config = json.load(f)
+
+        def array(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+
+        terms = array("terms")
+        return cls(
+            vocabulary={str(term): column for column, term in enumerate(terms)},
+            idf=array("idf"),
+            weights=array("weights"),
+            intercept=array("intercept"),
+            classes=array("classes"),
+            tipo_codes={tipo: code for code, tipo in enumerate(config["tipos"])},
+            token_pattern=config["token_pattern"],
+            ngram_range=tuple(config["ngram_range"]),
+        )
+
+    def predict(
+        self, descriptions: Sequence[str], tipos: Sequence[str]
+    ) -> Tuple[List[str], np.ndarray]:
+        """
+        Classify cleaned descriptions.
+
+        Args:
+            descriptions: Cleaned descriptions (see utils.clean_text)
+            tipos: Transaction type of every description
+
+        Returns:
+            The predicted category of every description and its probability
+        """
+        scores = self._scores(descriptions, tipos)
+        best = scores.argmax(axis=1)
+        # Softmax probability of the best class: 1 / sum(exp(s - s_max))
+        best_scores = scores[np.arange(len(best)), best]
+        confidences = 1.0 / np.exp(scores - best_scores[:, None]).sum(axis=1)
+        return self.classes[best].tolist(), confidences
+
+    def predict_proba(self, descriptions: Sequence[str], tipos: Sequence[str]) -> np.ndarray:
+        """Probability of every class (columns in the order of self.classes)"""
+        scores = self._scores(descriptions, tipos)
+        probabilities = np.exp(scores - scores.max(axis=1, keepdims=True))
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        return probabilities
+
+    def _scores(self, descriptions: Sequence[str], tipos: Sequence[str]) -> np.ndarray:
+        """Decision function: one sparse matmul plus the intercepts"""
+        scores = self._features(descriptions, tipos) @ self.weights
+        scores += self.intercept
+        return scores
+
+    def _features(self, descriptions: Sequence[str], tipos: Sequence[str]) -> csr_matrix:
+        """Build the l2-normalized TF-IDF rows with the encoded type appended"""
+        indptr = [0]
+        indices: List[int] = []
+        counts: List[int] = []
+        for description in descriptions:
+            row: dict = {}
+            for term in self._terms(description):
+                column = self.vocabulary.get(term)
+                if column is not None:
+                    row[column] = row.get(column, 0) + 1
+            indices.extend(row)
+            counts.extend(row.values())
+            indptr.append(len(indices))
+
+        indptr = np.asarray(indptr, dtype=np.int64)
+        indices = np.asarray(indices, dtype=np.int64)
+        data = np.asarray(counts, dtype=np.float64) * self.idf[indices]
+        rows = np.repeat(np.arange(len(descriptions)), np.diff(indptr))
+        norms = np.sqrt(np.bincount(rows, weights=data * data, minlength=len(descriptions)))
+        norms[norms == 0] = 1.0
+        data /= norms[rows]
+
+        # Append the type column at the end of every row
+        tipo_values = np.asarray([self.tipo_codes[tipo] for tipo in tipos], dtype=np.float64)
+        insert_at = indptr[1:]
+        indices = np.insert(indices, insert_at, self._tipo_column)
+        data = np.insert(data, insert_at, tipo_values)
+        indptr = indptr + np.arange(len(indptr))
+
+        return csr_matrix(
+            (data, indices, indptr), shape=(len(descriptions), self._tipo_column + 1)
+        )
+
+    def _terms(self, description: str) -> List[str]:
+        """Word n-grams in the order TfidfVectorizer produces them"""
+        tokens = self._tokenize(description.lower())
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        terms = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), max_n + 1):
+            terms.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
@@ -0,0 +1,81 @@
+"""
+Merchant rule index
+
+A large share of the transactions comes from a small set of known merchants
+and transfer patterns. Their rules are indexed once per batch and matched
+against the cleaned descriptions before the ML classifier runs: exact rules
+in a hash map, prefix rules in a character trie, so a description is matched
+in one walk over its characters whatever the number of rules.
+
+Precedence: an exact match wins over a prefix match, a longer prefix over a
+shorter one, and a user's rule over a global rule with the same pattern.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+from ...domain.entities import MerchantRule
+from .utils import clean_text
+
+# Key holding the category in a trie node; never a character of a pattern
+_CATEGORY = ""
+
+
+class MerchantRuleIndex:
+    """
+    Exact and prefix merchant rules, indexed for matching.
+
+    Args:
+        rules: Rules with their category descriptions (global and user rules)
+    """
+
+    def __init__(self, rules: Iterable[MerchantRule]):
+        self._exact: Dict[str, str] = {}
+        self._prefixes: dict = {}
+        self._size = 0
+        # Global rules first, so a user's rule with the same pattern replaces them
+        for rule in sorted(rules, key=lambda rule: not rule.is_global):
+            # Rules inserted straight into the table may not be normalized
+            pattern = clean_text(rule.pattern)
+            if not pattern or not rule.category:
+                continue
+            if rule.match_type == MerchantRule.MATCH_EXACT:
+                self._exact[pattern] = rule.category
+            elif rule.match_type == MerchantRule.MATCH_PREFIX:
+                node = self._prefixes
+                for character in pattern:
+                    node = node.setdefault(character, {})
+                node[_CATEGORY] = rule.category
+            else:
+                continue
+            self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def match(self, cleaned_descriptions: Sequence[str]) -> List[Optional[str]]:
+        """
+        Match cleaned descriptions (see utils.clean_texts) against the rules.
+
+        Returns:
+            The category of every description, None where no rule matches
+        """
+        if not self._size:
+            return [None] * len(cleaned_descriptions)
+        matched: Dict[str, Optional[str]] = {}
+        categories = []
+        for description in cleaned_descriptions:
+            if description not in matched:
+                matched[description] = self._match_one(description)
+            categories.append(matched[description])
+        return categories
+
+    def _match_one(self, description: str) -> Optional[str]:
+        category = self._exact.get(description)
+        if category is not None:
+            return category
+        node = self._prefixes
+        for character in description:
+            node = node.get(character)
+            if node is None:
+                break
+            category = node.get(_CATEGORY, category)
+        return category
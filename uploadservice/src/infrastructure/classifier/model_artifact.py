@@ -0,0 +1,175 @@
+"""
+Versioned model artifacts
+
+An artifact is a directory holding one compiled model version: the arrays
+of TfidfLogisticEngine as .npy files, its config.json and a metadata.json
+with the training metadata plus the artifact version. Loading one only maps
+the arrays and rebuilds the vocabulary; nothing is unpickled and sklearn
+isn't needed at runtime.
+
+Layout of the artifacts directory (ML_ARTIFACTS_PATH):
+
+    artifacts/
+        CURRENT             <- version the services load
+        3f2a9c1e0b7d4a55/   <- one directory per exported version
+        9b04e7d2c6a1f830/
+
+Artifacts are written with export_artifact() (python -m src.export_model)
+and published by replacing CURRENT, which running services pick up on
+SIGHUP or on their next poll (see MLClassifier.reload).
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Optional
+from .inference_engine import TfidfLogisticEngine
+
+ARTIFACT_FORMAT = 1
+CURRENT_FILE = "CURRENT"
+PICKLE_FILES = ("classifier.pkl", "vectorizer.pkl", "label_encoder.pkl")
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    One model version, as loaded by a process.
+
+    The classifier swaps this object as a whole, so a prediction that read it
+    once uses a single version from start to end.
+
+    Attributes:
+        version: Content hash of the model; cached predictions are keyed on it
+        engine: Compiled predictor, None if the model isn't supported by it
+        metadata: Training metadata (metadata.json)
+        vectorizer, model, label_encoder: sklearn objects, only when the
+            model was loaded from the training pickles
+        directory: Where the engine's arrays are memory-mapped from, so
+            other processes can load the same engine; None if it was only
+            built in memory
+    """
+    version: str
+    engine: Optional[TfidfLogisticEngine]
+    metadata: dict = field(default_factory=dict)
+    vectorizer: Any = None
+    model: Any = None
+    label_encoder: Any = None
+    directory: Optional[str] = None
+
+
+def pickles_version(models_path: str) -> str:
+    """Content hash of the training pickles (same version as the artifact exported from them)"""
+    version = hashlib.sha256()
+    for name in PICKLE_FILES:
+        with open(os.path.join(models_path, name), "rb") as f:
+            version.update(f.read())
+    return version.hexdigest()[:16]
+
+
+def read_training_metadata(models_path: str) -> dict:
+    """metadata.json written by the training notebook ({} if missing)"""
+    try:
+        with open(os.path.join(models_path, "metadata.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_artifact(artifacts_path: str, version: str, engine: TfidfLogisticEngine, metadata: dict) -> str:
+    """
+    Save a compiled model as artifact <artifacts_path>/<version>.
+
+    Returns:
+        Directory of the artifact. An existing artifact of the same version
+        is kept as is.
+    """
+    directory = os.path.join(artifacts_path, version)
+    if not os.path.isdir(directory):
+        engine.save(
+            directory,
+            metadata={
+                "format": ARTIFACT_FORMAT,
+                "version": version,
+                "exported_at": datetime.now().isoformat(timespec="seconds"),
+                "training": metadata,
+            },
+        )
+    return directory
+
+
+def export_artifact(models_path: str, artifacts_path: str, activate: bool = False) -> str:
+    """
+    Compile the training pickles of models_path into an artifact.
+
+    Args:
+        models_path: Directory with classifier.pkl, vectorizer.pkl,
+            label_encoder.pkl and metadata.json
+        artifacts_path: Directory of the artifacts
+        activate: Also make it the CURRENT version
+
+    Returns:
+        The version of the artifact
+
+    Raises:
+        UnsupportedModelError: If the engine can't reproduce the model
+    """
+    loaded = []
+    for name in PICKLE_FILES:
+        with open(os.path.join(models_path, name), "rb") as f:
+            loaded.append(pickle.load(f))
+    model, vectorizer, label_encoder = loaded
+
+    version = pickles_version(models_path)
+    engine = TfidfLogisticEngine.from_sklearn(vectorizer, model, label_encoder)
+    write_artifact(artifacts_path, version, engine, read_training_metadata(models_path))
+    if activate:
+        activate_artifact(artifacts_path, version)
+    return version
+
+
+def activate_artifact(artifacts_path: str, version: str) -> None:
+    """
+    Point CURRENT at an exported version.
+
+    The pointer is replaced atomically, so a process reading it sees either
+    the old or the new version.
+    """
+    if not os.path.isdir(os.path.join(artifacts_path, version)):
+        raise FileNotFoundError(f"Model artifact {version} not found in {artifacts_path}")
+    fd, staging = tempfile.mkstemp(dir=artifacts_path, prefix=".current-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(version + "\n")
+        os.chmod(staging, 0o644)
+        os.replace(staging, os.path.join(artifacts_path, CURRENT_FILE))
+    except OSError:
+        os.unlink(staging)
+        raise
+
+
+def current_version(artifacts_path: str) -> Optional[str]:
+    """Version CURRENT points at, or None if no artifact was published"""
+    try:
+        with open(os.path.join(artifacts_path, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def load_artifact(artifacts_path: str, version: str) -> LoadedModel:
+    """Load an exported version, memory-mapping its arrays read-only"""
+    directory = os.path.join(artifacts_path, version)
+    with open(os.path.join(directory, "metadata.json")) as f:
+        metadata = json.load(f)
+    if metadata.get("format") != ARTIFACT_FORMAT:
+        raise ValueError(f"Unsupported model artifact format: {metadata.get('format')}")
+    return LoadedModel(
+        version=metadata["version"],
+        engine=TfidfLogisticEngine.load(directory),
+        metadata=metadata.get("training", {}),
+        directory=directory,
+    )
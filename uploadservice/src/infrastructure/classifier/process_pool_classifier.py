@@ -0,0 +1,165 @@
+"""
+Process pool classification for bulk jobs
+
+Vectorizing and scoring run in Python and NumPy code that holds the GIL for
+most of a batch, so one process classifies on one core. For jobs that
+classify millions of stored rows, ProcessPoolClassifier splits every batch
+into slices and classifies them in parallel worker processes, each with its
+own MLClassifier. Compiled models are memory-mapped, so the processes share
+one copy of the arrays.
+
+Unlike MLClassifier.classify_batch, errors are raised instead of falling
+back to "Other": a bulk job must stop rather than overwrite stored
+categories with a fallback.
+"""
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+from ...domain.ports import ClassifierPort
+from .ml_classifier import MLClassifier
+from .utils import clean_texts, transaction_types
+
+logger = logging.getLogger(__name__)
+
+# Classifier of a pool worker process, created by _init_worker
+_worker_classifier: Optional[MLClassifier] = None
+
+
+def _init_worker(models_path: Optional[str], artifacts_path: Optional[str]) -> None:
+    """Load the model once per worker process"""
+    global _worker_classifier
+    _worker_classifier = MLClassifier(models_path=models_path, artifacts_path=artifacts_path)
+    _worker_classifier.warm_up()
+
+
+def _worker_model_version() -> str:
+    return _worker_classifier.model_version
+
+
+def _classify_slice(
+    descriptions: List[str], values: List[Optional[float]]
+) -> Tuple[List[str], str]:
+    """
+    Classify a slice in a worker process.
+
+    Returns:
+        The category of every description ("Other" for empty ones) and the
+        model version that classified them
+    """
+    model = _worker_classifier._current()
+    keys = list(zip(clean_texts(descriptions), transaction_types(values)))
+    unique_keys = list(dict.fromkeys(key for key in keys if key[0]))
+    categories = {}
+    if unique_keys:
+        predictions, _ = _worker_classifier._predict(unique_keys, model)
+        categories = dict(zip(unique_keys, predictions))
+    return [categories[key] if key[0] else "Other" for key in keys], model.version
+
+
+class ProcessPoolClassifier(ClassifierPort):
+    """
+    Classifier running large batches across worker processes.
+
+    Args:
+        processes: Worker processes (default: half the CPUs, at least one)
+        models_path: Passed to the MLClassifier of every worker
+        artifacts_path: Passed to the MLClassifier of every worker
+        min_slice_size: Smallest slice sent to one process; smaller batches
+            use fewer processes
+    """
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        models_path: Optional[str] = None,
+        artifacts_path: Optional[str] = None,
+        min_slice_size: int = 1000,
+    ):
+        self.processes = processes or max(1, (os.cpu_count() or 2) // 2)
+        self.models_path = models_path
+        self.artifacts_path = artifacts_path
+        self.min_slice_size = min_slice_size
+        self._model_version: Optional[str] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    async def classify(self, description: str, transaction_value: Optional[float] = None) -> str:
+        return (await self.classify_batch([description], [transaction_value]))[0]
+
+    async def classify_batch(
+        self,
+        descriptions: List[str],
+        transaction_values: Optional[List[Optional[float]]] = None,
+    ) -> List[str]:
+        """
+        Classify a batch in parallel slices.
+
+        Raises:
+            RuntimeError: If a worker process used another model version than
+                the one reported by model_version
+        """
+        if not descriptions:
+            return []
+        if transaction_values is None:
+            transaction_values = [None] * len(descriptions)
+
+        slices = min(self.processes, math.ceil(len(descriptions) / self.min_slice_size))
+        size = math.ceil(len(descriptions) / slices)
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(
+                pool,
+                _classify_slice,
+                descriptions[start:start + size],
+                transaction_values[start:start + size],
+            )
+            for start in range(0, len(descriptions), size)
+        ])
+
+        versions = {version for _, version in results}
+        if self._model_version is None and len(versions) == 1:
+            self._model_version = next(iter(versions))
+        if versions != {self._model_version}:
+            raise RuntimeError(
+                f"Expected model {self._model_version}, worker processes used {sorted(versions)}"
+            )
+        return [category for categories, _ in results for category in categories]
+
+    def warm_up(self) -> None:
+        """Start the worker processes (each loads the model as it starts)"""
+        self._get_pool()
+
+    @property
+    def model_version(self) -> str:
+        """Version the worker processes loaded; blocks until one of them is up"""
+        if self._model_version is None:
+            self._model_version = self._get_pool().submit(_worker_model_version).result()
+        return self._model_version
+
+    @property
+    def is_ready(self) -> bool:
+        return self._pool is not None
+
+    def close(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+            self._model_version = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Spawned, not forked: the parent runs an event loop and thread pools
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.models_path, self.artifacts_path),
+            )
+            logger.info(f"Started {self.processes} classification processes")
+        return self._pool
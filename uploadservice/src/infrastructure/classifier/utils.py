@@ -3,10 +3,43 @@ Utility Functions for Transaction Classification
 
 Common functions used for text processing and transaction type detection.
 These functions must match exactly the preprocessing used during model training.
+
+clean_texts and transaction_types are the batch versions of clean_text and
+create_transaction_type: they process a whole column at once and return
+exactly what the per-row functions return for every value.
 """
 
-import pandas as pd
+import math
 import re
+from decimal import Decimal
+from typing import Iterable, List
+
+import numpy as np
+
+# After upper(), every character other than A-Z and 0-9 becomes a space and
+# runs of spaces collapse into one. Training did this in two steps (special
+# characters to spaces, then \s+ to a single space); one pass over the
+# complement of [A-Z0-9] gives the same string.
+_NON_ALNUM = re.compile(r'[^A-Z0-9]+')
+
+# Separates the rows of a batch joined into one string; it is not in
+# [A-Z0-9], so the batch pattern must leave it in place
+_ROW_SEPARATOR = '\x00'
+_NON_ALNUM_BATCH = re.compile(r'[^A-Z0-9\x00]+')
+
+
+def _is_missing(value) -> bool:
+    """Same result as pd.isna for a scalar, without importing pandas"""
+    if value is None:
+        return True
+    if isinstance(value, (float, np.floating)):
+        return math.isnan(value)
+    if isinstance(value, Decimal):
+        return value.is_nan()
+    if isinstance(value, (np.datetime64, np.timedelta64)):
+        return bool(np.isnat(value))
+    # pd.NA and pd.NaT
+    return type(value).__name__ in ('NAType', 'NaTType')
 
 
 def clean_text(text):
@@ -22,22 +55,33 @@ def clean_text(text):
     Returns:
         str: Cleaned and normalized text
     """
-    if pd.isna(text):
+    if _is_missing(text):
         return ""
 
-    # Convert to uppercase
-    text = str(text).upper()
+    # Uppercase, replace everything but A-Z and 0-9 with a single space, strip
+    return _NON_ALNUM.sub(' ', str(text).upper()).strip(' ')
 
-    # Remove special characters, keep only alphanumeric and spaces
-    text = re.sub(r'[^A-Z0-9\s]', ' ', text)
 
-    # Replace multiple spaces with single space
-    text = re.sub(r'\s+', ' ', text)
+def clean_texts(texts: Iterable) -> List[str]:
+    """
+    Clean a column of transaction descriptions (batch clean_text)
 
-    # Strip leading/trailing spaces
-    text = text.strip()
+    The rows are joined into one string, so upper() and the substitution
+    run once for the whole batch instead of once per row.
 
-    return text
+    Args:
+        texts: Raw transaction descriptions
+
+    Returns:
+        List of cleaned texts, same order as the input
+    """
+    rows = ["" if _is_missing(text) else str(text) for text in texts]
+    joined = _ROW_SEPARATOR.join(rows)
+    if joined.count(_ROW_SEPARATOR) != len(rows) - 1:
+        # A row contains the separator itself
+        return [clean_text(row) for row in rows]
+    cleaned = _NON_ALNUM_BATCH.sub(' ', joined.upper()).split(_ROW_SEPARATOR)
+    return [row.strip(' ') for row in cleaned] if rows else []
 
 
 def create_transaction_type(value):
@@ -50,7 +94,7 @@ def create_transaction_type(value):
     Returns:
         str: 'ingreso', 'egreso', or 'neutro'
     """
-    if pd.isna(value):
+    if _is_missing(value):
         return 'neutro'
 
     if value > 0:
@@ -59,3 +103,28 @@ def create_transaction_type(value):
         return 'egreso'
     else:
         return 'neutro'
+
+
+def transaction_types(values: Iterable) -> List[str]:
+    """
+    Create the transaction type of a column of values (batch create_transaction_type)
+
+    Args:
+        values: Transaction values; missing values give 'neutro'
+
+    Returns:
+        List of 'ingreso', 'egreso' or 'neutro', same order as the input
+    """
+    values = list(values)
+    try:
+        amounts = np.asarray(values)
+        if amounts.dtype.kind in 'USV':
+            raise TypeError("not a numeric column")
+        amounts = amounts.astype(np.float64)
+    except (TypeError, ValueError):
+        # Values numpy can't compare as numbers (e.g. pd.NA)
+        return [create_transaction_type(value) for value in values]
+    # NaN compares false both ways, so missing values stay 'neutro'
+    return np.select(
+        [amounts > 0, amounts < 0], ['ingreso', 'egreso'], default='neutro'
+    ).tolist()
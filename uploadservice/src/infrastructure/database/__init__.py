@@ -1,4 +1,11 @@
-from .models import Base, TransactionModel, BankModel, CategoryModel, TransactionBatchModel
+from .models import (
+    Base,
+    TransactionModel,
+    BankModel,
+    CategoryModel,
+    TransactionBatchModel,
+    ClassificationCacheModel,
+)
 from .connection import get_database, init_database, get_session_factory
 
 __all__ = [
@@ -7,6 +14,7 @@ __all__ = [
     "BankModel",
     "CategoryModel",
     "TransactionBatchModel",
+    "ClassificationCacheModel",
     "get_database",
     "init_database",
     "get_session_factory",
@@ -0,0 +1,30 @@
+from sqlalchemy import Table, insert
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.dml import Insert
+
+
+def insert_skipping_duplicates(session: AsyncSession, table: Table, key_column: str) -> Insert:
+    """
+    Build an INSERT that leaves rows whose unique key already exists untouched.
+
+    Unlike INSERT IGNORE, only duplicate keys are skipped: on MySQL, IGNORE
+    also turns foreign key, NOT NULL and truncation errors into warnings,
+    dropping or altering bad rows silently. On MySQL the duplicate is a
+    no-op ON DUPLICATE KEY UPDATE of key_column (a column of the unique
+    key) to the value it already has; on SQLite (the test stand-in) it is
+    ON CONFLICT DO NOTHING. Other errors still raise.
+
+    Args:
+        session: Session the statement runs on (picks the dialect)
+        table: Table to insert into
+        key_column: Column of the unique key the duplicates collide on
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect == "mysql":
+        statement = mysql_insert(table)
+        return statement.on_duplicate_key_update({key_column: statement.inserted[key_column]})
+    if dialect == "sqlite":
+        return sqlite_insert(table).on_conflict_do_nothing()
+    return insert(table)
@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, DateTime, Numeric, ForeignKey, Text
+from sqlalchemy import (
+    Column, Computed, Integer, String, DateTime, Numeric, ForeignKey, Text, UniqueConstraint,
+)
 from sqlalchemy.dialects.mysql import CHAR
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.sql import func
 import uuid
+from datetime import datetime
 
 Base = declarative_base()
 
@@ -25,7 +28,7 @@ class CategoryModel(Base):
     __tablename__ = "TransactionCategory"
 
     id_category = Column(CHAR(36), primary_key=True, default=generate_uuid)
-    description = Column(String(255), nullable=False)
+    description = Column(String(255), nullable=False, unique=True)
 
 
 class TransactionBatchModel(Base):
@@ -33,10 +36,19 @@ class TransactionBatchModel(Base):
     __tablename__ = "TransactionBatch"
 
     id_batch = Column(CHAR(36), primary_key=True, default=generate_uuid)
-    process_status = Column(String(50), nullable=False)
+    process_status = Column(String(50), nullable=False, index=True)
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=True)
     batch_size = Column(Integer, nullable=True)
+    # Rows committed so far; processing resumes from here after a failure
+    processed_records = Column(Integer, nullable=False, default=0, server_default="0")
+    # When a worker first picked the batch up; used for throughput and ETA
+    processing_start_date = Column(DateTime, nullable=True)
+    # Rows categorized by a merchant rule instead of the model
+    rule_matched_records = Column(Integer, nullable=False, default=0, server_default="0")
+    # Last change of the batch (status or checkpoint); unfinished batches that
+    # stopped changing no longer count against the upload limits
+    updated_at = Column(DateTime, nullable=True, default=datetime.now, onupdate=datetime.now)
 
 
 class TransactionModel(Base):
@@ -53,3 +65,71 @@ class TransactionModel(Base):
     value = Column(Numeric(15, 2), nullable=False)
     transaction_date = Column(DateTime, nullable=False)
     transaction_type = Column(String(50), nullable=False)
+    # Ordinal of the row within its batch; with id_batch it identifies the row,
+    # so re-inserting a chunk after a retry skips the rows already written
+    batch_row = Column(Integer, nullable=True)
+
+    __table_args__ = (
+        UniqueConstraint("id_batch", "batch_row", name="uq_transaction_batch_row"),
+    )
+
+
+class ClassificationCacheModel(Base):
+    """Database model for the classifier prediction cache shared by all workers"""
+    __tablename__ = "ClassificationCache"
+
+    # SHA-256 of (model version, transaction type, cleaned description)
+    cache_key = Column(CHAR(64), primary_key=True)
+    model_version = Column(String(64), nullable=False, index=True)
+    category = Column(String(255), nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class MerchantRuleModel(Base):
+    """Database model for merchant rules applied ahead of the classifier"""
+    __tablename__ = "MerchantRule"
+
+    id_rule = Column(CHAR(36), primary_key=True, default=generate_uuid)
+    # NULL for global rules maintained by administrators
+    id_user = Column(CHAR(36), nullable=True, index=True)
+    # id_user, or '' for global rules: NULLs never collide in a unique key
+    rule_owner = Column(CHAR(36), Computed("COALESCE(id_user, '')", persisted=True))
+    # Normalized description (see classifier utils.clean_text)
+    pattern = Column(String(255), nullable=False)
+    match_type = Column(String(10), nullable=False)
+    id_category = Column(CHAR(36), ForeignKey("TransactionCategory.id_category"), nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("rule_owner", "pattern", "match_type", name="uq_merchant_rule"),
+    )
+
+
+class CategoryCorrectionModel(Base):
+    """Database model for category corrections, learned by the classifier"""
+    __tablename__ = "CategoryCorrection"
+
+    # Increases monotonically; a model version records the last one it learned
+    id_correction = Column(Integer, primary_key=True, autoincrement=True)
+    id_user = Column(CHAR(36), nullable=False)
+    id_transaction = Column(CHAR(36), nullable=True)
+    # Corrections of the same description are compared across users
+    description = Column(String(255), nullable=False, index=True)
+    value = Column(Numeric(15, 2), nullable=True)
+    id_category = Column(CHAR(36), ForeignKey("TransactionCategory.id_category"), nullable=False)
+    created_at = Column(DateTime, nullable=False, server_default=func.now())
+
+
+class ReclassificationJobModel(Base):
+    """Database model for the checkpoint of a bulk reclassification job"""
+    __tablename__ = "ReclassificationJob"
+
+    id_job = Column(CHAR(36), primary_key=True, default=generate_uuid)
+    status = Column(String(50), nullable=False, index=True)
+    model_version = Column(String(64), nullable=True)
+    # Keyset cursor: every transaction up to this ID has been reclassified
+    last_id_transaction = Column(CHAR(36), nullable=True)
+    scanned_records = Column(Integer, nullable=False, default=0, server_default="0")
+    changed_records = Column(Integer, nullable=False, default=0, server_default="0")
+    start_date = Column(DateTime, nullable=False)
+    end_date = Column(DateTime, nullable=True)
@@ -0,0 +1,15 @@
+from .stage_executor import (
+    InlineStageExecutor,
+    ThreadStageExecutor,
+    ProcessStageExecutor,
+    get_stage_executor,
+    close_stage_executor,
+)
+
+__all__ = [
+    "InlineStageExecutor",
+    "ThreadStageExecutor",
+    "ProcessStageExecutor",
+    "get_stage_executor",
+    "close_stage_executor",
+]
@@ -0,0 +1,237 @@
+"""
+Executors for the CPU-bound stages of upload processing
+
+Parsing an Excel file and running the model are plain Python and NumPy
+code: run directly in a coroutine they hold the event loop for the whole
+file or batch, and every other request of the process (token validation,
+health checks, status streams) waits behind them. The stages run on one of
+these executors instead:
+
+- "thread" (default): a thread pool. The loop stays free to serve
+  requests; the stages still share the GIL with it, so under heavy parsing
+  other requests slow down somewhat but never stall.
+- "process": a pool of spawned processes, so parsing and inference run on
+  other cores without holding the API's GIL. Arguments and results are
+  pickled; NumPy arrays are pickled as raw buffers (protocol 5), with one
+  copy per transfer. Iterated items come back one at a time through a
+  bounded queue, so parsing a file holds a few chunks, not the whole file.
+- "inline": on the event loop, as before (debugging and tests).
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing.managers import SyncManager
+from typing import Any, AsyncIterator, Callable, Iterable, Optional, TypeVar
+from ...domain.ports import StageExecutorPort
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Returned by next() when an iterator is exhausted
+_DONE = object()
+
+# Items an executor process computes ahead of the consumer
+STREAM_QUEUE_SIZE = 2
+# Seconds between checks for a stopped consumer while the queue is full
+_STREAM_POLL_SECONDS = 0.5
+
+_stage_executor: Optional[StageExecutorPort] = None
+
+
+def _put(items: queue.Queue, entry: tuple, stop) -> bool:
+    """Put an entry on a bounded queue, unless the consumer stopped first"""
+    while not stop.is_set():
+        try:
+            items.put(entry, timeout=_STREAM_POLL_SECONDS)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _stream(factory: Callable[..., Iterable[T]], args: tuple, items: queue.Queue, stop) -> None:
+    """
+    Put the items of factory(*args) on items in an executor process, one at a time.
+
+    Ends with an end marker, also when the iterable raises (the exception is
+    then raised by the task's future); returns early once stop is set.
+    """
+    iterator = iter(factory(*args))
+    try:
+        for item in iterator:
+            if not _put(items, (True, item), stop):
+                return
+    finally:
+        if hasattr(iterator, "close"):
+            iterator.close()
+        _put(items, (False, None), stop)
+
+
+class InlineStageExecutor(StageExecutorPort):
+    """Runs the stages on the event loop (blocking it)"""
+
+    @property
+    def isolated(self) -> bool:
+        return False
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return fn(*args)
+
+    async def iterate(self, factory: Callable[..., Iterable[T]], *args: Any) -> AsyncIterator[T]:
+        iterator = iter(factory(*args))
+        try:
+            for item in iterator:
+                yield item
+        finally:
+            if hasattr(iterator, "close"):
+                iterator.close()
+
+
+class ThreadStageExecutor(StageExecutorPort):
+    """
+    Runs the stages in a thread pool.
+
+    Args:
+        workers: Threads in the pool
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stage")
+
+    @property
+    def isolated(self) -> bool:
+        return False
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.wrap_future(self._pool.submit(fn, *args))
+
+    async def iterate(self, factory: Callable[..., Iterable[T]], *args: Any) -> AsyncIterator[T]:
+        """Create the iterator in the pool and pull every item from it there"""
+        iterator = await self.run(lambda: iter(factory(*args)))
+        pending: Optional[Future] = None
+        try:
+            while True:
+                pending = self._pool.submit(next, iterator, _DONE)
+                item = await asyncio.wrap_future(pending)
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            if hasattr(iterator, "close"):
+                if pending is None:
+                    iterator.close()
+                else:
+                    # If cancelled while next() runs, close once it returns:
+                    # a running generator can't be closed
+                    pending.add_done_callback(lambda _: iterator.close())
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class ProcessStageExecutor(StageExecutorPort):
+    """
+    Runs the stages in a pool of worker processes.
+
+    An iterable is consumed in one worker process, which sends its items
+    back through a queue of STREAM_QUEUE_SIZE items (held by a manager
+    process) and waits while the queue is full, so memory stays bounded by
+    a few items. The worker process is busy until the iteration ends or
+    the consumer stops.
+
+    Args:
+        workers: Worker processes, started on first use
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool: Optional[Executor] = None
+        self._manager: Optional[SyncManager] = None
+
+    @property
+    def isolated(self) -> bool:
+        return True
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        return await asyncio.wrap_future(self._get_pool().submit(fn, *args))
+
+    async def iterate(self, factory: Callable[..., Iterable[T]], *args: Any) -> AsyncIterator[T]:
+        """Consume the iterable in a worker process, receiving its items one at a time"""
+        pool = self._get_pool()
+        items = self._manager.Queue(maxsize=STREAM_QUEUE_SIZE)
+        stop = self._manager.Event()
+        producer = asyncio.wrap_future(pool.submit(_stream, factory, args, items, stop))
+        try:
+            while True:
+                has_item, item = await asyncio.to_thread(items.get)
+                if not has_item:
+                    # Raises what the iterable raised
+                    await producer
+                    return
+                yield item
+        finally:
+            # Stop the worker process, and wake a get() left waiting by a cancellation
+            stop.set()
+            try:
+                items.put_nowait((False, None))
+            except queue.Full:
+                pass
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            # Spawned, not forked: the parent runs an event loop and thread pools
+            context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            # Holds the queues streaming iterated items back from the pool
+            self._manager = context.Manager()
+            logger.info(f"Started {self.workers} stage processes")
+        return self._pool
+
+
+def get_stage_executor() -> StageExecutorPort:
+    """
+    Return the process-wide executor of the parse and classify stages.
+
+    Environment Variables:
+        STAGE_EXECUTOR: "thread" (default), "process" or "inline"
+        STAGE_EXECUTOR_WORKERS: Threads or processes in the pool
+            (default: 4 threads, or half the CPUs for processes)
+    """
+    global _stage_executor
+    if _stage_executor is None:
+        mode = os.getenv("STAGE_EXECUTOR", "thread").lower()
+        workers = int(os.getenv("STAGE_EXECUTOR_WORKERS", "0"))
+        if mode == "thread":
+            _stage_executor = ThreadStageExecutor(workers or 4)
+        elif mode == "process":
+            _stage_executor = ProcessStageExecutor(workers or max(1, (os.cpu_count() or 2) // 2))
+        elif mode == "inline":
+            _stage_executor = InlineStageExecutor()
+        else:
+            raise ValueError(
+                f"Unknown STAGE_EXECUTOR {mode!r}. Supported: thread, process, inline"
+            )
+        logger.info(f"Running parse and classify stages on the {mode} executor")
+    return _stage_executor
+
+
+def close_stage_executor() -> None:
+    """Stop the process-wide executor's threads or processes"""
+    global _stage_executor
+    if _stage_executor is not None:
+        _stage_executor.close()
+        _stage_executor = None
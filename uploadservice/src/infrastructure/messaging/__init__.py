@@ -1,3 +1,16 @@
 from .rabbitmq_producer import RabbitMQProducer
+from .rabbitmq_job_queue import RabbitMQJobQueue
+from .in_process_job_queue import InProcessJobQueue
+from .job_queue_factory import get_job_queue, connect_job_queue, is_in_process_queue
+from .producer_factory import get_message_broker, connect_message_broker
 
-__all__ = ["RabbitMQProducer"]
+__all__ = [
+    "RabbitMQProducer",
+    "RabbitMQJobQueue",
+    "InProcessJobQueue",
+    "get_job_queue",
+    "connect_job_queue",
+    "is_in_process_queue",
+    "get_message_broker",
+    "connect_message_broker",
+]
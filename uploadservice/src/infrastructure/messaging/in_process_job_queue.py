@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from ...domain.entities import BatchJob
+from ...domain.ports import JobQueuePort
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessJobQueue(JobQueuePort):
+    """
+    Local stand-in for the RabbitMQ job queue.
+
+    Jobs are kept in an asyncio.Queue and handled by workers running in the
+    same process, so it needs no broker but jobs are lost on restart. Meant
+    for development and tests.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue = asyncio.Queue()
+
+    async def connect(self) -> None:
+        """Nothing to connect to"""
+        pass
+
+    async def disconnect(self) -> None:
+        """Nothing to disconnect from"""
+        pass
+
+    async def enqueue(self, job: BatchJob) -> None:
+        """Queue a job for the in-process workers"""
+        await self._queue.put(job)
+        logger.info(f"Queued batch job: batch_id={job.id_batch}")
+
+    async def consume(
+        self, handler: Callable[[BatchJob], Awaitable[None]], concurrency: int
+    ) -> None:
+        """Run concurrency workers that handle queued jobs until cancelled"""
+
+        async def worker() -> None:
+            while True:
+                job = await self._queue.get()
+                try:
+                    await handler(job)
+                except Exception as e:
+                    logger.error(f"Batch job {job.id_batch} failed: {e}", exc_info=True)
+                finally:
+                    self._queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def get_depth(self) -> int:
+        """Number of jobs waiting to be picked up"""
+        return self._queue.qsize()
+
+    async def join(self) -> None:
+        """Wait until every queued job has been handled"""
+        await self._queue.join()
@@ -0,0 +1,59 @@
+import os
+import logging
+from typing import Optional
+from ...domain.ports import JobQueuePort
+from .rabbitmq_job_queue import RabbitMQJobQueue
+from .in_process_job_queue import InProcessJobQueue
+
+logger = logging.getLogger(__name__)
+
+_job_queue: Optional[JobQueuePort] = None
+
+
+def get_job_queue() -> JobQueuePort:
+    """
+    Return the process-wide batch job queue.
+
+    Environment Variables:
+        JOB_QUEUE_BACKEND: "rabbitmq" (default) for the durable queue, or "memory"
+            to process jobs inside the API process without a broker
+        JOB_QUEUE_NAME: RabbitMQ queue holding the jobs (default: batch_jobs)
+        RABBITMQ_HOST, RABBITMQ_PORT, RABBITMQ_USERNAME, RABBITMQ_PASSWORD: Broker settings
+    """
+    global _job_queue
+    if _job_queue is None:
+        backend = os.getenv("JOB_QUEUE_BACKEND", "rabbitmq").lower()
+        if backend == "memory":
+            _job_queue = InProcessJobQueue()
+        elif backend == "rabbitmq":
+            _job_queue = RabbitMQJobQueue(
+                host=os.getenv("RABBITMQ_HOST", "localhost"),
+                port=int(os.getenv("RABBITMQ_PORT", "5672")),
+                username=os.getenv("RABBITMQ_USERNAME", "guest"),
+                password=os.getenv("RABBITMQ_PASSWORD", "guest"),
+                queue_name=os.getenv("JOB_QUEUE_NAME", "batch_jobs"),
+            )
+        else:
+            raise ValueError(
+                f"Unknown JOB_QUEUE_BACKEND {backend!r}. Supported: rabbitmq, memory"
+            )
+        logger.info(f"Using {backend} job queue")
+    return _job_queue
+
+
+async def connect_job_queue() -> None:
+    """
+    Connect the process-wide job queue at startup.
+
+    A broker that isn't reachable yet doesn't stop the API: the queue
+    connects again when the next job is enqueued.
+    """
+    try:
+        await get_job_queue().connect()
+    except Exception as e:
+        logger.warning(f"Job queue not reachable at startup, will retry when enqueueing: {e}")
+
+
+def is_in_process_queue() -> bool:
+    """Whether jobs are processed inside the API process (JOB_QUEUE_BACKEND=memory)"""
+    return isinstance(get_job_queue(), InProcessJobQueue)
@@ -0,0 +1,50 @@
+import os
+import logging
+from typing import Optional
+from ...domain.ports import MessageBrokerPort
+from .rabbitmq_producer import RabbitMQProducer
+
+logger = logging.getLogger(__name__)
+
+_message_broker: Optional[MessageBrokerPort] = None
+
+
+def get_message_broker() -> MessageBrokerPort:
+    """
+    Return the process-wide publisher of batch processed events.
+
+    Environment Variables:
+        RABBITMQ_HOST, RABBITMQ_PORT, RABBITMQ_USERNAME, RABBITMQ_PASSWORD: Broker settings
+        RABBITMQ_QUEUE_NAME: Queue receiving the events (default: batch_processed)
+        RABBITMQ_PUBLISH_CHANNELS: Pooled channels publishing at the same time (default: 4)
+        RABBITMQ_PUBLISH_BATCH_SIZE: Events that trigger a flush right away (default: 100)
+        RABBITMQ_PUBLISH_BATCH_WAIT_MS: Longest wait for more events to join a flush (default: 5)
+        RABBITMQ_PUBLISH_MAX_PENDING: Buffered events above which publishing waits (default: 10000)
+    """
+    global _message_broker
+    if _message_broker is None:
+        _message_broker = RabbitMQProducer(
+            host=os.getenv("RABBITMQ_HOST", "localhost"),
+            port=int(os.getenv("RABBITMQ_PORT", "5672")),
+            username=os.getenv("RABBITMQ_USERNAME", "guest"),
+            password=os.getenv("RABBITMQ_PASSWORD", "guest"),
+            queue_name=os.getenv("RABBITMQ_QUEUE_NAME", "batch_processed"),
+            channel_pool_size=int(os.getenv("RABBITMQ_PUBLISH_CHANNELS", "4")),
+            batch_size=int(os.getenv("RABBITMQ_PUBLISH_BATCH_SIZE", "100")),
+            batch_wait_ms=float(os.getenv("RABBITMQ_PUBLISH_BATCH_WAIT_MS", "5")),
+            max_pending=int(os.getenv("RABBITMQ_PUBLISH_MAX_PENDING", "10000")),
+        )
+    return _message_broker
+
+
+async def connect_message_broker() -> None:
+    """
+    Connect the process-wide publisher at startup.
+
+    A broker that isn't reachable yet doesn't stop the process: events are
+    buffered and published once a connection succeeds.
+    """
+    try:
+        await get_message_broker().connect()
+    except Exception as e:
+        logger.warning(f"Message broker not reachable at startup, will retry when publishing: {e}")
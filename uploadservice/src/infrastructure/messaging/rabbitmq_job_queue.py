@@ -0,0 +1,149 @@
+import asyncio
+import json
+import logging
+from dataclasses import asdict
+from typing import Awaitable, Callable, Optional
+import aio_pika
+from aio_pika import Connection, Channel
+from aio_pika.abc import AbstractIncomingMessage
+
+from ...domain.entities import BatchJob
+from ...domain.ports import JobQueuePort
+
+logger = logging.getLogger(__name__)
+
+
+class RabbitMQJobQueue(JobQueuePort):
+    """
+    Durable job queue on RabbitMQ.
+
+    Jobs are persistent messages on a durable queue, so they survive broker
+    and API restarts. Workers acknowledge a job only after handling it; if a
+    worker dies mid-way, RabbitMQ delivers the job to another worker.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str,
+        password: str,
+        queue_name: str,
+        connection_name: str = "upload-service-jobs",
+    ):
+        """
+        Initialize RabbitMQ job queue.
+
+        Args:
+            host: RabbitMQ host
+            port: RabbitMQ port
+            username: RabbitMQ username
+            password: RabbitMQ password
+            queue_name: Queue holding the batch processing jobs
+            connection_name: Name shown for the connection in the RabbitMQ UI
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.queue_name = queue_name
+        self.connection_name = connection_name
+
+        self.connection: Optional[Connection] = None
+        self.channel: Optional[Channel] = None
+
+        logger.info(f"Initialized RabbitMQ job queue for queue={queue_name}")
+
+    async def connect(self) -> None:
+        """Establish connection to RabbitMQ and declare the job queue"""
+        try:
+            url = f"amqp://{self.username}:{self.password}@{self.host}:{self.port}/"
+            self.connection = await aio_pika.connect_robust(
+                url,
+                heartbeat=600,
+                client_properties={"connection_name": self.connection_name},
+            )
+            self.channel = await self.connection.channel()
+
+            # Declare queue (idempotent)
+            await self.channel.declare_queue(self.queue_name, durable=True)
+
+            logger.info(f"Connected job queue to RabbitMQ at {self.host}:{self.port}")
+
+        except Exception as e:
+            logger.error(f"Failed to connect job queue to RabbitMQ: {e}")
+            raise
+
+    async def disconnect(self) -> None:
+        """Close connection to RabbitMQ"""
+        try:
+            if self.channel and not self.channel.is_closed:
+                await self.channel.close()
+
+            if self.connection and not self.connection.is_closed:
+                await self.connection.close()
+
+            logger.info("Disconnected job queue from RabbitMQ")
+
+        except Exception as e:
+            logger.error(f"Error disconnecting job queue from RabbitMQ: {e}")
+
+    async def enqueue(self, job: BatchJob) -> None:
+        """Publish a job as a persistent message"""
+        if not self.channel or self.channel.is_closed:
+            logger.warning("Job queue channel not connected, attempting to reconnect...")
+            await self.connect()
+
+        await self.channel.default_exchange.publish(
+            aio_pika.Message(
+                body=json.dumps(asdict(job)).encode("utf-8"),
+                delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                content_type="application/json",
+            ),
+            routing_key=self.queue_name,
+        )
+        logger.info(f"Queued batch job: batch_id={job.id_batch}")
+
+    async def consume(
+        self, handler: Callable[[BatchJob], Awaitable[None]], concurrency: int
+    ) -> None:
+        """
+        Handle jobs until cancelled, at most concurrency at a time.
+
+        The prefetch count limits the unacknowledged jobs this worker holds.
+        A job is acknowledged once its handler returns. If the handler raises,
+        the job is rejected without requeueing (the handler already recorded
+        the failure), so a bad file can't loop between workers.
+        """
+        if not self.channel or self.channel.is_closed:
+            await self.connect()
+
+        await self.channel.set_qos(prefetch_count=concurrency)
+        queue = await self.channel.declare_queue(self.queue_name, durable=True)
+
+        async def on_message(message: AbstractIncomingMessage) -> None:
+            async with message.process(requeue=False, ignore_processed=True):
+                job = BatchJob(**json.loads(message.body.decode("utf-8")))
+                if message.redelivered:
+                    logger.warning(f"Batch job redelivered: batch_id={job.id_batch}")
+                try:
+                    await handler(job)
+                except Exception as e:
+                    logger.error(f"Batch job {job.id_batch} failed: {e}", exc_info=True)
+                    await message.reject(requeue=False)
+
+        consumer_tag = await queue.consume(on_message)
+        logger.info(f"Consuming batch jobs from {self.queue_name} (concurrency={concurrency})")
+        try:
+            await asyncio.Future()
+        finally:
+            if not self.channel.is_closed:
+                await queue.cancel(consumer_tag)
+
+    async def get_depth(self) -> int:
+        """Number of jobs waiting in the queue (not yet delivered to a worker)"""
+        if not self.channel or self.channel.is_closed:
+            await self.connect()
+
+        queue = await self.channel.declare_queue(self.queue_name, durable=True)
+        return queue.declaration_result.message_count
@@ -1,9 +1,11 @@
+import asyncio
 import json
 import logging
-from typing import Optional
+from typing import List, Optional, Set, Tuple
 from uuid import UUID
 import aio_pika
-from aio_pika import Connection, Channel, ExchangeType
+from aio_pika.abc import AbstractChannel, AbstractRobustConnection
+from aio_pika.pool import Pool
 
 from ...domain.ports import MessageBrokerPort
 
@@ -11,7 +13,19 @@ logger = logging.getLogger(__name__)
 
 
 class RabbitMQProducer(MessageBrokerPort):
-    """RabbitMQ producer implementation for publishing batch processed events"""
+    """
+    RabbitMQ producer implementation for publishing batch processed events.
+
+    One instance serves the whole process: it keeps a single robust
+    connection and a pool of channels in confirm mode, opened once. Events
+    are buffered and a background flusher publishes them in batches of up
+    to batch_size, each batch waiting for the broker's confirms together,
+    so callers hand over an event without waiting for the network and the
+    broker sees neither new connections nor one round trip per event.
+    Events the broker didn't confirm are published again. Callers that
+    must not lose an event (e.g. before acknowledging the job that produced
+    it) await flush(), which returns once the broker confirmed it.
+    """
 
     def __init__(
         self,
@@ -20,6 +34,11 @@ class RabbitMQProducer(MessageBrokerPort):
         username: str,
         password: str,
         queue_name: str,
+        channel_pool_size: int = 4,
+        batch_size: int = 100,
+        batch_wait_ms: float = 5.0,
+        max_pending: int = 10000,
+        retry_delay_seconds: float = 1.0,
     ):
         """
         Initialize RabbitMQ producer.
@@ -30,54 +49,99 @@ class RabbitMQProducer(MessageBrokerPort):
             username: RabbitMQ username
             password: RabbitMQ password
             queue_name: Queue to publish messages to
+            channel_pool_size: Channels publishing batches at the same time
+            batch_size: Events that trigger a flush right away
+            batch_wait_ms: Longest time the first event of a batch waits for others
+            max_pending: Buffered events above which publishing waits for the flusher
+            retry_delay_seconds: Delay before publishing unconfirmed events again,
+                doubled on every further attempt (up to 30 seconds)
         """
         self.host = host
         self.port = port
         self.username = username
         self.password = password
         self.queue_name = queue_name
+        self.channel_pool_size = channel_pool_size
+        self.batch_size = batch_size
+        self.batch_wait_seconds = batch_wait_ms / 1000
+        self.max_pending = max_pending
+        self.retry_delay_seconds = retry_delay_seconds
 
-        self.connection: Optional[Connection] = None
-        self.channel: Optional[Channel] = None
+        self.connection: Optional[AbstractRobustConnection] = None
+        self._channels: Optional[Pool] = None
+        self._connecting: Optional[asyncio.Lock] = None
+        self._pending: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._senders: Optional[asyncio.Semaphore] = None
+        self._sending: Set[asyncio.Task] = set()
+        # Confirmations of the events published and not yet confirmed
+        self._unconfirmed: Set[asyncio.Future] = set()
 
         logger.info(f"Initialized RabbitMQ producer for queue={queue_name}")
 
     async def connect(self) -> None:
-        """Establish connection to RabbitMQ"""
-        try:
-            # Create connection URL
-            url = f"amqp://{self.username}:{self.password}@{self.host}:{self.port}/"
-
-            # Establish connection
-            self.connection = await aio_pika.connect_robust(
-                url,
-                heartbeat=600,
-                client_properties={"connection_name": "upload-service-producer"},
-            )
+        """Establish connection to RabbitMQ, open the channel pool and declare the queue"""
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        async with self._connecting:
+            # A robust connection that dropped reopens by itself; a second one would leak
+            if self.connection is not None:
+                return
+            try:
+                # Create connection URL
+                url = f"amqp://{self.username}:{self.password}@{self.host}:{self.port}/"
 
-            # Create channel
-            self.channel = await self.connection.channel()
+                # Establish connection; a robust connection and its channels
+                # reopen by themselves after a network failure
+                self.connection = await aio_pika.connect_robust(
+                    url,
+                    heartbeat=600,
+                    client_properties={"connection_name": "upload-service-producer"},
+                )
+                self._channels = Pool(self._open_channel, max_size=self.channel_pool_size)
 
-            # Declare queue (idempotent)
-            await self.channel.declare_queue(
-                self.queue_name,
-                durable=True,
-            )
+                # Declare queue (idempotent)
+                async with self._channels.acquire() as channel:
+                    await channel.declare_queue(self.queue_name, durable=True)
 
-            logger.info(f"Connected to RabbitMQ at {self.host}:{self.port}")
+                logger.info(f"Connected to RabbitMQ at {self.host}:{self.port}")
 
-        except Exception as e:
-            logger.error(f"Failed to connect to RabbitMQ: {e}")
-            raise
+            except Exception as e:
+                logger.error(f"Failed to connect to RabbitMQ: {e}")
+                raise
+
+    async def disconnect(self, timeout_seconds: float = 10.0) -> None:
+        """Publish the buffered events (waiting up to timeout_seconds), then close the connection"""
+        try:
+            await asyncio.wait_for(self.flush(), timeout_seconds)
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Closing RabbitMQ producer with {len(self._unconfirmed)} events not confirmed"
+            )
+
+        if self._flusher is not None:
+            self._flusher.cancel()
+        for task in self._sending:
+            task.cancel()
+        await asyncio.gather(
+            *([self._flusher] if self._flusher else []), *self._sending, return_exceptions=True
+        )
+        # Events not published by now are dropped; a later publish starts afresh
+        for confirmation in self._unconfirmed:
+            confirmation.cancel()
+        self._unconfirmed.clear()
+        self._flusher = None
+        self._pending = None
+        self._senders = None
 
-    async def disconnect(self) -> None:
-        """Close connection to RabbitMQ"""
         try:
-            if self.channel and not self.channel.is_closed:
-                await self.channel.close()
+            if self._channels is not None:
+                await self._channels.close()
+                self._channels = None
 
             if self.connection and not self.connection.is_closed:
                 await self.connection.close()
+            self.connection = None
 
             logger.info("Disconnected from RabbitMQ")
 
@@ -97,44 +161,121 @@ class RabbitMQProducer(MessageBrokerPort):
             "userid": "uuid-string"
         }
 
+        The event is buffered and published by the background flusher; this
+        only waits when max_pending events are already buffered (e.g. while
+        the broker is unreachable). Await flush() to know it was confirmed.
+
         Args:
             batch_id: UUID of the processed batch
             user_id: UUID of the user who owns the batch
             status: Status of the batch ("Processed", "Error", etc.)
+        """
+        # Create message payload matching InsightService format
+        message = {
+            "batch_id": str(batch_id),
+            "status": status,
+            "userid": str(user_id),
+        }
 
-        Raises:
-            Exception: If publishing fails
+        self._ensure_flusher()
+        confirmation = asyncio.get_running_loop().create_future()
+        self._unconfirmed.add(confirmation)
+        confirmation.add_done_callback(self._unconfirmed.discard)
+        await self._pending.put((json.dumps(message).encode("utf-8"), confirmation))
+
+        logger.info(
+            f"Queued batch processed event: batch_id={batch_id}, "
+            f"user_id={user_id}, status={status}"
+        )
+
+    async def flush(self) -> None:
         """
-        if not self.channel or self.channel.is_closed:
-            logger.warning("Channel not connected, attempting to reconnect...")
-            await self.connect()
+        Wait until the broker confirmed every event published so far.
 
-        try:
-            # Create message payload matching InsightService format
-            message = {
-                "batch_id": str(batch_id),
-                "status": status,
-                "userid": str(user_id),
-            }
-
-            # Serialize to JSON
-            message_body = json.dumps(message).encode("utf-8")
-
-            # Publish message
-            await self.channel.default_exchange.publish(
-                aio_pika.Message(
-                    body=message_body,
-                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,  # Make message persistent
-                    content_type="application/json",
-                ),
-                routing_key=self.queue_name,
-            )
+        Events published meanwhile aren't waited for, so this returns even
+        while other callers keep publishing. It also returns if disconnect()
+        gave up on the events.
+        """
+        if self._unconfirmed:
+            await asyncio.wait(list(self._unconfirmed))
 
-            logger.info(
-                f"Published batch processed event: batch_id={batch_id}, "
-                f"user_id={user_id}, status={status}"
-            )
+    async def _open_channel(self) -> AbstractChannel:
+        return await self.connection.channel(publisher_confirms=True)
 
-        except Exception as e:
-            logger.error(f"Failed to publish message to RabbitMQ: {e}")
-            raise
+    def _ensure_flusher(self) -> None:
+        if self._flusher is None or self._flusher.done():
+            if self._pending is None:
+                self._pending = asyncio.Queue(maxsize=self.max_pending)
+                self._senders = asyncio.Semaphore(self.channel_pool_size)
+            self._flusher = asyncio.create_task(self._flush_batches())
+
+    async def _flush_batches(self) -> None:
+        """Group buffered events into batches and hand each to a pooled channel"""
+        loop = asyncio.get_running_loop()
+        while True:
+            # Events stay buffered (and count against max_pending) until a channel is free
+            await self._senders.acquire()
+            batch = [await self._pending.get()]
+            deadline = loop.time() + self.batch_wait_seconds
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Runs alongside the next batches, one per pooled channel
+            task = asyncio.create_task(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, events: List[Tuple[bytes, asyncio.Future]]) -> None:
+        """Publish a batch until the broker confirmed all of it"""
+        delay = self.retry_delay_seconds
+        remaining = events
+        try:
+            while True:
+                try:
+                    if self.connection is None:
+                        await self.connect()
+                    elif self.connection.is_closed:
+                        # The robust connection is reconnecting; try again after the delay
+                        raise ConnectionError("connection lost, waiting for it to reopen")
+                    async with self._channels.acquire() as channel:
+                        # All the batch's confirms are awaited together
+                        results = await asyncio.gather(
+                            *(
+                                channel.default_exchange.publish(
+                                    aio_pika.Message(
+                                        body=body,
+                                        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                                        content_type="application/json",
+                                    ),
+                                    routing_key=self.queue_name,
+                                )
+                                for body, _ in remaining
+                            ),
+                            return_exceptions=True,
+                        )
+                    unconfirmed = []
+                    for event, result in zip(remaining, results):
+                        if isinstance(result, BaseException):
+                            unconfirmed.append(event)
+                        elif not event[1].done():
+                            event[1].set_result(None)
+                    remaining = unconfirmed
+                    if not remaining:
+                        return
+                    error = next(r for r in results if isinstance(r, BaseException))
+                except Exception as e:
+                    error = e
+
+                logger.error(
+                    f"Failed to publish {len(remaining)} messages to RabbitMQ, "
+                    f"retrying in {delay:.0f}s: {error}"
+                )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+        finally:
+            self._senders.release()
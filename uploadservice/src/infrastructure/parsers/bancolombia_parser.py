@@ -1,22 +1,33 @@
-from typing import List
+from typing import Dict, Iterator, List
+import numpy as np
 import pandas as pd
 from io import BytesIO
-from decimal import Decimal
-from ...domain.ports.excel_parser_port import ExcelParserPort, RawTransaction
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from contextlib import contextmanager
+from itertools import repeat
+from openpyxl import load_workbook
+from ...domain.entities import TransactionChunk
+from ...domain.ports.excel_parser_port import ExcelParserPort, RawTransaction, FileSource
+
+CENT = Decimal("0.01")
 
 
 class BancolombiaParser(ExcelParserPort):
     """Parser for Bancolombia Excel files"""
 
     BANK_CODE = "BANCOLOMBIA"
+    EXPECTED_COLUMNS = ["Fecha", "Descripción", "Referencia", "Valor"]
+    # Format of dates stored as text in Bancolombia statements
+    DATE_FORMAT = "%d/%m/%Y"
 
-    def parse(self, file_content: bytes) -> List[RawTransaction]:
+    def parse(self, file_content: FileSource) -> List[RawTransaction]:
         """
         Parse Bancolombia Excel files
         Expected format: Fecha (Date), Descripción (Description), Referencia (Reference), Valor (Amount)
 
         Args:
-            file_content: The Excel file content as bytes
+            file_content: The Excel file content as bytes or a binary file object
 
         Returns:
             List of raw transactions
@@ -24,28 +35,169 @@ class BancolombiaParser(ExcelParserPort):
         Raises:
             ValueError: If the file doesn't have the expected format
         """
-        df = pd.read_excel(BytesIO(file_content))
-
-        # Validate expected columns
-        expected_columns = ["Fecha", "Descripción", "Referencia", "Valor"]
-        if not all(col in df.columns for col in expected_columns):
-            raise ValueError(
-                f"File does not have the expected Bancolombia format. "
-                f"Expected columns: {expected_columns}"
-            )
-
         transactions = []
-        for _, row in df.iterrows():
-            transaction = RawTransaction(
-                date=pd.to_datetime(row["Fecha"]),
-                description=str(row["Descripción"]),
-                reference=str(row["Referencia"]) if pd.notna(row["Referencia"]) else None,
-                amount=Decimal(str(row["Valor"])),
+        for chunk in self.iter_chunks(file_content, chunk_size=1000):
+            amounts = map(Decimal.scaleb, map(Decimal, chunk.amounts.tolist()), repeat(-2))
+            transactions.extend(
+                map(
+                    RawTransaction,
+                    chunk.dates.tolist(),
+                    chunk.descriptions.tolist(),
+                    chunk.references.tolist(),
+                    amounts,
+                )
             )
-            transactions.append(transaction)
-
         return transactions
 
+    def iter_chunks(
+        self, file_content: FileSource, chunk_size: int
+    ) -> Iterator[TransactionChunk]:
+        """
+        Stream the file in columnar chunks of at most chunk_size transactions.
+
+        The workbook is opened in openpyxl read-only mode, so rows are read
+        from the sheet XML as they are consumed and only the current chunk
+        is held in memory.
+
+        Args:
+            file_content: The Excel file content as bytes or a binary file object
+            chunk_size: Maximum number of transactions per chunk
+
+        Yields:
+            TransactionChunk blocks of the file, in order
+
+        Raises:
+            ValueError: If the file doesn't have the expected format
+        """
+        with self._open_rows(file_content) as (rows, columns):
+            chunk_rows = []
+            for row in rows:
+                if self._is_empty(row):
+                    continue
+                chunk_rows.append(row)
+                if len(chunk_rows) >= chunk_size:
+                    yield self._convert_rows(chunk_rows, columns)
+                    chunk_rows = []
+            if chunk_rows:
+                yield self._convert_rows(chunk_rows, columns)
+
+    def count_rows(self, file_content: FileSource) -> int:
+        """
+        Count the transactions in the file without converting them
+
+        Raises:
+            ValueError: If the file doesn't have the expected format
+        """
+        with self._open_rows(file_content) as (rows, _):
+            return sum(1 for row in rows if not self._is_empty(row))
+
     def get_bank_code(self) -> str:
         """Get the bank code for this parser"""
         return self.BANK_CODE
+
+    @contextmanager
+    def _open_rows(self, file_content: FileSource):
+        """
+        Open the first sheet in read-only mode and validate its header
+
+        Yields:
+            Tuple of (row iterator positioned after the header, column index by name)
+        """
+        source = BytesIO(file_content) if isinstance(file_content, bytes) else file_content
+        if hasattr(source, "seek"):
+            source.seek(0)
+
+        workbook = load_workbook(source, read_only=True, data_only=True)
+        try:
+            rows = workbook.worksheets[0].iter_rows(values_only=True)
+            header = next(rows, ())
+            columns = {name: index for index, name in enumerate(header) if name is not None}
+
+            # Validate expected columns
+            if not all(col in columns for col in self.EXPECTED_COLUMNS):
+                raise ValueError(
+                    f"File does not have the expected Bancolombia format. "
+                    f"Expected columns: {self.EXPECTED_COLUMNS}"
+                )
+
+            yield rows, columns
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def _is_empty(row: tuple) -> bool:
+        """Blank rows are skipped, as pandas does when reading the sheet"""
+        return all(value is None or value == "" for value in row)
+
+    def _convert_rows(self, rows: List[tuple], columns: Dict[str, int]) -> TransactionChunk:
+        """
+        Convert a chunk of sheet rows into a columnar TransactionChunk
+
+        Dates are parsed once per column with DATE_FORMAT, amounts are scaled
+        to integer cents in a single NumPy operation and empty references are
+        resolved with a column mask.
+        """
+        width = max(columns.values()) + 1
+        if min(map(len, rows)) < width:
+            # Pad short rows (trailing empty cells) so every column has one value per row
+            rows = [row + (None,) * (width - len(row)) for row in rows]
+        table = list(zip(*rows))
+
+        references = np.array(table[columns["Referencia"]], dtype=object)
+        has_reference = (references != None) & (references != "")  # noqa: E711
+        references[has_reference] = references[has_reference].astype(str)
+        references[~has_reference] = None
+
+        descriptions = np.array(table[columns["Descripción"]], dtype=object)
+        missing_description = descriptions == None  # noqa: E711
+        descriptions[missing_description] = ""
+        if not all(isinstance(value, str) for value in descriptions):
+            descriptions = descriptions.astype(str).astype(object)
+
+        return TransactionChunk(
+            dates=self._convert_dates(table[columns["Fecha"]]),
+            amounts=self._convert_amounts(table[columns["Valor"]]),
+            descriptions=descriptions,
+            references=references,
+        )
+
+    def _convert_dates(self, values: tuple) -> np.ndarray:
+        """
+        Convert a date column to datetime64
+
+        Date cells already come out of openpyxl as datetimes and convert
+        directly. Text dates are parsed in one pass with DATE_FORMAT; values
+        in any other format fall back to pandas inference.
+        """
+        if all(isinstance(value, datetime) for value in values):
+            dates = pd.DatetimeIndex(values)
+        else:
+            raw = pd.Series(values, dtype=object)
+            dates = pd.to_datetime(raw, format=self.DATE_FORMAT, errors="coerce")
+            unparsed = dates.isna() & raw.notna()
+            if unparsed.any():
+                dates[unparsed] = [pd.to_datetime(value) for value in raw[unparsed]]
+        return np.asarray(dates, dtype="datetime64[us]")
+
+    @staticmethod
+    def _convert_amounts(values: tuple) -> np.ndarray:
+        """
+        Convert an amount column to exact integer cents
+
+        Half cents round away from zero, as the stored Decimal(str(value))
+        did in the DECIMAL(…, 2) column. np.rint rounds them to even, and the
+        float product can land just below .5 (2.675 * 100 = 267.4999…), so
+        values within reach of a half cent are rounded through Decimal.
+        """
+        amounts = np.asarray(values, dtype=np.float64)
+        if not np.isfinite(amounts).all():
+            raise ValueError("File contains rows with an empty or invalid Valor")
+        cents = amounts * 100
+        rounded = np.rint(cents)
+        halves = np.abs(np.abs(cents - np.trunc(cents)) - 0.5) < 1e-6
+        if halves.any():
+            rounded[halves] = [
+                Decimal(str(amount)).quantize(CENT, rounding=ROUND_HALF_UP) * 100
+                for amount in amounts[halves].tolist()
+            ]
+        return rounded.astype(np.int64)
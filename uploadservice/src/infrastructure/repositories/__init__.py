@@ -3,6 +3,10 @@ from .mysql_bank_repository import MySQLBankRepository
 from .mysql_category_repository import MySQLCategoryRepository
 from .mysql_transaction_batch_repository import MySQLTransactionBatchRepository
 from .mysql_user_repository import MySQLUserRepository
+from .mysql_prediction_cache_repository import MySQLPredictionCacheRepository
+from .mysql_merchant_rule_repository import MySQLMerchantRuleRepository
+from .mysql_category_correction_repository import MySQLCategoryCorrectionRepository
+from .mysql_reclassification_job_repository import MySQLReclassificationJobRepository
 
 __all__ = [
     "MySQLTransactionRepository",
@@ -10,4 +14,8 @@ __all__ = [
     "MySQLCategoryRepository",
     "MySQLTransactionBatchRepository",
     "MySQLUserRepository",
+    "MySQLPredictionCacheRepository",
+    "MySQLMerchantRuleRepository",
+    "MySQLCategoryCorrectionRepository",
+    "MySQLReclassificationJobRepository",
 ]
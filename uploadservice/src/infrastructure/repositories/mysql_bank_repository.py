@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ...domain.ports import BankRepositoryPort
@@ -36,6 +36,11 @@ class MySQLBankRepository(BankRepositoryPort):
         model = result.scalar_one_or_none()
         return self._to_entity(model) if model else None
 
+    async def get_all(self) -> List[Bank]:
+        """Get all banks"""
+        result = await self.session.execute(select(BankModel))
+        return [self._to_entity(model) for model in result.scalars()]
+
     def _to_model(self, entity: Bank) -> BankModel:
         """Convert domain entity to database model"""
         return BankModel(
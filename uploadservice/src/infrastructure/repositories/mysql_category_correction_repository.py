@@ -0,0 +1,73 @@
+from typing import List, Sequence
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from ...domain.ports import CategoryCorrectionRepositoryPort
+from ...domain.entities import CategoryCorrection
+from ..database.models import CategoryCorrectionModel, CategoryModel
+
+
+class MySQLCategoryCorrectionRepository(CategoryCorrectionRepositoryPort):
+    """MySQL implementation of the Category Correction repository"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def save(self, correction: CategoryCorrection) -> CategoryCorrection:
+        """Record a category correction"""
+        model = self._to_model(correction)
+        self.session.add(model)
+        await self.session.flush()
+        await self.session.refresh(model)
+        return self._to_entity(model, correction.category)
+
+    async def get_after(self, id_correction: int, limit: int) -> List[CategoryCorrection]:
+        """Get the corrections recorded after id_correction, oldest first"""
+        result = await self.session.execute(
+            select(CategoryCorrectionModel, CategoryModel.description)
+            .join(CategoryModel, CategoryModel.id_category == CategoryCorrectionModel.id_category)
+            .where(CategoryCorrectionModel.id_correction > id_correction)
+            .order_by(CategoryCorrectionModel.id_correction)
+            .limit(limit)
+        )
+        return [self._to_entity(model, category) for model, category in result.all()]
+
+    async def get_by_descriptions(
+        self, descriptions: Sequence[str], through: int
+    ) -> List[CategoryCorrection]:
+        """Get the corrections of these descriptions recorded up to id_correction through, oldest first"""
+        if not descriptions:
+            return []
+        result = await self.session.execute(
+            select(CategoryCorrectionModel)
+            .where(
+                CategoryCorrectionModel.description.in_(set(descriptions)),
+                CategoryCorrectionModel.id_correction <= through,
+            )
+            .order_by(CategoryCorrectionModel.id_correction)
+        )
+        return [self._to_entity(model) for model in result.scalars().all()]
+
+    def _to_model(self, entity: CategoryCorrection) -> CategoryCorrectionModel:
+        """Convert domain entity to database model"""
+        return CategoryCorrectionModel(
+            id_correction=entity.id_correction,
+            id_user=str(entity.id_user),
+            id_transaction=str(entity.id_transaction) if entity.id_transaction else None,
+            description=entity.description,
+            value=entity.value,
+            id_category=entity.id_category,
+        )
+
+    def _to_entity(self, model: CategoryCorrectionModel, category: str = None) -> CategoryCorrection:
+        """Convert database model to domain entity"""
+        return CategoryCorrection(
+            id_correction=model.id_correction,
+            id_user=UUID(model.id_user),
+            description=model.description,
+            id_category=model.id_category,
+            value=model.value,
+            id_transaction=UUID(model.id_transaction) if model.id_transaction else None,
+            category=category,
+            created_at=model.created_at,
+        )
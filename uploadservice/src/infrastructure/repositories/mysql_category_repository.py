@@ -1,9 +1,10 @@
-from typing import Optional
+from typing import Optional, List, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from ...domain.ports import CategoryRepositoryPort
 from ...domain.entities import Category
-from ..database.models import CategoryModel
+from ..database.models import CategoryModel, generate_uuid
+from ..database.inserts import insert_skipping_duplicates
 
 
 class MySQLCategoryRepository(CategoryRepositoryPort):
@@ -36,6 +37,36 @@ class MySQLCategoryRepository(CategoryRepositoryPort):
         model = result.scalar_one_or_none()
         return self._to_entity(model) if model else None
 
+    async def get_all(self) -> List[Category]:
+        """Get all categories"""
+        result = await self.session.execute(select(CategoryModel))
+        return [self._to_entity(model) for model in result.scalars()]
+
+    async def upsert_many(self, descriptions: Sequence[str]) -> List[Category]:
+        """
+        Create the missing categories with a single INSERT and return all of them.
+
+        Rows whose description already exists are skipped by the unique index
+        on description, so concurrent uploads creating the same category don't
+        produce duplicates; every caller reads back the row that won.
+        """
+        descriptions = list(dict.fromkeys(descriptions))
+        if not descriptions:
+            return []
+
+        await self.session.execute(
+            insert_skipping_duplicates(self.session, CategoryModel.__table__, "description"),
+            [
+                {"id_category": generate_uuid(), "description": description}
+                for description in descriptions
+            ],
+        )
+
+        result = await self.session.execute(
+            select(CategoryModel).where(CategoryModel.description.in_(descriptions))
+        )
+        return [self._to_entity(model) for model in result.scalars()]
+
     def _to_model(self, entity: Category) -> CategoryModel:
         """Convert domain entity to database model"""
         return CategoryModel(
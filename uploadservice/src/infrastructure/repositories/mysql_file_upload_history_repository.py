@@ -2,13 +2,19 @@
 MySQL implementation of FileUploadHistoryRepositoryPort.
 Handles persistence of file upload history records.
 """
-from typing import Optional
+from dataclasses import replace
+from datetime import datetime
+from typing import List, Optional, Sequence
 from uuid import uuid4
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import insert, func, distinct
 from sqlalchemy.future import select
 from ...domain.ports.file_upload_history_repository_port import FileUploadHistoryRepositoryPort
 from ...domain.entities.file_upload_history import FileUploadHistory
+from ...domain.entities.transaction_batch import TransactionBatch
 from ..database.file_upload_history_model import FileUploadHistoryModel
+from ..database.models import TransactionBatchModel
+from .mysql_transaction_batch_repository import UNFINISHED_STATUSES, unfinished_since
 
 
 class MySQLFileUploadHistoryRepository(FileUploadHistoryRepositoryPort):
@@ -52,6 +58,111 @@ class MySQLFileUploadHistoryRepository(FileUploadHistoryRepositoryPort):
 
         return self._to_entity(model)
 
+    async def get_by_hashes(
+        self, user_id: str, file_hashes: Sequence[str]
+    ) -> List[FileUploadHistory]:
+        """
+        Find the file upload records of a user matching any of the given hashes.
+
+        All hashes are looked up in one IN (...) query on the (id_user, file_hash)
+        index, instead of one query per file.
+
+        Args:
+            user_id: The user who uploaded the files (UUID as string)
+            file_hashes: SHA256 hashes of the file contents
+
+        Returns:
+            The matching records (empty list if none of the files was uploaded before)
+        """
+        if not file_hashes:
+            return []
+
+        query = select(FileUploadHistoryModel).where(
+            FileUploadHistoryModel.id_user == user_id,
+            FileUploadHistoryModel.file_hash.in_(list(set(file_hashes)))
+        )
+        result = await self.session.execute(query)
+        return [self._to_entity(model) for model in result.scalars()]
+
+    async def register_batch(
+        self, batch: TransactionBatch, file_uploads: Sequence[FileUploadHistory]
+    ) -> TransactionBatch:
+        """
+        Save a new transaction batch together with the upload records of its files.
+
+        IDs are generated client-side, so the batch and all the records are
+        written with two INSERT statements (the records as one executemany)
+        and a single commit.
+
+        Args:
+            batch: The batch to create
+            file_uploads: One record per uploaded file; their id_batch is set to the batch's
+
+        Returns:
+            The saved batch with its generated ID
+        """
+        if batch.id_batch is None:
+            batch = replace(batch, id_batch=uuid4())
+
+        await self.session.execute(
+            insert(TransactionBatchModel.__table__),
+            {
+                "id_batch": str(batch.id_batch),
+                "process_status": batch.process_status,
+                "start_date": batch.start_date,
+                "end_date": batch.end_date,
+                "batch_size": batch.batch_size,
+            },
+        )
+        if file_uploads:
+            await self.session.execute(
+                insert(FileUploadHistoryModel.__table__),
+                [
+                    {
+                        "id_file": file_upload.id_file or str(uuid4()),
+                        "id_user": file_upload.id_user,
+                        "file_hash": file_upload.file_hash,
+                        "file_name": file_upload.file_name,
+                        "bank_code": file_upload.bank_code,
+                        "upload_date": file_upload.upload_date,
+                        "id_batch": str(batch.id_batch),
+                        "file_size": file_upload.file_size,
+                    }
+                    for file_upload in file_uploads
+                ],
+            )
+        await self.session.commit()
+
+        return batch
+
+    async def count_unfinished_batches(
+        self, user_id: str, processing_since: Optional[datetime] = None
+    ) -> int:
+        """
+        Count the batches of a user that are queued or being processed.
+
+        Args:
+            user_id: The user who uploaded the files (UUID as string)
+            processing_since: Only count processing batches that changed at or
+                after this time; queued ones always count
+
+        Returns:
+            Number of the user's batches in the pending or processing state
+        """
+        statement = (
+            select(func.count(distinct(FileUploadHistoryModel.id_batch)))
+            .join(
+                TransactionBatchModel,
+                TransactionBatchModel.id_batch == FileUploadHistoryModel.id_batch,
+            )
+            .where(FileUploadHistoryModel.id_user == user_id)
+            .where(TransactionBatchModel.process_status.in_(UNFINISHED_STATUSES))
+        )
+        if processing_since is not None:
+            statement = statement.where(unfinished_since(processing_since))
+        result = await self.session.execute(statement)
+        return result.scalar_one()
+
     async def save(self, file_upload: FileUploadHistory) -> FileUploadHistory:
         """
         Save a new file upload history record.
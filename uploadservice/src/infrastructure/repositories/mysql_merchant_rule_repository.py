@@ -0,0 +1,97 @@
+from typing import List, Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, delete, or_
+from ...domain.ports import MerchantRuleRepositoryPort
+from ...domain.entities import MerchantRule
+from ..database.models import MerchantRuleModel, CategoryModel
+
+
+class MySQLMerchantRuleRepository(MerchantRuleRepositoryPort):
+    """MySQL implementation of the Merchant Rule repository"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_applicable(self, id_user: UUID) -> List[MerchantRule]:
+        """Get the global rules and the rules of a user in one query"""
+        result = await self.session.execute(
+            select(MerchantRuleModel, CategoryModel.description)
+            .join(CategoryModel, CategoryModel.id_category == MerchantRuleModel.id_category)
+            .where(
+                or_(
+                    MerchantRuleModel.id_user.is_(None),
+                    MerchantRuleModel.id_user == str(id_user),
+                )
+            )
+            .order_by(MerchantRuleModel.created_at)
+        )
+        return [self._to_entity(model, category) for model, category in result.all()]
+
+    async def get_all(self) -> List[MerchantRule]:
+        """Get every rule, global and per user"""
+        result = await self.session.execute(
+            select(MerchantRuleModel, CategoryModel.description)
+            .join(CategoryModel, CategoryModel.id_category == MerchantRuleModel.id_category)
+            .order_by(MerchantRuleModel.created_at)
+        )
+        return [self._to_entity(model, category) for model, category in result.all()]
+
+    async def save(self, rule: MerchantRule) -> MerchantRule:
+        """Save a merchant rule to the database"""
+        model = self._to_model(rule)
+        self.session.add(model)
+        await self.session.flush()
+        await self.session.refresh(model)
+        return self._to_entity(model, rule.category)
+
+    async def update(self, rule: MerchantRule) -> bool:
+        """Update a rule of rule.id_user, or a global rule if it is None"""
+        result = await self.session.execute(
+            update(MerchantRuleModel)
+            .where(MerchantRuleModel.id_rule == str(rule.id_rule), self._owned_by(rule.id_user))
+            .values(
+                pattern=rule.pattern,
+                match_type=rule.match_type,
+                id_category=rule.id_category,
+            )
+        )
+        return result.rowcount > 0
+
+    async def delete(self, id_rule: UUID, id_user: Optional[UUID]) -> bool:
+        """Delete a rule of the user, or a global rule if id_user is None"""
+        result = await self.session.execute(
+            delete(MerchantRuleModel).where(
+                MerchantRuleModel.id_rule == str(id_rule),
+                self._owned_by(id_user),
+            )
+        )
+        return result.rowcount > 0
+
+    @staticmethod
+    def _owned_by(id_user: Optional[UUID]):
+        """Rules of the user, or the global rules if id_user is None"""
+        if id_user is None:
+            return MerchantRuleModel.id_user.is_(None)
+        return MerchantRuleModel.id_user == str(id_user)
+
+    def _to_model(self, entity: MerchantRule) -> MerchantRuleModel:
+        """Convert domain entity to database model"""
+        return MerchantRuleModel(
+            id_rule=str(entity.id_rule) if entity.id_rule else None,
+            id_user=str(entity.id_user) if entity.id_user else None,
+            pattern=entity.pattern,
+            match_type=entity.match_type,
+            id_category=entity.id_category,
+        )
+
+    def _to_entity(self, model: MerchantRuleModel, category: str = None) -> MerchantRule:
+        """Convert database model to domain entity"""
+        return MerchantRule(
+            id_rule=UUID(model.id_rule) if model.id_rule else None,
+            pattern=model.pattern,
+            match_type=model.match_type,
+            id_category=model.id_category,
+            id_user=UUID(model.id_user) if model.id_user else None,
+            category=category,
+        )
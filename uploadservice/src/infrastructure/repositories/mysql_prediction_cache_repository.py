@@ -0,0 +1,43 @@
+from typing import Dict, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from ...domain.ports import PredictionCacheRepositoryPort
+from ..database.inserts import insert_skipping_duplicates
+from ..database.models import ClassificationCacheModel
+
+
+class MySQLPredictionCacheRepository(PredictionCacheRepositoryPort):
+    """MySQL implementation of the shared classifier prediction cache"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_many(self, cache_keys: Sequence[str]) -> Dict[str, str]:
+        """Get the cached categories of the given keys with a single IN query"""
+        if not cache_keys:
+            return {}
+        result = await self.session.execute(
+            select(ClassificationCacheModel.cache_key, ClassificationCacheModel.category)
+            .where(ClassificationCacheModel.cache_key.in_(cache_keys))
+        )
+        return dict(result.all())
+
+    async def save_many(self, model_version: str, categories: Dict[str, str]) -> None:
+        """
+        Store predictions with a single INSERT, skipping keys already cached.
+
+        Workers that predicted the same key concurrently computed the same
+        category, so whichever row is kept is correct.
+        """
+        if not categories:
+            return
+        statement = insert_skipping_duplicates(
+            self.session, ClassificationCacheModel.__table__, "cache_key"
+        )
+        await self.session.execute(
+            statement,
+            [
+                {"cache_key": cache_key, "model_version": model_version, "category": category}
+                for cache_key, category in categories.items()
+            ],
+        )
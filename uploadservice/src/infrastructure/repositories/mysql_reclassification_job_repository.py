@@ -0,0 +1,73 @@
+from typing import Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
+from ...domain.ports import ReclassificationJobRepositoryPort
+from ...domain.entities import ReclassificationJob
+from ..database.models import ReclassificationJobModel
+
+
+class MySQLReclassificationJobRepository(ReclassificationJobRepositoryPort):
+    """MySQL implementation of the Reclassification Job repository"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def save(self, job: ReclassificationJob) -> ReclassificationJob:
+        """Save a reclassification job to the database"""
+        self.session.add(self._to_model(job))
+        await self.session.flush()
+        return job
+
+    async def get_running(self) -> Optional[ReclassificationJob]:
+        """Get the most recent job that is still running"""
+        result = await self.session.execute(
+            select(ReclassificationJobModel)
+            .where(ReclassificationJobModel.status == ReclassificationJob.STATUS_RUNNING)
+            .order_by(ReclassificationJobModel.start_date.desc())
+            .limit(1)
+        )
+        model = result.scalar_one_or_none()
+        return self._to_entity(model) if model else None
+
+    async def update(self, job: ReclassificationJob) -> ReclassificationJob:
+        """Write the status and checkpoint of a job without loading it"""
+        await self.session.execute(
+            update(ReclassificationJobModel)
+            .where(ReclassificationJobModel.id_job == str(job.id_job))
+            .values(
+                status=job.status,
+                model_version=job.model_version,
+                last_id_transaction=job.last_id_transaction,
+                scanned_records=job.scanned_records,
+                changed_records=job.changed_records,
+                end_date=job.end_date,
+            )
+        )
+        return job
+
+    def _to_model(self, entity: ReclassificationJob) -> ReclassificationJobModel:
+        """Convert domain entity to database model"""
+        return ReclassificationJobModel(
+            id_job=str(entity.id_job),
+            status=entity.status,
+            model_version=entity.model_version,
+            last_id_transaction=entity.last_id_transaction,
+            scanned_records=entity.scanned_records,
+            changed_records=entity.changed_records,
+            start_date=entity.start_date,
+            end_date=entity.end_date,
+        )
+
+    def _to_entity(self, model: ReclassificationJobModel) -> ReclassificationJob:
+        """Convert database model to domain entity"""
+        return ReclassificationJob(
+            id_job=UUID(model.id_job),
+            status=model.status,
+            start_date=model.start_date,
+            model_version=model.model_version,
+            last_id_transaction=model.last_id_transaction,
+            scanned_records=model.scanned_records,
+            changed_records=model.changed_records,
+            end_date=model.end_date,
+        )
@@ -1,11 +1,23 @@
+from datetime import datetime
 from typing import Optional
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, func, or_
 from ...domain.ports import TransactionBatchRepositoryPort
 from ...domain.entities import TransactionBatch
 from ..database.models import TransactionBatchModel
 
+UNFINISHED_STATUSES = ("pending", "processing")
+
+
+def unfinished_since(processing_since: datetime):
+    """Unfinished batches that are waiting, or processing and changed at or after processing_since"""
+    # Waiting batches don't change until a worker takes them, however long the queue
+    return or_(
+        TransactionBatchModel.process_status == "pending",
+        TransactionBatchModel.updated_at >= processing_since,
+    )
+
 
 class MySQLTransactionBatchRepository(TransactionBatchRepositoryPort):
     """MySQL implementation of the Transaction Batch repository"""
@@ -39,11 +51,50 @@ class MySQLTransactionBatchRepository(TransactionBatchRepositoryPort):
             model.process_status = batch.process_status
             model.end_date = batch.end_date
             model.batch_size = batch.batch_size
+            model.processing_start_date = batch.processing_start_date
             await self.session.flush()
             await self.session.refresh(model)
             return self._to_entity(model)
         return batch
 
+    async def record_progress(
+        self,
+        id_batch: UUID,
+        processed_records: int,
+        rule_matched_records: Optional[int] = None,
+    ) -> None:
+        """Move the checkpoint of a batch forward without loading it"""
+        values = {"processed_records": processed_records}
+        if rule_matched_records is not None:
+            values["rule_matched_records"] = rule_matched_records
+        await self.session.execute(
+            update(TransactionBatchModel)
+            .where(TransactionBatchModel.id_batch == str(id_batch))
+            .where(TransactionBatchModel.processed_records < processed_records)
+            .values(**values)
+        )
+
+    async def count_processing(self) -> int:
+        """Count the batches in the processing state"""
+        result = await self.session.execute(
+            select(func.count())
+            .select_from(TransactionBatchModel)
+            .where(TransactionBatchModel.process_status == "processing")
+        )
+        return result.scalar_one()
+
+    async def count_unfinished(self, processing_since: Optional[datetime] = None) -> int:
+        """Count the pending batches, and the processing ones that changed at or after processing_since"""
+        statement = (
+            select(func.count())
+            .select_from(TransactionBatchModel)
+            .where(TransactionBatchModel.process_status.in_(UNFINISHED_STATUSES))
+        )
+        if processing_since is not None:
+            statement = statement.where(unfinished_since(processing_since))
+        result = await self.session.execute(statement)
+        return result.scalar_one()
+
     def _to_model(self, entity: TransactionBatch) -> TransactionBatchModel:
         """Convert domain entity to database model"""
         return TransactionBatchModel(
@@ -52,6 +103,9 @@ class MySQLTransactionBatchRepository(TransactionBatchRepositoryPort):
             start_date=entity.start_date,
             end_date=entity.end_date,
             batch_size=entity.batch_size,
+            processed_records=entity.processed_records,
+            processing_start_date=entity.processing_start_date,
+            rule_matched_records=entity.rule_matched_records,
         )
 
     def _to_entity(self, model: TransactionBatchModel) -> TransactionBatch:
@@ -62,4 +116,7 @@ class MySQLTransactionBatchRepository(TransactionBatchRepositoryPort):
             start_date=model.start_date,
             end_date=model.end_date,
             batch_size=model.batch_size,
+            processed_records=model.processed_records,
+            processing_start_date=model.processing_start_date,
+            rule_matched_records=model.rule_matched_records,
         )
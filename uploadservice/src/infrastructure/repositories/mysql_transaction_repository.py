@@ -1,27 +1,100 @@
-from typing import List, Optional
-from uuid import UUID
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+from dataclasses import replace
+from decimal import Decimal
+from itertools import repeat
+import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, case
 from ...domain.ports import TransactionRepositoryPort
-from ...domain.entities import Transaction
-from ..database.models import TransactionModel
+from ...domain.entities import Transaction, TransactionChunk
+from ..database.inserts import insert_skipping_duplicates
+from ..database.models import TransactionModel, CategoryCorrectionModel
 
 
 class MySQLTransactionRepository(TransactionRepositoryPort):
     """MySQL implementation of the Transaction repository"""
 
+    # Rows per UPDATE ... CASE statement in update_categories
+    UPDATE_GROUP_SIZE = 1000
+
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def save_batch(self, transactions: List[Transaction]) -> List[Transaction]:
-        """Save a batch of transactions to the database"""
-        models = [self._to_model(tx) for tx in transactions]
-        self.session.add_all(models)
-        await self.session.flush()
-        # Refresh to load generated IDs
-        for model in models:
-            await self.session.refresh(model)
-        return [self._to_entity(model) for model in models]
+        """
+        Save a batch of transactions to the database
+
+        IDs are generated client-side and the rows are sent as one executemany
+        INSERT, which the MySQL driver rewrites into multi-row INSERT
+        statements. The returned entities carry their IDs, so nothing is read back.
+        """
+        if not transactions:
+            return []
+
+        saved = [
+            replace(tx, id_transaction=tx.id_transaction or uuid4()) for tx in transactions
+        ]
+        await self.session.execute(
+            insert(TransactionModel.__table__), [self._to_row(tx) for tx in saved]
+        )
+        return saved
+
+    async def save_chunk(
+        self,
+        chunk: TransactionChunk,
+        category_ids: np.ndarray,
+        id_user: str,
+        id_bank: Optional[str],
+        id_batch: Optional[UUID],
+    ) -> int:
+        """
+        Save a columnar chunk with a single executemany INSERT
+
+        Columns are converted to driver values in bulk and no ORM objects
+        are created; the only per-row structure is the parameter set the
+        driver needs for each row. IDs are generated client-side.
+
+        Each row is keyed by (id_batch, batch_row), where batch_row is its
+        ordinal in the batch (chunk.first_row onwards). Rows whose key already
+        exists are skipped, so a chunk written again by a retried batch
+        doesn't duplicate transactions; any other error still raises.
+        """
+        if not len(chunk):
+            return 0
+
+        # Values are stored as positive amounts, the sign goes to transaction_type
+        values = map(Decimal.scaleb, map(Decimal, np.abs(chunk.amounts).tolist()), repeat(-2))
+        id_user = str(id_user)
+        id_batch = str(id_batch) if id_batch else None
+
+        params = [
+            {
+                "id_transaction": str(uuid4()),
+                "id_user": id_user,
+                "id_bank": id_bank,
+                "id_category": id_category,
+                "id_batch": id_batch,
+                "transaction_date": transaction_date,
+                "transaction_name": transaction_name,
+                "value": value,
+                "transaction_type": transaction_type,
+                "batch_row": batch_row,
+            }
+            for id_category, transaction_date, transaction_name, value, transaction_type, batch_row in zip(
+                category_ids.tolist(),
+                chunk.dates.tolist(),
+                chunk.descriptions.tolist(),
+                values,
+                chunk.transaction_types.tolist(),
+                range(chunk.first_row, chunk.first_row + len(chunk)),
+            )
+        ]
+        statement = insert_skipping_duplicates(
+            self.session, TransactionModel.__table__, "batch_row"
+        )
+        await self.session.execute(statement, params)
+        return len(params)
 
     async def get_by_id(self, id_transaction: UUID) -> Optional[Transaction]:
         """Get a transaction by its ID"""
@@ -31,20 +104,79 @@ class MySQLTransactionRepository(TransactionRepositoryPort):
         model = result.scalar_one_or_none()
         return self._to_entity(model) if model else None
 
-    def _to_model(self, entity: Transaction) -> TransactionModel:
-        """Convert domain entity to database model"""
-        return TransactionModel(
-            id_transaction=str(entity.id_transaction) if entity.id_transaction else None,
-            id_user=str(entity.id_user),
-            id_bank=entity.id_bank,  # Bank ID is already a string
-            id_category=entity.id_category,  # Category ID is already a string
-            id_batch=str(entity.id_batch) if entity.id_batch else None,
-            transaction_date=entity.transaction_date,
-            transaction_name=entity.transaction_name,
-            value=entity.value,
-            transaction_type=entity.transaction_type,
+    async def update_category(self, id_transaction: UUID, id_category: str) -> None:
+        """Set the category of a transaction without loading it"""
+        await self.session.execute(
+            update(TransactionModel)
+            .where(TransactionModel.id_transaction == str(id_transaction))
+            .values(id_category=id_category)
         )
 
+    async def get_page_after(
+        self, id_transaction: Optional[str], limit: int
+    ) -> List[Transaction]:
+        """
+        Get the next page in primary key order
+
+        Seeks past id_transaction on the primary key index instead of
+        using OFFSET, so every page costs the same however deep the job is.
+        """
+        corrected = select(CategoryCorrectionModel.id_correction).where(
+            CategoryCorrectionModel.id_transaction == TransactionModel.id_transaction
+        )
+        query = select(TransactionModel).where(~corrected.exists())
+        if id_transaction is not None:
+            query = query.where(TransactionModel.id_transaction > id_transaction)
+        result = await self.session.execute(
+            query.order_by(TransactionModel.id_transaction).limit(limit)
+        )
+        return [self._to_entity(model) for model in result.scalars()]
+
+    async def update_categories(
+        self, categories: Dict[UUID, str], previous: Dict[UUID, str]
+    ) -> int:
+        """
+        Set many categories with grouped UPDATE ... CASE statements
+
+        Each statement updates up to UPDATE_GROUP_SIZE rows:
+
+            UPDATE Transaction SET id_category = CASE id_transaction WHEN ... END
+            WHERE id_transaction IN (...)
+              AND id_category = CASE id_transaction WHEN ... END
+        """
+        updated = 0
+        ids = list(categories)
+        for start in range(0, len(ids), self.UPDATE_GROUP_SIZE):
+            group = [str(id_transaction) for id_transaction in ids[start:start + self.UPDATE_GROUP_SIZE]]
+            new = {key: categories[UUID(key)] for key in group}
+            old = {key: previous[UUID(key)] for key in group}
+            result = await self.session.execute(
+                update(TransactionModel)
+                .where(
+                    TransactionModel.id_transaction.in_(group),
+                    TransactionModel.id_category == case(old, value=TransactionModel.id_transaction),
+                )
+                .values(id_category=case(new, value=TransactionModel.id_transaction))
+                .execution_options(synchronize_session=False)
+            )
+            updated += result.rowcount
+        return updated
+
+    def _to_row(self, entity: Transaction) -> dict:
+        """Convert domain entity to INSERT parameters"""
+        return {
+            "id_transaction": str(entity.id_transaction),
+            "id_user": str(entity.id_user),
+            "id_bank": entity.id_bank,
+            "id_category": entity.id_category,
+            "id_batch": str(entity.id_batch) if entity.id_batch else None,
+            "transaction_date": entity.transaction_date,
+            "transaction_name": entity.transaction_name,
+            "value": entity.value,
+            "transaction_type": entity.transaction_type,
+            "batch_row": entity.batch_row,
+        }
+
     def _to_entity(self, model: TransactionModel) -> Transaction:
         """Convert database model to domain entity"""
         return Transaction(
@@ -57,4 +189,5 @@ class MySQLTransactionRepository(TransactionRepositoryPort):
             transaction_name=model.transaction_name,
             value=model.value,
             transaction_type=model.transaction_type,
+            batch_row=model.batch_row,
         )
@@ -0,0 +1,11 @@
+from .spooled_upload import SpooledUpload, FileTooLargeError, hash_upload, get_upload_limits
+from .local_file_storage import LocalFileStorage, get_file_storage
+
+__all__ = [
+    "SpooledUpload",
+    "FileTooLargeError",
+    "hash_upload",
+    "get_upload_limits",
+    "LocalFileStorage",
+    "get_file_storage",
+]
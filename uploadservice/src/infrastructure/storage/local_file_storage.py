@@ -0,0 +1,85 @@
+"""
+Uploaded file storage on a local or mounted directory.
+
+The API stores the files of a batch here and the workers read them back,
+so UPLOAD_STORAGE_PATH must point to a volume shared by both when they
+run on different nodes.
+"""
+import os
+import shutil
+import tempfile
+from typing import BinaryIO, Sequence
+from ...domain.ports import FileStoragePort
+
+
+class LocalFileStorage(FileStoragePort):
+    """
+    FileStoragePort implementation on a directory.
+
+    Files are stored as <base_path>/<id_batch>/<index>.xlsx; the storage key
+    is the path relative to base_path.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        os.makedirs(base_path, exist_ok=True)
+
+    def save(self, id_batch: str, index: int, file: BinaryIO) -> str:
+        """
+        Copy a file into the storage.
+
+        The content is written to a temporary name and renamed when complete,
+        so workers never see partially written files.
+        """
+        key = os.path.join(str(id_batch), f"{index}.xlsx")
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if hasattr(file, "seek"):
+            file.seek(0)
+        partial = f"{path}.part"
+        with open(partial, "wb") as target:
+            shutil.copyfileobj(file, target)
+        os.replace(partial, path)
+        return key
+
+    def open(self, key: str) -> BinaryIO:
+        """Open a stored file for reading"""
+        return open(self._path(key), "rb")
+
+    def delete(self, keys: Sequence[str]) -> None:
+        """Delete stored files and their batch directories once empty"""
+        directories = set()
+        for key in keys:
+            path = self._path(key)
+            directories.add(os.path.dirname(path))
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        for directory in directories:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass  # Not empty or already removed
+
+    def _path(self, key: str) -> str:
+        path = os.path.normpath(os.path.join(self.base_path, key))
+        if not path.startswith(os.path.normpath(self.base_path) + os.sep):
+            raise ValueError(f"Invalid storage key: {key}")
+        return path
+
+
+def get_file_storage() -> LocalFileStorage:
+    """
+    Build the uploaded file storage from the environment.
+
+    Environment Variables:
+        UPLOAD_STORAGE_PATH: Directory shared by the API and the workers
+            (default: flowlite-uploads in the system temp directory)
+    """
+    return LocalFileStorage(
+        os.getenv(
+            "UPLOAD_STORAGE_PATH", os.path.join(tempfile.gettempdir(), "flowlite-uploads")
+        )
+    )
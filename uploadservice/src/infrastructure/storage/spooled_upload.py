@@ -0,0 +1,103 @@
+"""
+Hashing of uploaded files.
+
+Starlette parses a multipart request completely before the route runs,
+spooling each file to a SpooledTemporaryFile (moved to disk above 1 MiB),
+so a file's size can only be checked once it was received. The size of
+the whole request is capped while it arrives instead, by
+RequestSizeLimitMiddleware. The uploads are then hashed where Starlette
+spooled them, in chunks, without another copy.
+"""
+import asyncio
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import BinaryIO
+
+# Bytes read from the upload at a time
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class FileTooLargeError(Exception):
+    """Exception raised when an uploaded file exceeds the size limit."""
+    def __init__(self, filename: str, max_size: int):
+        self.filename = filename
+        self.max_size = max_size
+        super().__init__(f"File {filename} exceeds the maximum size of {max_size} bytes")
+
+
+@dataclass
+class SpooledUpload:
+    """
+    An uploaded file spooled to memory or disk, with its hash.
+
+    Attributes:
+        file: Binary file object with the content, positioned at the start
+        file_hash: SHA256 hash of the content (64 hex characters)
+        filename: Original filename
+        file_size: Size of the content in bytes
+    """
+    file: BinaryIO
+    file_hash: str
+    filename: str
+    file_size: int
+
+    def close(self) -> None:
+        """Release the spooled content (deletes the temporary file, if any)"""
+        self.file.close()
+
+
+async def hash_upload(
+    file: BinaryIO,
+    filename: str,
+    max_size: int,
+    chunk_size: int = READ_CHUNK_SIZE,
+) -> SpooledUpload:
+    """
+    Hash an uploaded file in place, in a worker thread.
+
+    Args:
+        file: Spooled file of the upload, such as UploadFile.file
+        filename: Original filename
+        max_size: Maximum allowed size in bytes
+        chunk_size: Bytes read at a time
+
+    Returns:
+        SpooledUpload over the same file, positioned at the start
+
+    Raises:
+        FileTooLargeError: If the file exceeds max_size (nothing is read)
+    """
+    return await asyncio.to_thread(_hash_file, file, filename, max_size, chunk_size)
+
+
+def _hash_file(file: BinaryIO, filename: str, max_size: int, chunk_size: int) -> SpooledUpload:
+    size = file.seek(0, os.SEEK_END)
+    if size > max_size:
+        raise FileTooLargeError(filename, max_size)
+
+    file.seek(0)
+    sha256 = hashlib.sha256()
+    while chunk := file.read(chunk_size):
+        sha256.update(chunk)
+    file.seek(0)
+    return SpooledUpload(
+        file=file, file_hash=sha256.hexdigest(), filename=filename, file_size=size
+    )
+
+
+def get_upload_limits() -> tuple:
+    """
+    Read the upload size limits from the environment.
+
+    Environment Variables:
+        UPLOAD_MAX_FILE_BYTES: Maximum size of one uploaded file (default: 20 MiB)
+        UPLOAD_MAX_REQUEST_BYTES: Maximum size of a whole request body (default: 100 MiB)
+
+    Returns:
+        Tuple of (max_file_size, max_request_size) in bytes
+    """
+    return (
+        int(os.getenv("UPLOAD_MAX_FILE_BYTES", str(20 * 1024 * 1024))),
+        int(os.getenv("UPLOAD_MAX_REQUEST_BYTES", str(100 * 1024 * 1024))),
+    )
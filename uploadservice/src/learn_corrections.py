@@ -0,0 +1,170 @@
+"""
+Online learning from category corrections.
+
+Folds the category corrections users made since the CURRENT model was
+published into a new model version and publishes it:
+
+    python -m src.learn_corrections
+
+The model is shared by every user, so a correction is only learned once
+ML_ONLINE_LEARNING_MIN_USERS distinct users set the same category on the
+same description; one user can't relabel a merchant for everybody. Until
+then the correction only changes that user's transaction.
+
+The worker runs the same step every ML_ONLINE_LEARNING_SECONDS. Running API
+and worker processes switch to the new version on their next poll
+(ML_MODEL_RELOAD_SECONDS) or right away on SIGHUP.
+
+Environment Variables:
+    ML_MODELS_PATH: Directory of the training pickles (default: models/)
+    ML_ARTIFACTS_PATH: Directory of the artifacts (default: <models>/artifacts)
+    ML_ONLINE_LEARNING_MAX_CORRECTIONS: Most corrections learned per run (default: 5000)
+    ML_ONLINE_LEARNING_MIN_USERS: Distinct users who must agree on a correction (default: 3)
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import argparse
+import asyncio
+import logging
+import os
+from collections import defaultdict
+from typing import List, Optional, Tuple
+from sqlalchemy.orm import sessionmaker
+from .domain.entities import CategoryCorrection
+from .infrastructure.classifier.incremental_learner import (
+    LabeledDescription,
+    learned_through,
+    publish_corrections,
+)
+from .infrastructure.database import get_session_factory
+from .infrastructure.repositories import MySQLCategoryCorrectionRepository
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODELS_PATH = os.path.join(os.path.dirname(__file__), "..", "models")
+
+
+def get_model_paths() -> Tuple[str, str]:
+    """Directories of the training pickles and of the artifacts, as MLClassifier resolves them"""
+    models_path = os.getenv("ML_MODELS_PATH", DEFAULT_MODELS_PATH)
+    return models_path, os.getenv("ML_ARTIFACTS_PATH", os.path.join(models_path, "artifacts"))
+
+
+def get_max_corrections() -> int:
+    """Most corrections learned in one run; the rest wait for the next one"""
+    return int(os.getenv("ML_ONLINE_LEARNING_MAX_CORRECTIONS", "5000"))
+
+
+def get_min_users() -> int:
+    """Distinct users who must make the same correction before it is learned"""
+    return int(os.getenv("ML_ONLINE_LEARNING_MIN_USERS", "3"))
+
+
+def agreed_corrections(
+    corrections: List[CategoryCorrection],
+    history: List[CategoryCorrection],
+    min_users: int,
+) -> List[CategoryCorrection]:
+    """
+    The corrections whose description and category at least min_users
+    distinct users had set by the time they were made.
+
+    Args:
+        corrections: Corrections to learn
+        history: Every correction of the same descriptions up to the last
+            one of corrections, oldest first
+        min_users: Distinct users needed
+    """
+    users = defaultdict(set)
+    agreed = set()
+    for correction in history:
+        key = (correction.description, correction.id_category)
+        users[key].add(correction.id_user)
+        if len(users[key]) >= min_users:
+            agreed.add(correction.id_correction)
+    return [correction for correction in corrections if correction.id_correction in agreed]
+
+
+async def learn_pending_corrections(
+    session_factory: sessionmaker,
+    models_path: str,
+    artifacts_path: str,
+    max_corrections: int,
+    min_users: int,
+) -> Optional[str]:
+    """
+    Learn the corrections the CURRENT model hasn't seen and publish the result.
+
+    Only corrections min_users distinct users agree on are learned. The
+    others are passed over; one that gains agreement later is learned
+    with the correction that completes it.
+
+    Returns:
+        The published version, or None if there was nothing new to learn
+    """
+    through = await asyncio.to_thread(learned_through, artifacts_path)
+    async with session_factory() as session:
+        repo = MySQLCategoryCorrectionRepository(session)
+        corrections = await repo.get_after(through, max_corrections)
+        if not corrections:
+            return None
+        history = await repo.get_by_descriptions(
+            [correction.description for correction in corrections],
+            corrections[-1].id_correction,
+        )
+
+    agreed = agreed_corrections(corrections, history, min_users)
+    if not agreed and len(corrections) < max_corrections:
+        # Nothing to learn yet; a full page is published anyway so the
+        # next run reads past it
+        return None
+
+    examples = [
+        LabeledDescription(
+            description=correction.description,
+            value=float(correction.value) if correction.value is not None else None,
+            category=correction.category,
+        )
+        for correction in agreed
+    ]
+    return await asyncio.to_thread(
+        publish_corrections,
+        models_path,
+        artifacts_path,
+        examples,
+        corrections[-1].id_correction,
+    )
+
+
+async def run(max_corrections: int, min_users: int) -> None:
+    models_path, artifacts_path = get_model_paths()
+    version = await learn_pending_corrections(
+        get_session_factory(), models_path, artifacts_path, max_corrections, min_users
+    )
+    logger.info(f"Published model {version}" if version else "No new corrections to learn")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Learn new category corrections")
+    parser.add_argument(
+        "--max-corrections",
+        type=int,
+        default=get_max_corrections(),
+        help="Most corrections learned in this run",
+    )
+    parser.add_argument(
+        "--min-users",
+        type=int,
+        default=get_min_users(),
+        help="Distinct users who must agree on a correction",
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.max_corrections, args.min_users))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,20 +3,83 @@ from dotenv import load_dotenv
 # Load environment variables from .env file BEFORE importing any modules
 load_dotenv()
 
+import asyncio
+import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from .infrastructure.database import init_database
-from .api.routes import transactions_router, health_router, test_router
+from .infrastructure.cache import get_reference_data_cache
+from .infrastructure.messaging import (
+    get_job_queue,
+    connect_job_queue,
+    is_in_process_queue,
+    connect_message_broker,
+)
+from .infrastructure.executors import close_stage_executor
+from .infrastructure.storage import get_upload_limits
+from .worker import run_worker, get_worker_concurrency, start_model_reloading
+from .api.middleware import RequestSizeLimitMiddleware
+from .api.routes import (
+    transactions_router,
+    health_router,
+    test_router,
+    classification_router,
+    merchant_rules_router,
+)
+from .api.dependencies.services import (
+    get_classifier,
+    get_classification_batcher,
+    get_message_broker,
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up_classifier() -> None:
+    """Load the classifier in a thread; /health/ready reports it once warm"""
+    try:
+        await asyncio.to_thread(get_classifier().warm_up)
+    except Exception as e:
+        logger.error(f"Classifier warm-up failed: {e}", exc_info=True)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await init_database()
+    # Preload banks and categories so uploads don't query them
+    await get_reference_data_cache().load()
+    # Load the model in the background: the API starts serving right away
+    # and /health/ready stays 503 until the model is warm
+    warm_up = asyncio.create_task(warm_up_classifier())
+    # Pick up newly published model versions without a restart
+    model_watcher = start_model_reloading()
+
+    job_queue = get_job_queue()
+    await connect_job_queue()
+    # One publisher (connection and channel pool) for every batch event of this process
+    await connect_message_broker()
+    # Without a broker (JOB_QUEUE_BACKEND=memory), jobs are processed in this process
+    in_process_worker = None
+    if is_in_process_queue():
+        async def run_in_process_worker():
+            await warm_up
+            await run_worker(job_queue, get_worker_concurrency())
+
+        in_process_worker = asyncio.create_task(run_in_process_worker())
     yield
     # Shutdown
-    pass
+    if model_watcher:
+        model_watcher.cancel()
+    if in_process_worker:
+        in_process_worker.cancel()
+        await asyncio.gather(in_process_worker, return_exceptions=True)
+    await asyncio.gather(warm_up, return_exceptions=True)
+    await get_classification_batcher().close()
+    close_stage_executor()
+    await get_message_broker().disconnect()
+    await job_queue.disconnect()
 
 
 app = FastAPI(
@@ -35,10 +98,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Turn away oversized uploads before their body is read and spooled
+app.add_middleware(RequestSizeLimitMiddleware, max_body_size=get_upload_limits()[1])
+
 # Register routers
 app.include_router(transactions_router)
 app.include_router(health_router)
 app.include_router(test_router)
+app.include_router(classification_router)
+app.include_router(merchant_rules_router)
 
 
 @app.get("/")
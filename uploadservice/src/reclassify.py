@@ -0,0 +1,85 @@
+"""
+Bulk reclassification of the stored transactions.
+
+Re-categorizes every transaction with the current model version, for
+example after publishing a retrained model:
+
+    python -m src.reclassify             # resume the running job or start one
+    python -m src.reclassify --restart   # start over from the first transaction
+
+The job checkpoints every page, so it can be stopped (Ctrl+C, SIGTERM) and
+resumed later. Run one job at a time.
+
+Environment Variables:
+    RECLASSIFY_PAGE_SIZE: Transactions per page (default: 5000)
+    RECLASSIFY_PROCESSES: Classification processes (default: half the CPUs)
+    RECLASSIFY_MAX_ROWS_PER_SECOND: Rate limit (default: 0, unlimited)
+    RECLASSIFY_BUSY_PAUSE_SECONDS: Pause after every page while upload
+        batches are processing (default: 2)
+    ML_MODELS_PATH, ML_ARTIFACTS_PATH: Model to classify with (see MLClassifier)
+"""
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+from .application.use_cases import ReclassifyTransactionsUseCase
+from .infrastructure.cache import get_reference_data_cache
+from .infrastructure.classifier import ProcessPoolClassifier
+from .infrastructure.database import get_session_factory
+
+logger = logging.getLogger(__name__)
+
+
+async def run(args: argparse.Namespace) -> None:
+    classifier = ProcessPoolClassifier(processes=args.processes)
+    use_case = ReclassifyTransactionsUseCase(
+        classifier=classifier,
+        reference_data=get_reference_data_cache(),
+        session_factory=get_session_factory(),
+        page_size=args.page_size,
+        max_rows_per_second=args.max_rows_per_second,
+        busy_pause_seconds=float(os.getenv("RECLASSIFY_BUSY_PAUSE_SECONDS", "2")),
+    )
+    await get_reference_data_cache().load()
+
+    job = asyncio.create_task(use_case.execute(restart=args.restart))
+    # The page in flight is rolled back; the next run resumes from the checkpoint
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, job.cancel)
+    try:
+        await job
+    except asyncio.CancelledError:
+        logger.info("Reclassification stopped; run again to resume")
+    finally:
+        classifier.close()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    parser = argparse.ArgumentParser(description="Reclassify the stored transactions")
+    parser.add_argument("--restart", action="store_true", help="Start over even if a job is running")
+    parser.add_argument(
+        "--page-size", type=int, default=int(os.getenv("RECLASSIFY_PAGE_SIZE", "5000")),
+        help="Transactions per page",
+    )
+    parser.add_argument(
+        "--processes", type=int, default=int(os.getenv("RECLASSIFY_PROCESSES", "0")) or None,
+        help="Classification processes",
+    )
+    parser.add_argument(
+        "--max-rows-per-second", type=float,
+        default=float(os.getenv("RECLASSIFY_MAX_ROWS_PER_SECOND", "0")),
+        help="Rate limit (0: unlimited)",
+    )
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+"""
+Batch processing worker.
+
+Consumes the batch jobs queued by the upload API and classifies and stores
+their transactions. Runs as its own process, so processing nodes scale
+independently from API nodes:
+
+    python -m src.worker
+
+Environment Variables:
+    WORKER_CONCURRENCY: Jobs processed at the same time by this worker (default: 2)
+    WORKER_PREFETCH: Jobs this worker takes from the queue to pick the next
+        one from, so another user's job can run before the rest of a large
+        upload (default: 4 x WORKER_CONCURRENCY)
+    WORKER_MAX_JOBS_PER_USER: Jobs of the same user processed at the same
+        time (default: half of WORKER_CONCURRENCY, at least 1; 0 for no limit)
+    ML_MODEL_RELOAD_SECONDS: How often to check for a newly published model
+        artifact (default: 30, 0 disables polling; SIGHUP always reloads)
+    ML_ONLINE_LEARNING_SECONDS: How often to learn new category corrections
+        and publish them as a new model version (default: 0, disabled)
+"""
+from dotenv import load_dotenv
+
+# Load environment variables from .env file BEFORE importing any modules
+load_dotenv()
+
+import asyncio
+import logging
+import os
+import signal
+from typing import Awaitable, Callable, Optional
+from .application.services import FairJobScheduler
+from .application.use_cases import ProcessBatchUseCase
+from .domain.entities import BatchJob
+from .domain.ports import JobQueuePort
+from .infrastructure.cache import get_reference_data_cache
+from .infrastructure.database import init_database, get_session_factory
+from .infrastructure.messaging import get_job_queue, is_in_process_queue, connect_message_broker
+from .infrastructure.executors import close_stage_executor
+from .infrastructure.parsers import ParserFactory
+from .infrastructure.storage import get_file_storage
+from .learn_corrections import (
+    get_max_corrections,
+    get_min_users,
+    get_model_paths,
+    learn_pending_corrections,
+)
+from .api.dependencies.services import (
+    get_classifier,
+    get_classification_batcher,
+    get_message_broker,
+    get_stage_executor,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def create_job_handler() -> Callable[[BatchJob], Awaitable[None]]:
+    """
+    Build the handler that processes one batch job.
+
+    The classifier, message broker and caches are created once and shared
+    by every job handled in this process; chunks of concurrent jobs are
+    classified together through the classification batcher.
+    """
+    use_case = ProcessBatchUseCase(
+        classifier=get_classification_batcher(),
+        message_broker=get_message_broker(),
+        reference_data=get_reference_data_cache(),
+        file_storage=get_file_storage(),
+        session_factory=get_session_factory(),
+        stage_executor=get_stage_executor(),
+        # Jobs of the in-process queue die with the process anyway
+        confirm_events=not is_in_process_queue(),
+    )
+
+    async def handle(job: BatchJob) -> None:
+        logger.info(f"Processing batch job: batch_id={job.id_batch}")
+        await use_case.execute(job, ParserFactory.get_parser(job.bank_code))
+
+    return handle
+
+
+def get_worker_concurrency() -> int:
+    """Jobs processed at the same time by one worker process"""
+    return int(os.getenv("WORKER_CONCURRENCY", "2"))
+
+
+def get_worker_prefetch(concurrency: int) -> int:
+    """Jobs one worker process takes from the queue and schedules between users"""
+    return max(concurrency, int(os.getenv("WORKER_PREFETCH", str(concurrency * 4))))
+
+
+def get_max_jobs_per_user(concurrency: int) -> int:
+    """Jobs of the same user one worker process runs at the same time (0: no limit)"""
+    return int(os.getenv("WORKER_MAX_JOBS_PER_USER", str(max(1, concurrency // 2))))
+
+
+def get_model_reload_interval() -> float:
+    """Seconds between checks for a newly published model (0 disables polling)"""
+    return float(os.getenv("ML_MODEL_RELOAD_SECONDS", "30"))
+
+
+async def reload_classifier() -> bool:
+    """Switch the classifier to the published model version if it changed"""
+    try:
+        return await asyncio.to_thread(get_classifier().reload)
+    except Exception as e:
+        logger.error(f"Classifier reload failed: {e}", exc_info=True)
+        return False
+
+
+async def watch_model_updates(interval_seconds: float) -> None:
+    """Reload the classifier every interval_seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await reload_classifier()
+
+
+def start_model_reloading() -> Optional[asyncio.Task]:
+    """
+    Hot-reload the classifier on SIGHUP and, if enabled, by polling.
+
+    Returns:
+        The polling task to cancel on shutdown, or None if polling is disabled
+    """
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGHUP, lambda: asyncio.create_task(reload_classifier()))
+    interval = get_model_reload_interval()
+    if interval <= 0:
+        return None
+    return asyncio.create_task(watch_model_updates(interval))
+
+
+def get_online_learning_interval() -> float:
+    """Seconds between online learning runs (0 disables online learning)"""
+    return float(os.getenv("ML_ONLINE_LEARNING_SECONDS", "0"))
+
+
+async def learn_corrections() -> Optional[str]:
+    """Publish the corrections made since the current model and switch to the result"""
+    models_path, artifacts_path = get_model_paths()
+    try:
+        version = await learn_pending_corrections(
+            get_session_factory(),
+            models_path,
+            artifacts_path,
+            get_max_corrections(),
+            get_min_users(),
+        )
+    except Exception as e:
+        logger.error(f"Online learning failed: {e}", exc_info=True)
+        return None
+    if version:
+        await reload_classifier()
+    return version
+
+
+async def watch_corrections(interval_seconds: float) -> None:
+    """Learn new corrections every interval_seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await learn_corrections()
+
+
+def start_online_learning() -> Optional[asyncio.Task]:
+    """
+    Start learning category corrections periodically, if enabled.
+
+    Every worker may run it: processes learning the same corrections write
+    the same model version.
+
+    Returns:
+        The learning task to cancel on shutdown, or None if it is disabled
+    """
+    interval = get_online_learning_interval()
+    if interval <= 0:
+        return None
+    return asyncio.create_task(watch_corrections(interval))
+
+
+async def run_worker(job_queue: JobQueuePort, concurrency: int) -> None:
+    """
+    Consume batch jobs until cancelled.
+
+    Takes up to WORKER_PREFETCH jobs from the queue; the fair scheduler runs
+    concurrency of them at a time, taking turns between their users.
+    """
+    scheduler = FairJobScheduler(
+        create_job_handler(),
+        concurrency=concurrency,
+        per_user_limit=get_max_jobs_per_user(concurrency),
+    )
+
+    async def run(job: BatchJob) -> None:
+        # Jobs of batches the API is processing inline wait without holding a slot
+        await ProcessBatchUseCase.wait_for_inline_attempt(job)
+        await scheduler.run(job)
+
+    await job_queue.consume(run, concurrency=get_worker_prefetch(concurrency))
+
+
+async def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+
+    if is_in_process_queue():
+        raise SystemExit(
+            "JOB_QUEUE_BACKEND=memory processes jobs inside the API process; "
+            "a separate worker needs JOB_QUEUE_BACKEND=rabbitmq"
+        )
+
+    await init_database()
+    await get_reference_data_cache().load()
+    # Load the model before taking jobs, so the first batch doesn't pay for it
+    await asyncio.to_thread(get_classifier().warm_up)
+    model_watcher = start_model_reloading()
+    learner = start_online_learning()
+
+    job_queue = get_job_queue()
+    await job_queue.connect()
+    await connect_message_broker()
+
+    consumer = asyncio.create_task(run_worker(job_queue, get_worker_concurrency()))
+
+    # Stop consuming on SIGTERM/SIGINT; unacknowledged jobs go back to the queue
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, consumer.cancel)
+
+    try:
+        await consumer
+    except asyncio.CancelledError:
+        logger.info("Worker stopped")
+    finally:
+        if model_watcher:
+            model_watcher.cancel()
+        if learner:
+            learner.cancel()
+        await get_classification_batcher().close()
+        close_stage_executor()
+        # Publish the events of the last batches before closing the connection
+        await get_message_broker().disconnect()
+        await job_queue.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
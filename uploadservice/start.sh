@@ -127,6 +127,7 @@ export $(cat .env | grep -v '^#' | xargs)
 # Establecer valores por defecto si no están definidos
 export HOST=${HOST:-0.0.0.0}
 export PORT=${PORT:-8001}
+export JOB_QUEUE_BACKEND=${JOB_QUEUE_BACKEND:-rabbitmq}
 
 echo -e "${GREEN}✓${NC} Variables de entorno cargadas"
 
@@ -151,5 +152,15 @@ echo ""
 echo "Para detener el servicio, presiona Ctrl+C"
 echo ""
 
+# Iniciar el worker de lotes (con JOB_QUEUE_BACKEND=memory la API procesa los lotes)
+if [ "$JOB_QUEUE_BACKEND" != "memory" ]; then
+    python -m src.worker &
+    WORKER_PID=$!
+    echo -e "${GREEN}✓${NC} Worker de lotes iniciado (PID: $WORKER_PID)"
+    # Detener el worker junto con el servidor; sus jobs pendientes vuelven a la cola
+    trap 'kill -TERM $WORKER_PID 2>/dev/null; wait $WORKER_PID 2>/dev/null' EXIT
+    trap 'exit 130' INT TERM
+fi
+
 # Iniciar el servidor
 uvicorn src.main:app --host $HOST --port $PORT --reload
@@ -0,0 +1,331 @@
+"""
+Tests for admission control and fair scheduling of batch work
+
+Checks that:
+- Waiting users take turns for the worker's slots, so a large upload
+  doesn't hold every slot while another user's job waits
+- Jobs of one user never use more than their share of the slots, and a
+  failing or cancelled job frees its slot
+- Uploads are turned away while the user, or the whole service, has too
+  many unfinished batches; finished batches, and processing ones that
+  stopped changing, don't count, while queued ones count however long
+  they wait
+- Uploads processed within the request don't count against the
+  service-wide limit
+- The upload endpoint answers 429 and 503 with a Retry-After header, the
+  503 only once the upload is known to go to the queue
+
+Uses SQLite databases as a stand-in for MySQL.
+
+Run with: pytest tests/test_admission_control.py -v
+"""
+import asyncio
+import os
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock
+from uuid import UUID
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from src.api.dependencies import (
+    get_current_user_id,
+    get_admission_limits,
+    get_reference_data,
+    get_job_queue,
+    get_file_storage,
+    get_stage_executor,
+    get_batch_processor,
+    get_inline_max_rows,
+)
+from src.api.routes import transactions_router
+from src.application.services import FairJobScheduler
+from src.application.use_cases import AdmitUploadUseCase
+from src.application.use_cases.admit_upload_use_case import (
+    BacklogFullError,
+    UserBacklogFullError,
+)
+from src.domain.entities import BatchJob, FileUploadHistory, TransactionBatch
+from src.infrastructure.database import get_database
+from src.infrastructure.database.models import Base, TransactionBatchModel
+from src.infrastructure.executors import InlineStageExecutor
+from src.infrastructure.repositories import MySQLTransactionBatchRepository
+from src.infrastructure.repositories.mysql_file_upload_history_repository import (
+    MySQLFileUploadHistoryRepository,
+)
+from src.infrastructure.storage import LocalFileStorage
+from tests.test_bancolombia_parser import SAMPLE_ROWS, create_excel
+
+
+USER_ID = "123e4567-e89b-12d3-a456-426614174001"
+OTHER_USER_ID = "123e4567-e89b-12d3-a456-426614174002"
+
+
+def job(id_user: str, name: str) -> BatchJob:
+    return BatchJob(id_batch=name, id_user=id_user, id_bank="bank-1", bank_code="BANCOLOMBIA")
+
+
+class RecordingHandler:
+    """Handles jobs one event loop turn at a time, recording their order and overlap"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.started = []
+        self.running = set()
+        self.overlaps = []
+
+    async def __call__(self, batch_job: BatchJob) -> None:
+        self.started.append(batch_job.id_batch)
+        self.running.add(batch_job.id_batch)
+        self.overlaps.append(set(self.running))
+        try:
+            await asyncio.sleep(0.01)
+            if batch_job.id_batch in self.fail:
+                raise RuntimeError("bad file")
+        finally:
+            self.running.discard(batch_job.id_batch)
+
+
+async def register(
+    session_factory, id_user: str, status: str, file_hash: str, idle_minutes: int = 0
+) -> None:
+    async with session_factory() as session:
+        batch = await MySQLFileUploadHistoryRepository(session).register_batch(
+            TransactionBatch(id_batch=None, process_status=status, start_date=datetime.now()),
+            [FileUploadHistory(
+                id_file=None, id_user=id_user, file_hash=file_hash,
+                file_name="extracto.xlsx", bank_code="BANCOLOMBIA",
+                upload_date=datetime.now(), id_batch=None, file_size=100,
+            )],
+        )
+        if idle_minutes:
+            await session.execute(
+                update(TransactionBatchModel)
+                .where(TransactionBatchModel.id_batch == str(batch.id_batch))
+                .values(updated_at=datetime.now() - timedelta(minutes=idle_minutes))
+            )
+            await session.commit()
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'admission.db'}", poolclass=NullPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await register(factory, USER_ID, "pending", "a" * 64)
+    await register(factory, USER_ID, "processing", "b" * 64)
+    await register(factory, USER_ID, "completed", "c" * 64)
+    await register(factory, OTHER_USER_ID, "failed", "d" * 64)
+    yield factory
+    await engine.dispose()
+
+
+class TestFairJobScheduler:
+    """Test suite for FairJobScheduler"""
+
+    @pytest.mark.asyncio
+    async def test_users_take_turns(self):
+        handler = RecordingHandler()
+        scheduler = FairJobScheduler(handler, concurrency=1, per_user_limit=0)
+        jobs = [job(USER_ID, f"a{i}") for i in range(1, 5)]
+        jobs += [job(OTHER_USER_ID, "b1"), job(OTHER_USER_ID, "b2")]
+
+        await asyncio.gather(*(scheduler.run(batch_job) for batch_job in jobs))
+
+        assert handler.started == ["a1", "a2", "b1", "a3", "b2", "a4"]
+        assert (scheduler.running, scheduler.waiting) == (0, 0)
+
+    @pytest.mark.asyncio
+    async def test_limits_jobs_per_user(self):
+        handler = RecordingHandler()
+        scheduler = FairJobScheduler(handler, concurrency=2, per_user_limit=1)
+        jobs = [job(USER_ID, f"a{i}") for i in range(1, 4)] + [job(OTHER_USER_ID, "b1")]
+
+        await asyncio.gather(*(scheduler.run(batch_job) for batch_job in jobs))
+
+        assert max(len(running) for running in handler.overlaps) == 2
+        assert all(
+            len([name for name in running if name.startswith("a")]) <= 1
+            for running in handler.overlaps
+        )
+        assert {"a1", "b1"} in handler.overlaps
+
+    @pytest.mark.asyncio
+    async def test_failed_and_cancelled_jobs_free_their_slots(self):
+        handler = RecordingHandler(fail={"a1"})
+        scheduler = FairJobScheduler(handler, concurrency=1)
+
+        first = asyncio.create_task(scheduler.run(job(USER_ID, "a1")))
+        cancelled = asyncio.create_task(scheduler.run(job(OTHER_USER_ID, "b1")))
+        last = asyncio.create_task(scheduler.run(job(USER_ID, "a2")))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        results = await asyncio.gather(first, cancelled, last, return_exceptions=True)
+
+        assert isinstance(results[0], RuntimeError)
+        assert isinstance(results[1], asyncio.CancelledError)
+        assert handler.started == ["a1", "a2"]
+        assert (scheduler.running, scheduler.waiting) == (0, 0)
+
+
+class TestAdmitUpload:
+    """Test suite for AdmitUploadUseCase"""
+
+    async def admit(
+        self, session_factory, id_user, max_pending, max_pending_per_user,
+        queued=True, stale_after_seconds=0, per_user=True,
+    ):
+        async with session_factory() as session:
+            await AdmitUploadUseCase(
+                batch_repo=MySQLTransactionBatchRepository(session),
+                file_upload_history_repo=MySQLFileUploadHistoryRepository(session),
+                max_pending=max_pending,
+                max_pending_per_user=max_pending_per_user,
+                retry_after_seconds=15,
+                stale_after_seconds=stale_after_seconds,
+            ).execute(id_user, queued=queued, per_user=per_user)
+
+    @pytest.mark.asyncio
+    async def test_rejects_user_with_full_backlog(self, session_factory):
+        with pytest.raises(UserBacklogFullError) as rejected:
+            await self.admit(session_factory, USER_ID, max_pending=0, max_pending_per_user=2)
+
+        assert rejected.value.retry_after == 15
+        # Only the pending and processing batches count
+        await self.admit(session_factory, USER_ID, max_pending=0, max_pending_per_user=3)
+        await self.admit(session_factory, OTHER_USER_ID, max_pending=0, max_pending_per_user=1)
+
+    @pytest.mark.asyncio
+    async def test_sheds_uploads_when_service_backlog_is_full(self, session_factory):
+        with pytest.raises(BacklogFullError):
+            await self.admit(session_factory, OTHER_USER_ID, max_pending=2, max_pending_per_user=0)
+
+        await self.admit(session_factory, OTHER_USER_ID, max_pending=3, max_pending_per_user=0)
+        await self.admit(session_factory, USER_ID, max_pending=0, max_pending_per_user=0)
+
+    @pytest.mark.asyncio
+    async def test_uploads_processed_inline_skip_service_limit(self, session_factory):
+        await self.admit(
+            session_factory, OTHER_USER_ID, max_pending=1, max_pending_per_user=0, queued=False
+        )
+
+        with pytest.raises(UserBacklogFullError):
+            await self.admit(
+                session_factory, USER_ID, max_pending=1, max_pending_per_user=2, queued=False
+            )
+
+    @pytest.mark.asyncio
+    async def test_stale_batches_do_not_count(self, session_factory):
+        await register(session_factory, OTHER_USER_ID, "processing", "e" * 64, idle_minutes=90)
+
+        with pytest.raises(UserBacklogFullError):
+            await self.admit(session_factory, OTHER_USER_ID, max_pending=0, max_pending_per_user=1)
+        with pytest.raises(BacklogFullError):
+            await self.admit(session_factory, USER_ID, max_pending=3, max_pending_per_user=0)
+
+        # Idle for longer than an hour: the batch is stuck, not queued
+        await self.admit(
+            session_factory, OTHER_USER_ID, max_pending=0, max_pending_per_user=1,
+            stale_after_seconds=3600,
+        )
+        await self.admit(
+            session_factory, USER_ID, max_pending=3, max_pending_per_user=0,
+            stale_after_seconds=3600,
+        )
+
+    @pytest.mark.asyncio
+    async def test_queued_batches_count_however_long_they_wait(self, session_factory):
+        await register(session_factory, OTHER_USER_ID, "pending", "e" * 64, idle_minutes=90)
+
+        with pytest.raises(UserBacklogFullError):
+            await self.admit(
+                session_factory, OTHER_USER_ID, max_pending=0, max_pending_per_user=1,
+                stale_after_seconds=3600,
+            )
+        with pytest.raises(BacklogFullError):
+            await self.admit(
+                session_factory, USER_ID, max_pending=3, max_pending_per_user=0,
+                stale_after_seconds=3600,
+            )
+
+    @pytest.mark.asyncio
+    async def test_service_limit_alone_skips_user_limit(self, session_factory):
+        await self.admit(
+            session_factory, USER_ID, max_pending=3, max_pending_per_user=2, per_user=False
+        )
+
+        with pytest.raises(BacklogFullError):
+            await self.admit(
+                session_factory, USER_ID, max_pending=2, max_pending_per_user=2, per_user=False
+            )
+
+
+class TestUploadEndpointAdmission:
+    """Test suite for the admission responses of POST /upload"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'upload.db'}", poolclass=NullPool
+        )
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def setup():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            await register(factory, USER_ID, "pending", "a" * 64)
+
+        asyncio.run(setup())
+
+        async def database():
+            async with factory() as session:
+                yield session
+
+        self.limits = (0, 1, 12, 0)
+        self.storage = LocalFileStorage(str(tmp_path / "uploads"))
+        app = FastAPI()
+        app.include_router(transactions_router)
+        app.dependency_overrides[get_database] = database
+        app.dependency_overrides[get_current_user_id] = lambda: UUID(USER_ID)
+        app.dependency_overrides[get_admission_limits] = lambda: self.limits
+        app.dependency_overrides[get_reference_data] = lambda: AsyncMock()
+        app.dependency_overrides[get_job_queue] = lambda: AsyncMock()
+        app.dependency_overrides[get_file_storage] = lambda: self.storage
+        app.dependency_overrides[get_stage_executor] = lambda: InlineStageExecutor()
+        app.dependency_overrides[get_batch_processor] = lambda: None
+        app.dependency_overrides[get_inline_max_rows] = lambda: 0
+        return TestClient(app, headers={"Authorization": "Bearer token"})
+
+    def upload(self, client):
+        return client.post(
+            "/api/v1/transactions/upload",
+            params={"bank_code": "BANCOLOMBIA"},
+            files={"files": ("extracto.xlsx", create_excel(SAMPLE_ROWS), "application/octet-stream")},
+        )
+
+    def test_user_backlog_gets_429(self, client):
+        response = self.upload(client)
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "12"
+
+    def test_service_backlog_gets_503(self, client):
+        self.limits = (1, 0, 12, 0)
+
+        response = self.upload(client)
+
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "12"
+        # The stored files of the turned away upload are removed
+        assert os.listdir(self.storage.base_path) == []
+
+
+# Run with: pytest tests/test_admission_control.py -v
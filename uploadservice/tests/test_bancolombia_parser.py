@@ -0,0 +1,187 @@
+"""
+Tests for BancolombiaParser
+
+Checks that the streaming parser:
+- Validates the expected Bancolombia columns
+- Yields bounded chunks that add up to the whole file
+- Produces the same transactions as the previous pandas-based parser,
+  including half cents, which round away from zero as the stored Decimal did
+- Reads empty descriptions as "" (the pandas parser produced "nan")
+
+And that parsers chunking parse()'s result (the default iter_chunks) round
+half cents the same way.
+
+Run with: pytest tests/test_bancolombia_parser.py -v
+"""
+import pytest
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from io import BytesIO
+import pandas as pd
+from openpyxl import Workbook
+import numpy as np
+from src.domain.entities import TransactionChunk
+from src.domain.ports.excel_parser_port import ExcelParserPort, RawTransaction
+from src.infrastructure.parsers import BancolombiaParser
+
+
+HEADER = ["Fecha", "Descripción", "Referencia", "Valor"]
+
+SAMPLE_ROWS = [
+    [datetime(2025, 10, 5, 5, 0), "TRANSF DE JOIVER GONZ", "", 29900],
+    [datetime(2025, 9, 26, 5, 0), "PAGO DE NOMI PRAGMA S A", "NIT811004057", 1950000],
+    [datetime(2025, 9, 16, 5, 0), "PAGO AUTOM TC VISA", "", -4160.04],
+    [datetime(2025, 9, 14, 5, 0), "ABONO INTERESES AHORROS", None, 0.02],
+]
+
+
+def create_excel(rows, header=HEADER) -> bytes:
+    """Create an Excel file in memory with the given rows"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(header)
+    for row in rows:
+        sheet.append(row)
+    output = BytesIO()
+    workbook.save(output)
+    return output.getvalue()
+
+
+def legacy_parse(file_content: bytes):
+    """Row-by-row pandas parsing, as the parser worked before streaming"""
+    df = pd.read_excel(BytesIO(file_content))
+    return [
+        (
+            pd.to_datetime(row["Fecha"]),
+            str(row["Descripción"]),
+            str(row["Referencia"]) if pd.notna(row["Referencia"]) else None,
+            Decimal(str(row["Valor"])),
+        )
+        for _, row in df.iterrows()
+    ]
+
+
+@pytest.fixture
+def parser():
+    return BancolombiaParser()
+
+
+class TestBancolombiaParser:
+    """Test suite for BancolombiaParser"""
+
+    def test_parse_matches_legacy_parser(self, parser):
+        """Streaming parse gives the same values as the pandas parser"""
+        content = create_excel(SAMPLE_ROWS)
+
+        parsed = [
+            (tx.date, tx.description, tx.reference, tx.amount)
+            for tx in parser.parse(content)
+        ]
+
+        assert parsed == legacy_parse(content)
+
+    def test_iter_chunks_respects_chunk_size(self, parser):
+        """Chunks never exceed chunk_size and cover every row"""
+        content = create_excel(SAMPLE_ROWS * 25)  # 100 rows
+
+        chunks = list(parser.iter_chunks(content, chunk_size=30))
+
+        assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+        assert parser.count_rows(content) == 100
+
+    def test_chunks_are_columnar(self, parser):
+        """Chunks carry NumPy columns, with amounts in integer cents"""
+        content = create_excel(SAMPLE_ROWS)
+
+        chunk = next(parser.iter_chunks(content, chunk_size=10))
+
+        assert isinstance(chunk, TransactionChunk)
+        assert chunk.dates.dtype == np.dtype("datetime64[us]")
+        assert chunk.amounts.tolist() == [2990000, 195000000, -416004, 2]
+        assert chunk.references.tolist() == [None, "NIT811004057", None, None]
+        assert chunk.transaction_types.tolist() == ["income", "income", "expense", "income"]
+
+    def test_accepts_file_objects(self, parser):
+        """The parser reads from binary file objects as well as bytes"""
+        content = create_excel(SAMPLE_ROWS)
+
+        transactions = parser.parse(BytesIO(content))
+
+        assert len(transactions) == len(SAMPLE_ROWS)
+
+    def test_skips_blank_rows(self, parser):
+        """Blank rows are ignored, as pandas does"""
+        content = create_excel(SAMPLE_ROWS[:2] + [[None, None, None, None]] + SAMPLE_ROWS[2:])
+
+        assert parser.count_rows(content) == len(SAMPLE_ROWS)
+        assert len(parser.parse(content)) == len(SAMPLE_ROWS)
+
+    def test_parses_text_dates_day_first(self, parser):
+        """Text dates follow the Bancolombia dd/mm/yyyy format"""
+        content = create_excel([
+            ["27/10/2025", "TEST TRANSACTION 1", "REF001", 100.50],
+            ["05/10/2025", "TEST TRANSACTION 2", "REF002", -50.25],
+        ])
+
+        transactions = parser.parse(content)
+
+        assert [tx.date for tx in transactions] == [datetime(2025, 10, 27), datetime(2025, 10, 5)]
+        assert [tx.amount for tx in transactions] == [Decimal("100.50"), Decimal("-50.25")]
+
+    def test_half_cents_round_like_stored_decimals(self, parser):
+        """Half cents round away from zero, as DECIMAL(…, 2) stored the pandas parser's Decimals"""
+        values = [10.005, -10.005, 2.675, 0.125, 1.015, 100.5, 0.004]
+        content = create_excel([
+            [datetime(2025, 10, 5), f"TX {i}", None, value] for i, value in enumerate(values)
+        ])
+
+        chunk = next(parser.iter_chunks(content, chunk_size=10))
+
+        assert chunk.amounts.tolist() == [
+            int(amount.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP) * 100)
+            for *_, amount in legacy_parse(content)
+        ]
+        assert chunk.amounts.tolist() == [1001, -1001, 268, 13, 102, 10050, 0]
+
+    def test_default_chunks_round_like_bancolombia(self, parser):
+        """The default iter_chunks rounds half cents away from zero too"""
+        values = [10.005, -10.005, 2.675, 0.125, 1.015, 100.5, 0.004]
+        content = create_excel([
+            [datetime(2025, 10, 5), f"TX {i}", None, value] for i, value in enumerate(values)
+        ])
+
+        class SlicingParser(ExcelParserPort):
+            def parse(self, file_content):
+                return [
+                    RawTransaction(date, description, reference, amount)
+                    for date, description, reference, amount in legacy_parse(file_content)
+                ]
+
+            def get_bank_code(self):
+                return "TEST"
+
+        chunk = next(SlicingParser().iter_chunks(content, chunk_size=10))
+
+        assert chunk.amounts.tolist() == next(parser.iter_chunks(content, chunk_size=10)).amounts.tolist()
+
+    def test_empty_description_is_empty_text(self, parser):
+        """An empty description is read as "", not the "nan" the pandas parser produced"""
+        content = create_excel([[datetime(2025, 10, 5), None, None, -1000]])
+
+        transactions = parser.parse(content)
+
+        assert legacy_parse(content)[0][1] == "nan"
+        assert transactions[0].description == ""
+
+    def test_invalid_format_raises_value_error(self, parser):
+        """Files without the Bancolombia columns are rejected"""
+        content = create_excel([["a", "b"]], header=["Date", "Amount"])
+
+        with pytest.raises(ValueError, match="expected Bancolombia format"):
+            parser.count_rows(content)
+
+        with pytest.raises(ValueError, match="expected Bancolombia format"):
+            parser.parse(content)
+
+
+# Run with: pytest tests/test_bancolombia_parser.py -v
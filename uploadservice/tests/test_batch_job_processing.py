@@ -0,0 +1,500 @@
+"""
+Tests for queued batch processing
+
+Checks that:
+- An upload stores its files, registers the batch and queues a job
+- A worker consuming the queue classifies and stores the transactions,
+  recording its progress on the batch
+- Jobs redelivered after a worker crash resume from the last checkpoint
+- Transient failures are retried from the checkpoint, format errors are not
+- Jobs for finished batches are skipped
+- A job waits a bounded time for the broker to confirm its batch's event
+- Large batches are processed in shards, each on its own session, and
+  completed once every shard committed
+- Small uploads are processed within the request with their job already
+  queued: the job waits for the request's deadline, skips a batch the
+  request completed and resumes one it didn't finish (transient failure,
+  timeout); the response doesn't wait for the broker's confirm
+
+Uses the in-process job queue, a temporary file storage and SQLite
+databases as a stand-in for MySQL.
+
+Run with: pytest tests/test_batch_job_processing.py -v
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from io import BytesIO
+from uuid import uuid4
+from unittest.mock import AsyncMock
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from src.application.use_cases import (
+    ProcessFilesUseCase, ProcessBatchUseCase, GetBatchStatusUseCase,
+)
+from src.domain.entities import BatchJob, TransactionBatch, TransactionChunk
+from src.infrastructure.cache import ReferenceDataCache
+from src.infrastructure.database.models import (
+    Base, BankModel, TransactionModel, TransactionBatchModel,
+)
+from src.infrastructure.messaging import InProcessJobQueue
+from src.infrastructure.parsers import BancolombiaParser
+from src.infrastructure.repositories import (
+    MySQLTransactionBatchRepository, MySQLTransactionRepository,
+)
+from src.infrastructure.repositories.mysql_file_upload_history_repository import (
+    MySQLFileUploadHistoryRepository,
+)
+from src.infrastructure.storage import LocalFileStorage
+from src.application.use_cases import process_batch_use_case, process_files_use_case
+from tests.test_bancolombia_parser import SAMPLE_ROWS, create_excel
+
+
+USER_ID = "123e4567-e89b-12d3-a456-426614174001"
+BANK_ID = "bank-001-bancolombia"
+
+
+class FakeClassifier:
+    def __init__(self, failures: int = 0, delay: float = 0):
+        self.failures = failures
+        self.delay = delay
+
+    async def classify_batch(self, descriptions, transaction_values):
+        await asyncio.sleep(self.delay)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("classifier unavailable")
+        return ["Other"] * len(descriptions)
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(process_batch_use_case, "BATCH_RETRY_DELAY_SECONDS", 0)
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(BankModel(id_bank=BANK_ID, bank_name="BANCOLOMBIA"))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalFileStorage(str(tmp_path / "uploads"))
+
+
+@pytest_asyncio.fixture
+async def reference_data(session_factory):
+    cache = ReferenceDataCache(session_factory)
+    await cache.load()
+    return cache
+
+
+@pytest.fixture
+def broker():
+    return AsyncMock()
+
+
+@pytest.fixture
+def process_batch(session_factory, storage, reference_data, broker):
+    return ProcessBatchUseCase(
+        classifier=FakeClassifier(),
+        message_broker=broker,
+        reference_data=reference_data,
+        file_storage=storage,
+        session_factory=session_factory,
+    )
+
+
+async def count_transactions(session_factory) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(TransactionModel))
+
+
+async def batch_status(session_factory, id_batch) -> str:
+    async with session_factory() as session:
+        return await session.scalar(
+            select(TransactionBatchModel.process_status)
+            .where(TransactionBatchModel.id_batch == str(id_batch))
+        )
+
+
+async def stored_descriptions(session_factory):
+    async with session_factory() as session:
+        rows = await session.execute(
+            select(TransactionModel.batch_row, TransactionModel.transaction_name)
+            .order_by(TransactionModel.batch_row)
+        )
+        return rows.all()
+
+
+async def create_batch(session_factory, storage, status: str, rows=SAMPLE_ROWS) -> BatchJob:
+    """A batch with one stored file, as left by the upload API"""
+    id_batch = uuid4()
+    key = storage.save(str(id_batch), 0, BytesIO(create_excel(rows)))
+    async with session_factory() as session:
+        await MySQLTransactionBatchRepository(session).save(
+            TransactionBatch(
+                id_batch=id_batch,
+                process_status=status,
+                start_date=datetime.now(),
+                batch_size=len(rows),
+            )
+        )
+        await session.commit()
+    return BatchJob(
+        id_batch=str(id_batch), id_user=USER_ID, id_bank=BANK_ID,
+        bank_code="BANCOLOMBIA", file_keys=[key],
+    )
+
+
+class TestBatchJobProcessing:
+    """Test suite for queued batch processing"""
+
+    @pytest.mark.asyncio
+    async def test_upload_is_queued_and_processed_by_worker(
+        self, session_factory, storage, reference_data, process_batch, broker
+    ):
+        queue = InProcessJobQueue()
+        async with session_factory() as session:
+            upload = ProcessFilesUseCase(
+                transaction_repo=None,
+                bank_repo=None,
+                category_repo=None,
+                batch_repo=MySQLTransactionBatchRepository(session),
+                file_upload_history_repo=MySQLFileUploadHistoryRepository(session),
+                reference_data=reference_data,
+                job_queue=queue,
+                file_storage=storage,
+                session_factory=session_factory,
+            )
+            content = create_excel(SAMPLE_ROWS)
+            batch_id = await upload.execute(
+                files_data=[(BytesIO(content), "a" * 64, "extracto.xlsx", len(content))],
+                parser=BancolombiaParser(),
+                user_id=USER_ID,
+            )
+
+        assert await queue.get_depth() == 1
+        assert await batch_status(session_factory, batch_id) == "pending"
+
+        async def handle(job):
+            await process_batch.execute(job, BancolombiaParser())
+
+        worker = asyncio.create_task(queue.consume(handle, concurrency=2))
+        await queue.join()
+        worker.cancel()
+
+        assert await batch_status(session_factory, batch_id) == "completed"
+        assert await count_transactions(session_factory) == len(SAMPLE_ROWS)
+        assert os.listdir(storage.base_path) == []
+        # The event is confirmed before the job is acknowledged
+        assert [name for name, _, _ in broker.mock_calls] == ["publish_batch_processed", "flush"]
+
+        async with session_factory() as session:
+            progress = await GetBatchStatusUseCase(
+                MySQLTransactionBatchRepository(session)
+            ).execute(batch_id)
+        assert progress.processed_records == len(SAMPLE_ROWS)
+        assert progress.processed_percentage == 100.0
+
+    @pytest.mark.asyncio
+    async def test_redelivered_job_resumes_from_checkpoint(
+        self, session_factory, storage, process_batch
+    ):
+        job = await create_batch(session_factory, storage, status="processing")
+        # The worker that died had committed the first two rows and their checkpoint
+        async with session_factory() as session:
+            chunk = next(BancolombiaParser().iter_chunks(create_excel(SAMPLE_ROWS), 2))
+            await MySQLTransactionRepository(session).save_chunk(
+                chunk,
+                category_ids=np.array(["cat-x"] * 2, dtype=object),
+                id_user=USER_ID, id_bank=BANK_ID, id_batch=job.id_batch,
+            )
+            await MySQLTransactionBatchRepository(session).record_progress(job.id_batch, 2)
+            await session.commit()
+
+        await process_batch.execute(job, BancolombiaParser())
+
+        assert await batch_status(session_factory, job.id_batch) == "completed"
+        assert await stored_descriptions(session_factory) == [
+            (row, SAMPLE_ROWS[row][1]) for row in range(len(SAMPLE_ROWS))
+        ]
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_is_retried(
+        self, session_factory, storage, reference_data, broker
+    ):
+        job = await create_batch(session_factory, storage, status="pending")
+        process_batch = ProcessBatchUseCase(
+            classifier=FakeClassifier(failures=1),
+            message_broker=broker,
+            reference_data=reference_data,
+            file_storage=storage,
+            session_factory=session_factory,
+        )
+
+        await process_batch.execute(job, BancolombiaParser())
+
+        assert await batch_status(session_factory, job.id_batch) == "completed"
+        assert await count_transactions(session_factory) == len(SAMPLE_ROWS)
+
+    @pytest.mark.asyncio
+    async def test_format_error_fails_batch_without_retry(
+        self, session_factory, storage, process_batch, broker
+    ):
+        job = await create_batch(session_factory, storage, status="pending")
+        parser = BancolombiaParser()
+        calls = []
+
+        def broken_chunks(file_content, chunk_size):
+            calls.append(file_content)
+            raise ValueError("unexpected format")
+
+        parser.iter_chunks = broken_chunks
+
+        with pytest.raises(ValueError):
+            await process_batch.execute(job, parser)
+
+        assert len(calls) == 1
+        assert await batch_status(session_factory, job.id_batch) == "error"
+        assert os.listdir(storage.base_path) == []
+
+    @pytest.mark.asyncio
+    async def test_job_for_finished_batch_is_skipped(
+        self, session_factory, storage, process_batch, broker
+    ):
+        job = await create_batch(session_factory, storage, status="completed")
+
+        await process_batch.execute(job, BancolombiaParser())
+
+        assert await count_transactions(session_factory) == 0
+        broker.publish_batch_processed.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_unconfirmed_event_does_not_hold_the_job(
+        self, session_factory, storage, process_batch, broker, monkeypatch
+    ):
+        monkeypatch.setattr(process_batch_use_case, "BATCH_EVENT_CONFIRM_SECONDS", 0.05)
+        # The broker is unreachable: the event is never confirmed
+        broker.flush.side_effect = lambda: asyncio.Event().wait()
+        job = await create_batch(session_factory, storage, status="pending")
+
+        await asyncio.wait_for(process_batch.execute(job, BancolombiaParser()), 2)
+
+        assert await batch_status(session_factory, job.id_batch) == "completed"
+        broker.flush.assert_called_once()
+
+
+class TestInlineUploads:
+    """Test suite for uploads processed within the request"""
+
+    async def upload(self, session_factory, storage, reference_data, queue, processor, max_rows):
+        async with session_factory() as session:
+            content = create_excel(SAMPLE_ROWS)
+            return await ProcessFilesUseCase(
+                transaction_repo=None,
+                bank_repo=None,
+                category_repo=None,
+                batch_repo=MySQLTransactionBatchRepository(session),
+                file_upload_history_repo=MySQLFileUploadHistoryRepository(session),
+                reference_data=reference_data,
+                job_queue=queue,
+                file_storage=storage,
+                session_factory=session_factory,
+                batch_processor=processor,
+                inline_max_rows=max_rows,
+            ).execute(
+                files_data=[(BytesIO(content), "b" * 64, "extracto.xlsx", len(content))],
+                parser=BancolombiaParser(),
+                user_id=USER_ID,
+            )
+
+    async def run_queued_job(self, queue, processor):
+        """Run the queued job as a worker does once the request's deadline passed"""
+        async def handle(job):
+            await processor.execute(job, BancolombiaParser())
+
+        worker = asyncio.create_task(queue.consume(handle, concurrency=1))
+        await queue.join()
+        worker.cancel()
+
+    @pytest.mark.asyncio
+    async def test_small_upload_is_completed_inline(
+        self, session_factory, storage, reference_data, process_batch, broker
+    ):
+        queue = InProcessJobQueue()
+
+        batch_id = await self.upload(
+            session_factory, storage, reference_data, queue, process_batch, len(SAMPLE_ROWS)
+        )
+
+        assert await batch_status(session_factory, batch_id) == "completed"
+        assert await count_transactions(session_factory) == len(SAMPLE_ROWS)
+        assert os.listdir(storage.base_path) == []
+        broker.publish_batch_processed.assert_called_once()
+        broker.flush.assert_not_called()
+
+        # The job queued beside the request finds the batch completed
+        assert await queue.get_depth() == 1
+        await self.run_queued_job(queue, process_batch)
+        assert await count_transactions(session_factory) == len(SAMPLE_ROWS)
+        broker.publish_batch_processed.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_larger_upload_is_queued(
+        self, session_factory, storage, reference_data, process_batch
+    ):
+        queue = InProcessJobQueue()
+
+        batch_id = await self.upload(
+            session_factory, storage, reference_data, queue, process_batch, len(SAMPLE_ROWS) - 1
+        )
+
+        assert await queue.get_depth() == 1
+        assert await batch_status(session_factory, batch_id) == "pending"
+        assert await count_transactions(session_factory) == 0
+
+    @pytest.mark.asyncio
+    async def test_transient_failure_hands_batch_to_workers(
+        self, session_factory, storage, reference_data, broker
+    ):
+        queue = InProcessJobQueue()
+        processor = ProcessBatchUseCase(
+            classifier=FakeClassifier(failures=1),
+            message_broker=broker,
+            reference_data=reference_data,
+            file_storage=storage,
+            session_factory=session_factory,
+        )
+
+        batch_id = await self.upload(
+            session_factory, storage, reference_data, queue, processor, len(SAMPLE_ROWS)
+        )
+
+        assert await queue.get_depth() == 1
+        assert await batch_status(session_factory, batch_id) == "processing"
+
+        await self.run_queued_job(queue, processor)
+
+        assert await batch_status(session_factory, batch_id) == "completed"
+        assert await count_transactions(session_factory) == len(SAMPLE_ROWS)
+
+    @pytest.mark.asyncio
+    async def test_attempt_out_of_time_is_finished_by_workers(
+        self, session_factory, storage, reference_data, broker, monkeypatch
+    ):
+        monkeypatch.setattr(process_files_use_case, "INLINE_TIMEOUT_SECONDS", 0.05)
+        queue = InProcessJobQueue()
+        processor = ProcessBatchUseCase(
+            classifier=FakeClassifier(delay=0.2),
+            message_broker=broker,
+            reference_data=reference_data,
+            file_storage=storage,
+            session_factory=session_factory,
+        )
+
+        batch_id = await self.upload(
+            session_factory, storage, reference_data, queue, processor, len(SAMPLE_ROWS)
+        )
+
+        assert await batch_status(session_factory, batch_id) == "processing"
+        broker.publish_batch_processed.assert_not_called()
+
+        await self.run_queued_job(queue, processor)
+
+        assert await batch_status(session_factory, batch_id) == "completed"
+        assert await count_transactions(session_factory) == len(SAMPLE_ROWS)
+        broker.publish_batch_processed.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_workers_wait_for_the_inline_deadline(self, monkeypatch):
+        monkeypatch.setattr(process_batch_use_case, "INLINE_GRACE_SECONDS", 0.05)
+        job = BatchJob(
+            id_batch=str(uuid4()), id_user=USER_ID, id_bank=BANK_ID,
+            bank_code="BANCOLOMBIA", inline_until=time.time() + 0.1,
+        )
+
+        started = time.monotonic()
+        await ProcessBatchUseCase.wait_for_inline_attempt(job)
+
+        assert time.monotonic() - started >= 0.14
+        started = time.monotonic()
+        await ProcessBatchUseCase.wait_for_inline_attempt(
+            BatchJob(id_batch=job.id_batch, id_user=USER_ID, id_bank=BANK_ID, bank_code="BANCOLOMBIA")
+        )
+        assert time.monotonic() - started < 0.05
+
+
+class TestShardedBatchProcessing:
+    """Test suite for batches processed in shards"""
+
+    @pytest_asyncio.fixture
+    async def session_factory(self, tmp_path):
+        # One connection per session, as with MySQL: shards commit concurrently
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'shards.db'}", poolclass=NullPool
+        )
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with factory() as session:
+            session.add(BankModel(id_bank=BANK_ID, bank_name="BANCOLOMBIA"))
+            await session.commit()
+        yield factory
+        await engine.dispose()
+
+    @pytest.mark.asyncio
+    async def test_large_batch_is_processed_in_shards(
+        self, session_factory, storage, broker, monkeypatch
+    ):
+        monkeypatch.setattr(process_batch_use_case, "BATCH_SHARDS", 3)
+        monkeypatch.setattr(process_batch_use_case, "BATCH_SHARD_MIN_ROWS", 100)
+        monkeypatch.setenv("PIPELINE_CHUNK_SIZE", "40")
+        monkeypatch.setenv("PIPELINE_CHUNK_SIZE_MIN", "40")
+        monkeypatch.setenv("PIPELINE_CHUNK_SIZE_MAX", "40")
+        rows = SAMPLE_ROWS * 100
+        job = await create_batch(session_factory, storage, status="pending", rows=rows)
+        sessions = []
+
+        def counting_factory():
+            sessions.append(None)
+            return session_factory()
+
+        reference_data = ReferenceDataCache(session_factory)
+        await reference_data.load()
+        await ProcessBatchUseCase(
+            classifier=FakeClassifier(),
+            message_broker=broker,
+            reference_data=reference_data,
+            file_storage=storage,
+            session_factory=counting_factory,
+        ).execute(job, BancolombiaParser())
+
+        assert await batch_status(session_factory, job.id_batch) == "completed"
+        assert await stored_descriptions(session_factory) == [
+            (row, rows[row][1]) for row in range(len(rows))
+        ]
+        async with session_factory() as session:
+            progress = await GetBatchStatusUseCase(
+                MySQLTransactionBatchRepository(session)
+            ).execute(job.id_batch)
+        assert progress.processed_records == len(rows)
+        # The attempt's session plus one for each other shard
+        assert len(sessions) == 3
+
+
+# Run with: pytest tests/test_batch_job_processing.py -v
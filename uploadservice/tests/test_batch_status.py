@@ -0,0 +1,160 @@
+"""
+Tests for batch progress reporting and status streaming
+
+Checks that:
+- Progress comes from the rows committed by the workers
+- Throughput and ETA are computed from the processing start
+- The broadcaster reads each followed batch once per interval, whatever
+  the number of subscribers, and ends every stream on a final status
+
+Run with: pytest tests/test_batch_status.py -v
+"""
+import asyncio
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from src.application.dto import BatchStatusDTO
+from src.application.services import BatchStatusBroadcaster
+from src.domain.entities import TransactionBatch
+
+
+NOW = datetime(2025, 10, 1, 12, 0, 0)
+
+
+def make_batch(**overrides) -> TransactionBatch:
+    fields = dict(
+        id_batch=uuid4(),
+        process_status="processing",
+        start_date=NOW - timedelta(seconds=30),
+        batch_size=1000,
+        processed_records=250,
+        processing_start_date=NOW - timedelta(seconds=10),
+    )
+    fields.update(overrides)
+    return TransactionBatch(**fields)
+
+
+def make_status(batch_id, status="processing", processed=0) -> BatchStatusDTO:
+    return BatchStatusDTO(
+        id_batch=batch_id,
+        process_status=status,
+        start_date=NOW,
+        end_date=None,
+        batch_size=100,
+        processed_records=processed,
+        processed_percentage=float(processed),
+    )
+
+
+class FakeStatusSource:
+    """Returns the scripted statuses one read at a time, repeating the last one"""
+
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.reads = 0
+
+    async def __call__(self, batch_id):
+        self.reads += 1
+        if len(self.statuses) > 1:
+            return self.statuses.pop(0)
+        return self.statuses[0]
+
+
+async def collect(stream):
+    return [status async for status in stream]
+
+
+class TestBatchProgress:
+    """Test suite for TransactionBatch progress reporting"""
+
+    def test_percentage_follows_committed_rows(self):
+        assert make_batch().processed_percentage == 25.0
+
+    def test_completed_batch_is_full(self):
+        batch = make_batch(process_status="completed", processed_records=0)
+        assert batch.processed_percentage == 100.0
+        assert batch.eta_seconds(NOW) == 0.0
+
+    def test_throughput_and_eta(self):
+        batch = make_batch()
+        # 250 rows in 10 seconds, 750 rows left
+        assert batch.rows_per_second(NOW) == 25.0
+        assert batch.eta_seconds(NOW) == 30.0
+
+    def test_no_eta_before_first_checkpoint(self):
+        batch = make_batch(processed_records=0)
+        assert batch.rows_per_second(NOW) is None
+        assert batch.eta_seconds(NOW) is None
+
+    def test_no_eta_while_queued(self):
+        batch = make_batch(
+            process_status="pending", processed_records=0, processing_start_date=None
+        )
+        assert batch.processed_percentage == 0.0
+        assert batch.eta_seconds(NOW) is None
+
+
+class TestBatchStatusBroadcaster:
+    """Test suite for BatchStatusBroadcaster"""
+
+    @pytest.mark.asyncio
+    async def test_streams_changes_until_completed(self):
+        batch_id = uuid4()
+        source = FakeStatusSource([
+            make_status(batch_id, "pending"),
+            make_status(batch_id, processed=40),
+            make_status(batch_id, processed=40),
+            make_status(batch_id, processed=80),
+            make_status(batch_id, "completed", processed=100),
+        ])
+        broadcaster = BatchStatusBroadcaster(source, interval_seconds=0.005)
+
+        statuses = await collect(broadcaster.subscribe(batch_id))
+
+        assert [(s.process_status, s.processed_records) for s in statuses] == [
+            ("pending", 0), ("processing", 40), ("processing", 80), ("completed", 100),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_subscribers_share_one_watcher(self):
+        batch_id = uuid4()
+        source = FakeStatusSource(
+            [make_status(batch_id, processed=n) for n in range(0, 100, 10)]
+            + [make_status(batch_id, "completed", processed=100)]
+        )
+        broadcaster = BatchStatusBroadcaster(source, interval_seconds=0.001)
+
+        streams = await asyncio.gather(
+            *[collect(broadcaster.subscribe(batch_id)) for _ in range(20)]
+        )
+
+        assert source.reads == 11
+        assert all(stream[-1].process_status == "completed" for stream in streams)
+
+    @pytest.mark.asyncio
+    async def test_missing_batch_ends_stream(self):
+        async def load_status(batch_id):
+            return None
+
+        broadcaster = BatchStatusBroadcaster(load_status, interval_seconds=0)
+
+        assert await collect(broadcaster.subscribe(uuid4())) == []
+
+    @pytest.mark.asyncio
+    async def test_heartbeat_while_unchanged_and_watcher_stops_when_unsubscribed(self):
+        batch_id = uuid4()
+        source = FakeStatusSource([make_status(batch_id, processed=10)])
+        broadcaster = BatchStatusBroadcaster(source, interval_seconds=0.001)
+
+        stream = broadcaster.subscribe(batch_id, heartbeat_seconds=0.02)
+        assert (await stream.__anext__()).processed_records == 10
+        assert await stream.__anext__() is None
+        await stream.aclose()
+        await asyncio.sleep(0.01)
+        reads = source.reads
+        await asyncio.sleep(0.01)
+
+        assert source.reads == reads
+
+
+# Run with: pytest tests/test_batch_status.py -v
@@ -0,0 +1,135 @@
+"""
+Tests for cross-request micro-batching of classifications
+
+Checks that:
+- Concurrent callers are classified in one shared classify_batch call and
+  each gets its own categories back, in order
+- A full batch is dispatched without waiting for max_wait_ms
+- A failing batch fails every caller in it, and later batches still run
+- POST /api/v1/classification/batch classifies through the batcher
+
+Run with: pytest tests/test_classification_batcher.py -v
+"""
+import asyncio
+from uuid import uuid4
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api.dependencies import get_current_user_id, get_classification_batcher
+from src.api.routes import classification_router
+from src.application.services import ClassificationBatcher
+from src.domain.ports import ClassifierPort
+from src.infrastructure.classifier import SimpleClassifier
+
+
+class RecordingClassifier(ClassifierPort):
+    """Categorizes by amount sign and records every classify_batch call"""
+
+    def __init__(self, fail_first=0):
+        self.calls = []
+        self.fail_first = fail_first
+
+    async def classify(self, description):
+        return "Other"
+
+    async def classify_batch(self, descriptions, transaction_values=None):
+        self.calls.append(list(descriptions))
+        if self.fail_first:
+            self.fail_first -= 1
+            raise RuntimeError("model crashed")
+        return [
+            f"{description}:{'in' if value and value > 0 else 'out'}"
+            for description, value in zip(descriptions, transaction_values)
+        ]
+
+
+class TestClassificationBatcher:
+    """Test suite for ClassificationBatcher"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_callers_share_one_batch(self):
+        classifier = RecordingClassifier()
+        batcher = ClassificationBatcher(classifier, max_batch_size=100, max_wait_ms=20)
+
+        results = await asyncio.gather(
+            batcher.classify_batch(["A", "B"], [10, -5]),
+            batcher.classify("C", 3),
+            batcher.classify_batch(["D"]),
+        )
+        await batcher.close()
+
+        assert classifier.calls == [["A", "B", "C", "D"]]
+        assert results == [["A:in", "B:out"], "C:in", ["D:out"]]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_does_not_wait(self):
+        classifier = RecordingClassifier()
+        batcher = ClassificationBatcher(classifier, max_batch_size=3, max_wait_ms=10_000)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                batcher.classify_batch(["A", "B"], [1, 1]),
+                batcher.classify_batch(["C"], [1]),
+            ),
+            timeout=1,
+        )
+        await batcher.close()
+
+        assert results == [["A:in", "B:in"], ["C:in"]]
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_fails_its_callers_only(self):
+        classifier = RecordingClassifier(fail_first=1)
+        batcher = ClassificationBatcher(classifier, max_batch_size=100, max_wait_ms=5)
+
+        failed = await asyncio.gather(
+            batcher.classify("A", 1), batcher.classify("B", 1), return_exceptions=True
+        )
+        after = await batcher.classify("C", 1)
+        await batcher.close()
+
+        assert [type(result) for result in failed] == [RuntimeError, RuntimeError]
+        assert after == "C:in"
+
+    @pytest.mark.asyncio
+    async def test_classifier_without_batch_support(self):
+        batcher = ClassificationBatcher(SimpleClassifier(), max_wait_ms=1)
+
+        assert await batcher.classify_batch(["A", "B"], [1, -1]) == ["Other", "Other"]
+        await batcher.close()
+
+
+class TestClassificationEndpoint:
+    """Test suite for POST /api/v1/classification/batch"""
+
+    @pytest.fixture
+    def client(self):
+        classifier = RecordingClassifier()
+        app = FastAPI()
+        app.include_router(classification_router)
+        app.dependency_overrides[get_current_user_id] = lambda: uuid4()
+        app.dependency_overrides[get_classification_batcher] = lambda: ClassificationBatcher(
+            classifier, max_wait_ms=1
+        )
+        return TestClient(app)
+
+    def test_classifies_in_request_order(self, client):
+        response = client.post(
+            "/api/v1/classification/batch",
+            json={"transactions": [
+                {"description": "NOMINA", "value": 1950000},
+                {"description": "EXITO", "value": -50000},
+                {"description": "SIN VALOR"},
+            ]},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"categories": ["NOMINA:in", "EXITO:out", "SIN VALOR:out"]}
+
+    def test_rejects_empty_request(self, client):
+        response = client.post("/api/v1/classification/batch", json={"transactions": []})
+
+        assert response.status_code == 422
+
+
+# Run with: pytest tests/test_classification_batcher.py -v
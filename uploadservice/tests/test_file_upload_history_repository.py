@@ -0,0 +1,130 @@
+"""
+Tests for MySQLFileUploadHistoryRepository batched registration
+
+Checks that:
+- Duplicate detection looks up every hash of an upload in one query
+- A batch and all its upload records are written in a constant number of statements
+- A failed registration leaves neither the batch nor any record behind
+
+Uses an in-memory SQLite database as a stand-in for MySQL.
+
+Run with: pytest tests/test_file_upload_history_repository.py -v
+"""
+from datetime import datetime
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.domain.entities import TransactionBatch, FileUploadHistory
+from src.infrastructure.database.models import Base, TransactionBatchModel
+from src.infrastructure.database.file_upload_history_model import FileUploadHistoryModel
+from src.infrastructure.repositories.mysql_file_upload_history_repository import (
+    MySQLFileUploadHistoryRepository,
+)
+
+
+USER_ID = "123e4567-e89b-12d3-a456-426614174001"
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def queries(engine):
+    """Statements executed against the database"""
+    executed = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: executed.append(statement),
+    )
+    return executed
+
+
+def new_batch() -> TransactionBatch:
+    return TransactionBatch(
+        id_batch=None, process_status="pending", start_date=datetime(2025, 10, 1), batch_size=10
+    )
+
+
+def new_uploads(count: int, id_file=None) -> list:
+    return [
+        FileUploadHistory(
+            id_file=id_file,
+            id_user=USER_ID,
+            file_hash=f"{i:064x}",
+            file_name=f"extracto_{i}.xlsx",
+            bank_code="BANCOLOMBIA",
+            upload_date=datetime(2025, 10, 1),
+            id_batch=None,
+            file_size=1024,
+        )
+        for i in range(count)
+    ]
+
+
+async def count_rows(session_factory, model) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(model))
+
+
+class TestFileUploadHistoryRepository:
+    """Test suite for batched upload registration"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("file_count", [1, 10])
+    async def test_register_batch_uses_constant_statements(self, session_factory, queries, file_count):
+        async with session_factory() as session:
+            repo = MySQLFileUploadHistoryRepository(session)
+            queries.clear()
+            batch = await repo.register_batch(new_batch(), new_uploads(file_count))
+
+        # One INSERT for the batch and one executemany for the records
+        assert len([q for q in queries if q.lstrip().upper().startswith("INSERT")]) == 2
+        assert batch.id_batch is not None
+        async with session_factory() as session:
+            batch_ids = (await session.execute(select(FileUploadHistoryModel.id_batch))).scalars().all()
+        assert batch_ids == [str(batch.id_batch)] * file_count
+
+    @pytest.mark.asyncio
+    async def test_get_by_hashes_finds_duplicates_in_one_query(self, session_factory, queries):
+        uploads = new_uploads(5)
+        async with session_factory() as session:
+            repo = MySQLFileUploadHistoryRepository(session)
+            await repo.register_batch(new_batch(), uploads[:3])
+
+            queries.clear()
+            found = await repo.get_by_hashes(USER_ID, [upload.file_hash for upload in uploads[1:]])
+            other_user = await repo.get_by_hashes("another-user", [uploads[0].file_hash])
+
+        assert len(queries) == 2
+        assert sorted(upload.file_hash for upload in found) == [uploads[1].file_hash, uploads[2].file_hash]
+        assert other_user == []
+
+    @pytest.mark.asyncio
+    async def test_failed_registration_leaves_nothing_behind(self, session_factory):
+        async with session_factory() as session:
+            repo = MySQLFileUploadHistoryRepository(session)
+            # Two records with the same primary key make the second INSERT fail
+            with pytest.raises(IntegrityError):
+                await repo.register_batch(new_batch(), new_uploads(2, id_file="same-id"))
+            await session.rollback()
+
+        assert await count_rows(session_factory, TransactionBatchModel) == 0
+        assert await count_rows(session_factory, FileUploadHistoryModel) == 0
+
+
+# Run with: pytest tests/test_file_upload_history_repository.py -v
@@ -0,0 +1,130 @@
+"""
+Tests for the NumPy inference engine
+
+Checks against the shipped models/ artifacts that TfidfLogisticEngine gives
+exactly the labels of the sklearn pipeline (TfidfVectorizer.transform +
+hstack + predict) and the same confidences as predict_proba.
+
+Run with: pytest tests/test_inference_engine.py -v
+"""
+import copy
+import dataclasses
+import os
+import pickle
+import random
+import numpy as np
+import pytest
+from scipy.sparse import hstack
+from src.infrastructure.classifier import MLClassifier
+from src.infrastructure.classifier.inference_engine import (
+    TfidfLogisticEngine,
+    UnsupportedModelError,
+)
+from src.infrastructure.classifier.utils import clean_text
+
+
+MODELS_PATH = os.path.join(os.path.dirname(__file__), "..", "models")
+TIPOS = ["egreso", "ingreso", "neutro"]
+
+
+def load(name):
+    with open(os.path.join(MODELS_PATH, name), "rb") as f:
+        return pickle.load(f)
+
+
+@pytest.fixture(scope="module")
+def artifacts():
+    return load("vectorizer.pkl"), load("classifier.pkl"), load("label_encoder.pkl")
+
+
+def sample_descriptions(vectorizer, count=2000):
+    """Real-looking descriptions mixing known terms, unknown words and repeats"""
+    rng = random.Random(42)
+    terms = sorted(vectorizer.vocabulary_)
+    descriptions = [
+        "TRANSF DE JOIVER GONZ",
+        "PAGO DE NOMI PRAGMA S A",
+        "PAGO AUTOM TC VISA",
+        "ABONO INTERESES AHORROS",
+        "COMPRA EN EXITO COMPRA EN EXITO",
+        "RETIRO CAJERO 123",
+        "XYZZY QWERTY",
+        "A",
+        "",
+    ]
+    for _ in range(count):
+        words = rng.sample(terms, rng.randint(1, 4)) + rng.sample(["ZZZ", "123", "S A"], 1)
+        rng.shuffle(words)
+        descriptions.append(" ".join(words))
+    return [clean_text(description) for description in descriptions]
+
+
+def sklearn_predict(artifacts, descriptions, tipos):
+    vectorizer, model, label_encoder = artifacts
+    X = hstack([
+        vectorizer.transform(descriptions),
+        label_encoder.transform(tipos).reshape(-1, 1),
+    ])
+    return model.predict(X), model.predict_proba(X).max(axis=1)
+
+
+class TestTfidfLogisticEngine:
+    """Test suite for TfidfLogisticEngine"""
+
+    def test_matches_sklearn_pipeline(self, artifacts):
+        engine = TfidfLogisticEngine.from_sklearn(*artifacts)
+        descriptions = sample_descriptions(artifacts[0])
+        tipos = [TIPOS[i % 3] for i in range(len(descriptions))]
+
+        labels, confidences = engine.predict(descriptions, tipos)
+        expected_labels, expected_confidences = sklearn_predict(artifacts, descriptions, tipos)
+
+        assert labels == expected_labels.tolist()
+        np.testing.assert_allclose(confidences, expected_confidences, rtol=0, atol=1e-12)
+
+    def test_single_description(self, artifacts):
+        engine = TfidfLogisticEngine.from_sklearn(*artifacts)
+
+        labels, confidences = engine.predict(["PAGO DE NOMI PRAGMA S A"], ["ingreso"])
+        expected_labels, _ = sklearn_predict(artifacts, ["PAGO DE NOMI PRAGMA S A"], ["ingreso"])
+
+        assert labels == expected_labels.tolist()
+        assert 0 < confidences[0] <= 1
+
+    def test_rejects_unsupported_vectorizer_options(self, artifacts):
+        vectorizer, model, label_encoder = artifacts
+        vectorizer = copy.deepcopy(vectorizer)
+        vectorizer.set_params(sublinear_tf=True)
+
+        with pytest.raises(UnsupportedModelError, match="sublinear_tf"):
+            TfidfLogisticEngine.from_sklearn(vectorizer, model, label_encoder)
+
+    def test_rejects_one_vs_rest_models(self, artifacts):
+        vectorizer, model, label_encoder = artifacts
+        model = copy.deepcopy(model)
+        model.set_params(multi_class="ovr")
+
+        with pytest.raises(UnsupportedModelError, match="multi_class"):
+            TfidfLogisticEngine.from_sklearn(vectorizer, model, label_encoder)
+
+
+class TestMLClassifierEngine:
+    """Test suite for MLClassifier predictions with and without the engine"""
+
+    @pytest.mark.asyncio
+    async def test_engine_and_sklearn_fallback_agree(self, artifacts, monkeypatch):
+        classifier = MLClassifier(models_path=MODELS_PATH)
+        descriptions = sample_descriptions(artifacts[0], count=300)
+        values = [(-1) ** i * i for i in range(len(descriptions))]
+
+        with_engine = await classifier.classify_batch(descriptions, values)
+        assert MLClassifier._active.engine is not None
+        monkeypatch.setattr(
+            MLClassifier, "_active", dataclasses.replace(MLClassifier._active, engine=None)
+        )
+        with_sklearn = await classifier.classify_batch(descriptions, values)
+
+        assert with_engine == with_sklearn
+
+
+# Run with: pytest tests/test_inference_engine.py -v
@@ -0,0 +1,374 @@
+"""
+Tests for the merchant rule fast path
+
+Checks that:
+- Exact rules win over prefix rules, longer prefixes over shorter ones and
+  a user's rules over global rules
+- Rows matched by a rule skip the classifier and the batch reports its
+  rule hit ratio
+- Users only see, change and delete their own rules (plus the global ones)
+- A global rule can't be stored twice
+- The /merchant-rules endpoints normalize patterns and reject duplicates,
+  and only administrators change global rules
+
+Uses SQLite databases as a stand-in for MySQL.
+
+Run with: pytest tests/test_merchant_rules.py -v
+"""
+import asyncio
+from datetime import datetime
+from io import BytesIO
+from uuid import UUID, uuid4
+from unittest.mock import AsyncMock
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from src.api.dependencies import get_current_user_id, get_admin_user_ids
+from src.api.routes import merchant_rules_router
+from src.application.use_cases import ProcessBatchUseCase, GetBatchStatusUseCase
+from src.domain.entities import BatchJob, MerchantRule, TransactionBatch
+from src.infrastructure.cache import ReferenceDataCache
+from src.infrastructure.classifier import MerchantRuleIndex
+from src.infrastructure.database import get_database
+from src.infrastructure.database.models import (
+    Base, BankModel, CategoryModel, MerchantRuleModel, TransactionModel,
+)
+from src.infrastructure.parsers import BancolombiaParser
+from src.infrastructure.repositories import (
+    MySQLMerchantRuleRepository, MySQLTransactionBatchRepository,
+)
+from src.infrastructure.storage import LocalFileStorage
+from tests.test_bancolombia_parser import SAMPLE_ROWS, create_excel
+
+
+USER_ID = "123e4567-e89b-12d3-a456-426614174001"
+OTHER_USER_ID = "123e4567-e89b-12d3-a456-426614174002"
+BANK_ID = "bank-001-bancolombia"
+NOMINA_ID = "cat-nomina"
+TRANSFER_ID = "cat-transferencias"
+
+
+def rule(pattern, match_type, category, id_user=None):
+    return MerchantRule(
+        id_rule=uuid4(), pattern=pattern, match_type=match_type,
+        id_category="cat", id_user=id_user, category=category,
+    )
+
+
+class RecordingClassifier:
+    def __init__(self):
+        self.descriptions = []
+
+    async def classify_batch(self, descriptions, transaction_values):
+        self.descriptions.extend(descriptions)
+        return ["Other"] * len(descriptions)
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(BankModel(id_bank=BANK_ID, bank_name="BANCOLOMBIA"))
+        session.add(CategoryModel(id_category=NOMINA_ID, description="Nomina"))
+        session.add(CategoryModel(id_category=TRANSFER_ID, description="Transferencias"))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+class TestMerchantRuleIndex:
+    """Test suite for MerchantRuleIndex"""
+
+    def test_precedence(self):
+        index = MerchantRuleIndex([
+            rule("PAGO", "prefix", "Pagos"),
+            rule("PAGO DE NOMI", "prefix", "Nomina"),
+            rule("PAGO AUTOM TC VISA", "exact", "Tarjeta"),
+            rule("PAGO AUTOM", "prefix", "Automaticos"),
+        ])
+
+        assert index.match([
+            "PAGO DE NOMI PRAGMA S A",
+            "PAGO AUTOM TC VISA",
+            "PAGO AUTOM TC VISA 2",
+            "PAGO SERVICIOS",
+            "PAG",
+            "COMPRA",
+            "",
+        ]) == ["Nomina", "Tarjeta", "Automaticos", "Pagos", None, None, None]
+
+    def test_user_rule_overrides_global_rule(self):
+        index = MerchantRuleIndex([
+            rule("UBER", "prefix", "Mine", id_user=UUID(USER_ID)),
+            rule("UBER", "prefix", "Transporte"),
+        ])
+
+        assert index.match(["UBER TRIP"]) == ["Mine"]
+
+    def test_patterns_are_normalized(self):
+        index = MerchantRuleIndex([
+            rule("  compra*éxito ", "exact", "Mercado"),
+            rule("***", "prefix", "Never"),
+        ])
+
+        assert index.match(["COMPRA XITO", "COMPRA"]) == ["Mercado", None]
+        assert len(index) == 1
+
+
+class TestRuleFastPath:
+    """Test suite for merchant rules in batch processing"""
+
+    @pytest.mark.asyncio
+    async def test_matched_rows_skip_classifier(self, session_factory, tmp_path):
+        async with session_factory() as session:
+            session.add_all([
+                MerchantRuleModel(
+                    pattern="PAGO DE NOMI", match_type="prefix", id_category=NOMINA_ID,
+                ),
+                MerchantRuleModel(
+                    pattern="TRANSF DE JOIVER GONZ", match_type="exact",
+                    id_category=TRANSFER_ID, id_user=USER_ID,
+                ),
+                # Another user's rule doesn't apply
+                MerchantRuleModel(
+                    pattern="PAGO AUTOM", match_type="prefix",
+                    id_category=TRANSFER_ID, id_user=OTHER_USER_ID,
+                ),
+            ])
+            await session.commit()
+        storage = LocalFileStorage(str(tmp_path / "uploads"))
+        id_batch = uuid4()
+        key = storage.save(str(id_batch), 0, BytesIO(create_excel(SAMPLE_ROWS)))
+        async with session_factory() as session:
+            await MySQLTransactionBatchRepository(session).save(TransactionBatch(
+                id_batch=id_batch, process_status="pending",
+                start_date=datetime.now(), batch_size=len(SAMPLE_ROWS),
+            ))
+            await session.commit()
+        reference_data = ReferenceDataCache(session_factory)
+        await reference_data.load()
+        classifier = RecordingClassifier()
+
+        await ProcessBatchUseCase(
+            classifier=classifier,
+            message_broker=AsyncMock(),
+            reference_data=reference_data,
+            file_storage=storage,
+            session_factory=session_factory,
+        ).execute(
+            BatchJob(
+                id_batch=str(id_batch), id_user=USER_ID, id_bank=BANK_ID,
+                bank_code="BANCOLOMBIA", file_keys=[key],
+            ),
+            BancolombiaParser(),
+        )
+
+        assert classifier.descriptions == ["PAGO AUTOM TC VISA", "ABONO INTERESES AHORROS"]
+        async with session_factory() as session:
+            rows = await session.execute(
+                select(TransactionModel.transaction_name, TransactionModel.id_category)
+                .order_by(TransactionModel.batch_row)
+            )
+            categories = dict(rows.all())
+            status = await GetBatchStatusUseCase(
+                MySQLTransactionBatchRepository(session)
+            ).execute(id_batch)
+        assert categories["TRANSF DE JOIVER GONZ"] == TRANSFER_ID
+        assert categories["PAGO DE NOMI PRAGMA S A"] == NOMINA_ID
+        assert status.rule_matched_records == 2
+        assert status.rule_hit_ratio == 0.5
+
+
+class TestMerchantRuleRepository:
+    """Test suite for MySQLMerchantRuleRepository"""
+
+    @pytest.mark.asyncio
+    async def test_users_see_global_and_own_rules(self, session_factory):
+        async with session_factory() as session:
+            repo = MySQLMerchantRuleRepository(session)
+            await repo.save(MerchantRule(None, "NETFLIX", "prefix", TRANSFER_ID))
+            mine = await repo.save(
+                MerchantRule(None, "UBER", "prefix", TRANSFER_ID, id_user=UUID(USER_ID))
+            )
+            theirs = await repo.save(
+                MerchantRule(None, "RAPPI", "prefix", TRANSFER_ID, id_user=UUID(OTHER_USER_ID))
+            )
+            await session.commit()
+
+            rules = await repo.get_applicable(UUID(USER_ID))
+            deleted_theirs = await repo.delete(theirs.id_rule, UUID(USER_ID))
+            deleted_mine = await repo.delete(mine.id_rule, UUID(USER_ID))
+
+        assert sorted((r.pattern, r.is_global, r.category) for r in rules) == [
+            ("NETFLIX", True, "Transferencias"),
+            ("UBER", False, "Transferencias"),
+        ]
+        assert deleted_theirs is False
+        assert deleted_mine is True
+
+    @pytest.mark.asyncio
+    async def test_global_rules_are_unique(self, session_factory):
+        async with session_factory() as session:
+            repo = MySQLMerchantRuleRepository(session)
+            await repo.save(MerchantRule(None, "NETFLIX", "prefix", TRANSFER_ID))
+            await repo.save(
+                MerchantRule(None, "NETFLIX", "prefix", TRANSFER_ID, id_user=UUID(USER_ID))
+            )
+
+            with pytest.raises(IntegrityError):
+                await repo.save(MerchantRule(None, "NETFLIX", "prefix", NOMINA_ID))
+
+    @pytest.mark.asyncio
+    async def test_updates_only_rules_of_the_owner(self, session_factory):
+        async with session_factory() as session:
+            repo = MySQLMerchantRuleRepository(session)
+            shared = await repo.save(MerchantRule(None, "NETFLIX", "prefix", TRANSFER_ID))
+            mine = await repo.save(
+                MerchantRule(None, "UBER", "prefix", TRANSFER_ID, id_user=UUID(USER_ID))
+            )
+            await session.commit()
+
+            updated_shared = await repo.update(
+                MerchantRule(shared.id_rule, "NETFLIX", "exact", NOMINA_ID, id_user=UUID(USER_ID))
+            )
+            updated_mine = await repo.update(
+                MerchantRule(mine.id_rule, "UBER EATS", "exact", NOMINA_ID, id_user=UUID(USER_ID))
+            )
+            rules = await repo.get_applicable(UUID(USER_ID))
+
+        assert updated_shared is False
+        assert updated_mine is True
+        assert sorted((r.pattern, r.match_type, r.category) for r in rules) == [
+            ("NETFLIX", "prefix", "Transferencias"),
+            ("UBER EATS", "exact", "Nomina"),
+        ]
+
+
+class TestMerchantRuleEndpoints:
+    """Test suite for /api/v1/merchant-rules"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'rules.db'}", poolclass=NullPool
+        )
+        factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def setup():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with factory() as session:
+                session.add(CategoryModel(id_category=NOMINA_ID, description="Nomina"))
+                session.add(CategoryModel(id_category=TRANSFER_ID, description="Transferencias"))
+                await session.commit()
+
+        asyncio.run(setup())
+
+        async def database():
+            async with factory() as session:
+                try:
+                    yield session
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+
+        app = FastAPI()
+        app.include_router(merchant_rules_router)
+        app.dependency_overrides[get_database] = database
+        app.dependency_overrides[get_current_user_id] = lambda: UUID(USER_ID)
+        self.admins = frozenset()
+        app.dependency_overrides[get_admin_user_ids] = lambda: self.admins
+        return TestClient(app)
+
+    def test_create_list_and_delete(self, client):
+        created = client.post(
+            "/api/v1/merchant-rules",
+            json={"pattern": "pago de nómi*", "match_type": "prefix", "category": "Nomina"},
+        )
+        exact = client.post(
+            "/api/v1/merchant-rules",
+            json={"pattern": "PAGO DE N MI", "match_type": "exact", "category": "Nomina"},
+        )
+        listed = client.get("/api/v1/merchant-rules")
+        deleted = client.delete(f"/api/v1/merchant-rules/{created.json()['id_rule']}")
+        deleted_again = client.delete(f"/api/v1/merchant-rules/{created.json()['id_rule']}")
+
+        assert created.status_code == 201
+        assert created.json()["pattern"] == "PAGO DE N MI"
+        assert exact.status_code == 201
+        assert sorted(rule["match_type"] for rule in listed.json()) == ["exact", "prefix"]
+        assert deleted.status_code == 204
+        assert deleted_again.status_code == 404
+
+    def test_rejects_duplicates_and_unknown_categories(self, client):
+        body = {"pattern": "UBER", "match_type": "prefix", "category": "Nomina"}
+
+        first = client.post("/api/v1/merchant-rules", json=body)
+        second = client.post("/api/v1/merchant-rules", json=body)
+        unknown = client.post("/api/v1/merchant-rules", json={**body, "category": "Nope"})
+        empty = client.post("/api/v1/merchant-rules", json={**body, "pattern": "***"})
+
+        assert first.status_code == 201
+        assert second.status_code == 409
+        assert unknown.status_code == 400
+        assert empty.status_code == 400
+
+    def test_update_own_rule(self, client):
+        body = {"pattern": "UBER", "match_type": "prefix", "category": "Nomina"}
+        created = client.post("/api/v1/merchant-rules", json=body).json()
+        other = client.post("/api/v1/merchant-rules", json={**body, "pattern": "RAPPI"}).json()
+
+        updated = client.put(
+            f"/api/v1/merchant-rules/{created['id_rule']}",
+            json={**body, "match_type": "exact", "category": "Transferencias"},
+        )
+        clash = client.put(
+            f"/api/v1/merchant-rules/{other['id_rule']}", json={**body, "match_type": "exact"}
+        )
+        missing = client.put(f"/api/v1/merchant-rules/{uuid4()}", json=body)
+
+        assert updated.status_code == 200
+        assert (updated.json()["match_type"], updated.json()["category"]) == ("exact", "Transferencias")
+        assert clash.status_code == 409
+        assert missing.status_code == 404
+
+    def test_only_administrators_manage_global_rules(self, client):
+        body = {"pattern": "netflix", "match_type": "prefix", "category": "Nomina"}
+
+        refused = client.post("/api/v1/merchant-rules/global", json=body)
+        self.admins = frozenset({UUID(USER_ID)})
+        created = client.post("/api/v1/merchant-rules/global", json=body)
+        duplicate = client.post("/api/v1/merchant-rules/global", json=body)
+        rule_id = created.json()["id_rule"]
+        # Users can't change global rules through their own endpoints
+        not_theirs = client.delete(f"/api/v1/merchant-rules/{rule_id}")
+        updated = client.put(
+            f"/api/v1/merchant-rules/global/{rule_id}",
+            json={**body, "category": "Transferencias"},
+        )
+        listed = client.get("/api/v1/merchant-rules")
+        deleted = client.delete(f"/api/v1/merchant-rules/global/{rule_id}")
+
+        assert refused.status_code == 403
+        assert created.status_code == 201
+        assert (created.json()["pattern"], created.json()["is_global"]) == ("NETFLIX", True)
+        assert duplicate.status_code == 409
+        assert not_theirs.status_code == 404
+        assert updated.json()["category"] == "Transferencias"
+        assert [(rule["pattern"], rule["category"]) for rule in listed.json()] == [
+            ("NETFLIX", "Transferencias")
+        ]
+        assert deleted.status_code == 204
+
+
+# Run with: pytest tests/test_merchant_rules.py -v
@@ -0,0 +1,170 @@
+"""
+Tests for versioned model artifacts and hot reload
+
+Checks that:
+- An exported artifact predicts exactly what the training pickles predict
+- Loading an artifact doesn't unpickle anything
+- reload() swaps to the published version and keeps the active one when
+  the new one can't be loaded
+- Cached predictions follow the model version in use
+
+Run with: pytest tests/test_model_artifacts.py -v
+"""
+import os
+import pickle
+import numpy as np
+import pytest
+from src.infrastructure.cache import PredictionCache
+from src.infrastructure.classifier import MLClassifier
+from src.infrastructure.classifier.model_artifact import (
+    activate_artifact,
+    current_version,
+    export_artifact,
+    load_artifact,
+    write_artifact,
+)
+
+
+MODELS_PATH = os.path.join(os.path.dirname(__file__), "..", "models")
+
+DESCRIPTIONS = [
+    "PAGO DE NOMI PRAGMA S A",
+    "COMPRA EN EXITO",
+    "UBER TRIP",
+    "RETIRO CAJERO 123",
+    "ABONO INTERESES AHORROS",
+    "",
+]
+VALUES = [1950000, -50000, -12000, -200000, 1500, -1]
+
+
+@pytest.fixture
+def artifacts_path(monkeypatch, tmp_path):
+    """Empty artifacts directory, with the process-wide model unloaded"""
+    monkeypatch.setattr(MLClassifier, "_active", None)
+    monkeypatch.setattr(MLClassifier, "_initialized", False)
+    monkeypatch.setattr(MLClassifier, "_warm", False)
+    monkeypatch.setenv("ML_COMPILED_MODELS_PATH", str(tmp_path / "compiled"))
+    path = tmp_path / "artifacts"
+    path.mkdir()
+    return str(path)
+
+
+def publish_variant(artifacts_path, version):
+    """Publish a retrained-looking model that always predicts its last class"""
+    base = load_artifact(artifacts_path, current_version(artifacts_path)).engine
+    intercept = np.array(base.intercept)
+    intercept[-1] += 1000
+    engine = type(base)(
+        vocabulary=base.vocabulary,
+        idf=np.array(base.idf),
+        weights=np.array(base.weights),
+        intercept=intercept,
+        classes=np.array(base.classes),
+        tipo_codes=base.tipo_codes,
+    )
+    write_artifact(artifacts_path, version, engine, {})
+    activate_artifact(artifacts_path, version)
+    return str(base.classes[-1])
+
+
+class TestModelArtifacts:
+    """Test suite for exporting and loading model artifacts"""
+
+    @pytest.mark.asyncio
+    async def test_artifact_predicts_like_pickles(self, artifacts_path):
+        from_pickles = await MLClassifier(models_path=MODELS_PATH).classify_batch(DESCRIPTIONS, VALUES)
+        pickles_version = MLClassifier._active.version
+
+        version = export_artifact(MODELS_PATH, artifacts_path, activate=True)
+        MLClassifier._active = None
+        MLClassifier._initialized = False
+        classifier = MLClassifier(models_path=MODELS_PATH, artifacts_path=artifacts_path)
+        from_artifact = await classifier.classify_batch(DESCRIPTIONS, VALUES)
+
+        assert from_artifact == from_pickles
+        assert classifier.model_version == version == pickles_version
+        assert MLClassifier._active.model is None
+
+    def test_loading_artifact_does_not_unpickle(self, artifacts_path, monkeypatch):
+        export_artifact(MODELS_PATH, artifacts_path, activate=True)
+
+        def no_unpickling(*args, **kwargs):
+            raise AssertionError("artifact loading unpickled a file")
+
+        monkeypatch.setattr(pickle, "loads", no_unpickling)
+        monkeypatch.setattr(pickle, "load", no_unpickling)
+        classifier = MLClassifier(models_path=MODELS_PATH, artifacts_path=artifacts_path)
+        classifier.warm_up()
+
+        assert classifier.is_ready
+        assert classifier.classify_with_details("PAGO DE NOMI PRAGMA S A", 1950000)["confidence"] > 0
+
+    def test_activate_unknown_version(self, artifacts_path):
+        with pytest.raises(FileNotFoundError):
+            activate_artifact(artifacts_path, "does-not-exist")
+
+        assert current_version(artifacts_path) is None
+
+
+class TestHotReload:
+    """Test suite for MLClassifier.reload"""
+
+    @pytest.mark.asyncio
+    async def test_reload_swaps_to_published_version(self, artifacts_path):
+        old_version = export_artifact(MODELS_PATH, artifacts_path, activate=True)
+        classifier = MLClassifier(models_path=MODELS_PATH, artifacts_path=artifacts_path)
+        before = await classifier.classify_batch(DESCRIPTIONS, VALUES)
+        assert classifier.reload() is False
+
+        forced = publish_variant(artifacts_path, "v2")
+        assert classifier.reload() is True
+        after = await classifier.classify_batch(DESCRIPTIONS, VALUES)
+
+        assert classifier.model_version == "v2" != old_version
+        assert before[:-1] != after[:-1]
+        assert after == [forced] * 5 + ["Other"]
+        assert classifier.reload() is False
+
+    def test_broken_version_keeps_active_one(self, artifacts_path):
+        version = export_artifact(MODELS_PATH, artifacts_path, activate=True)
+        classifier = MLClassifier(models_path=MODELS_PATH, artifacts_path=artifacts_path)
+        classifier.warm_up()
+        broken = os.path.join(artifacts_path, "broken")
+        os.mkdir(broken)
+        with open(os.path.join(broken, "metadata.json"), "w") as f:
+            f.write("{not json")
+
+        activate_artifact(artifacts_path, "broken")
+
+        assert classifier.reload() is False
+        assert classifier.model_version == version
+
+    @pytest.mark.asyncio
+    async def test_cached_predictions_follow_version(self, artifacts_path, monkeypatch):
+        export_artifact(MODELS_PATH, artifacts_path, activate=True)
+        classifier = MLClassifier(
+            models_path=MODELS_PATH,
+            artifacts_path=artifacts_path,
+            prediction_cache=PredictionCache(),
+        )
+        calls = []
+        predict = classifier._predict
+
+        def counting_predict(keys, model):
+            calls.append(model.version)
+            return predict(keys, model)
+
+        monkeypatch.setattr(classifier, "_predict", counting_predict)
+        await classifier.classify_batch(DESCRIPTIONS, VALUES)
+        await classifier.classify_batch(DESCRIPTIONS, VALUES)
+        publish_variant(artifacts_path, "v2")
+        classifier.reload()
+        await classifier.classify_batch(DESCRIPTIONS, VALUES)
+
+        # The warm-up run of reload() goes through _predict too
+        assert calls[0] != "v2"
+        assert calls[1:] == ["v2", "v2"]
+
+
+# Run with: pytest tests/test_model_artifacts.py -v
@@ -0,0 +1,127 @@
+"""
+Tests for classifier preloading and readiness
+
+Checks that:
+- Concurrent first uses load the model files only once
+- warm_up() loads the model and marks the classifier ready
+- The compiled engine is shared through read-only memory-mapped files
+- /health/ready answers 503 until the classifier is warm
+
+Run with: pytest tests/test_model_preload.py -v
+"""
+import os
+import threading
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.api.dependencies import get_classifier
+from src.api.routes import health_router
+from src.infrastructure.classifier import MLClassifier
+from src.infrastructure.classifier.inference_engine import TfidfLogisticEngine
+
+
+MODELS_PATH = os.path.join(os.path.dirname(__file__), "..", "models")
+
+
+@pytest.fixture
+def cold_classifier(monkeypatch, tmp_path):
+    """An MLClassifier whose process-wide state is unloaded (restored afterwards)"""
+    monkeypatch.setattr(MLClassifier, "_active", None)
+    monkeypatch.setattr(MLClassifier, "_initialized", False)
+    monkeypatch.setattr(MLClassifier, "_warm", False)
+    monkeypatch.setenv("ML_COMPILED_MODELS_PATH", str(tmp_path / "compiled"))
+    monkeypatch.setenv("ML_ARTIFACTS_PATH", str(tmp_path / "artifacts"))
+    return MLClassifier(models_path=MODELS_PATH)
+
+
+class TestModelPreload:
+    """Test suite for MLClassifier loading"""
+
+    def test_concurrent_first_use_loads_once(self, cold_classifier, monkeypatch):
+        reads = []
+        read_models = MLClassifier._read_models
+
+        def counting_read(self):
+            reads.append(threading.get_ident())
+            read_models(self)
+
+        monkeypatch.setattr(MLClassifier, "_read_models", counting_read)
+        threads = [threading.Thread(target=cold_classifier._load_models) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(reads) == 1
+        assert MLClassifier._initialized
+
+    def test_warm_up_marks_ready(self, cold_classifier):
+        assert not cold_classifier.is_ready
+
+        cold_classifier.warm_up()
+
+        assert cold_classifier.is_ready
+        assert MLClassifier._initialized
+
+    def test_engine_is_memory_mapped(self, cold_classifier, tmp_path):
+        cold_classifier.warm_up()
+
+        engine = MLClassifier._active.engine
+        compiled = tmp_path / "compiled" / cold_classifier.model_version
+        assert compiled.is_dir()
+        assert isinstance(engine.weights, np.memmap)
+        assert not engine.weights.flags.writeable
+
+    def test_saved_engine_predicts_the_same(self, cold_classifier, tmp_path):
+        cold_classifier._load_models()
+        active = MLClassifier._active
+        compiled = TfidfLogisticEngine.from_sklearn(
+            active.vectorizer, active.model, active.label_encoder
+        )
+        compiled.save(str(tmp_path / "engine"))
+        loaded = TfidfLogisticEngine.load(str(tmp_path / "engine"))
+        descriptions = ["PAGO DE NOMI PRAGMA S A", "COMPRA EN EXITO", "RETIRO CAJERO", ""]
+        tipos = ["ingreso", "egreso", "egreso", "neutro"]
+
+        expected_labels, expected_confidences = compiled.predict(descriptions, tipos)
+        labels, confidences = loaded.predict(descriptions, tipos)
+
+        assert labels == expected_labels
+        np.testing.assert_array_equal(confidences, expected_confidences)
+
+    def test_saving_over_existing_engine_keeps_it(self, cold_classifier, tmp_path):
+        cold_classifier._load_models()
+        active = MLClassifier._active
+        engine = TfidfLogisticEngine.from_sklearn(
+            active.vectorizer, active.model, active.label_encoder
+        )
+        target = str(tmp_path / "engine")
+        engine.save(target)
+        # A second process compiling the same version
+        engine.save(target)
+
+        assert os.path.isdir(target)
+        assert [name for name in os.listdir(tmp_path) if name.startswith(".engine-")] == []
+
+
+class TestReadiness:
+    """Test suite for the /health/ready probe"""
+
+    def test_not_ready_until_classifier_is_warm(self, cold_classifier):
+        app = FastAPI()
+        app.include_router(health_router)
+        app.dependency_overrides[get_classifier] = lambda: cold_classifier
+        client = TestClient(app)
+
+        starting = client.get("/api/v1/health/ready")
+        cold_classifier.warm_up()
+        ready = client.get("/api/v1/health/ready")
+
+        assert starting.status_code == 503
+        assert starting.json()["status"] == "starting"
+        assert ready.status_code == 200
+        assert ready.json() == {"status": "ready", "classifier": "warm"}
+
+
+# Run with: pytest tests/test_model_preload.py -v
@@ -0,0 +1,299 @@
+"""
+Tests for online learning from category corrections
+
+Checks that:
+- A learned correction fixes the merchant without changing predictions of
+  descriptions that share no term with it
+- Unseen terms and categories are learned, and the base model is untouched
+- Published corrections become a new model version that MLClassifier.reload
+  picks up, and corrections already learned aren't learned again
+- A correction reaches the shared model only once enough distinct users
+  made it, so one user can't relabel a merchant for everybody
+- PUT /transactions/{id}/category updates the user's transaction and
+  records the correction
+
+Uses SQLite databases as a stand-in for MySQL.
+
+Run with: pytest tests/test_online_learning.py -v
+"""
+import asyncio
+import os
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID, uuid4
+import pytest
+import pytest_asyncio
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from src.api.dependencies import get_current_user_id
+from src.api.routes import transactions_router
+from src.domain.entities import CategoryCorrection
+from src.infrastructure.classifier import MLClassifier
+from src.infrastructure.classifier.incremental_learner import (
+    IncrementalLearner,
+    LabeledDescription,
+    learned_through,
+    publish_corrections,
+)
+from src.infrastructure.classifier.model_artifact import (
+    current_version,
+    export_artifact,
+    load_artifact,
+)
+from src.infrastructure.database import get_database
+from src.infrastructure.database.models import (
+    Base, CategoryCorrectionModel, CategoryModel, TransactionModel,
+)
+from src.infrastructure.repositories import MySQLCategoryCorrectionRepository
+from src.learn_corrections import learn_pending_corrections
+
+
+MODELS_PATH = os.path.join(os.path.dirname(__file__), "..", "models")
+
+USER_ID = "123e4567-e89b-12d3-a456-426614174001"
+OTHER_USER_ID = "123e4567-e89b-12d3-a456-426614174002"
+FOOD_ID = "cat-alimentacion"
+TRANSPORT_ID = "cat-transporte"
+
+UNRELATED = ["PAGO DE NOMI PRAGMA S A", "RETIRO CAJERO 123", "COMPRA EN EXITO"]
+UNRELATED_TIPOS = ["ingreso", "egreso", "egreso"]
+
+
+@pytest.fixture
+def artifacts_path(monkeypatch, tmp_path):
+    """Artifacts directory with the training pickles published, the process-wide model unloaded"""
+    monkeypatch.setattr(MLClassifier, "_active", None)
+    monkeypatch.setattr(MLClassifier, "_initialized", False)
+    monkeypatch.setattr(MLClassifier, "_warm", False)
+    monkeypatch.setenv("ML_COMPILED_MODELS_PATH", str(tmp_path / "compiled"))
+    path = str(tmp_path / "artifacts")
+    export_artifact(MODELS_PATH, path, activate=True)
+    return path
+
+
+@pytest.fixture
+def engine(artifacts_path):
+    return load_artifact(artifacts_path, current_version(artifacts_path)).engine
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(CategoryModel(id_category=FOOD_ID, description="Alimentacion_Restaurantes"))
+        session.add(CategoryModel(id_category=TRANSPORT_ID, description="Combustible_Transporte"))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+class TestIncrementalLearner:
+    """Test suite for IncrementalLearner"""
+
+    def test_correction_fixes_merchant_only(self, engine):
+        before, _ = engine.predict(["UBER TRIP"], ["egreso"])
+        unrelated_before, _ = engine.predict(UNRELATED, UNRELATED_TIPOS)
+        assert before == ["Combustible_Transporte"]
+
+        learned = IncrementalLearner().partial_fit(
+            engine, ["UBER TRIP"], ["egreso"], ["Alimentacion_Restaurantes"]
+        )
+
+        after, confidence = learned.predict(["UBER TRIP"], ["egreso"])
+        assert after == ["Alimentacion_Restaurantes"]
+        assert confidence[0] >= 0.8
+        assert learned.predict(UNRELATED, UNRELATED_TIPOS)[0] == unrelated_before
+
+    def test_learns_new_terms_and_categories(self, engine):
+        learned = IncrementalLearner().partial_fit(
+            engine, ["TIENDA MASCOTAS PELUDOS"], ["egreso"], ["Mascotas"]
+        )
+
+        assert "peludos" in learned.vocabulary and "peludos" not in engine.vocabulary
+        assert learned.classes[-1] == "Mascotas"
+        assert learned.predict(["TIENDA MASCOTAS PELUDOS"], ["egreso"])[0] == ["Mascotas"]
+        # The base model is left as it was
+        assert len(engine.classes) == len(learned.classes) - 1
+        assert engine.predict(["TIENDA MASCOTAS PELUDOS"], ["egreso"])[0] != ["Mascotas"]
+
+
+class TestPublishCorrections:
+    """Test suite for publishing learned corrections"""
+
+    @pytest.mark.asyncio
+    async def test_reload_picks_up_learned_version(self, artifacts_path):
+        base_version = current_version(artifacts_path)
+        classifier = MLClassifier(models_path=MODELS_PATH, artifacts_path=artifacts_path)
+        assert await classifier.classify("UBER TRIP", -12000) == "Combustible_Transporte"
+
+        version = publish_corrections(
+            MODELS_PATH,
+            artifacts_path,
+            [LabeledDescription("Uber trip", -12000, "Alimentacion_Restaurantes")],
+            corrections_through=7,
+        )
+
+        assert version != base_version
+        assert learned_through(artifacts_path) == 7
+        assert load_artifact(artifacts_path, version).metadata["learning"]["base_version"] == base_version
+        assert classifier.reload() is True
+        assert await classifier.classify("UBER TRIP", -12000) == "Alimentacion_Restaurantes"
+
+    @pytest.mark.asyncio
+    async def test_learns_each_correction_once(self, artifacts_path, session_factory):
+        async with session_factory() as session:
+            repo = MySQLCategoryCorrectionRepository(session)
+            for description in ("UBER TRIP", "UBER EATS"):
+                await repo.save(CategoryCorrection(
+                    id_correction=None, id_user=UUID(USER_ID), description=description,
+                    id_category=FOOD_ID, value=Decimal("-12000"),
+                ))
+            await session.commit()
+
+        version = await learn_pending_corrections(
+            session_factory, MODELS_PATH, artifacts_path, max_corrections=100, min_users=1
+        )
+        again = await learn_pending_corrections(
+            session_factory, MODELS_PATH, artifacts_path, max_corrections=100, min_users=1
+        )
+
+        assert current_version(artifacts_path) == version
+        assert learned_through(artifacts_path) == 2
+        assert again is None
+
+    @pytest.mark.asyncio
+    async def test_learns_corrections_once_users_agree(self, artifacts_path, session_factory):
+        async def correct(id_user, id_category):
+            async with session_factory() as session:
+                await MySQLCategoryCorrectionRepository(session).save(CategoryCorrection(
+                    id_correction=None, id_user=UUID(id_user), description="UBER TRIP",
+                    id_category=id_category, value=Decimal("-12000"),
+                ))
+                await session.commit()
+
+        async def learn(max_corrections=100):
+            return await learn_pending_corrections(
+                session_factory, MODELS_PATH, artifacts_path, max_corrections, min_users=2
+            )
+
+        classifier = MLClassifier(models_path=MODELS_PATH, artifacts_path=artifacts_path)
+        # One user alone, or saying the same thing twice, changes nothing
+        await correct(USER_ID, FOOD_ID)
+        await correct(USER_ID, FOOD_ID)
+        await correct(OTHER_USER_ID, TRANSPORT_ID)
+        assert await learn() is None
+
+        # A full page without agreement is passed over
+        assert await learn(max_corrections=3) is not None
+        assert learned_through(artifacts_path) == 3
+        assert classifier.reload() is True
+        assert await classifier.classify("UBER TRIP", -12000) == "Combustible_Transporte"
+
+        # A second user agreeing with a correction already read gets it learned
+        await correct(OTHER_USER_ID, FOOD_ID)
+        assert await learn() is not None
+        assert learned_through(artifacts_path) == 4
+        assert classifier.reload() is True
+        assert await classifier.classify("UBER TRIP", -12000) == "Alimentacion_Restaurantes"
+
+
+class TestCorrectionEndpoint:
+    """Test suite for PUT /api/v1/transactions/{id}/category"""
+
+    @pytest.fixture
+    def client(self, tmp_path):
+        engine = create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'corrections.db'}", poolclass=NullPool
+        )
+        self.factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        self.transaction_id = str(uuid4())
+        self.other_transaction_id = str(uuid4())
+
+        async def setup():
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            async with self.factory() as session:
+                session.add(CategoryModel(id_category=FOOD_ID, description="Alimentacion_Restaurantes"))
+                session.add(CategoryModel(id_category=TRANSPORT_ID, description="Combustible_Transporte"))
+                for id_transaction, id_user in (
+                    (self.transaction_id, USER_ID),
+                    (self.other_transaction_id, OTHER_USER_ID),
+                ):
+                    session.add(TransactionModel(
+                        id_transaction=id_transaction, id_user=id_user,
+                        id_category=TRANSPORT_ID, transaction_name="UBER TRIP",
+                        value=Decimal("12000"), transaction_date=datetime(2025, 1, 1),
+                        transaction_type="expense",
+                    ))
+                await session.commit()
+
+        asyncio.run(setup())
+
+        async def database():
+            async with self.factory() as session:
+                try:
+                    yield session
+                    await session.commit()
+                except Exception:
+                    await session.rollback()
+                    raise
+
+        app = FastAPI()
+        app.include_router(transactions_router)
+        app.dependency_overrides[get_database] = database
+        app.dependency_overrides[get_current_user_id] = lambda: UUID(USER_ID)
+        return TestClient(app)
+
+    def stored(self):
+        async def read():
+            async with self.factory() as session:
+                categories = dict((await session.execute(
+                    select(TransactionModel.id_transaction, TransactionModel.id_category)
+                )).all())
+                corrections = (await session.execute(
+                    select(CategoryCorrectionModel)
+                )).scalars().all()
+                return categories, corrections
+
+        return asyncio.run(read())
+
+    def test_updates_transaction_and_records_correction(self, client):
+        response = client.put(
+            f"/api/v1/transactions/{self.transaction_id}/category",
+            json={"category": "Alimentacion_Restaurantes"},
+        )
+
+        categories, corrections = self.stored()
+        assert response.status_code == 200
+        assert response.json()["id_category"] == FOOD_ID
+        assert categories[self.transaction_id] == FOOD_ID
+        assert categories[self.other_transaction_id] == TRANSPORT_ID
+        assert [
+            (c.id_user, c.description, c.id_category, c.id_transaction, c.value) for c in corrections
+        ] == [(USER_ID, "UBER TRIP", FOOD_ID, self.transaction_id, Decimal("-12000"))]
+
+    def test_rejects_other_users_and_unknown_categories(self, client):
+        other = client.put(
+            f"/api/v1/transactions/{self.other_transaction_id}/category",
+            json={"category": "Alimentacion_Restaurantes"},
+        )
+        unknown = client.put(
+            f"/api/v1/transactions/{self.transaction_id}/category",
+            json={"category": "Nope"},
+        )
+
+        categories, corrections = self.stored()
+        assert other.status_code == 404
+        assert unknown.status_code == 400
+        assert categories[self.other_transaction_id] == TRANSPORT_ID
+        assert corrections == []
+
+
+# Run with: pytest tests/test_online_learning.py -v
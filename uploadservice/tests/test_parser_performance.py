@@ -0,0 +1,92 @@
+"""
+Performance Benchmark for the Bancolombia row conversion
+
+Compares the previous row-by-row conversion (pandas iterrows with
+pd.to_datetime / Decimal(str(...)) per row) against the column-wise
+conversion used by BancolombiaParser on a 100k-row statement.
+
+Run with: pytest tests/test_parser_performance.py -v -s
+"""
+import gc
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from src.infrastructure.parsers import BancolombiaParser
+
+
+ROW_COUNT = 100_000
+COLUMNS = {"Fecha": 0, "Descripción": 1, "Referencia": 2, "Valor": 3}
+
+
+def build_rows(count: int) -> list:
+    """Rows as openpyxl yields them for a Bancolombia statement"""
+    start = datetime(2024, 1, 1, 5, 0)
+    return [
+        (
+            start + timedelta(days=i % 640),
+            f"COMPRA EN TIENDA {i % 250}",
+            "" if i % 3 else f"NIT{800000000 + i}",
+            round((i % 2000 - 1000) * 13.37, 2),
+        )
+        for i in range(count)
+    ]
+
+
+def legacy_convert(df: pd.DataFrame) -> list:
+    """The previous per-row conversion loop"""
+    return [
+        (
+            pd.to_datetime(row["Fecha"]),
+            str(row["Descripción"]),
+            str(row["Referencia"]) if pd.notna(row["Referencia"]) else None,
+            Decimal(str(row["Valor"])),
+        )
+        for _, row in df.iterrows()
+    ]
+
+
+def measure(func, *args):
+    """Run func once and return (result, seconds), with GC paused as timeit does"""
+    gc.collect()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - start
+    finally:
+        gc.enable()
+
+
+def test_columnar_conversion_speedup():
+    """Column-wise conversion to a TransactionChunk is faster and gives the same values"""
+    print(f"\n{'='*70}")
+    print(f"ROW CONVERSION BENCHMARK ({ROW_COUNT:,} rows)")
+    print(f"{'='*70}")
+
+    rows = build_rows(ROW_COUNT)
+    # pandas reads empty cells as NaN
+    df = pd.DataFrame(rows, columns=list(COLUMNS)).replace("", np.nan)
+    parser = BancolombiaParser()
+
+    legacy, time_legacy = measure(legacy_convert, df)
+    converted, time_columnar = measure(parser._convert_rows, rows, COLUMNS)
+
+    speedup = time_legacy / time_columnar
+
+    print(f"\n  Row-by-row loop: {time_legacy*1000:.0f}ms")
+    print(f"  Column-wise:     {time_columnar*1000:.0f}ms")
+    print(f"\n  SPEEDUP: {speedup:.1f}x")
+
+    dates, descriptions, references, amounts = zip(*legacy)
+    assert np.array_equal(converted.dates, np.array(dates, dtype="datetime64[us]"))
+    assert converted.descriptions.tolist() == list(descriptions)
+    assert converted.references.tolist() == list(references)
+    assert converted.amounts.tolist() == [int(amount * 100) for amount in amounts]
+    # About 35x on an idle machine; only the direction is asserted, so a
+    # loaded CI runner doesn't fail it
+    assert time_columnar < time_legacy
+
+
+# Run with: pytest tests/test_parser_performance.py -v -s
@@ -0,0 +1,144 @@
+"""
+Tests for the classifier prediction cache
+
+Checks that:
+- Repeated descriptions are predicted once per batch
+- Cached predictions skip the model and give the same categories
+- The local tier is a bounded LRU and the shared tier serves other processes
+- Predictions of one model version are never served to another
+- A failing shared tier falls through to the model
+
+Uses an in-memory SQLite database as a stand-in for MySQL.
+
+Run with: pytest tests/test_prediction_cache.py -v
+"""
+import os
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.infrastructure.cache import PredictionCache
+from src.infrastructure.classifier import MLClassifier
+from src.infrastructure.database.models import Base
+
+
+MODELS_PATH = os.path.join(os.path.dirname(__file__), "..", "models")
+
+DESCRIPTIONS = [
+    "COMPRA EN EXITO",
+    "UBER TRIP",
+    "compra en exito",
+    "PAGO DE NOMI PRAGMA S A",
+    "COMPRA EN EXITO",
+    "",
+]
+VALUES = [-50000, -12000, -50000, 1950000, -50000, -1]
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def count_predictions(monkeypatch, classifier):
+    """Record the number of pairs run through the model on each call"""
+    calls = []
+    predict = classifier._predict
+
+    def counting_predict(keys, model):
+        calls.append(len(keys))
+        return predict(keys, model)
+
+    monkeypatch.setattr(classifier, "_predict", counting_predict)
+    return calls
+
+
+class TestPredictionCache:
+    """Test suite for PredictionCache"""
+
+    @pytest.mark.asyncio
+    async def test_local_tier_evicts_least_recently_used(self):
+        cache = PredictionCache(max_entries=2)
+        await cache.put_many("v1", {("A", "egreso"): "X", ("B", "egreso"): "Y"})
+        await cache.get_many("v1", [("A", "egreso")])
+        await cache.put_many("v1", {("C", "egreso"): "Z"})
+
+        found = await cache.get_many("v1", [("A", "egreso"), ("B", "egreso"), ("C", "egreso")])
+
+        assert found == {("A", "egreso"): "X", ("C", "egreso"): "Z"}
+
+    @pytest.mark.asyncio
+    async def test_shared_tier_serves_other_processes(self, session_factory):
+        await PredictionCache(session_factory).put_many("v1", {("UBER TRIP", "egreso"): "Transporte"})
+        other_process = PredictionCache(session_factory)
+
+        found = await other_process.get_many("v1", [("UBER TRIP", "egreso"), ("UBER TRIP", "ingreso")])
+
+        assert found == {("UBER TRIP", "egreso"): "Transporte"}
+        assert other_process.shared_hits == 1
+        # Shared hits are kept locally for the next lookup
+        await other_process.get_many("v1", [("UBER TRIP", "egreso")])
+        assert other_process.local_hits == 1
+
+    @pytest.mark.asyncio
+    async def test_predictions_are_scoped_to_model_version(self, session_factory):
+        cache = PredictionCache(session_factory)
+        await cache.put_many("v1", {("UBER TRIP", "egreso"): "Transporte"})
+
+        assert await cache.get_many("v2", [("UBER TRIP", "egreso")]) == {}
+
+    @pytest.mark.asyncio
+    async def test_failing_shared_tier_is_a_miss(self):
+        def broken_session_factory():
+            raise ConnectionError("database down")
+
+        cache = PredictionCache(broken_session_factory)
+        await cache.put_many("v1", {("UBER TRIP", "egreso"): "Transporte"})
+
+        assert await cache.get_many("v1", [("UBER TRIP", "ingreso")]) == {}
+        assert await cache.get_many("v1", [("UBER TRIP", "egreso")]) == {
+            ("UBER TRIP", "egreso"): "Transporte"
+        }
+
+
+class TestMLClassifierCaching:
+    """Test suite for cached batch classification in MLClassifier"""
+
+    @pytest.mark.asyncio
+    async def test_duplicates_are_predicted_once(self, monkeypatch):
+        classifier = MLClassifier(models_path=MODELS_PATH)
+        calls = count_predictions(monkeypatch, classifier)
+
+        result = await classifier.classify_batch(DESCRIPTIONS, VALUES)
+
+        # "COMPRA EN EXITO" appears three times (once in lowercase)
+        assert calls == [3]
+        assert result[0] == result[2] == result[4]
+        assert result[5] == "Other"
+
+    @pytest.mark.asyncio
+    async def test_cached_batch_skips_model(self, monkeypatch, session_factory):
+        uncached = await MLClassifier(models_path=MODELS_PATH).classify_batch(DESCRIPTIONS, VALUES)
+        classifier = MLClassifier(
+            models_path=MODELS_PATH, prediction_cache=PredictionCache(session_factory)
+        )
+        calls = count_predictions(monkeypatch, classifier)
+
+        first = await classifier.classify_batch(DESCRIPTIONS, VALUES)
+        second = await classifier.classify_batch(DESCRIPTIONS, VALUES)
+
+        assert calls == [3]
+        assert first == second == uncached
+
+    def test_model_version_identifies_model_files(self):
+        version = MLClassifier(models_path=MODELS_PATH).model_version
+
+        assert len(version) == 16
+        assert version == MLClassifier(models_path=MODELS_PATH).model_version
+
+
+# Run with: pytest tests/test_prediction_cache.py -v
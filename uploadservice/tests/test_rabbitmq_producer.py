@@ -0,0 +1,229 @@
+"""
+Tests for the pooled RabbitMQ producer
+
+Checks that:
+- Publishing an event returns without waiting for the broker, and the
+  buffered events are published in batches over one connection and a
+  bounded pool of channels
+- Events the broker didn't confirm are published again, each exactly once
+  once confirmed, including when the broker is unreachable at first
+- Flushing waits for the events published so far, not for later ones
+- A dropped connection is waited for while it reopens, not replaced
+- Disconnecting publishes the buffered events before closing
+- The API and the workers share one producer per process
+
+Uses a fake aio_pika connection in place of a RabbitMQ broker.
+
+Run with: pytest tests/test_rabbitmq_producer.py -v
+"""
+import asyncio
+import json
+from uuid import uuid4
+import pytest
+from src.infrastructure.messaging import RabbitMQProducer, rabbitmq_producer
+from src.infrastructure.messaging import producer_factory
+
+
+USER_ID = "123e4567-e89b-12d3-a456-426614174001"
+
+
+class FakeBroker:
+    """Records what reaches the broker; refuses to confirm the first failures messages"""
+
+    def __init__(self, failures=0, unreachable=0):
+        self.failures = failures
+        self.unreachable = unreachable
+        self.connections = []
+        self.published = []
+        # Messages of these batches wait for the gate before being confirmed
+        self.gated = set()
+        self.gate = asyncio.Event()
+
+    async def connect_robust(self, url, **kwargs):
+        if self.unreachable:
+            self.unreachable -= 1
+            raise ConnectionError("broker unreachable")
+        connection = FakeConnection(self)
+        self.connections.append(connection)
+        return connection
+
+    @property
+    def channels(self):
+        return [channel for connection in self.connections for channel in connection.channels]
+
+
+class FakeConnection:
+    def __init__(self, broker):
+        self.broker = broker
+        self.channels = []
+        self.is_closed = False
+
+    async def channel(self, publisher_confirms=True):
+        assert publisher_confirms
+        channel = FakeChannel(self.broker)
+        self.channels.append(channel)
+        return channel
+
+    async def close(self):
+        self.is_closed = True
+
+
+class FakeChannel:
+    def __init__(self, broker):
+        self.broker = broker
+        self.default_exchange = self
+        self.declared = []
+        self.is_closed = False
+
+    async def declare_queue(self, name, durable):
+        self.declared.append(name)
+
+    async def publish(self, message, routing_key):
+        # The confirm arrives a round trip later
+        await asyncio.sleep(0)
+        if json.loads(message.body)["batch_id"] in self.broker.gated:
+            await self.broker.gate.wait()
+        if self.broker.failures:
+            self.broker.failures -= 1
+            raise ConnectionError("message not confirmed")
+        self.broker.published.append((routing_key, json.loads(message.body)))
+
+    async def close(self):
+        self.is_closed = True
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    broker = FakeBroker()
+    monkeypatch.setattr(rabbitmq_producer.aio_pika, "connect_robust", broker.connect_robust)
+    return broker
+
+
+def new_producer(**kwargs):
+    return RabbitMQProducer(
+        host="localhost", port=5672, username="guest", password="guest",
+        queue_name="batch_processed", retry_delay_seconds=0, **kwargs,
+    )
+
+
+def record_batches(producer):
+    """Sizes of the batches the producer sends"""
+    sizes = []
+    send = producer._send
+
+    async def recording_send(bodies):
+        sizes.append(len(bodies))
+        await send(bodies)
+
+    producer._send = recording_send
+    return sizes
+
+
+async def publish(producer, count):
+    batch_ids = [uuid4() for _ in range(count)]
+    for batch_id in batch_ids:
+        await producer.publish_batch_processed(batch_id, USER_ID, "completed")
+    return [str(batch_id) for batch_id in batch_ids]
+
+
+class TestRabbitMQProducer:
+    """Test suite for RabbitMQProducer"""
+
+    @pytest.mark.asyncio
+    async def test_publishes_in_batches_over_one_connection(self, broker):
+        producer = new_producer(channel_pool_size=2, batch_size=50)
+        sizes = record_batches(producer)
+        await producer.connect()
+
+        batch_ids = await publish(producer, 120)
+        # Nothing waited for the broker yet
+        assert broker.published == []
+
+        await producer.flush()
+        await producer.disconnect()
+
+        assert sorted(message["batch_id"] for _, message in broker.published) == sorted(batch_ids)
+        assert {routing_key for routing_key, _ in broker.published} == {"batch_processed"}
+        assert {(m["status"], m["userid"]) for _, m in broker.published} == {("completed", USER_ID)}
+        assert sizes == [50, 50, 20]
+        assert len(broker.connections) == 1
+        assert len(broker.channels) <= 2
+        assert broker.channels[0].declared == ["batch_processed"]
+
+    @pytest.mark.asyncio
+    async def test_republishes_unconfirmed_events(self, broker):
+        broker.failures = 3
+        producer = new_producer(batch_size=10)
+        await producer.connect()
+
+        batch_ids = await publish(producer, 10)
+        await producer.flush()
+
+        assert sorted(message["batch_id"] for _, message in broker.published) == sorted(batch_ids)
+        await producer.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_connects_once_the_broker_is_reachable(self, broker):
+        broker.unreachable = 2
+        producer = new_producer()
+
+        batch_ids = await publish(producer, 3)
+        await producer.flush()
+
+        assert [message["batch_id"] for _, message in broker.published] == batch_ids
+        assert len(broker.connections) == 1
+        await producer.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_flush_waits_only_for_earlier_events(self, broker):
+        producer = new_producer(batch_wait_ms=0)
+        await producer.connect()
+
+        earlier = await publish(producer, 3)
+        flushing = asyncio.create_task(producer.flush())
+        await asyncio.sleep(0)
+        broker.gated.update(await publish(producer, 2))
+        await flushing
+
+        assert sorted(message["batch_id"] for _, message in broker.published) == sorted(earlier)
+        broker.gate.set()
+        await producer.disconnect()
+        assert len(broker.published) == 5
+
+    @pytest.mark.asyncio
+    async def test_waits_for_dropped_connection_to_reopen(self, broker):
+        producer = new_producer()
+        await producer.connect()
+        connection = broker.connections[0]
+        connection.is_closed = True
+
+        batch_ids = await publish(producer, 2)
+        await asyncio.sleep(0.01)
+        assert broker.published == []
+        # The robust connection reopens by itself
+        connection.is_closed = False
+        await producer.flush()
+
+        assert [message["batch_id"] for _, message in broker.published] == batch_ids
+        assert broker.connections == [connection]
+        await producer.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_disconnect_publishes_buffered_events(self, broker):
+        producer = new_producer(batch_wait_ms=200)
+        await producer.connect()
+
+        batch_ids = await publish(producer, 5)
+        await producer.disconnect()
+
+        assert [message["batch_id"] for _, message in broker.published] == batch_ids
+        assert broker.connections[0].is_closed
+        assert all(channel.is_closed for channel in broker.channels)
+
+    def test_one_producer_per_process(self, monkeypatch):
+        monkeypatch.setattr(producer_factory, "_message_broker", None)
+
+        assert producer_factory.get_message_broker() is producer_factory.get_message_broker()
+
+
+# Run with: pytest tests/test_rabbitmq_producer.py -v
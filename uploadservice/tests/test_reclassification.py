@@ -0,0 +1,251 @@
+"""
+Tests for the bulk reclassification job
+
+Checks that:
+- Every stored transaction is reclassified with the current model, merchant
+  rules first, and only changed rows are written
+- Transactions a user corrected are never touched, nor rows that changed
+  after the job read them
+- A failed job resumes after its last committed page; a new model version
+  supersedes the running job
+- The job pauses while upload batches are processing
+- ProcessPoolClassifier predicts what MLClassifier predicts
+
+Uses SQLite databases as a stand-in for MySQL.
+
+Run with: pytest tests/test_reclassification.py -v
+"""
+import os
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID, uuid4
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from src.application.use_cases import ReclassifyTransactionsUseCase
+from src.application.use_cases import reclassify_transactions_use_case
+from src.domain.entities import ReclassificationJob
+from src.domain.ports import ClassifierPort
+from src.infrastructure.cache import ReferenceDataCache
+from src.infrastructure.classifier import MLClassifier, ProcessPoolClassifier
+from src.infrastructure.database.models import (
+    Base, CategoryCorrectionModel, CategoryModel, MerchantRuleModel,
+    ReclassificationJobModel, TransactionBatchModel, TransactionModel,
+)
+from src.infrastructure.repositories import MySQLTransactionRepository
+
+
+MODELS_PATH = os.path.join(os.path.dirname(__file__), "..", "models")
+
+USER_ID = "123e4567-e89b-12d3-a456-426614174001"
+OTHER_USER_ID = "123e4567-e89b-12d3-a456-426614174002"
+CATEGORIES = {"cat-food": "Food", "cat-transport": "Transport", "cat-income": "Income"}
+
+# name, amount, stored category, id_user
+ROWS = [
+    ("UBER TRIP", -12000, "cat-food", USER_ID),
+    ("RESTAURANTE PEPE", -50000, "cat-food", USER_ID),
+    ("PAGO DE NOMI PRAGMA", 1950000, "cat-food", USER_ID),
+    ("UBER EATS", -30000, "cat-transport", OTHER_USER_ID),
+    ("TAXI CENTRO", -9000, "cat-food", OTHER_USER_ID),
+]
+
+
+class KeywordClassifier(ClassifierPort):
+    """Categorizes by keyword and amount sign; records what it was asked"""
+
+    def __init__(self, version="v1", fail_after=None):
+        self.version = version
+        self.fail_after = fail_after
+        self.calls = []
+
+    async def classify(self, description):
+        return "Transport"
+
+    async def classify_batch(self, descriptions, transaction_values=None):
+        if self.fail_after is not None and len(self.calls) >= self.fail_after:
+            raise RuntimeError("classifier crashed")
+        self.calls.append(list(descriptions))
+        return [
+            "Income" if value > 0 else "Transport" if "UBER" in d or "TAXI" in d else "Food"
+            for d, value in zip(descriptions, transaction_values)
+        ]
+
+    @property
+    def model_version(self):
+        return self.version
+
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    # One connection per session, as with MySQL: the job reads the next page
+    # while it writes the current one
+    engine = create_async_engine(
+        f"sqlite+aiosqlite:///{tmp_path / 'reclassify.db'}", poolclass=NullPool
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        for id_category, description in CATEGORIES.items():
+            session.add(CategoryModel(id_category=id_category, description=description))
+        for name, amount, id_category, id_user in ROWS:
+            session.add(TransactionModel(
+                id_transaction=str(uuid4()), id_user=id_user, id_category=id_category,
+                transaction_name=name, value=Decimal(abs(amount)),
+                transaction_date=datetime(2025, 1, 1),
+                transaction_type="income" if amount > 0 else "expense",
+            ))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+async def stored_categories(session_factory):
+    async with session_factory() as session:
+        rows = await session.execute(
+            select(TransactionModel.transaction_name, TransactionModel.id_category)
+        )
+        return dict(rows.all())
+
+
+async def transaction_id(session_factory, name):
+    async with session_factory() as session:
+        return (await session.execute(
+            select(TransactionModel.id_transaction).where(TransactionModel.transaction_name == name)
+        )).scalar_one()
+
+
+def use_case(session_factory, classifier, **kwargs):
+    return ReclassifyTransactionsUseCase(
+        classifier=classifier,
+        reference_data=ReferenceDataCache(session_factory),
+        session_factory=session_factory,
+        busy_pause_seconds=0,
+        **kwargs,
+    )
+
+
+class TestReclassifyTransactions:
+    """Test suite for ReclassifyTransactionsUseCase"""
+
+    @pytest.mark.asyncio
+    async def test_reclassifies_changed_rows(self, session_factory):
+        async with session_factory() as session:
+            session.add(MerchantRuleModel(
+                pattern="UBER EATS", match_type="exact", id_category="cat-food", id_user=OTHER_USER_ID,
+            ))
+            session.add(CategoryCorrectionModel(
+                id_user=USER_ID, description="RESTAURANTE PEPE", id_category="cat-food",
+                id_transaction=await transaction_id(session_factory, "RESTAURANTE PEPE"),
+            ))
+            await session.commit()
+        classifier = KeywordClassifier()
+
+        job = await use_case(session_factory, classifier, page_size=2).execute()
+
+        assert await stored_categories(session_factory) == {
+            "UBER TRIP": "cat-transport",
+            "RESTAURANTE PEPE": "cat-food",
+            "PAGO DE NOMI PRAGMA": "cat-income",
+            "UBER EATS": "cat-food",
+            "TAXI CENTRO": "cat-transport",
+        }
+        classified = sorted(d for call in classifier.calls for d in call)
+        assert classified == ["PAGO DE NOMI PRAGMA", "TAXI CENTRO", "UBER TRIP"]
+        assert job.status == ReclassificationJob.STATUS_COMPLETED
+        assert (job.scanned_records, job.changed_records) == (4, 4)
+
+    @pytest.mark.asyncio
+    async def test_resumes_after_last_committed_page(self, session_factory):
+        with pytest.raises(RuntimeError):
+            await use_case(session_factory, KeywordClassifier(fail_after=1), page_size=2).execute()
+        async with session_factory() as session:
+            checkpoint = (await session.execute(select(ReclassificationJobModel))).scalar_one()
+        assert (checkpoint.status, checkpoint.scanned_records) == ("running", 2)
+
+        classifier = KeywordClassifier()
+        job = await use_case(session_factory, classifier, page_size=2).execute()
+
+        assert job.id_job == UUID(checkpoint.id_job)
+        assert job.scanned_records == len(ROWS)
+        assert sum(len(call) for call in classifier.calls) == len(ROWS) - 2
+        assert set((await stored_categories(session_factory)).values()) == {
+            "cat-transport", "cat-income", "cat-food",
+        }
+
+    @pytest.mark.asyncio
+    async def test_new_model_supersedes_running_job(self, session_factory):
+        with pytest.raises(RuntimeError):
+            await use_case(session_factory, KeywordClassifier(fail_after=1), page_size=2).execute()
+
+        classifier = KeywordClassifier(version="v2")
+        job = await use_case(session_factory, classifier, page_size=2).execute()
+
+        async with session_factory() as session:
+            statuses = dict((await session.execute(
+                select(ReclassificationJobModel.model_version, ReclassificationJobModel.status)
+            )).all())
+        assert statuses == {"v1": "superseded", "v2": "completed"}
+        assert job.scanned_records == len(ROWS)
+
+    @pytest.mark.asyncio
+    async def test_concurrent_changes_are_kept(self, session_factory):
+        id_transaction = UUID(await transaction_id(session_factory, "UBER TRIP"))
+        async with session_factory() as session:
+            repo = MySQLTransactionRepository(session)
+            stale = await repo.update_categories(
+                {id_transaction: "cat-income"}, {id_transaction: "cat-transport"}
+            )
+            current = await repo.update_categories(
+                {id_transaction: "cat-income"}, {id_transaction: "cat-food"}
+            )
+            await session.commit()
+
+        assert (stale, current) == (0, 1)
+        assert (await stored_categories(session_factory))["UBER TRIP"] == "cat-income"
+
+    @pytest.mark.asyncio
+    async def test_pauses_while_batches_are_processing(self, session_factory, monkeypatch):
+        async with session_factory() as session:
+            session.add(TransactionBatchModel(
+                id_batch=str(uuid4()), process_status="processing", start_date=datetime.now(),
+            ))
+            await session.commit()
+        pauses = []
+
+        async def sleep(seconds):
+            pauses.append(seconds)
+
+        monkeypatch.setattr(reclassify_transactions_use_case.asyncio, "sleep", sleep)
+        reclassify = use_case(session_factory, KeywordClassifier(), page_size=2)
+        reclassify.busy_pause_seconds = 3
+
+        await reclassify.execute()
+
+        assert pauses == [3, 3, 3]
+
+
+class TestProcessPoolClassifier:
+    """Test suite for ProcessPoolClassifier"""
+
+    @pytest.mark.asyncio
+    async def test_matches_ml_classifier(self):
+        descriptions = [
+            "PAGO DE NOMI PRAGMA S A", "COMPRA EN EXITO", "UBER TRIP", "", "RETIRO CAJERO 123",
+        ] * 3
+        values = [1950000, -50000, -12000, -1, -200000] * 3
+        expected = await MLClassifier(models_path=MODELS_PATH).classify_batch(descriptions, values)
+        classifier = ProcessPoolClassifier(processes=2, models_path=MODELS_PATH, min_slice_size=4)
+        try:
+            categories = await classifier.classify_batch(descriptions, values)
+            assert categories == expected
+            assert classifier.model_version == MLClassifier(models_path=MODELS_PATH).model_version
+        finally:
+            classifier.close()
+
+
+# Run with: pytest tests/test_reclassification.py -v
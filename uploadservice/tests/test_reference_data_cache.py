@@ -0,0 +1,143 @@
+"""
+Tests for ReferenceDataCache
+
+Checks that:
+- Banks and categories are served from memory after the initial load
+- Missing categories are created in one idempotent upsert
+- Concurrent uploads don't create duplicate categories
+- The upsert only skips duplicate descriptions: on MySQL it is an
+  ON DUPLICATE KEY UPDATE, not an INSERT IGNORE that hides other errors
+- The cache reloads after its TTL expires
+
+Uses an in-memory SQLite database as a stand-in for MySQL.
+
+Run with: pytest tests/test_reference_data_cache.py -v
+"""
+import asyncio
+from types import SimpleNamespace
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select, func
+from sqlalchemy.dialects import mysql
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.infrastructure.cache import ReferenceDataCache
+from src.infrastructure.database.inserts import insert_skipping_duplicates
+from src.infrastructure.database.models import Base, BankModel, CategoryModel
+
+
+@pytest_asyncio.fixture
+async def engine():
+    """In-memory SQLite database with a bank and a category"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(BankModel(id_bank="bank-001-bancolombia", bank_name="BANCOLOMBIA"))
+        session.add(CategoryModel(id_category="cat-001-retiros-efectivo", description="Retiros_Efectivo"))
+        await session.commit()
+    yield engine
+    await engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def queries(engine):
+    """Statements executed against the database"""
+    executed = []
+    event.listen(
+        engine.sync_engine,
+        "before_cursor_execute",
+        lambda conn, cursor, statement, *args: executed.append(statement),
+    )
+    return executed
+
+
+async def count_categories(session_factory, description: str) -> int:
+    async with session_factory() as session:
+        return await session.scalar(
+            select(func.count()).where(CategoryModel.description == description)
+        )
+
+
+class TestReferenceDataCache:
+    """Test suite for ReferenceDataCache"""
+
+    @pytest.mark.asyncio
+    async def test_lookups_after_load_make_no_queries(self, session_factory, queries):
+        cache = ReferenceDataCache(session_factory)
+        await cache.load()
+        queries.clear()
+
+        bank = await cache.get_bank_by_name("BANCOLOMBIA")
+        category_ids = await cache.get_category_ids(["Retiros_Efectivo"])
+
+        assert bank.id_bank == "bank-001-bancolombia"
+        assert category_ids == {"Retiros_Efectivo": "cat-001-retiros-efectivo"}
+        assert queries == []
+
+    @pytest.mark.asyncio
+    async def test_missing_categories_are_upserted_once(self, session_factory, queries):
+        cache = ReferenceDataCache(session_factory)
+        await cache.load()
+        queries.clear()
+
+        first = await cache.get_category_ids(["Alimentacion", "Transporte", "Retiros_Efectivo"])
+        inserts = [q for q in queries if q.lstrip().upper().startswith("INSERT")]
+        queries.clear()
+        second = await cache.get_category_ids(["Alimentacion", "Transporte"])
+
+        assert len(inserts) == 1
+        assert first["Retiros_Efectivo"] == "cat-001-retiros-efectivo"
+        assert second == {k: first[k] for k in ("Alimentacion", "Transporte")}
+        assert queries == []
+
+    @pytest.mark.asyncio
+    async def test_concurrent_caches_do_not_duplicate_categories(self, session_factory):
+        # One cache per process: each sees the category as missing
+        caches = [ReferenceDataCache(session_factory) for _ in range(4)]
+        for cache in caches:
+            await cache.load()
+
+        results = await asyncio.gather(
+            *(cache.get_category_ids(["Entretenimiento"]) for cache in caches)
+        )
+
+        assert len({result["Entretenimiento"] for result in results}) == 1
+        assert await count_categories(session_factory, "Entretenimiento") == 1
+
+    @pytest.mark.asyncio
+    async def test_reloads_after_ttl(self, session_factory):
+        cache = ReferenceDataCache(session_factory, ttl_seconds=0)
+        await cache.load()
+        async with session_factory() as session:
+            session.add(BankModel(id_bank="bank-002-nequi", bank_name="NEQUI"))
+            await session.commit()
+
+        bank = await cache.get_bank_by_name("NEQUI")
+
+        assert bank.id_bank == "bank-002-nequi"
+
+    @pytest.mark.asyncio
+    async def test_unknown_bank_returns_none(self, session_factory):
+        cache = ReferenceDataCache(session_factory)
+        await cache.load()
+
+        assert await cache.get_bank_by_name("UNKNOWN") is None
+
+    def test_mysql_upsert_only_skips_duplicate_keys(self):
+        session = SimpleNamespace(get_bind=lambda: SimpleNamespace(dialect=mysql.dialect()))
+
+        statement = insert_skipping_duplicates(session, CategoryModel.__table__, "description")
+        sql = str(statement.compile(dialect=mysql.dialect()))
+
+        assert "IGNORE" not in sql
+        assert "ON DUPLICATE KEY UPDATE description = VALUES(description)" in sql
+
+
+# Run with: pytest tests/test_reference_data_cache.py -v
@@ -0,0 +1,194 @@
+"""
+Insert Throughput Benchmark for MySQLTransactionRepository
+
+Compares the previous ORM write path (add_all + flush + one refresh per row)
+with the bulk INSERT paths (save_batch and save_chunk), using an in-memory
+SQLite database as a stand-in for MySQL.
+
+Run with: pytest tests/test_repository_performance.py -v -s
+"""
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import UUID
+import numpy as np
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.domain.entities import Transaction, TransactionChunk
+from src.infrastructure.database.models import (
+    Base, TransactionModel, CategoryModel, BankModel, TransactionBatchModel,
+)
+from src.infrastructure.repositories import MySQLTransactionRepository
+
+
+CHUNK_SIZE = 500
+CHUNK_COUNT = 10
+USER_ID = UUID("123e4567-e89b-12d3-a456-426614174001")
+CATEGORY_ID = "cat-001-retiros-efectivo"
+BANK_ID = "bank-001-bancolombia"
+BATCH_ID = "b7c1e0c2-1a52-4c3e-9d0e-5f2f3c4b5a61"
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    """In-memory SQLite database with the service tables"""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with factory() as session:
+        session.add(CategoryModel(id_category=CATEGORY_ID, description="Retiros_Efectivo"))
+        session.add(BankModel(id_bank=BANK_ID, bank_name="BANCOLOMBIA"))
+        await session.commit()
+    yield factory
+    await engine.dispose()
+
+
+def build_transactions(count: int) -> list:
+    start = datetime(2025, 1, 1, 5, 0)
+    return [
+        Transaction(
+            id_transaction=None,
+            id_user=USER_ID,
+            id_category=CATEGORY_ID,
+            id_bank=BANK_ID,
+            id_batch=None,
+            transaction_name=f"COMPRA EN TIENDA {i % 250}",
+            value=Decimal(i % 1000) + Decimal("0.50"),
+            transaction_date=start + timedelta(minutes=i),
+            transaction_type="expense",
+        )
+        for i in range(count)
+    ]
+
+
+def build_chunk(count: int) -> TransactionChunk:
+    start = np.datetime64("2025-01-01T05:00", "us")
+    return TransactionChunk(
+        dates=start + np.arange(count).astype("timedelta64[m]"),
+        amounts=-(np.arange(count, dtype=np.int64) % 1000 * 100 + 50),
+        descriptions=np.array([f"COMPRA EN TIENDA {i % 250}" for i in range(count)], dtype=object),
+        references=np.full(count, None, dtype=object),
+    )
+
+
+async def legacy_save_batch(session, transactions: list) -> None:
+    """The previous write path: ORM objects, flush, then one refresh per row"""
+    models = [
+        TransactionModel(
+            id_user=str(tx.id_user),
+            id_bank=tx.id_bank,
+            id_category=tx.id_category,
+            id_batch=None,
+            transaction_date=tx.transaction_date,
+            transaction_name=tx.transaction_name,
+            value=tx.value,
+            transaction_type=tx.transaction_type,
+        )
+        for tx in transactions
+    ]
+    session.add_all(models)
+    await session.flush()
+    for model in models:
+        await session.refresh(model)
+
+
+async def count_rows(session) -> int:
+    return (await session.execute(select(func.count()).select_from(TransactionModel))).scalar()
+
+
+def report(label: str, rows: int, seconds: float) -> float:
+    throughput = rows / seconds
+    print(f"  {label:<28} {seconds*1000:>8.0f}ms  {throughput:>10,.0f} rows/sec")
+    return throughput
+
+
+@pytest.mark.asyncio
+async def test_save_batch_returns_ids_without_reading_back(session_factory):
+    """save_batch assigns client-side IDs and the rows are stored with them"""
+    async with session_factory() as session:
+        repo = MySQLTransactionRepository(session)
+        saved = await repo.save_batch(build_transactions(3))
+        await session.commit()
+
+        assert all(isinstance(tx.id_transaction, UUID) for tx in saved)
+        stored = (await session.execute(select(TransactionModel.id_transaction))).scalars().all()
+        assert sorted(stored) == sorted(str(tx.id_transaction) for tx in saved)
+
+
+@pytest.mark.asyncio
+async def test_save_chunk_skips_rows_already_in_batch(session_factory):
+    """Re-inserting a chunk of a batch (a retried chunk) doesn't duplicate its rows"""
+    async with session_factory() as session:
+        session.add(TransactionBatchModel(
+            id_batch=BATCH_ID, process_status="processing", start_date=datetime.now()
+        ))
+        repo = MySQLTransactionRepository(session)
+        chunk = build_chunk(10)
+        category_ids = np.full(10, CATEGORY_ID, dtype=object)
+
+        await repo.save_chunk(chunk.slice(0, 6), category_ids[:6], str(USER_ID), BANK_ID, BATCH_ID)
+        await session.commit()
+        await repo.save_chunk(chunk, category_ids, str(USER_ID), BANK_ID, BATCH_ID)
+        await session.commit()
+
+        rows = (await session.execute(
+            select(TransactionModel.batch_row).order_by(TransactionModel.batch_row)
+        )).scalars().all()
+        assert rows == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_save_chunk_raises_on_rows_that_are_not_duplicates(session_factory):
+    """Only duplicate keys are skipped; a row missing its category still fails"""
+    async with session_factory() as session:
+        repo = MySQLTransactionRepository(session)
+        category_ids = np.full(3, CATEGORY_ID, dtype=object)
+        category_ids[1] = None
+
+        with pytest.raises(IntegrityError):
+            await repo.save_chunk(build_chunk(3), category_ids, str(USER_ID), BANK_ID, None)
+
+
+@pytest.mark.asyncio
+async def test_insert_throughput(session_factory):
+    """Bulk INSERT paths write the same rows faster than the ORM refresh path"""
+    rows = CHUNK_SIZE * CHUNK_COUNT
+    print(f"\n{'='*70}")
+    print(f"INSERT THROUGHPUT ({CHUNK_COUNT} chunks of {CHUNK_SIZE} rows, SQLite stand-in)")
+    print(f"{'='*70}")
+
+    async with session_factory() as session:
+        repo = MySQLTransactionRepository(session)
+        transactions = build_transactions(CHUNK_SIZE)
+        chunk = build_chunk(CHUNK_SIZE)
+        category_ids = np.full(CHUNK_SIZE, CATEGORY_ID, dtype=object)
+
+        start = time.perf_counter()
+        for _ in range(CHUNK_COUNT):
+            await legacy_save_batch(session, transactions)
+            await session.commit()
+        legacy = report("add_all + refresh per row", rows, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(CHUNK_COUNT):
+            await repo.save_batch(transactions)
+            await session.commit()
+        bulk = report("save_batch (executemany)", rows, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for _ in range(CHUNK_COUNT):
+            await repo.save_chunk(chunk, category_ids, str(USER_ID), BANK_ID, None)
+            await session.commit()
+        columnar = report("save_chunk (executemany)", rows, time.perf_counter() - start)
+
+        assert await count_rows(session) == rows * 3
+        assert bulk > legacy
+        assert columnar > legacy
+
+
+# Run with: pytest tests/test_repository_performance.py -v -s
@@ -0,0 +1,116 @@
+"""
+Tests for hash_upload and RequestSizeLimitMiddleware
+
+Checks that uploads are:
+- Hashed in chunks with the same result as hashing the whole content,
+  in place, without copying the file
+- Rejected when over the size limit without reading them
+- Readable by the parser straight from the spooled file
+- Turned away with 413 before their body is read when the Content-Length
+  is over the request limit, and as soon as a body without one crosses it
+
+Run with: pytest tests/test_spooled_upload.py -v
+"""
+import hashlib
+from io import BytesIO
+import pytest
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from src.api.middleware import RequestSizeLimitMiddleware
+from src.infrastructure.parsers import BancolombiaParser
+from src.infrastructure.storage import FileTooLargeError, hash_upload
+from tests.test_bancolombia_parser import SAMPLE_ROWS, create_excel
+
+
+class RecordingFile(BytesIO):
+    """BytesIO that records how much was read"""
+
+    bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+class TestHashUpload:
+    """Test suite for hash_upload"""
+
+    @pytest.mark.asyncio
+    async def test_hash_and_size_match_content(self):
+        content = bytes(range(256)) * 1000
+        file = BytesIO(content)
+
+        upload = await hash_upload(file, "file.xlsx", max_size=10**6, chunk_size=4096)
+
+        assert upload.file_hash == hashlib.sha256(content).hexdigest()
+        assert upload.file_size == len(content)
+        assert upload.file is file
+        assert upload.file.read() == content
+        upload.close()
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_file_without_reading(self):
+        file = RecordingFile(b"x" * 100_000)
+
+        with pytest.raises(FileTooLargeError):
+            await hash_upload(file, "big.xlsx", max_size=10_000, chunk_size=1000)
+
+        assert file.bytes_read == 0
+
+    @pytest.mark.asyncio
+    async def test_parser_reads_hashed_file(self):
+        upload = await hash_upload(
+            BytesIO(create_excel(SAMPLE_ROWS)), "extracto.xlsx", max_size=10**6
+        )
+        parser = BancolombiaParser()
+
+        assert parser.count_rows(upload.file) == len(SAMPLE_ROWS)
+        assert sum(len(chunk) for chunk in parser.iter_chunks(upload.file, 2)) == len(SAMPLE_ROWS)
+        upload.close()
+
+
+class TestRequestSizeLimitMiddleware:
+    """Test suite for RequestSizeLimitMiddleware"""
+
+    @pytest.fixture
+    def client(self):
+        self.received = []
+        app = FastAPI()
+        app.add_middleware(RequestSizeLimitMiddleware, max_body_size=10_000)
+
+        @app.post("/upload")
+        async def upload(files: list[UploadFile] = File(...)):
+            self.received.extend(file.filename for file in files)
+            return {"files": len(files)}
+
+        return TestClient(app)
+
+    def test_accepts_request_within_limit(self, client):
+        response = client.post("/upload", files={"files": ("a.xlsx", b"x" * 5_000)})
+
+        assert response.status_code == 200
+        assert self.received == ["a.xlsx"]
+
+    def test_rejects_content_length_over_limit(self, client):
+        response = client.post("/upload", files={"files": ("a.xlsx", b"x" * 20_000)})
+
+        assert response.status_code == 413
+        assert self.received == []
+
+    def test_rejects_chunked_body_crossing_limit(self, client):
+        def body():
+            for _ in range(100):
+                yield b"x" * 1000
+
+        response = client.post(
+            "/upload",
+            content=body(),
+            headers={"Content-Type": "multipart/form-data; boundary=b"},
+        )
+
+        assert response.status_code == 413
+        assert self.received == []
+
+
+# Run with: pytest tests/test_spooled_upload.py -v
@@ -0,0 +1,244 @@
+"""
+Tests for the stage executors
+
+Checks that:
+- Thread and process executors parse stored files into the same chunks as
+  parsing on the event loop
+- The event loop keeps running while a stage runs on the thread executor
+- Stopping an iteration early closes its source
+- The process executor sends iterated items back a few at a time, stops
+  the worker process when the iteration stops early and raises what the
+  iterable raised
+- MLClassifier predicts the same on a process executor as on the event loop
+- An upload whose files fail validation leaves no stored files behind
+
+Run with: pytest tests/test_stage_executor.py -v
+"""
+import asyncio
+import os
+import time
+from io import BytesIO
+from unittest.mock import AsyncMock
+import numpy as np
+import pytest
+from src.application.use_cases import ProcessFilesUseCase
+from src.application.use_cases.process_batch_use_case import read_stored_chunks
+from src.domain.entities import Bank
+from src.infrastructure.classifier import MLClassifier
+from src.infrastructure.executors import (
+    InlineStageExecutor,
+    ThreadStageExecutor,
+    ProcessStageExecutor,
+)
+from src.infrastructure.executors import stage_executor
+from src.infrastructure.parsers import BancolombiaParser
+from src.infrastructure.storage import LocalFileStorage
+from tests.test_bancolombia_parser import SAMPLE_ROWS, create_excel
+
+
+MODELS_PATH = os.path.join(os.path.dirname(__file__), "..", "models")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return LocalFileStorage(str(tmp_path / "uploads"))
+
+
+@pytest.fixture
+def file_keys(storage):
+    return [
+        storage.save("batch", index, BytesIO(create_excel(SAMPLE_ROWS * (index + 1))))
+        for index in range(2)
+    ]
+
+
+async def parse(executor, storage, file_keys):
+    chunks = [
+        chunk
+        async for chunk in executor.iterate(
+            read_stored_chunks, storage, BancolombiaParser(), file_keys, 3
+        )
+    ]
+    return (
+        np.concatenate([chunk.descriptions for chunk in chunks]).tolist(),
+        np.concatenate([chunk.amounts for chunk in chunks]).tolist(),
+        np.concatenate([chunk.dates for chunk in chunks]).tolist(),
+    )
+
+
+def opened_source(events):
+    try:
+        for item in range(10):
+            yield item
+    finally:
+        events.append("closed")
+
+
+def logged_source(path, count):
+    """Yields count items, logging each one (and closing) to a file the test reads"""
+    try:
+        for item in range(count):
+            with open(path, "a") as log:
+                log.write(f"{item}\n")
+            yield item
+    finally:
+        with open(path, "a") as log:
+            log.write("closed\n")
+
+
+def failing_source():
+    yield 1
+    raise ValueError("unexpected format")
+
+
+class TestStageExecutors:
+    """Test suite for the stage executors"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("executor_class", [ThreadStageExecutor, ProcessStageExecutor])
+    async def test_parses_like_the_event_loop(self, executor_class, storage, file_keys):
+        expected = await parse(InlineStageExecutor(), storage, file_keys)
+        executor = executor_class(workers=2)
+        try:
+            parsed = await parse(executor, storage, file_keys)
+        finally:
+            executor.close()
+
+        assert parsed == expected
+        assert len(parsed[0]) == len(SAMPLE_ROWS) * 3
+
+    @pytest.mark.asyncio
+    async def test_event_loop_keeps_running(self):
+        executor = ThreadStageExecutor(workers=1)
+        ticks = []
+
+        async def ticker():
+            while True:
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        task = asyncio.create_task(ticker())
+        try:
+            await asyncio.sleep(0.02)
+            await executor.run(time.sleep, 0.3)
+        finally:
+            task.cancel()
+            executor.close()
+
+        assert max(np.diff(ticks)) < 0.1
+
+    @pytest.mark.asyncio
+    async def test_closing_iteration_closes_source(self):
+        executor = ThreadStageExecutor(workers=1)
+        events = []
+        try:
+            items = executor.iterate(opened_source, events)
+            assert await items.__anext__() == 0
+            await items.aclose()
+        finally:
+            executor.close()
+
+        assert events == ["closed"]
+
+    @pytest.mark.asyncio
+    async def test_process_executor_streams_items(self, tmp_path):
+        executor = ProcessStageExecutor(workers=1)
+        log = tmp_path / "source.log"
+        try:
+            items = executor.iterate(logged_source, str(log), 1000)
+            assert await items.__anext__() == 0
+            await asyncio.sleep(1)
+            produced = log.read_text().split()
+            await items.aclose()
+            # The worker process notices the consumer stopped at its next put
+            await asyncio.sleep(2 * stage_executor._STREAM_POLL_SECONDS)
+            stopped = log.read_text().split()
+        finally:
+            executor.close()
+
+        # One item consumed, a full queue and one waiting to be put
+        assert len(produced) <= stage_executor.STREAM_QUEUE_SIZE + 2
+        assert stopped[-1] == "closed"
+        assert len(stopped) == len(produced) + 1
+
+    @pytest.mark.asyncio
+    async def test_process_executor_raises_iterable_errors(self):
+        executor = ProcessStageExecutor(workers=1)
+        try:
+            received = []
+            with pytest.raises(ValueError):
+                async for item in executor.iterate(failing_source):
+                    received.append(item)
+        finally:
+            executor.close()
+
+        assert received == [1]
+
+    def test_rejects_unknown_mode(self, monkeypatch):
+        monkeypatch.setattr(stage_executor, "_stage_executor", None)
+        monkeypatch.setenv("STAGE_EXECUTOR", "gpu")
+
+        with pytest.raises(ValueError):
+            stage_executor.get_stage_executor()
+
+
+class TestOffloadedClassification:
+    """Test suite for MLClassifier on a stage executor"""
+
+    @pytest.mark.asyncio
+    async def test_process_executor_matches_event_loop(self):
+        descriptions = [
+            "PAGO DE NOMI PRAGMA S A", "COMPRA EN EXITO", "UBER TRIP", "", "RETIRO CAJERO 123",
+        ]
+        values = [1950000, -50000, -12000, -1, -200000]
+        expected = await MLClassifier(models_path=MODELS_PATH).classify_batch(descriptions, values)
+        executor = ProcessStageExecutor(workers=1)
+        classifier = MLClassifier(models_path=MODELS_PATH, stage_executor=executor)
+        try:
+            categories = await classifier.classify_batch(descriptions, values)
+        finally:
+            executor.close()
+
+        # The process loaded the compiled model rather than falling back to a thread
+        assert classifier._current().directory is not None
+        assert categories == expected
+        assert categories[3] == "Other"
+
+
+class TestUploadValidation:
+    """Test suite for upload validation on the stage executor"""
+
+    @pytest.mark.asyncio
+    async def test_invalid_files_are_not_kept(self, storage):
+        reference_data = AsyncMock()
+        reference_data.get_bank_by_name.return_value = Bank(id_bank="bank-1", bank_name="BANCOLOMBIA")
+        history = AsyncMock()
+        history.get_by_hashes.return_value = []
+        executor = ThreadStageExecutor(workers=1)
+        use_case = ProcessFilesUseCase(
+            transaction_repo=None,
+            bank_repo=None,
+            category_repo=None,
+            batch_repo=None,
+            file_upload_history_repo=history,
+            reference_data=reference_data,
+            job_queue=AsyncMock(),
+            file_storage=storage,
+            stage_executor=executor,
+        )
+        content = create_excel(SAMPLE_ROWS, header=["Fecha", "Valor"])
+        try:
+            with pytest.raises(ValueError):
+                await use_case.execute(
+                    files_data=[(BytesIO(content), "a" * 64, "extracto.xlsx", len(content))],
+                    parser=BancolombiaParser(),
+                    user_id="123e4567-e89b-12d3-a456-426614174001",
+                )
+        finally:
+            executor.close()
+
+        assert os.listdir(storage.base_path) == []
+        history.register_batch.assert_not_called()
+
+
+# Run with: pytest tests/test_stage_executor.py -v
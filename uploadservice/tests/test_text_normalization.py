@@ -0,0 +1,142 @@
+"""
+Parity tests for the classifier text normalization
+
+The model was trained on descriptions preprocessed by the pandas + re
+implementation kept below as legacy_clean_text / legacy_create_transaction_type.
+clean_text, clean_texts, create_transaction_type and transaction_types must
+return exactly the same strings for every input, including Unicode letters,
+Unicode whitespace and missing values.
+
+Run with: pytest tests/test_text_normalization.py -v
+"""
+import random
+import re
+import subprocess
+import sys
+from decimal import Decimal
+import numpy as np
+import pandas as pd
+from src.infrastructure.classifier.utils import (
+    clean_text,
+    clean_texts,
+    create_transaction_type,
+    transaction_types,
+)
+
+
+def legacy_clean_text(text):
+    """Training-time preprocessing"""
+    if pd.isna(text):
+        return ""
+    text = str(text).upper()
+    text = re.sub(r'[^A-Z0-9\s]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+    return text
+
+
+def legacy_create_transaction_type(value):
+    if pd.isna(value):
+        return 'neutro'
+    if value > 0:
+        return 'ingreso'
+    elif value < 0:
+        return 'egreso'
+    else:
+        return 'neutro'
+
+
+EDGE_CASES = [
+    "TRANSF DE JOIVER GONZ",
+    "  pago de nómina  PRAGMA S.A. ",
+    "COMPRA*EXITO/CALLE-80",
+    "Straße ﬁnanciera",  # upper() expands ß and the ligature
+    "año niño café\tmenú\nfin",  # Unicode whitespace
+    "\x1c\x1d\x1e\x1f\x85 separators",
+    "emoji 🍔 pizza 🍕",
+    "ı i̇ ǆ ǅ",
+    "",
+    "   ",
+    "***",
+    "a\x00b",
+    None,
+    float("nan"),
+    np.nan,
+    np.float32("nan"),
+    pd.NA,
+    pd.NaT,
+    12345,
+    -4160.04,
+    Decimal("1.50"),
+]
+
+RANDOM_ALPHABET = (
+    "abcxyzABCXYZ0189 áéíóúñÑüß.,;:-_/*#@()[]\t\n\r\x0b\x0c"
+    "   　İıﬁǆ€£¥🍔"
+)
+
+
+def random_texts(count=3000):
+    rng = random.Random(7)
+    return [
+        "".join(rng.choice(RANDOM_ALPHABET) for _ in range(rng.randint(0, 40)))
+        for _ in range(count)
+    ]
+
+
+class TestCleanText:
+    """Test suite for clean_text and clean_texts"""
+
+    def test_edge_cases_match_training(self):
+        for text in EDGE_CASES:
+            assert clean_text(text) == legacy_clean_text(text), repr(text)
+
+    def test_random_texts_match_training(self):
+        for text in random_texts():
+            assert clean_text(text) == legacy_clean_text(text), repr(text)
+
+    def test_batch_matches_training(self):
+        texts = EDGE_CASES + random_texts()
+
+        assert clean_texts(texts) == [legacy_clean_text(text) for text in texts]
+
+    def test_batch_of_numpy_column(self):
+        column = np.array(["COMPRA EXITO", None, "uber*trip"], dtype=object)
+
+        assert clean_texts(column) == ["COMPRA EXITO", "", "UBER TRIP"]
+
+    def test_empty_batch(self):
+        assert clean_texts([]) == []
+
+
+class TestTransactionType:
+    """Test suite for create_transaction_type and transaction_types"""
+
+    VALUES = [29900, -4160.04, 0, 0.0, -0.0, 0.02, None, float("nan"), np.int64(-3),
+              np.float32(2.5), Decimal("-1.5"), Decimal("0"), True, pd.NA]
+
+    def test_matches_training(self):
+        for value in self.VALUES:
+            assert create_transaction_type(value) == legacy_create_transaction_type(value)
+
+    def test_batch_matches_training(self):
+        expected = [legacy_create_transaction_type(value) for value in self.VALUES]
+
+        assert transaction_types(self.VALUES) == expected
+        assert transaction_types(self.VALUES[:-1]) == expected[:-1]
+
+    def test_batch_of_numpy_column(self):
+        assert transaction_types(np.array([-1.0, 0.0, 2.0])) == ["egreso", "neutro", "ingreso"]
+
+
+def test_classifier_import_does_not_load_pandas():
+    """The classifier preprocessing doesn't need pandas"""
+    code = (
+        "import sys\n"
+        "from src.infrastructure.classifier import utils, inference_engine\n"
+        "assert 'pandas' not in sys.modules, 'pandas imported'\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+# Run with: pytest tests/test_text_normalization.py -v
@@ -0,0 +1,205 @@
+"""
+Tests for the staged transaction pipeline
+
+Checks that:
+- Every row reaches the persist stage, in order
+- Classification of the next chunk overlaps with persisting the previous one
+- The chunk size follows the measured insert latency
+- An error in any stage stops the pipeline
+- Rows are numbered in source order and skipped rows are not processed again
+- Several lanes persist concurrently, and the commit checkpoint only covers
+  rows committed from the start
+
+Run with: pytest tests/test_transaction_pipeline.py -v
+"""
+import asyncio
+import numpy as np
+import pytest
+from src.application.services import TransactionPipeline, ChunkSizeController, CommitCheckpoint
+from src.domain.entities import TransactionChunk
+
+
+def make_chunks(sizes):
+    """Parser-like chunks whose amounts number the rows 0..N-1"""
+    chunks, start = [], 0
+    for size in sizes:
+        amounts = np.arange(start, start + size, dtype=np.int64)
+        chunks.append(
+            TransactionChunk(
+                dates=np.full(size, np.datetime64("2025-01-01", "us")),
+                amounts=amounts,
+                descriptions=np.array([f"TX {i}" for i in amounts], dtype=object),
+                references=np.full(size, None, dtype=object),
+            )
+        )
+        start += size
+    return chunks
+
+
+class TestChunkSizeController:
+    """Test suite for ChunkSizeController"""
+
+    def test_grows_when_inserts_are_fast(self):
+        sizer = ChunkSizeController(initial=500, maximum=5000, target_seconds=0.5, smoothing=1.0)
+        sizer.record(rows=500, seconds=0.1)
+        assert sizer.chunk_size == 2500
+
+    def test_shrinks_when_inserts_are_slow(self):
+        sizer = ChunkSizeController(initial=500, minimum=100, target_seconds=0.5, smoothing=1.0)
+        sizer.record(rows=500, seconds=1.0)
+        assert sizer.chunk_size == 250
+
+    def test_stays_within_bounds(self):
+        sizer = ChunkSizeController(initial=500, minimum=100, maximum=1000, smoothing=1.0)
+        sizer.record(rows=500, seconds=0.0001)
+        assert sizer.chunk_size == 1000
+        sizer.record(rows=500, seconds=100)
+        assert sizer.chunk_size == 100
+
+
+class TestTransactionPipeline:
+    """Test suite for TransactionPipeline"""
+
+    @pytest.mark.asyncio
+    async def test_persists_every_row_in_order(self):
+        persisted = []
+
+        async def classify(chunk):
+            return ["Other"] * len(chunk)
+
+        async def persist(chunk, labels):
+            assert len(labels) == len(chunk)
+            persisted.extend(chunk.amounts.tolist())
+
+        pipeline = TransactionPipeline(
+            classify, persist, ChunkSizeController(initial=120, minimum=100, smoothing=0)
+        )
+        rows = await pipeline.run(make_chunks([50] * 10 + [7]))
+
+        assert rows == 507
+        assert persisted == list(range(507))
+
+    @pytest.mark.asyncio
+    async def test_classify_overlaps_with_persist(self):
+        events = []
+
+        async def classify(chunk):
+            events.append(("classify", int(chunk.amounts[0])))
+            return ["Other"] * len(chunk)
+
+        async def persist(chunk, labels):
+            events.append(("persist start", int(chunk.amounts[0])))
+            await asyncio.sleep(0.01)
+            events.append(("persist end", int(chunk.amounts[0])))
+
+        pipeline = TransactionPipeline(
+            classify, persist, ChunkSizeController(initial=100, minimum=100, smoothing=0)
+        )
+        await pipeline.run(make_chunks([100] * 3))
+
+        # The second chunk is classified before the first one finishes persisting
+        assert events.index(("classify", 100)) < events.index(("persist end", 0))
+
+    @pytest.mark.asyncio
+    async def test_chunk_size_adapts_to_insert_latency(self):
+        sizes = []
+
+        async def classify(chunk):
+            return ["Other"] * len(chunk)
+
+        async def persist(chunk, labels):
+            sizes.append(len(chunk))
+            # Inserts take 0.1ms per row, so 0.05s fit 500 rows
+            await asyncio.sleep(len(chunk) * 0.0001)
+
+        sizer = ChunkSizeController(
+            initial=100, minimum=100, maximum=5000, target_seconds=0.05, smoothing=1.0
+        )
+        await TransactionPipeline(classify, persist, sizer, queue_size=1).run(
+            make_chunks([100] * 40)
+        )
+
+        assert sizes[0] == 100
+        assert max(sizes) > 100
+
+    @pytest.mark.asyncio
+    async def test_stage_error_stops_pipeline(self):
+        async def classify(chunk):
+            if chunk.amounts[0] >= 200:
+                raise RuntimeError("classifier failed")
+            return ["Other"] * len(chunk)
+
+        async def persist(chunk, labels):
+            pass
+
+        pipeline = TransactionPipeline(
+            classify, persist, ChunkSizeController(initial=100, minimum=100, smoothing=0)
+        )
+        with pytest.raises(RuntimeError, match="classifier failed"):
+            await pipeline.run(make_chunks([100] * 5))
+
+    @pytest.mark.asyncio
+    async def test_skip_rows_resumes_with_source_row_numbers(self):
+        persisted = []
+
+        async def classify(chunk):
+            return ["Other"] * len(chunk)
+
+        async def persist(chunk, labels):
+            # first_row numbers the rows like the amounts of make_chunks
+            assert chunk.first_row == chunk.amounts[0]
+            persisted.extend(chunk.amounts.tolist())
+
+        pipeline = TransactionPipeline(
+            classify, persist, ChunkSizeController(initial=100, minimum=100, smoothing=0)
+        )
+        rows = await pipeline.run(make_chunks([60] * 5), skip_rows=130)
+
+        assert rows == 170
+        assert persisted == list(range(130, 300))
+
+    @pytest.mark.asyncio
+    async def test_lanes_persist_concurrently(self):
+        persisted = []
+        running = 0
+        most_running = 0
+
+        async def classify(chunk):
+            return ["Other"] * len(chunk)
+
+        async def persist(chunk, labels):
+            nonlocal running, most_running
+            running += 1
+            most_running = max(most_running, running)
+            await asyncio.sleep(0.01)
+            persisted.extend(chunk.amounts.tolist())
+            running -= 1
+
+        pipeline = TransactionPipeline(
+            classify, persist, ChunkSizeController(initial=100, minimum=100, smoothing=0), lanes=3
+        )
+        rows = await pipeline.run(make_chunks([100] * 9))
+
+        assert rows == 900
+        assert sorted(persisted) == list(range(900))
+        assert most_running == 3
+
+
+class TestCommitCheckpoint:
+    """Test suite for CommitCheckpoint"""
+
+    def test_covers_rows_committed_from_the_start(self):
+        checkpoint = CommitCheckpoint(position=100, count=5)
+
+        # A chunk past the checkpoint doesn't move it
+        assert checkpoint.including(200, 300, 7) == (100, 5)
+        checkpoint.commit(200, 300, 7)
+        assert (checkpoint.position, checkpoint.count) == (100, 5)
+
+        # The missing chunk joins both
+        assert checkpoint.including(100, 200, 1) == (300, 13)
+        checkpoint.commit(100, 200, 1)
+        assert (checkpoint.position, checkpoint.count) == (300, 13)
+
+
+# Run with: pytest tests/test_transaction_pipeline.py -v